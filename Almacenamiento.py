@@ -0,0 +1,431 @@
+"""
+Módulo que define los mecanismos de almacenamiento persistente del crucero.
+
+Este módulo implementa una capa de almacenamiento intercambiable para el
+estado de Crucero (usuarios, reservas y contadores de códigos):
+
+- Almacenamiento: almacenamiento en memoria, sin persistencia.
+- AlmacenamientoDiario: diario de operaciones de solo adición más
+  instantáneas compactas periódicas.
+- AlmacenamientoSQLite: base de datos SQLite con índices.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import date, timedelta
+
+def estado_vacio():
+    """
+    Crea la estructura de estado vacía que devuelven los almacenamientos.
+
+    Returns:
+        dict: Diccionario con usuarios, reservas activas, reservas archivadas
+            en el historial, rutas de los archivos sellados y contadores de códigos.
+    """
+    return {"usuarios": {}, "reservas": {}, "historial": {}, "archivos": [],
+            "contadores": {"identificadores": 0}}
+
+def fecha_salida(datos):
+    """
+    Calcula la fecha de salida de una reserva guardada.
+
+    Args:
+        datos (dict): Reserva con el formato de Reserva.a_dict.
+
+    Returns:
+        str: Fecha de salida en formato ISO.
+    """
+    return (date.fromisoformat(datos["fecha_inicio"]) + timedelta(days=datos["dias_reserva"])).isoformat()
+
+def aplicar_operacion(estado, operacion):
+    """
+    Aplica una operación del diario sobre un estado.
+
+    Args:
+        estado (dict): Estado a modificar, con el formato de estado_vacio.
+        operacion (dict): Operación con la clave "op" y sus datos.
+    """
+    tipo = operacion["op"]
+    if tipo == "lote":
+        for suboperacion in operacion["operaciones"]:
+            aplicar_operacion(estado, suboperacion)
+    elif tipo == "usuario":
+        datos = operacion["usuario"]
+        estado["usuarios"][datos["codigo"]] = datos
+    elif tipo == "reserva":
+        datos = operacion["reserva"]
+        estado["reservas"][datos["codigo_reserva"]] = datos
+    elif tipo == "cancelacion":
+        estado["reservas"].pop(operacion["codigo_reserva"], None)
+    elif tipo == "archivo":
+        for codigo in operacion["codigos"]:
+            datos = estado["reservas"].pop(codigo, None)
+            if datos is not None:
+                estado["historial"][codigo] = datos
+                # Los usuarios de la reserva terminaron su estancia
+                for codigo_usuario in datos["codigos_usuarios"]:
+                    usuario = estado["usuarios"].get(codigo_usuario)
+                    if usuario is not None:
+                        usuario["fecha_salida"] = fecha_salida(datos)
+    elif tipo == "sellado":
+        # El historial completo quedó escrito en el archivo
+        estado["historial"].clear()
+        if operacion["ruta"] not in estado["archivos"]:
+            estado["archivos"].append(operacion["ruta"])
+
+    # Los contadores nunca retroceden, aunque se cancele la última reserva
+    for nombre, valor in operacion.get("contadores", {}).items():
+        estado["contadores"][nombre] = max(estado["contadores"].get(nombre, 0), valor)
+
+class Almacenamiento:
+    """
+    Almacenamiento base en memoria, sin persistencia.
+
+    Define la interfaz que utilizan los demás almacenamientos. Las clases
+    derivadas sobrescriben sus métodos para guardar el estado en disco.
+    """
+
+    def cargar(self):
+        """
+        Carga el estado guardado.
+
+        Returns:
+            dict: Estado con el formato de estado_vacio.
+        """
+        return estado_vacio()
+
+    def registrar(self, operacion):
+        """
+        Registra una operación de creación o cancelación, o un lote de ellas.
+
+        Args:
+            operacion (dict): Operación con la clave "op" y sus datos.
+
+        Returns:
+            bool: True si conviene compactar el almacenamiento.
+        """
+        return False
+
+    def compactar(self, estado):
+        """
+        Reemplaza el historial de operaciones por una instantánea del estado.
+
+        Args:
+            estado (dict): Estado completo con el formato de estado_vacio.
+        """
+
+    def cerrar(self):
+        """
+        Libera los recursos del almacenamiento.
+        """
+
+class AlmacenamientoDiario(Almacenamiento):
+    """
+    Almacenamiento en un diario de operaciones más instantáneas periódicas.
+
+    Cada operación se escribe como una línea JSON al final del diario, de modo
+    que cada escritura es una única adición secuencial. Cuando el diario supera
+    el intervalo configurado se escribe una instantánea del estado completo y
+    se vacía el diario, por lo que al reiniciar solo se carga la instantánea y
+    se reproducen las operaciones posteriores.
+
+    Attributes:
+        directorio (str): Directorio donde se guardan los archivos.
+        intervalo_instantanea (int): Operaciones tras las que se compacta.
+        sincronizar (bool): Si es True, fuerza la escritura a disco (fsync)
+            después de cada operación.
+    """
+
+    ARCHIVO_DIARIO = "diario.jsonl"
+    ARCHIVO_INSTANTANEA = "instantanea.json"
+
+    def __init__(self, directorio, intervalo_instantanea=1000, sincronizar=False):
+        """
+        Inicializa el almacenamiento en el directorio indicado.
+
+        Args:
+            directorio (str): Directorio de datos. Se crea si no existe.
+            intervalo_instantanea (int, optional): Operaciones del diario tras
+                las que se recomienda compactar. Por defecto 1000.
+            sincronizar (bool, optional): Forzar fsync tras cada operación.
+                Por defecto False.
+        """
+        self.directorio = directorio
+        self.intervalo_instantanea = intervalo_instantanea
+        self.sincronizar = sincronizar
+        os.makedirs(directorio, exist_ok=True)
+        self._ruta_diario = os.path.join(directorio, self.ARCHIVO_DIARIO)
+        self._ruta_instantanea = os.path.join(directorio, self.ARCHIVO_INSTANTANEA)
+        self._operaciones_diario = 0
+        self._diario = None
+
+    def cargar(self):
+        """
+        Carga la última instantánea y reproduce el diario posterior.
+
+        Una última línea incompleta (escritura interrumpida) se descarta y se
+        recorta del archivo, para que las operaciones siguientes no se escriban
+        a continuación de ella y se pierdan con ella al volver a cargar.
+
+        Returns:
+            dict: Estado con el formato de estado_vacio.
+        """
+        estado = estado_vacio()
+        if os.path.exists(self._ruta_instantanea):
+            with open(self._ruta_instantanea, encoding="utf-8") as archivo:
+                estado.update(json.load(archivo))
+
+        self._operaciones_diario = 0
+        if os.path.exists(self._ruta_diario):
+            # Bytes del diario hasta la última línea completa y válida
+            validos = 0
+            with open(self._ruta_diario, "rb") as archivo:
+                for linea in archivo:
+                    if not linea.endswith(b"\n"):
+                        break
+                    try:
+                        operacion = json.loads(linea)
+                    except ValueError:
+                        break
+                    aplicar_operacion(estado, operacion)
+                    self._operaciones_diario += 1
+                    validos += len(linea)
+                recortar = archivo.seek(0, os.SEEK_END) > validos
+            if recortar:
+                with open(self._ruta_diario, "r+b") as archivo:
+                    archivo.truncate(validos)
+                    os.fsync(archivo.fileno())
+        return estado
+
+    def registrar(self, operacion):
+        """
+        Añade una operación al final del diario.
+
+        Args:
+            operacion (dict): Operación con la clave "op" y sus datos.
+
+        Returns:
+            bool: True si el diario alcanzó el intervalo de instantánea.
+        """
+        if self._diario is None:
+            self._diario = open(self._ruta_diario, "a", encoding="utf-8")
+        self._diario.write(json.dumps(operacion, ensure_ascii=False) + "\n")
+        self._diario.flush()
+        if self.sincronizar:
+            os.fsync(self._diario.fileno())
+        self._operaciones_diario += 1
+        return self._operaciones_diario >= self.intervalo_instantanea
+
+    def compactar(self, estado):
+        """
+        Escribe una instantánea del estado y vacía el diario.
+
+        La instantánea se escribe en un archivo temporal que luego reemplaza
+        al anterior, para no dejar nunca una instantánea a medio escribir.
+
+        Args:
+            estado (dict): Estado completo con el formato de estado_vacio.
+        """
+        ruta_temporal = self._ruta_instantanea + ".tmp"
+        with open(ruta_temporal, "w", encoding="utf-8") as archivo:
+            json.dump(estado, archivo, ensure_ascii=False)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(ruta_temporal, self._ruta_instantanea)
+
+        # Vaciar el diario: sus operaciones ya están en la instantánea
+        if self._diario is not None:
+            self._diario.close()
+        self._diario = open(self._ruta_diario, "w", encoding="utf-8")
+        self._operaciones_diario = 0
+
+    def cerrar(self):
+        """
+        Cierra el archivo del diario.
+        """
+        if self._diario is not None:
+            self._diario.close()
+            self._diario = None
+
+class AlmacenamientoSQLite(Almacenamiento):
+    """
+    Almacenamiento en una base de datos SQLite.
+
+    Cada operación se aplica directamente sobre las tablas, usando el modo WAL
+    de SQLite como diario. Las reservas se indexan por habitación y fecha de
+    inicio, y por usuario mediante una tabla de relación.
+
+    Attributes:
+        ruta (str): Ruta del archivo de la base de datos.
+    """
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            codigo TEXT PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            fecha_registro TEXT NOT NULL,
+            fecha_salida TEXT
+        );
+        CREATE TABLE IF NOT EXISTS reservas (
+            codigo_reserva TEXT PRIMARY KEY,
+            codigo_habitacion TEXT NOT NULL,
+            codigos_usuarios TEXT NOT NULL,
+            dias_reserva INTEGER NOT NULL,
+            fecha_inicio TEXT NOT NULL,
+            fecha_reserva TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_reservas_habitacion
+            ON reservas (codigo_habitacion, fecha_inicio);
+        CREATE TABLE IF NOT EXISTS historial (
+            codigo_reserva TEXT PRIMARY KEY,
+            codigo_habitacion TEXT NOT NULL,
+            codigos_usuarios TEXT NOT NULL,
+            dias_reserva INTEGER NOT NULL,
+            fecha_inicio TEXT NOT NULL,
+            fecha_reserva TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS reservas_usuarios (
+            codigo_usuario TEXT NOT NULL,
+            codigo_reserva TEXT NOT NULL REFERENCES reservas ON DELETE CASCADE,
+            PRIMARY KEY (codigo_usuario, codigo_reserva)
+        );
+        CREATE INDEX IF NOT EXISTS idx_reservas_usuarios_reserva
+            ON reservas_usuarios (codigo_reserva);
+        CREATE TABLE IF NOT EXISTS archivos (
+            ruta TEXT PRIMARY KEY
+        );
+        CREATE TABLE IF NOT EXISTS contadores (
+            nombre TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, ruta):
+        """
+        Abre (o crea) la base de datos en la ruta indicada.
+
+        Args:
+            ruta (str): Ruta del archivo de la base de datos.
+        """
+        self.ruta = ruta
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute("PRAGMA foreign_keys=ON")
+        self._conexion.executescript(self.ESQUEMA)
+        # Las bases creadas antes de guardar la fecha de salida no tienen la columna
+        columnas = [fila[1] for fila in self._conexion.execute("PRAGMA table_info(usuarios)")]
+        if "fecha_salida" not in columnas:
+            self._conexion.execute("ALTER TABLE usuarios ADD COLUMN fecha_salida TEXT")
+
+    def cargar(self):
+        """
+        Carga todos los usuarios, reservas y contadores de la base de datos.
+
+        Returns:
+            dict: Estado con el formato de estado_vacio.
+        """
+        estado = estado_vacio()
+        for codigo, nombre, fecha_registro, salida in self._conexion.execute(
+                "SELECT codigo, nombre, fecha_registro, fecha_salida FROM usuarios"):
+            estado["usuarios"][codigo] = {
+                "nombre": nombre, "codigo": codigo, "fecha_registro": fecha_registro, "fecha_salida": salida,
+            }
+        for tabla in ("reservas", "historial"):
+            for fila in self._conexion.execute(
+                    "SELECT codigo_reserva, codigo_habitacion, codigos_usuarios, dias_reserva,"
+                    f" fecha_inicio, fecha_reserva FROM {tabla} ORDER BY rowid"):
+                estado[tabla][fila[0]] = {
+                    "codigo_reserva": fila[0],
+                    "codigo_habitacion": fila[1],
+                    "codigos_usuarios": json.loads(fila[2]),
+                    "dias_reserva": fila[3],
+                    "fecha_inicio": fila[4],
+                    "fecha_reserva": fila[5],
+                }
+        estado["archivos"] = [ruta for ruta, in self._conexion.execute("SELECT ruta FROM archivos ORDER BY rowid")]
+        for nombre, valor in self._conexion.execute("SELECT nombre, valor FROM contadores"):
+            estado["contadores"][nombre] = valor
+        return estado
+
+    def registrar(self, operacion):
+        """
+        Aplica una operación sobre las tablas en una transacción.
+
+        Args:
+            operacion (dict): Operación con la clave "op" y sus datos.
+
+        Returns:
+            bool: Siempre False; SQLite no necesita compactación explícita.
+        """
+        with self._conexion:
+            self._aplicar(operacion)
+        return False
+
+    def _aplicar(self, operacion):
+        """
+        Ejecuta las sentencias de una operación dentro de la transacción actual.
+
+        Args:
+            operacion (dict): Operación con la clave "op" y sus datos.
+        """
+        tipo = operacion["op"]
+        if tipo == "lote":
+            for suboperacion in operacion["operaciones"]:
+                self._aplicar(suboperacion)
+        elif tipo == "usuario":
+            datos = operacion["usuario"]
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO usuarios (codigo, nombre, fecha_registro, fecha_salida) VALUES (?, ?, ?, ?)",
+                (datos["codigo"], datos["nombre"], datos["fecha_registro"], datos.get("fecha_salida")),
+            )
+        elif tipo == "reserva":
+            datos = operacion["reserva"]
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO reservas (codigo_reserva, codigo_habitacion, codigos_usuarios,"
+                " dias_reserva, fecha_inicio, fecha_reserva) VALUES (?, ?, ?, ?, ?, ?)",
+                (datos["codigo_reserva"], datos["codigo_habitacion"],
+                 json.dumps(datos["codigos_usuarios"]), datos["dias_reserva"],
+                 datos["fecha_inicio"], datos["fecha_reserva"]),
+            )
+            self._conexion.executemany(
+                "INSERT OR IGNORE INTO reservas_usuarios (codigo_usuario, codigo_reserva) VALUES (?, ?)",
+                [(codigo, datos["codigo_reserva"]) for codigo in datos["codigos_usuarios"] if codigo],
+            )
+        elif tipo == "cancelacion":
+            self._conexion.execute(
+                "DELETE FROM reservas WHERE codigo_reserva = ?", (operacion["codigo_reserva"],)
+            )
+        elif tipo == "archivo":
+            codigos = [(codigo,) for codigo in operacion["codigos"]]
+            # Los usuarios de las reservas terminaron su estancia
+            salidas = []
+            for codigo, in codigos:
+                for codigos_usuarios, fecha_inicio, dias_reserva in self._conexion.execute(
+                        "SELECT codigos_usuarios, fecha_inicio, dias_reserva FROM reservas WHERE codigo_reserva = ?",
+                        (codigo,)):
+                    salida = fecha_salida({"fecha_inicio": fecha_inicio, "dias_reserva": dias_reserva})
+                    salidas.extend((salida, codigo_usuario) for codigo_usuario in json.loads(codigos_usuarios)
+                                   if codigo_usuario)
+            self._conexion.executemany("UPDATE usuarios SET fecha_salida = ? WHERE codigo = ?", salidas)
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO historial SELECT codigo_reserva, codigo_habitacion, codigos_usuarios,"
+                " dias_reserva, fecha_inicio, fecha_reserva FROM reservas WHERE codigo_reserva = ?",
+                codigos,
+            )
+            self._conexion.executemany("DELETE FROM reservas WHERE codigo_reserva = ?", codigos)
+        elif tipo == "sellado":
+            self._conexion.execute("DELETE FROM historial")
+            self._conexion.execute("INSERT OR IGNORE INTO archivos (ruta) VALUES (?)", (operacion["ruta"],))
+        self._conexion.executemany(
+            "INSERT INTO contadores (nombre, valor) VALUES (?, ?)"
+            " ON CONFLICT (nombre) DO UPDATE SET valor = MAX(valor, excluded.valor)",
+            list(operacion.get("contadores", {}).items()),
+        )
+
+    def cerrar(self):
+        """
+        Cierra la conexión con la base de datos.
+        """
+        self._conexion.close()
@@ -0,0 +1,506 @@
+"""
+Módulo que define la analítica de ocupación e ingresos del crucero.
+
+Este módulo implementa agregados que se calculan una sola vez a partir de las
+reservas activas y del historial, y después se mantienen de forma incremental
+con cada reserva, cancelación o archivo (mediante Crucero.agregar_observador).
+Así los tableros leen la ocupación de una noche, los ingresos o la tasa de
+vacantes de un grupo en O(1), sin recorrer las reservas.
+
+El cálculo inicial trabaja por columnas: con NumPy se vectoriza (bincount y
+suma acumulada de diferencias); sin NumPy se usa el mismo algoritmo con
+arreglos de la biblioteca estándar.
+"""
+
+import threading
+from array import array
+from datetime import date, timedelta
+from itertools import accumulate
+
+from Normalizar import normalizar_texto_cacheado
+from Tarifas import tarifas
+
+try:
+    import numpy
+except ImportError:  # NumPy es opcional
+    numpy = None
+
+# Días que se agregan de más al extender el calendario de noches, para no
+# tener que extenderlo con cada reserva nueva
+MARGEN_DIAS = 366
+
+class Analitica:
+    """
+    Ocupación por noche, ingresos y vacantes del crucero, mantenidos al día.
+
+    Las reservas canceladas dejan de contar; las archivadas siguen contando,
+    porque la estancia se realizó. Los ingresos de cada reserva se calculan con
+    la tarifa vigente al crearla.
+
+    Attributes:
+        crucero (Crucero): Crucero analizado.
+        usar_numpy (bool): Indica si los agregados se guardan en arreglos de NumPy.
+    """
+
+    def __init__(self, crucero, usar_numpy=None):
+        """
+        Calcula los agregados iniciales y empieza a seguir los cambios del crucero.
+
+        Args:
+            crucero (Crucero): Crucero a analizar.
+            usar_numpy (bool, optional): Forzar o evitar el uso de NumPy. Por
+                defecto se usa si está instalado.
+
+        Raises:
+            ImportError: Si se pide NumPy y no está instalado.
+        """
+        if usar_numpy and numpy is None:
+            raise ImportError("NumPy no está instalado.")
+        self.crucero = crucero
+        self.usar_numpy = numpy is not None if usar_numpy is None else usar_numpy
+        self._bloqueo = threading.Lock()
+        self._claves = {}
+        self._grupos = {}
+        self._totales = [0, 0.0, 0, 0]
+        self._registradas = {}
+        self._primer_dia = 0
+        self._habitaciones_noche = self._ceros(0)
+        self._huespedes_noche = self._ceros(0)
+
+        # El observador se registra antes de leer las reservas; los eventos que
+        # lleguen durante el cálculo esperan el bloqueo y se descartan si la
+        # reserva ya fue contada (o nunca lo fue, en el caso de cancelaciones)
+        with self._bloqueo:
+            crucero.agregar_observador(self._observar)
+            self._recalcular()
+
+    def cerrar(self):
+        """
+        Deja de seguir los cambios del crucero.
+        """
+        self.crucero.quitar_observador(self._observar)
+
+    def _ceros(self, cantidad):
+        """
+        Crea un arreglo de enteros en cero.
+
+        Args:
+            cantidad (int): Largo del arreglo.
+
+        Returns:
+            numpy.ndarray | array: Arreglo de enteros de 64 bits.
+        """
+        if self.usar_numpy:
+            return numpy.zeros(cantidad, dtype=numpy.int64)
+        return array("q", bytes(8 * cantidad))
+
+    def _clave_habitacion(self, codigo_habitacion):
+        """
+        Obtiene el grupo (cubierta, acomodación) de una habitación.
+
+        Args:
+            codigo_habitacion (str): Código de la habitación.
+
+        Returns:
+            tuple: (cubierta, acomodacion), o None si la habitación no existe.
+        """
+        clave = self._claves.get(codigo_habitacion)
+        if clave is None:
+            habitacion = self.crucero.buscar_habitacion(codigo_habitacion)
+            if habitacion is None:
+                return None
+            clave = self._claves[codigo_habitacion] = (habitacion.cubierta, habitacion.acomodacion)
+        return clave
+
+    def _columnas(self):
+        """
+        Reúne las reservas activas y archivadas en columnas.
+
+        Returns:
+            tuple: (claves de grupo, reservas activas contadas, y las columnas
+                grupo, inicio, días, plazas y vacantes de cada reserva, primero
+                las activas).
+        """
+        claves = []
+        numeros = {}
+        columnas = ([], [], [], [], [])
+        grupos, inicios, dias, plazas, vacantes = columnas
+
+        def numero_grupo(codigo_habitacion):
+            clave = self._clave_habitacion(codigo_habitacion)
+            if clave is None:
+                return -1
+            numero = numeros.get(clave)
+            if numero is None:
+                numero = numeros[clave] = len(claves)
+                claves.append(clave)
+            return numero
+
+        activas = []
+        for reserva in list(self.crucero._indice_reservas.values()):
+            numero = numero_grupo(reserva.codigo_habitacion)
+            if numero < 0:
+                continue
+            activas.append(reserva)
+            grupos.append(numero)
+            inicios.append(reserva.fecha_inicio.toordinal())
+            dias.append(reserva.dias_reserva)
+            plazas.append(len(reserva.codigos_usuarios))
+            vacantes.append(reserva.codigos_usuarios.count(None))
+
+        # El historial y los archivos ya son columnares: se leen sus arreglos directamente
+        for historial in self.crucero.historiales():
+            numeros_habitacion = [numero_grupo(codigo) for codigo in historial.habitaciones.textos]
+            desplazamientos = historial._desplazamientos
+            usuarios = historial._usuarios
+            for posicion, habitacion in enumerate(historial._habitaciones):
+                numero = numeros_habitacion[habitacion]
+                if numero < 0:
+                    continue
+                desde, hasta = desplazamientos[posicion], desplazamientos[posicion + 1]
+                grupos.append(numero)
+                inicios.append(historial._inicios[posicion])
+                dias.append(historial._dias[posicion])
+                plazas.append(hasta - desde)
+                vacantes.append(usuarios[desde:hasta].tolist().count(-1))
+        return claves, activas, columnas
+
+    def _recalcular(self):
+        """
+        Calcula todos los agregados desde cero. Debe llamarse con el bloqueo tomado.
+        """
+        claves, activas, (grupos, inicios, dias, plazas, vacantes) = self._columnas()
+        tarifas_grupo = [tarifas.tarifa_diaria(cubierta, acomodacion) for cubierta, acomodacion in claves]
+        cantidad_grupos = len(claves)
+        if inicios:
+            primer_dia = min(inicios)
+            largo = max(inicio + dia for inicio, dia in zip(inicios, dias)) - primer_dia + MARGEN_DIAS
+        else:
+            primer_dia, largo = date.today().toordinal(), MARGEN_DIAS
+
+        if self.usar_numpy:
+            grupos = numpy.asarray(grupos, dtype=numpy.intp)
+            inicios = numpy.asarray(inicios, dtype=numpy.int64) - primer_dia
+            fines = inicios + numpy.asarray(dias, dtype=numpy.int64)
+            plazas = numpy.asarray(plazas, dtype=numpy.int64)
+            vacantes = numpy.asarray(vacantes, dtype=numpy.int64)
+            ingresos = numpy.asarray(tarifas_grupo, dtype=numpy.float64)[grupos] * numpy.asarray(dias)
+            reservas_grupo = numpy.bincount(grupos, minlength=cantidad_grupos)
+            ingresos_grupo = numpy.bincount(grupos, weights=ingresos, minlength=cantidad_grupos)
+            plazas_grupo = numpy.bincount(grupos, weights=plazas, minlength=cantidad_grupos)
+            vacantes_grupo = numpy.bincount(grupos, weights=vacantes, minlength=cantidad_grupos)
+
+            # Ocupación por noche: +1 el día de inicio, -1 el día de salida y suma acumulada
+            huespedes = plazas - vacantes
+            diferencias = (numpy.bincount(inicios, minlength=largo + 1)
+                           - numpy.bincount(fines, minlength=largo + 1))
+            habitaciones_noche = numpy.cumsum(diferencias)[:largo].astype(numpy.int64)
+            diferencias = (numpy.bincount(inicios, weights=huespedes, minlength=largo + 1)
+                           - numpy.bincount(fines, weights=huespedes, minlength=largo + 1))
+            huespedes_noche = numpy.rint(numpy.cumsum(diferencias)[:largo]).astype(numpy.int64)
+            ingresos = ingresos.tolist()
+            agregados = zip(reservas_grupo.tolist(), ingresos_grupo.tolist(),
+                            numpy.rint(plazas_grupo).astype(numpy.int64).tolist(),
+                            numpy.rint(vacantes_grupo).astype(numpy.int64).tolist())
+        else:
+            ingresos = [tarifas_grupo[grupo] * dia for grupo, dia in zip(grupos, dias)]
+            sumas = [[0, 0.0, 0, 0] for _ in claves]
+            diferencias = [0] * (largo + 1)
+            diferencias_huespedes = [0] * (largo + 1)
+            for grupo, inicio, dia, plaza, vacante, ingreso in zip(grupos, inicios, dias, plazas, vacantes, ingresos):
+                suma = sumas[grupo]
+                suma[0] += 1
+                suma[1] += ingreso
+                suma[2] += plaza
+                suma[3] += vacante
+                inicio -= primer_dia
+                diferencias[inicio] += 1
+                diferencias[inicio + dia] -= 1
+                diferencias_huespedes[inicio] += plaza - vacante
+                diferencias_huespedes[inicio + dia] -= plaza - vacante
+            habitaciones_noche = array("q", accumulate(diferencias[:largo]))
+            huespedes_noche = array("q", accumulate(diferencias_huespedes[:largo]))
+            agregados = sumas
+
+        self._grupos = {clave: list(suma) for clave, suma in zip(claves, agregados)}
+        self._totales = [sum((suma[posicion] for suma in self._grupos.values()), inicial)
+                         for posicion, inicial in enumerate((0, 0.0, 0, 0))]
+        self._registradas = {reserva.codigo_reserva: (claves[grupo], ingreso)
+                             for reserva, grupo, ingreso in zip(activas, grupos, ingresos)}
+        self._primer_dia = primer_dia
+        self._habitaciones_noche = habitaciones_noche
+        self._huespedes_noche = huespedes_noche
+
+    def _extender(self, inicio, fin):
+        """
+        Amplía el calendario de noches para cubrir un rango de días ordinales.
+
+        Args:
+            inicio (int): Primer día (ordinal).
+            fin (int): Día de salida (ordinal).
+        """
+        faltan_antes = self._primer_dia - inicio
+        if faltan_antes > 0:
+            faltan_antes += MARGEN_DIAS
+            self._primer_dia -= faltan_antes
+            self._habitaciones_noche = self._unir(self._ceros(faltan_antes), self._habitaciones_noche)
+            self._huespedes_noche = self._unir(self._ceros(faltan_antes), self._huespedes_noche)
+        faltan_despues = fin - self._primer_dia - len(self._habitaciones_noche)
+        if faltan_despues > 0:
+            faltan_despues += MARGEN_DIAS
+            self._habitaciones_noche = self._unir(self._habitaciones_noche, self._ceros(faltan_despues))
+            self._huespedes_noche = self._unir(self._huespedes_noche, self._ceros(faltan_despues))
+
+    def _unir(self, primero, segundo):
+        """
+        Concatena dos arreglos de noches.
+
+        Args:
+            primero (numpy.ndarray | array): Arreglo inicial.
+            segundo (numpy.ndarray | array): Arreglo final.
+
+        Returns:
+            numpy.ndarray | array: Arreglo concatenado.
+        """
+        if self.usar_numpy:
+            return numpy.concatenate((primero, segundo))
+        return primero + segundo
+
+    def _sumar(self, reserva, clave, ingreso, signo):
+        """
+        Suma (o resta) una reserva a los agregados. Debe llamarse con el bloqueo tomado.
+
+        Args:
+            reserva (Reserva): Reserva a contar.
+            clave (tuple): Grupo (cubierta, acomodacion) de la reserva.
+            ingreso (float): Ingreso de la reserva.
+            signo (int): 1 para sumar, -1 para restar.
+        """
+        plazas = len(reserva.codigos_usuarios)
+        vacantes = reserva.codigos_usuarios.count(None)
+        for agregado in (self._grupos.setdefault(clave, [0, 0.0, 0, 0]), self._totales):
+            agregado[0] += signo
+            agregado[1] += signo * ingreso
+            agregado[2] += signo * plazas
+            agregado[3] += signo * vacantes
+
+        inicio = reserva.fecha_inicio.toordinal()
+        fin = inicio + reserva.dias_reserva
+        self._extender(inicio, fin)
+        desde, hasta = inicio - self._primer_dia, fin - self._primer_dia
+        huespedes = signo * (plazas - vacantes)
+        if self.usar_numpy:
+            self._habitaciones_noche[desde:hasta] += signo
+            self._huespedes_noche[desde:hasta] += huespedes
+        else:
+            for noche in range(desde, hasta):
+                self._habitaciones_noche[noche] += signo
+                self._huespedes_noche[noche] += huespedes
+
+    def _observar(self, evento, reserva):
+        """
+        Actualiza los agregados con un cambio de las reservas del crucero.
+
+        Args:
+            evento (str): "reserva", "cancelacion" o "archivo".
+            reserva (Reserva): Reserva afectada.
+        """
+        with self._bloqueo:
+            codigo = reserva.codigo_reserva
+            if evento == "reserva":
+                if codigo in self._registradas:
+                    return
+                clave = self._clave_habitacion(reserva.codigo_habitacion)
+                if clave is None:
+                    return
+                ingreso = tarifas.calcular_costo(clave[0], reserva.dias_reserva, clave[1])
+                self._registradas[codigo] = (clave, ingreso)
+                self._sumar(reserva, clave, ingreso, 1)
+            elif evento == "cancelacion":
+                registro = self._registradas.pop(codigo, None)
+                if registro is not None:
+                    self._sumar(reserva, registro[0], registro[1], -1)
+            elif evento == "archivo":
+                # La estancia se realizó: sigue contando, pero ya no puede cancelarse
+                self._registradas.pop(codigo, None)
+
+    def _noche(self, arreglo, fecha):
+        """
+        Lee el valor de una noche en un arreglo de noches.
+
+        Args:
+            arreglo (numpy.ndarray | array): Arreglo de noches.
+            fecha (date): Noche a consultar.
+
+        Returns:
+            int: Valor de la noche, o 0 fuera del calendario.
+        """
+        posicion = fecha.toordinal() - self._primer_dia
+        if 0 <= posicion < len(arreglo):
+            return int(arreglo[posicion])
+        return 0
+
+    def habitaciones_ocupadas(self, fecha):
+        """
+        Cantidad de habitaciones ocupadas una noche.
+
+        Args:
+            fecha (date): Noche a consultar.
+
+        Returns:
+            int: Habitaciones con una reserva que incluye esa noche.
+        """
+        with self._bloqueo:
+            return self._noche(self._habitaciones_noche, fecha)
+
+    def huespedes(self, fecha):
+        """
+        Cantidad de huéspedes (plazas no vacantes) una noche.
+
+        Args:
+            fecha (date): Noche a consultar.
+
+        Returns:
+            int: Huéspedes alojados esa noche.
+        """
+        with self._bloqueo:
+            return self._noche(self._huespedes_noche, fecha)
+
+    def tasa_ocupacion(self, fecha):
+        """
+        Fracción de habitaciones del crucero ocupadas una noche.
+
+        Args:
+            fecha (date): Noche a consultar.
+
+        Returns:
+            float: Habitaciones ocupadas sobre el total de habitaciones.
+        """
+        return self.habitaciones_ocupadas(fecha) / max(len(self.crucero.habitaciones), 1)
+
+    def ocupacion_por_noche(self, fecha_inicio, fecha_fin):
+        """
+        Ocupación de cada noche de un rango.
+
+        Args:
+            fecha_inicio (date): Primera noche.
+            fecha_fin (date): Día de salida (no incluido).
+
+        Returns:
+            list: Tuplas (fecha, habitaciones ocupadas, huéspedes) por noche.
+        """
+        with self._bloqueo:
+            resultado = []
+            fecha = fecha_inicio
+            while fecha < fecha_fin:
+                resultado.append((fecha, self._noche(self._habitaciones_noche, fecha),
+                                  self._noche(self._huespedes_noche, fecha)))
+                fecha += timedelta(days=1)
+        return resultado
+
+    def _sumar_grupos(self, cubierta=None, acomodacion=None):
+        """
+        Suma los agregados de los grupos que cumplen con los filtros.
+
+        Args:
+            cubierta (str, optional): Cubierta a filtrar.
+            acomodacion (int, optional): Acomodación a filtrar.
+
+        Returns:
+            list: [reservas, ingresos, plazas, vacantes].
+        """
+        cubierta_normalizada = normalizar_texto_cacheado(cubierta) if cubierta else None
+        with self._bloqueo:
+            if not cubierta and not acomodacion:
+                return list(self._totales)
+            total = [0, 0.0, 0, 0]
+            for (cubierta_grupo, acomodacion_grupo), suma in self._grupos.items():
+                if cubierta_normalizada and normalizar_texto_cacheado(cubierta_grupo) != cubierta_normalizada:
+                    continue
+                if acomodacion and acomodacion_grupo != acomodacion:
+                    continue
+                for posicion in range(4):
+                    total[posicion] += suma[posicion]
+        return total
+
+    def ingresos(self, cubierta=None, acomodacion=None):
+        """
+        Ingresos de las reservas contadas.
+
+        Args:
+            cubierta (str, optional): Solo reservas de esta cubierta.
+            acomodacion (int, optional): Solo reservas de esta acomodación.
+
+        Returns:
+            float: Suma de los costos de las reservas.
+        """
+        return self._sumar_grupos(cubierta, acomodacion)[1]
+
+    def tasa_vacantes(self, cubierta=None, acomodacion=None):
+        """
+        Fracción de plazas reservadas sin pasajero asignado.
+
+        Args:
+            cubierta (str, optional): Solo reservas de esta cubierta.
+            acomodacion (int, optional): Solo reservas de esta acomodación.
+
+        Returns:
+            float: Vacantes sobre plazas reservadas (0 si no hay reservas).
+        """
+        _, _, plazas, vacantes = self._sumar_grupos(cubierta, acomodacion)
+        return vacantes / plazas if plazas else 0.0
+
+    def por_grupo(self):
+        """
+        Agregados de cada grupo de cubierta y acomodación.
+
+        Returns:
+            dict: Por (cubierta, acomodacion), un diccionario con reservas,
+                ingresos, plazas, vacantes y tasa_vacantes.
+        """
+        with self._bloqueo:
+            grupos = sorted((clave, tuple(suma)) for clave, suma in self._grupos.items())
+        resultado = {}
+        for clave, (reservas, ingresos, plazas, vacantes) in grupos:
+            resultado[clave] = {"reservas": reservas, "ingresos": ingresos, "plazas": plazas,
+                                "vacantes": vacantes, "tasa_vacantes": vacantes / plazas if plazas else 0.0}
+        return resultado
+
+    def ingresos_por_cubierta(self):
+        """
+        Ingresos agrupados por cubierta.
+
+        Returns:
+            dict: Ingresos por nombre de cubierta.
+        """
+        resultado = {}
+        for (cubierta, _), datos in self.por_grupo().items():
+            resultado[cubierta] = resultado.get(cubierta, 0.0) + datos["ingresos"]
+        return resultado
+
+    def resumen(self, fecha=None):
+        """
+        Resumen serializable a JSON para tableros.
+
+        Args:
+            fecha (date, optional): Noche cuya ocupación se informa. Por defecto, hoy.
+
+        Returns:
+            dict: Totales, ocupación de la noche y agregados por grupo.
+        """
+        if fecha is None:
+            fecha = date.today()
+        reservas, ingresos, plazas, vacantes = self._sumar_grupos()
+        return {
+            "reservas": reservas,
+            "ingresos": ingresos,
+            "plazas": plazas,
+            "vacantes": vacantes,
+            "tasa_vacantes": vacantes / plazas if plazas else 0.0,
+            "noche": fecha.isoformat(),
+            "habitaciones_ocupadas": self.habitaciones_ocupadas(fecha),
+            "huespedes": self.huespedes(fecha),
+            "tasa_ocupacion": self.tasa_ocupacion(fecha),
+            "grupos": [{"cubierta": cubierta, "acomodacion": acomodacion, **datos}
+                       for (cubierta, acomodacion), datos in self.por_grupo().items()],
+        }
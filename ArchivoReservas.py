@@ -0,0 +1,503 @@
+"""
+Módulo que define el archivo binario de reservas de una salida terminada.
+
+Al terminar una salida, su historial se escribe una sola vez en un archivo de
+solo lectura que se abre con mmap: las consultas leen directamente las
+páginas del archivo, sin cargarlo en memoria ni crear objetos por registro.
+
+El archivo tiene una cabecera y secciones alineadas a 8 bytes:
+
+- Columnas de ancho fijo con un valor por reserva (código, habitación, día de
+  inicio, días, fecha de reserva y desplazamiento de sus usuarios), con las
+  reservas ordenadas por habitación y día de inicio.
+- Índices por código de reserva, por habitación (tramo de reservas de cada
+  una), por usuario (reservas de cada uno) y por día de inicio.
+- Tablas de textos ordenados (códigos de reserva, de habitación y de
+  usuario): desplazamientos más los textos en UTF-8, que se buscan por
+  búsqueda binaria.
+
+El archivo expone los mismos atributos que HistorialReservas, así que sus
+registros se leen con VistaReserva y las consultas sobre el historial
+funcionan igual sobre los archivos.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import timedelta
+
+from Historial import VistaReserva
+
+MAGIA = b"CRUCARCH"
+VERSION = 1
+
+# Secciones del archivo, en orden, con el tipo de sus elementos (array)
+SECCIONES = (
+    ("codigos", "I"),               # Número del código de cada reserva
+    ("posiciones_codigo", "I"),     # Reserva de cada código, en orden de código
+    ("habitaciones", "I"),          # Número de la habitación de cada reserva
+    ("inicios", "I"),               # Ordinal del primer día de cada reserva
+    ("dias", "H"),                  # Días de cada reserva
+    ("fechas_reserva", "d"),        # Marca de tiempo de cada reserva
+    ("desplazamientos", "I"),       # Tramo de usuarios de cada reserva
+    ("usuarios", "i"),              # Número de cada usuario (-1 para las vacantes)
+    ("tramos_habitacion", "I"),     # Primera reserva de cada habitación
+    ("orden_inicios", "I"),         # Reservas ordenadas por día de inicio
+    ("tramos_usuario", "I"),        # Tramo de reservas_usuario de cada usuario
+    ("reservas_usuario", "I"),      # Reservas de cada usuario, en orden
+    ("desplazamientos_reservas", "I"),
+    ("textos_reservas", "B"),
+    ("desplazamientos_habitaciones", "I"),
+    ("textos_habitaciones", "B"),
+    ("desplazamientos_usuarios", "I"),
+    ("textos_usuarios", "B"),
+)
+
+# Cabecera: magia, versión, orden de bytes (1 = little endian), días de la
+# reserva más larga y, por cada sección, su desplazamiento y cantidad de elementos
+_CABECERA = struct.Struct("<8sIII")
+_SECCION = struct.Struct("<QQ")
+
+def _alinear(posicion):
+    """
+    Redondea una posición al siguiente múltiplo de 8.
+
+    Args:
+        posicion (int): Posición en bytes.
+
+    Returns:
+        int: Posición alineada.
+    """
+    return (posicion + 7) & ~7
+
+def _tabla_textos(textos):
+    """
+    Codifica una lista de textos ordenados como desplazamientos más datos.
+
+    Args:
+        textos (list): Textos ordenados.
+
+    Returns:
+        tuple: (array de desplazamientos, bytes con los textos en UTF-8).
+    """
+    desplazamientos = array("I", [0])
+    datos = bytearray()
+    for texto in textos:
+        datos += texto.encode("utf-8")
+        desplazamientos.append(len(datos))
+    return desplazamientos, bytes(datos)
+
+def escribir_archivo(ruta, reservas):
+    """
+    Escribe un archivo binario con reservas finalizadas.
+
+    El archivo se escribe en una ruta temporal que luego reemplaza a la final,
+    para no dejar nunca un archivo a medio escribir.
+
+    Args:
+        ruta (str): Ruta del archivo.
+        reservas (iterable): Reservas o vistas de reserva a archivar.
+
+    Returns:
+        int: Cantidad de reservas escritas.
+    """
+    filas = sorted(
+        ((reserva.codigo_habitacion, reserva.fecha_inicio.toordinal(), reserva.codigo_reserva,
+          reserva.dias_reserva, reserva.fecha_reserva.timestamp(), list(reserva.codigos_usuarios))
+         for reserva in reservas),
+        key=lambda fila: fila[:3],
+    )
+    textos_reservas = sorted(fila[2] for fila in filas)
+    textos_habitaciones = sorted({fila[0] for fila in filas})
+    textos_usuarios = sorted({codigo for fila in filas for codigo in fila[5] if codigo})
+    numero_reserva = {texto: numero for numero, texto in enumerate(textos_reservas)}
+    numero_habitacion = {texto: numero for numero, texto in enumerate(textos_habitaciones)}
+    numero_usuario = {texto: numero for numero, texto in enumerate(textos_usuarios)}
+
+    columnas = {nombre: array(tipo) for nombre, tipo in SECCIONES}
+    columnas["desplazamientos"].append(0)
+    columnas["posiciones_codigo"] = array("I", bytes(4 * len(filas)))
+    reservas_usuario = [[] for _ in textos_usuarios]
+    for posicion, (habitacion, inicio, codigo, dias, fecha_reserva, usuarios) in enumerate(filas):
+        columnas["codigos"].append(numero_reserva[codigo])
+        columnas["posiciones_codigo"][numero_reserva[codigo]] = posicion
+        columnas["habitaciones"].append(numero_habitacion[habitacion])
+        columnas["inicios"].append(inicio)
+        columnas["dias"].append(dias)
+        columnas["fechas_reserva"].append(fecha_reserva)
+        columnas["usuarios"].extend(numero_usuario[usuario] if usuario else -1 for usuario in usuarios)
+        columnas["desplazamientos"].append(len(columnas["usuarios"]))
+        for numero in {numero_usuario[usuario] for usuario in usuarios if usuario}:
+            reservas_usuario[numero].append(posicion)
+
+    # Las reservas de cada habitación son consecutivas
+    tramos = columnas["tramos_habitacion"]
+    for posicion, numero in enumerate(columnas["habitaciones"]):
+        while len(tramos) <= numero:
+            tramos.append(posicion)
+    tramos.append(len(filas))
+    columnas["orden_inicios"].extend(sorted(range(len(filas)), key=columnas["inicios"].__getitem__))
+    columnas["tramos_usuario"].append(0)
+    for posiciones in reservas_usuario:
+        columnas["reservas_usuario"].extend(posiciones)
+        columnas["tramos_usuario"].append(len(columnas["reservas_usuario"]))
+    for nombre, textos in (("reservas", textos_reservas), ("habitaciones", textos_habitaciones),
+                           ("usuarios", textos_usuarios)):
+        desplazamientos, datos = _tabla_textos(textos)
+        columnas[f"desplazamientos_{nombre}"] = desplazamientos
+        columnas[f"textos_{nombre}"] = array("B", datos)
+
+    ruta_temporal = ruta + ".tmp"
+    with open(ruta_temporal, "wb") as archivo:
+        posicion = _alinear(_CABECERA.size + _SECCION.size * len(SECCIONES))
+        directorio = []
+        for nombre, _ in SECCIONES:
+            directorio.append(_SECCION.pack(posicion, len(columnas[nombre])))
+            posicion = _alinear(posicion + len(columnas[nombre]) * columnas[nombre].itemsize)
+        archivo.write(_CABECERA.pack(MAGIA, VERSION, sys.byteorder == "little",
+                                     max(columnas["dias"], default=0)))
+        archivo.write(b"".join(directorio))
+        for nombre, _ in SECCIONES:
+            archivo.write(bytes(_alinear(archivo.tell()) - archivo.tell()))
+            columnas[nombre].tofile(archivo)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(ruta_temporal, ruta)
+    return len(filas)
+
+class TablaTextosArchivo:
+    """
+    Tabla de textos ordenados guardada en un archivo.
+
+    Se comporta como una secuencia de textos (el número de cada texto es su
+    posición) y ofrece la misma búsqueda que Historial.TablaTextos.
+
+    Attributes:
+        textos (TablaTextosArchivo): La propia tabla, para leerla como
+            TablaTextos.textos.
+    """
+
+    __slots__ = ("_desplazamientos", "_datos", "textos")
+
+    def __init__(self, desplazamientos, datos):
+        """
+        Inicializa la tabla sobre sus secciones del archivo.
+
+        Args:
+            desplazamientos (memoryview): Fin de cada texto en los datos.
+            datos (memoryview): Textos en UTF-8, uno tras otro.
+        """
+        self._desplazamientos = desplazamientos
+        self._datos = datos
+        self.textos = self
+
+    def _bytes(self, numero):
+        """
+        Obtiene los bytes de un texto.
+
+        Args:
+            numero (int): Número del texto.
+
+        Returns:
+            bytes: Texto en UTF-8.
+        """
+        return bytes(self._datos[self._desplazamientos[numero]:self._desplazamientos[numero + 1]])
+
+    def __getitem__(self, numero):
+        """
+        Obtiene un texto por su número.
+
+        Args:
+            numero (int): Número del texto.
+
+        Returns:
+            str: Texto.
+        """
+        if not 0 <= numero < len(self):
+            raise IndexError(numero)
+        return self._bytes(numero).decode("utf-8")
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de textos.
+
+        Returns:
+            int: Número de textos.
+        """
+        return len(self._desplazamientos) - 1
+
+    def __iter__(self):
+        """
+        Recorre los textos en orden.
+
+        Yields:
+            str: Cada texto.
+        """
+        for numero in range(len(self)):
+            yield self._bytes(numero).decode("utf-8")
+
+    def buscar(self, texto):
+        """
+        Obtiene el número de un texto (búsqueda binaria).
+
+        Args:
+            texto (str): Texto a buscar.
+
+        Returns:
+            int: Número del texto o None si no está en la tabla.
+        """
+        buscado = texto.encode("utf-8")
+        inferior, superior = 0, len(self)
+        while inferior < superior:
+            medio = (inferior + superior) // 2
+            if self._bytes(medio) < buscado:
+                inferior = medio + 1
+            else:
+                superior = medio
+        if inferior < len(self) and self._bytes(inferior) == buscado:
+            return inferior
+        return None
+
+class _CodigosReserva:
+    """
+    Código de reserva de cada posición, leído de la tabla de códigos.
+    """
+
+    __slots__ = ("_tabla", "_numeros")
+
+    def __init__(self, tabla, numeros):
+        """
+        Inicializa la secuencia.
+
+        Args:
+            tabla (TablaTextosArchivo): Códigos de reserva ordenados.
+            numeros (memoryview): Número del código de cada reserva.
+        """
+        self._tabla = tabla
+        self._numeros = numeros
+
+    def __getitem__(self, posicion):
+        """
+        Obtiene el código de la reserva en una posición.
+
+        Args:
+            posicion (int): Posición de la reserva.
+
+        Returns:
+            str: Código de la reserva.
+        """
+        return self._tabla[self._numeros[posicion]]
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de reservas.
+
+        Returns:
+            int: Número de reservas.
+        """
+        return len(self._numeros)
+
+class ArchivoReservas:
+    """
+    Archivo binario de reservas finalizadas, abierto con mmap.
+
+    Tiene los mismos atributos que HistorialReservas (tablas de habitaciones y
+    usuarios y las columnas _habitaciones, _inicios, _dias, _fechas_reserva,
+    _usuarios y _desplazamientos), pero sus columnas son vistas del archivo.
+
+    Attributes:
+        ruta (str): Ruta del archivo.
+        reservas (TablaTextosArchivo): Códigos de reserva del archivo.
+        habitaciones (TablaTextosArchivo): Códigos de habitación del archivo.
+        usuarios (TablaTextosArchivo): Códigos de usuario del archivo.
+        dias_maximos (int): Días de la reserva más larga.
+    """
+
+    def __init__(self, ruta):
+        """
+        Abre un archivo de reservas.
+
+        Args:
+            ruta (str): Ruta del archivo.
+
+        Raises:
+            ValueError: Si el archivo no es un archivo de reservas válido o se
+                escribió con otro orden de bytes.
+        """
+        self.ruta = ruta
+        with open(ruta, "rb") as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magia, version, little_endian, self.dias_maximos = _CABECERA.unpack_from(self._mapa)
+            if magia != MAGIA or version != VERSION:
+                raise ValueError(f"{ruta} no es un archivo de reservas compatible.")
+            if bool(little_endian) != (sys.byteorder == "little"):
+                raise ValueError(f"{ruta} se escribió con otro orden de bytes.")
+            self._vista = memoryview(self._mapa)
+            self._vistas = [self._vista]
+            secciones = {}
+            for numero, (nombre, tipo) in enumerate(SECCIONES):
+                inicio, cantidad = _SECCION.unpack_from(self._mapa, _CABECERA.size + numero * _SECCION.size)
+                vista = self._vista[inicio:inicio + cantidad * array(tipo).itemsize].cast(tipo)
+                self._vistas.append(vista)
+                secciones[nombre] = vista
+        except Exception:
+            self.cerrar()
+            raise
+
+        self.reservas = TablaTextosArchivo(secciones["desplazamientos_reservas"], secciones["textos_reservas"])
+        self.habitaciones = TablaTextosArchivo(secciones["desplazamientos_habitaciones"],
+                                               secciones["textos_habitaciones"])
+        self.usuarios = TablaTextosArchivo(secciones["desplazamientos_usuarios"], secciones["textos_usuarios"])
+        self._codigos_reserva = _CodigosReserva(self.reservas, secciones["codigos"])
+        self._posiciones_codigo = secciones["posiciones_codigo"]
+        self._habitaciones = secciones["habitaciones"]
+        self._inicios = secciones["inicios"]
+        self._dias = secciones["dias"]
+        self._fechas_reserva = secciones["fechas_reserva"]
+        self._desplazamientos = secciones["desplazamientos"]
+        self._usuarios = secciones["usuarios"]
+        self._tramos_habitacion = secciones["tramos_habitacion"]
+        self._orden_inicios = secciones["orden_inicios"]
+        self._tramos_usuario = secciones["tramos_usuario"]
+        self._reservas_usuario = secciones["reservas_usuario"]
+
+    def cerrar(self):
+        """
+        Libera las vistas y cierra el mapa del archivo.
+
+        Las vistas de reserva obtenidas del archivo dejan de poder leerse.
+        """
+        for vista in reversed(getattr(self, "_vistas", [])):
+            vista.release()
+        self._vistas = []
+        self._mapa.close()
+
+    def buscar(self, codigo_reserva):
+        """
+        Busca una reserva del archivo por su código.
+
+        Args:
+            codigo_reserva (str): Código de la reserva.
+
+        Returns:
+            VistaReserva: Vista del registro o None si no existe.
+        """
+        numero = self.reservas.buscar(codigo_reserva)
+        if numero is None:
+            return None
+        return VistaReserva(self, self._posiciones_codigo[numero])
+
+    def _primera(self, posiciones, desde, hasta, valor):
+        """
+        Busca la primera posición de una lista ordenada por día de inicio cuyo inicio es >= valor.
+
+        Args:
+            posiciones (sequence): Posiciones de reservas ordenadas por día de inicio.
+            desde (int): Primer índice de la búsqueda.
+            hasta (int): Índice final (excluido) de la búsqueda.
+            valor (int): Ordinal buscado.
+
+        Returns:
+            int: Índice encontrado.
+        """
+        inicios = self._inicios
+        while desde < hasta:
+            medio = (desde + hasta) // 2
+            if inicios[posiciones[medio]] < valor:
+                desde = medio + 1
+            else:
+                hasta = medio
+        return desde
+
+    def consultar(self, codigo_habitacion=None, codigo_usuario=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Recorre las reservas del archivo que cumplen con los filtros.
+
+        Se usa el índice más selectivo disponible: habitación, usuario o día
+        de inicio; los demás filtros se comprueban sobre las columnas.
+
+        Args:
+            codigo_habitacion (str, optional): Solo reservas de esta habitación.
+            codigo_usuario (str, optional): Solo reservas que incluyen a este usuario.
+            fecha_inicio (date, optional): Solo reservas que ocupan alguna noche
+                entre fecha_inicio y fecha_fin.
+            fecha_fin (date, optional): Día de salida del rango. Si es None, se
+                considera solo la noche de fecha_inicio.
+
+        Yields:
+            VistaReserva: Reservas que cumplen con todos los filtros, en orden
+                de habitación y día de inicio (o solo de día de inicio si se
+                filtra por fechas sin habitación ni usuario).
+        """
+        habitacion = usuario = None
+        if codigo_habitacion:
+            habitacion = self.habitaciones.buscar(codigo_habitacion)
+            if habitacion is None:
+                return
+        if codigo_usuario:
+            usuario = self.usuarios.buscar(codigo_usuario)
+            if usuario is None:
+                return
+        desde = hasta = None
+        if fecha_inicio is not None:
+            if fecha_fin is None:
+                fecha_fin = fecha_inicio + timedelta(days=1)
+            desde, hasta = fecha_inicio.toordinal(), fecha_fin.toordinal()
+
+        if habitacion is not None:
+            posiciones = range(self._tramos_habitacion[habitacion], self._tramos_habitacion[habitacion + 1])
+        elif usuario is not None:
+            posiciones = self._reservas_usuario[self._tramos_usuario[usuario]:self._tramos_usuario[usuario + 1]]
+        elif desde is not None:
+            # Una reserva que empieza antes de desde - dias_maximos no llega a desde
+            orden = self._orden_inicios
+            posiciones = orden[self._primera(orden, 0, len(orden), desde - self.dias_maximos + 1):
+                               self._primera(orden, 0, len(orden), hasta)]
+        else:
+            posiciones = range(len(self))
+
+        for posicion in posiciones:
+            if desde is not None:
+                inicio = self._inicios[posicion]
+                if inicio >= hasta or inicio + self._dias[posicion] <= desde:
+                    continue
+            if usuario is not None and habitacion is not None:
+                if usuario not in self._usuarios[self._desplazamientos[posicion]:self._desplazamientos[posicion + 1]]:
+                    continue
+            yield VistaReserva(self, posicion)
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de reservas del archivo.
+
+        Returns:
+            int: Número de registros.
+        """
+        return len(self._habitaciones)
+
+    def __getitem__(self, posicion):
+        """
+        Devuelve la vista del registro en una posición.
+
+        Args:
+            posicion (int): Posición del registro.
+
+        Returns:
+            VistaReserva: Vista del registro.
+        """
+        if not 0 <= posicion < len(self):
+            raise IndexError(posicion)
+        return VistaReserva(self, posicion)
+
+    def __iter__(self):
+        """
+        Recorre los registros del archivo en orden de habitación y día de inicio.
+
+        Yields:
+            VistaReserva: Vista de cada registro.
+        """
+        for posicion in range(len(self)):
+            yield VistaReserva(self, posicion)
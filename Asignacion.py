@@ -0,0 +1,154 @@
+"""
+Módulo que define la asignación de habitaciones para reservas de grupo.
+
+Dado un grupo de pasajeros, se eligen las habitaciones libres de menor costo
+total que alcanzan para todos. Las habitaciones de un mismo grupo del índice
+de disponibilidad (cubierta y acomodación) cuestan lo mismo, así que el
+problema se reduce a decidir cuántas habitaciones tomar de cada tipo: una
+mochila acotada de costo mínimo sobre la capacidad, resuelta con programación
+dinámica. Cada tipo se parte en potencias de dos (1, 2, 4, ...) para que la
+cantidad disponible solo sume un factor logarítmico, y nunca se consideran más
+habitaciones de un tipo de las que el grupo podría llenar, por lo que el costo
+no depende del tamaño del inventario.
+"""
+
+from math import inf
+
+from Normalizar import normalizar_texto_cacheado
+from Tarifas import tarifas
+
+def plan_optimo(tipos, pasajeros, max_habitaciones=None):
+    """
+    Elige cuántas habitaciones tomar de cada tipo para alojar a un grupo al menor costo.
+
+    Entre planes de igual costo se prefiere el de menos habitaciones.
+
+    Args:
+        tipos (list): Tuplas (capacidad, costo, disponibles) de cada tipo de habitación.
+        pasajeros (int): Cantidad de pasajeros del grupo.
+        max_habitaciones (int, optional): Máximo de habitaciones del plan.
+
+    Returns:
+        tuple: (costo total, lista con la cantidad de habitaciones de cada
+            tipo), o None si ninguna combinación aloja al grupo.
+
+    Raises:
+        ValueError: Si la cantidad de pasajeros no es positiva.
+    """
+    if pasajeros <= 0:
+        raise ValueError("La cantidad de pasajeros debe ser mayor a 0.")
+    limite_habitaciones = pasajeros if max_habitaciones is None else min(max_habitaciones, pasajeros)
+
+    # Partir cada tipo en piezas de 1, 2, 4, ... habitaciones (mochila 0/1)
+    piezas = []
+    for numero, (capacidad, costo, disponibles) in enumerate(tipos):
+        restantes = min(disponibles, -(-pasajeros // capacidad), limite_habitaciones)
+        cantidad = 1
+        while restantes > 0:
+            tomar = min(cantidad, restantes)
+            piezas.append((numero, tomar, capacidad * tomar, costo * tomar))
+            restantes -= tomar
+            cantidad *= 2
+
+    # Estado: (habitaciones usadas, plazas cubiertas, con tope en pasajeros).
+    # Sin máximo de habitaciones basta con las plazas, y las habitaciones solo
+    # desempatan.
+    con_maximo = max_habitaciones is not None
+    filas = limite_habitaciones + 1 if con_maximo else 1
+    ancho = pasajeros + 1
+    costos = [inf] * (filas * ancho)
+    habitaciones = [0] * (filas * ancho)
+    costos[0] = 0.0
+    origenes = []
+    for numero, cantidad, capacidad, costo in piezas:
+        origen = {}
+        saltos = cantidad if con_maximo else 0
+        # Recorrer los estados de mayor a menor para usar cada pieza una sola vez
+        for fila in range(filas - 1 - saltos, -1, -1):
+            base = fila * ancho
+            destino_base = base + saltos * ancho
+            for plazas in range(pasajeros - 1, -1, -1):
+                costo_actual = costos[base + plazas]
+                if costo_actual == inf:
+                    continue
+                destino = destino_base + min(plazas + capacidad, pasajeros)
+                nuevo = costo_actual + costo
+                nuevas = habitaciones[base + plazas] + cantidad
+                if nuevo < costos[destino] or (nuevo == costos[destino] and nuevas < habitaciones[destino]):
+                    costos[destino] = nuevo
+                    habitaciones[destino] = nuevas
+                    origen[destino] = base + plazas
+        origenes.append(origen)
+
+    # El mejor estado con todas las plazas cubiertas
+    finales = [fila * ancho + pasajeros for fila in range(filas)]
+    estado = min(finales, key=lambda final: (costos[final], habitaciones[final]))
+    if costos[estado] == inf:
+        return None
+    total = costos[estado]
+
+    # Reconstruir el plan recorriendo las piezas en orden inverso
+    cantidades = [0] * len(tipos)
+    for (numero, cantidad, _, _), origen in zip(reversed(piezas), reversed(origenes)):
+        anterior = origen.get(estado)
+        if anterior is not None:
+            cantidades[numero] += cantidad
+            estado = anterior
+    return total, cantidades
+
+def elegir_habitaciones(indice, pasajeros, fecha_inicio, fecha_fin, dias_reserva, cubierta=None,
+                        max_habitaciones=None, juntos=False):
+    """
+    Elige las habitaciones libres de menor costo total para un grupo.
+
+    Args:
+        indice (IndiceDisponibilidad): Índice de disponibilidad del crucero.
+        pasajeros (int): Cantidad de pasajeros del grupo.
+        fecha_inicio (date): Primer día de la estancia.
+        fecha_fin (date): Día de salida.
+        dias_reserva (int): Cantidad de días de la estancia.
+        cubierta (str, optional): Usar solo habitaciones de esta cubierta.
+        max_habitaciones (int, optional): Máximo de habitaciones para el grupo.
+        juntos (bool, optional): Si es True, todas las habitaciones deben estar
+            en la misma cubierta (se elige la cubierta más económica).
+
+    Returns:
+        tuple: (costo total, lista de Habitacion), o None si no hay combinación posible.
+    """
+    cubierta_normalizada = normalizar_texto_cacheado(cubierta) if cubierta else None
+    claves = [clave for clave in indice.grupos() if not cubierta_normalizada or clave[0] == cubierta_normalizada]
+    if juntos:
+        por_cubierta = {}
+        for clave in claves:
+            por_cubierta.setdefault(clave[0], []).append(clave)
+        opciones = list(por_cubierta.values())
+    else:
+        opciones = [claves]
+
+    mejor = None
+    for claves_opcion in opciones:
+        # Solo hacen falta tantas habitaciones libres de cada tipo como el grupo podría llenar
+        tipos = []
+        libres = []
+        for cubierta_grupo, acomodacion in claves_opcion:
+            necesarias = -(-pasajeros // acomodacion)
+            if max_habitaciones is not None:
+                necesarias = min(necesarias, max_habitaciones)
+            encontradas = []
+            for habitacion in indice.candidatas(fecha_inicio, fecha_fin, cubierta_grupo, acomodacion):
+                encontradas.append(habitacion)
+                if len(encontradas) == necesarias:
+                    break
+            if encontradas:
+                tipos.append((acomodacion, tarifas.calcular_costo(cubierta_grupo, dias_reserva, acomodacion),
+                              len(encontradas)))
+                libres.append(encontradas)
+        plan = plan_optimo(tipos, pasajeros, max_habitaciones) if tipos else None
+        if plan is None:
+            continue
+        costo, cantidades = plan
+        if mejor is None or costo < mejor[0]:
+            elegidas = [habitacion for encontradas, cantidad in zip(libres, cantidades)
+                        for habitacion in encontradas[:cantidad]]
+            mejor = (costo, elegidas)
+    return mejor
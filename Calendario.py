@@ -0,0 +1,169 @@
+"""
+Módulo que define el calendario de ocupación de una habitación.
+
+Este módulo implementa una estructura de intervalos ordenados que registra
+los rangos de fechas reservados de una habitación y permite comprobar si un
+rango está libre mediante búsqueda binaria.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+def a_ordinal(fecha):
+    """
+    Convierte una fecha (o fecha y hora) en su número ordinal de día.
+
+    Args:
+        fecha (date | datetime | int): Fecha a convertir. Si ya es un entero,
+            se devuelve sin cambios.
+
+    Returns:
+        int: Número ordinal del día correspondiente a la fecha.
+    """
+    if isinstance(fecha, int):
+        return fecha
+    return fecha.toordinal()
+
+def rango_reserva(fecha_inicio, dias_reserva):
+    """
+    Calcula el rango de fechas que ocupa una reserva.
+
+    Args:
+        fecha_inicio (date): Fecha de inicio de la reserva.
+        dias_reserva (int): Cantidad de días de la reserva.
+
+    Returns:
+        tuple: Fechas (inicio, fin), donde el fin es el día de salida y no
+            se considera ocupado.
+
+    Raises:
+        ValueError: Si la cantidad de días es menor que 1.
+    """
+    if dias_reserva < 1:
+        raise ValueError(f"La cantidad de días debe ser mayor a 0: {dias_reserva}")
+    return fecha_inicio, fecha_inicio + timedelta(days=dias_reserva)
+
+class CalendarioOcupacion:
+    """
+    Conjunto ordenado de rangos de fechas ocupados de una habitación.
+
+    Los rangos son semiabiertos [inicio, fin) y nunca se solapan, por lo que
+    al estar ordenados por inicio también quedan ordenados por fin. Esto
+    permite comprobar solapamientos con una sola búsqueda binaria.
+
+    Attributes:
+        _inicios (list): Días ordinales de inicio de cada rango, ordenados.
+        _fines (list): Días ordinales de fin de cada rango, en el mismo orden.
+        _codigos (list): Código de la reserva que ocupa cada rango.
+    """
+
+    def __init__(self):
+        """
+        Inicializa un calendario sin rangos ocupados.
+        """
+        self._inicios = []
+        self._fines = []
+        self._codigos = []
+
+    def esta_libre(self, fecha_inicio, fecha_fin):
+        """
+        Comprueba si un rango de fechas no se solapa con ningún rango ocupado.
+
+        Args:
+            fecha_inicio (date): Primer día del rango.
+            fecha_fin (date): Día siguiente al último día del rango.
+
+        Returns:
+            bool: True si el rango está libre, False en caso contrario.
+        """
+        inicio = a_ordinal(fecha_inicio)
+        fin = a_ordinal(fecha_fin)
+
+        # Primer rango ocupado que termina después del inicio solicitado
+        posicion = bisect_right(self._fines, inicio)
+        return posicion == len(self._inicios) or self._inicios[posicion] >= fin
+
+    def ocupar(self, fecha_inicio, fecha_fin, codigo_reserva):
+        """
+        Registra un rango ocupado si no se solapa con los existentes.
+
+        Args:
+            fecha_inicio (date): Primer día del rango.
+            fecha_fin (date): Día siguiente al último día del rango.
+            codigo_reserva (str): Código de la reserva que ocupa el rango.
+
+        Returns:
+            bool: True si se registró el rango, False si estaba ocupado.
+
+        Raises:
+            ValueError: Si el rango está vacío o invertido (fin <= inicio).
+        """
+        inicio = a_ordinal(fecha_inicio)
+        fin = a_ordinal(fecha_fin)
+        if fin <= inicio:
+            raise ValueError(f"Rango de fechas vacío o invertido: {fecha_inicio} a {fecha_fin}")
+        if not self.esta_libre(inicio, fin):
+            return False
+        posicion = bisect_left(self._inicios, inicio)
+        self._inicios.insert(posicion, inicio)
+        self._fines.insert(posicion, fin)
+        self._codigos.insert(posicion, codigo_reserva)
+        return True
+
+    def liberar(self, fecha_inicio, codigo_reserva):
+        """
+        Elimina el rango ocupado por una reserva.
+
+        Args:
+            fecha_inicio (date): Fecha de inicio del rango a liberar.
+            codigo_reserva (str): Código de la reserva que ocupa el rango.
+
+        Returns:
+            bool: True si se liberó el rango, False si no se encontró.
+        """
+        inicio = a_ordinal(fecha_inicio)
+        posicion = bisect_left(self._inicios, inicio)
+        if posicion == len(self._inicios) or self._codigos[posicion] != codigo_reserva:
+            return False
+        del self._inicios[posicion]
+        del self._fines[posicion]
+        del self._codigos[posicion]
+        return True
+
+    def hueco(self, fecha):
+        """
+        Devuelve el rango libre más amplio que contiene una fecha libre.
+
+        Args:
+            fecha (date | int): Fecha libre (o su ordinal).
+
+        Returns:
+            tuple: Ordinales (inicio, fin) del rango libre; sin rangos ocupados
+                antes o después, se extiende hasta date.min o date.max.
+        """
+        dia = a_ordinal(fecha)
+        posicion = bisect_right(self._fines, dia)
+        inicio = self._fines[posicion - 1] if posicion else date.min.toordinal()
+        fin = self._inicios[posicion] if posicion < len(self._inicios) else date.max.toordinal()
+        return inicio, fin
+
+    def rangos(self):
+        """
+        Devuelve los rangos ocupados en orden cronológico.
+
+        Returns:
+            list: Lista de tuplas (inicio, fin, codigo_reserva) con fechas.
+        """
+        return [
+            (date.fromordinal(inicio), date.fromordinal(fin), codigo)
+            for inicio, fin, codigo in zip(self._inicios, self._fines, self._codigos)
+        ]
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de rangos ocupados.
+
+        Returns:
+            int: Número de rangos registrados en el calendario.
+        """
+        return len(self._inicios)
@@ -5,9 +5,52 @@ Este módulo implementa la clase central que coordina la gestión de habitacione
 y reservas en el sistema de gestión del crucero.
 """
 
-from Cubiertas import Economica, Normal, Premium
+import logging
+import os
+import threading
+from datetime import date, timedelta
+from itertools import islice
+
+from Distribucion import DISTRIBUCION_PREDETERMINADA, HabitacionesPerezosas, normalizar_distribucion
+from Calendario import rango_reserva
+from Asignacion import elegir_habitaciones
 from Reserva import Reserva
-from Normalizar import normalizar_texto
+from Usuario import Usuario
+from RegistroUsuarios import RegistroUsuarios
+from IndiceDisponibilidad import IndiceDisponibilidad
+from Almacenamiento import Almacenamiento
+from Tarifas import tarifas
+from Historial import HistorialReservas
+from ArchivoReservas import ArchivoReservas, escribir_archivo
+from ListaEspera import ListaEspera, SolicitudEspera
+from Retenciones import DURACION_RETENCION, PlanificadorVencimientos, Retencion, VencimientosEnSegundoPlano
+from Normalizar import normalizar_texto_cacheado
+from Identificadores import generador
+
+registro = logging.getLogger(__name__)
+
+# Reservas que se copian del orden por cada toma del bloqueo al recorrerlas
+TAMANO_TRAMO = 256
+
+# Veces que se vuelve a elegir habitaciones para un grupo si otra reserva
+# ocupó alguna de las elegidas antes de confirmarlas
+INTENTOS_GRUPO = 3
+
+def _clave_codigo(codigo):
+    """
+    Clave de orden de un código de reserva.
+
+    Los códigos más cortos van primero, de modo que R999 queda antes que R1000
+    y el orden coincide con el de creación. Los códigos de Identificadores
+    tienen todos el mismo largo y se ordenan por instante de creación.
+
+    Args:
+        codigo (str): Código de reserva.
+
+    Returns:
+        tuple: (longitud, código).
+    """
+    return (len(codigo), codigo)
 
 class Crucero:
     """
@@ -18,53 +61,481 @@ class Crucero:
     
     Attributes:
         habitaciones (list): Lista de objetos de tipo Habitacion disponibles.
+        distribucion (tuple): Distribución de habitaciones del barco.
         reservas (list): Lista de objetos de tipo Reserva realizadas.
+        historial (HistorialReservas): Reservas finalizadas en formato compacto.
+        archivos (list): Archivos binarios (ArchivoReservas) con el historial
+            de salidas terminadas, abiertos con mmap.
+        usuarios (RegistroUsuarios): Usuarios registrados y sus reservas activas.
+        identificadores (GeneradorIdentificadores): Generador de los códigos de
+            reservas y usuarios, con el origen del crucero.
+    
+    Además de las listas, se mantienen índices por código de habitación y por
+    código de reserva para que las búsquedas y cancelaciones sean O(1), y un
+    índice de disponibilidad agrupado por cubierta y acomodación. Los códigos
+    de las reservas activas se guardan además ordenados, para recorrerlas por
+    páginas reanudando desde el último código devuelto.
+    
+    Los usuarios y las reservas se guardan en el almacenamiento configurado y
+    se recuperan al crear una nueva instancia con el mismo almacenamiento.
+    
+    Las operaciones pueden invocarse desde varios hilos: cada habitación se
+    bloquea por separado al ocupar o liberar fechas, y solo la escritura en el
+    almacenamiento se serializa.
     """
     
-    def __init__(self):
+    def __init__(self, almacenamiento=None, distribucion=None, perezosa=False, origen=0):
         """
         Inicializa una nueva instancia del sistema de crucero.
         
-        Crea las listas de habitaciones y reservas, y realiza la inicialización
-        de las habitaciones disponibles en el crucero.
+        Crea las listas de habitaciones y reservas, realiza la inicialización
+        de las habitaciones disponibles en el crucero y recupera el estado
+        guardado en el almacenamiento.
+        
+        Args:
+            almacenamiento (Almacenamiento, optional): Almacenamiento donde se
+                guardan usuarios y reservas. Por defecto, solo en memoria.
+            distribucion (iterable, optional): Habitaciones del barco, con el
+                formato de Distribucion.normalizar_distribucion. Por defecto, la
+                distribución predeterminada de 30 habitaciones.
+            perezosa (bool, optional): Si es True, cada habitación se crea la
+                primera vez que se usa, lo que acelera el arranque de barcos con
+                miles de habitaciones. Por defecto, se crean todas al inicio.
+            origen (int, optional): Origen que se graba en los códigos que
+                genera el crucero (ver Identificadores). Flota asigna uno
+                distinto a cada salida. Por defecto 0.
         """
+        if distribucion is None:
+            self.distribucion = DISTRIBUCION_PREDETERMINADA
+        else:
+            self.distribucion = normalizar_distribucion(distribucion)
+        self._perezosa = perezosa
+        self.identificadores = generador(origen)
         self.habitaciones = []
-        self.reservas = []
+        self._indice_habitaciones = {}
+        self._bloqueo_habitaciones = threading.Lock()
+        self._indice_reservas = {}
+        self._orden_reservas = []
+        self._retiradas_orden = 0
+        self._bloqueo_orden = threading.Lock()
+        self._observadores = []
+        self._retenciones = {}
+        self._vencimientos = PlanificadorVencimientos()
+        self._bloqueo_retenciones = threading.Lock()
+        self._hilo_vencimientos = None
+        self.lista_espera = ListaEspera()
+        self._flujo = None
+        self._disponibilidad_pendiente = {}
+        self.usuarios = RegistroUsuarios()
+        self._indice_disponibilidad = IndiceDisponibilidad()
+        self.historial = HistorialReservas()
+        self.archivos = []
+        self._bloqueo_historial = threading.Lock()
         self.inicializar_habitaciones()
+        
+        self._almacenamiento = almacenamiento if almacenamiento is not None else Almacenamiento()
+        self._bloqueo_almacenamiento = threading.Lock()
+        self._cargar_estado(self._almacenamiento.cargar())
     
     def inicializar_habitaciones(self):
         """
-        Inicializa las habitaciones disponibles en el crucero.
-        
-        Crea 10 habitaciones para cada tipo de cubierta (Económica, Normal y Premium)
-        con diferentes capacidades de acomodación (2, 3 y 4 personas).
-        """
-        # Crear 10 habitaciones para cada cubierta con diferentes acomodaciones
-        # 3 habitaciones para 2 personas, 4 para 3 personas, 3 para 4 personas por cubierta
-        
-        # Habitaciones Económicas
-        for i in range(1, 4):
-            self.habitaciones.append(Economica(f"E{i:02d}", 2))
-        for i in range(4, 8):
-            self.habitaciones.append(Economica(f"E{i:02d}", 3))
-        for i in range(8, 11):
-            self.habitaciones.append(Economica(f"E{i:02d}", 4))
-        
-        # Habitaciones Normales
-        for i in range(1, 4):
-            self.habitaciones.append(Normal(f"N{i:02d}", 2))
-        for i in range(4, 8):
-            self.habitaciones.append(Normal(f"N{i:02d}", 3))
-        for i in range(8, 11):
-            self.habitaciones.append(Normal(f"N{i:02d}", 4))
-        
-        # Habitaciones Premium
-        for i in range(1, 4):
-            self.habitaciones.append(Premium(f"P{i:02d}", 2))
-        for i in range(4, 8):
-            self.habitaciones.append(Premium(f"P{i:02d}", 3))
-        for i in range(8, 11):
-            self.habitaciones.append(Premium(f"P{i:02d}", 4))
+        Inicializa las habitaciones del crucero según su distribución.
+        
+        La distribución predeterminada crea 10 habitaciones para cada tipo de
+        cubierta (Económica, Normal y Premium) con diferentes capacidades de
+        acomodación (2, 3 y 4 personas).
+        
+        Las habitaciones se crean e indexan en bloque; en modo perezoso solo se
+        indexan sus códigos y cada habitación se crea al usarse.
+        """
+        if self._perezosa:
+            self.habitaciones = HabitacionesPerezosas(self.distribucion, self.buscar_habitacion)
+            self._indice_disponibilidad.registrar_pendientes(self.distribucion, self._crear_habitacion)
+            return
+        
+        self.habitaciones.extend(self.distribucion.construir_todas())
+        
+        # Indexar las habitaciones por código y por disponibilidad
+        self._indice_habitaciones.update(zip(self.distribucion.codigos, self.habitaciones))
+        self._indice_disponibilidad.registrar_lote(self.habitaciones)
+    
+    def _crear_habitacion(self, codigo_habitacion):
+        """
+        Crea e indexa una habitación de la distribución que aún no se usó.
+        
+        Args:
+            codigo_habitacion (str): Código de la habitación.
+            
+        Returns:
+            Habitacion: Habitación creada (o la existente), o None si el código
+                no pertenece a la distribución.
+        """
+        with self._bloqueo_habitaciones:
+            habitacion = self._indice_habitaciones.get(codigo_habitacion)
+            if habitacion is None:
+                posicion = self.distribucion.posiciones().get(codigo_habitacion)
+                if posicion is None:
+                    return None
+                habitacion = self.distribucion.construir(posicion)
+                self._indice_disponibilidad.registrar(habitacion)
+                self._indice_habitaciones[codigo_habitacion] = habitacion
+            return habitacion
+    
+    def _cargar_estado(self, estado):
+        """
+        Restaura usuarios, reservas y contadores a partir de un estado guardado.
+        
+        Las reservas que no se pueden restaurar (habitación inexistente, sin
+        días o con fechas ya ocupadas por otra reserva) se omiten y se avisa de
+        cada una en el registro del módulo.
+        
+        Args:
+            estado (dict): Estado devuelto por el almacenamiento.
+        """
+        for datos in estado["usuarios"].values():
+            self.usuarios.registrar(Usuario.desde_dict(datos))
+        
+        for datos in estado["reservas"].values():
+            reserva = Reserva.desde_dict(datos)
+            habitacion = self.buscar_habitacion(reserva.codigo_habitacion)
+            if not habitacion:
+                registro.warning("Reserva %s omitida: no existe la habitación %s",
+                                 reserva.codigo_reserva, reserva.codigo_habitacion)
+                continue
+            # Las reservas sin días guardadas antes de validarlos no ocupan fechas
+            if reserva.dias_reserva < 1:
+                registro.warning("Reserva %s omitida: %s días de reserva",
+                                 reserva.codigo_reserva, reserva.dias_reserva)
+                continue
+            if not habitacion.ocupar(reserva.fecha_inicio, reserva.fecha_fin, reserva.codigo_reserva):
+                registro.warning("Reserva %s omitida: la habitación %s ya está ocupada en esas fechas",
+                                 reserva.codigo_reserva, reserva.codigo_habitacion)
+                continue
+            self._indice_reservas[reserva.codigo_reserva] = reserva
+            self._agregar_orden_reserva(reserva.codigo_reserva)
+            self.usuarios.vincular(reserva)
+        
+        for datos in estado.get("historial", {}).values():
+            self.historial.agregar(Reserva.desde_dict(datos))
+        
+        # Los archivos sellados se abren sin leerlos; uno que ya no existe se omite
+        for ruta in estado.get("archivos", []):
+            if os.path.exists(ruta):
+                self.archivos.append(ArchivoReservas(ruta))
+        
+        # Generar códigos mayores que los ya emitidos, aunque el reloj haya retrocedido
+        self.identificadores.avanzar(estado["contadores"].get("identificadores", 0))
+    
+    def _contadores(self):
+        """
+        Devuelve el valor actual de los contadores de códigos.
+        
+        Returns:
+            dict: Último número emitido por el generador de códigos.
+        """
+        return {"identificadores": self.identificadores.ultimo}
+    
+    def nuevo_codigo_reserva(self):
+        """
+        Genera un código de reserva con el origen del crucero.
+        
+        Returns:
+            str: Código de reserva nuevo.
+        """
+        return self.identificadores.codigo("R")
+    
+    def nuevo_codigo_usuario(self):
+        """
+        Genera un código de usuario con el origen del crucero.
+        
+        Returns:
+            str: Código de usuario nuevo.
+        """
+        return self.identificadores.codigo("U")
+    
+    def _registrar_operacion(self, operacion):
+        """
+        Guarda una operación en el almacenamiento y compacta si corresponde.
+        
+        Si hay un flujo de cambios conectado, la operación se publica bajo el
+        mismo bloqueo, seguida de los cambios de disponibilidad pendientes, así
+        que el flujo sigue el orden del almacenamiento.
+        
+        Args:
+            operacion (dict): Operación con la clave "op" y sus datos.
+        """
+        with self._bloqueo_almacenamiento:
+            operacion["contadores"] = self._contadores()
+            if self._almacenamiento.registrar(operacion):
+                self._almacenamiento.compactar(self.exportar_estado())
+            if self._flujo is not None:
+                self._flujo.publicar(operacion)
+                self._vaciar_disponibilidad()
+    
+    def conectar_flujo(self, flujo):
+        """
+        Conecta un flujo de cambios que recibe las operaciones del crucero.
+        
+        Cada operación registrada se publica con flujo.publicar bajo el bloqueo
+        del almacenamiento. Los cambios de disponibilidad de las habitaciones
+        se publican también bajo ese bloqueo, como operaciones "disponibilidad",
+        después de la operación que los produjo (o enseguida, si no la hay,
+        como al retener una habitación).
+        
+        Args:
+            flujo (Replicacion.FlujoCambios): Flujo a conectar.
+        """
+        with self._bloqueo_almacenamiento:
+            self._flujo = flujo
+            self._disponibilidad_pendiente.clear()
+            self._indice_disponibilidad.observador = self._cambio_disponibilidad
+    
+    def desconectar_flujo(self):
+        """
+        Desconecta el flujo de cambios, si hay uno conectado.
+        """
+        with self._bloqueo_almacenamiento:
+            self._indice_disponibilidad.observador = None
+            self._flujo = None
+            self._disponibilidad_pendiente.clear()
+    
+    def exportar_estado_publicado(self, anotar):
+        """
+        Exporta el estado sin que se registre ni se publique ninguna operación mientras tanto.
+        
+        Args:
+            anotar (callable): Función sin argumentos que se llama bajo el mismo
+                bloqueo, por ejemplo para leer la secuencia del flujo.
+            
+        Returns:
+            tuple: (resultado de anotar, estado con el formato de exportar_estado).
+        """
+        with self._bloqueo_almacenamiento:
+            estado = self.exportar_estado()
+            return anotar(), estado
+    
+    def _cambio_disponibilidad(self, habitacion):
+        """
+        Anota una habitación que cambió de disponibilidad, para publicarla en el flujo.
+        
+        Se llama con el bloqueo de la habitación tomado, así que no toma el
+        del almacenamiento.
+        
+        Args:
+            habitacion (Habitacion): Habitación que cambió.
+        """
+        self._disponibilidad_pendiente[habitacion.codigo_habitacion] = habitacion
+    
+    def _vaciar_disponibilidad(self):
+        """
+        Publica en el flujo la disponibilidad actual de las habitaciones anotadas.
+        
+        Debe llamarse con el bloqueo del almacenamiento tomado y un flujo conectado.
+        """
+        pendientes = self._disponibilidad_pendiente
+        for codigo in list(pendientes):
+            habitacion = pendientes.pop(codigo)
+            self._flujo.publicar({"op": "disponibilidad", "codigo_habitacion": codigo,
+                                  "disponible": habitacion.disponibilidad})
+    
+    def _publicar_disponibilidad(self):
+        """
+        Publica los cambios de disponibilidad que no acompañan a ninguna operación.
+        """
+        if self._flujo is None or not self._disponibilidad_pendiente:
+            return
+        with self._bloqueo_almacenamiento:
+            if self._flujo is not None:
+                self._vaciar_disponibilidad()
+    
+    def aplicar_operacion(self, operacion):
+        """
+        Aplica una operación registrada por otro crucero con la misma distribución.
+        
+        La usan las réplicas para seguir el flujo de cambios del primario.
+        Aplicar dos veces la misma operación no tiene efecto.
+        
+        Args:
+            operacion (dict): Operación con la clave "op" y sus datos.
+        """
+        tipo = operacion["op"]
+        if tipo == "lote":
+            for suboperacion in operacion["operaciones"]:
+                self.aplicar_operacion(suboperacion)
+        elif tipo == "usuario":
+            self.usuarios.registrar(Usuario.desde_dict(operacion["usuario"]))
+        elif tipo == "reserva":
+            reserva = Reserva.desde_dict(operacion["reserva"])
+            habitacion = self.buscar_habitacion(reserva.codigo_habitacion)
+            if (habitacion and reserva.dias_reserva >= 1 and reserva.codigo_reserva not in self._indice_reservas
+                    and habitacion.ocupar(reserva.fecha_inicio, reserva.fecha_fin, reserva.codigo_reserva)):
+                self._alta_reserva(reserva)
+        elif tipo == "cancelacion":
+            self.cancelar_reserva(operacion["codigo_reserva"])
+        elif tipo == "archivo":
+            self._archivar([self._indice_reservas[codigo] for codigo in operacion["codigos"]
+                            if codigo in self._indice_reservas])
+        elif tipo == "sellado":
+            # El archivo lo escribió el crucero de origen; se abre si es accesible
+            with self._bloqueo_historial:
+                if (os.path.exists(operacion["ruta"])
+                        and all(archivo.ruta != operacion["ruta"] for archivo in self.archivos)):
+                    self.archivos.append(ArchivoReservas(operacion["ruta"]))
+                    self.historial = HistorialReservas()
+        
+        # Continuar los códigos como el crucero de origen, por si la réplica pasa a primario
+        self.identificadores.avanzar(operacion.get("contadores", {}).get("identificadores", 0))
+    
+    def exportar_estado(self):
+        """
+        Genera una copia serializable del estado de usuarios y reservas.
+        
+        Returns:
+            dict: Estado con usuarios, reservas y contadores de códigos.
+        """
+        # Copiar los índices primero para no iterarlos mientras otros hilos los modifican
+        usuarios = self.usuarios.usuarios()
+        reservas = dict(self._indice_reservas)
+        return {
+            "usuarios": {usuario.codigo: usuario.a_dict() for usuario in usuarios},
+            "reservas": {codigo: reserva.a_dict() for codigo, reserva in reservas.items()},
+            "historial": {vista.codigo_reserva: vista.a_reserva().a_dict() for vista in self.historial},
+            "archivos": [archivo.ruta for archivo in self.archivos],
+            "contadores": self._contadores(),
+        }
+    
+    def cerrar(self):
+        """
+        Detiene el vencimiento de retenciones y cierra el almacenamiento del crucero.
+        """
+        if self._hilo_vencimientos is not None:
+            self._hilo_vencimientos.detener()
+            self._hilo_vencimientos = None
+        self._almacenamiento.cerrar()
+        for archivo in self.archivos:
+            archivo.cerrar()
+    
+    def agregar_observador(self, observador):
+        """
+        Registra una función que se llama con cada cambio en las reservas activas.
+        
+        El observador recibe (evento, reserva), donde evento es "reserva" al
+        crearse una reserva, "cancelacion" al cancelarla o "archivo" al pasarla
+        al historial. Se llama desde el hilo que realizó la operación.
+        
+        Args:
+            observador (callable): Función a notificar.
+        """
+        # Se reemplaza la lista para que una notificación en curso no la vea cambiar
+        self._observadores = self._observadores + [observador]
+    
+    def quitar_observador(self, observador):
+        """
+        Deja de notificar a un observador.
+        
+        Args:
+            observador (callable): Función registrada con agregar_observador.
+        """
+        self._observadores = [registrado for registrado in self._observadores if registrado != observador]
+    
+    def _notificar(self, evento, reserva):
+        """
+        Notifica un cambio en las reservas a los observadores.
+        
+        Args:
+            evento (str): "reserva", "cancelacion" o "archivo".
+            reserva (Reserva): Reserva afectada.
+        """
+        for observador in self._observadores:
+            observador(evento, reserva)
+    
+    def registrar_usuario(self, usuario):
+        """
+        Registra un usuario en el sistema.
+        
+        Args:
+            usuario (Usuario): Usuario a registrar.
+            
+        Returns:
+            bool: True si se registró, False si ya existía un usuario con ese código.
+        """
+        if not self.usuarios.registrar(usuario):
+            return False
+        self._registrar_operacion({"op": "usuario", "usuario": usuario.a_dict()})
+        return True
+    
+    def registrar_usuarios(self, usuarios):
+        """
+        Registra varios usuarios guardándolos con una sola operación.
+        
+        Args:
+            usuarios (iterable): Usuarios a registrar.
+            
+        Returns:
+            list: Un bool por usuario, False si ya existía un usuario con ese código.
+        """
+        registrados = []
+        operaciones = []
+        for usuario in usuarios:
+            nuevo = self.usuarios.registrar(usuario)
+            if nuevo:
+                operaciones.append({"op": "usuario", "usuario": usuario.a_dict()})
+            registrados.append(nuevo)
+        if operaciones:
+            self._registrar_operacion({"op": "lote", "operaciones": operaciones})
+        return registrados
+    
+    def buscar_usuario(self, codigo):
+        """
+        Busca un usuario por su código.
+        
+        Args:
+            codigo (str): Código del usuario a buscar. Se aceptan formas
+                equivalentes como "U7", "U07" o "7".
+            
+        Returns:
+            Usuario: Usuario encontrado o None si no existe.
+        """
+        return self.usuarios.buscar(codigo)
+    
+    def buscar_usuarios_por_nombre(self, nombre):
+        """
+        Busca usuarios por nombre, sin distinguir acentos ni mayúsculas.
+        
+        Args:
+            nombre (str): Nombre del usuario.
+            
+        Returns:
+            list: Usuarios con ese nombre.
+        """
+        return self.usuarios.buscar_por_nombre(nombre)
+    
+    def buscar_usuarios_similares(self, nombre, limite=10):
+        """
+        Busca usuarios por nombre aproximado, con su reserva activa.
+        
+        Tolera acentos, errores de escritura, nombres incompletos y palabras
+        en otro orden ("Muñoz, José"), usando un índice de trigramas.
+        
+        Args:
+            nombre (str): Nombre o parte del nombre.
+            limite (int, optional): Cantidad máxima de resultados.
+            
+        Returns:
+            list: Tuplas (puntuación, usuario) de la más parecida a la menos;
+                la reserva activa de cada usuario está en usuario.reserva.
+        """
+        return self.usuarios.buscar_similares(nombre, limite)
+    
+    @property
+    def reservas(self):
+        """
+        Lista de reservas activas en el orden en que fueron creadas.
+        
+        Returns:
+            list: Lista de objetos de tipo Reserva.
+        """
+        return list(self._indice_reservas.values())
     
     def buscar_habitacion(self, codigo_habitacion):
         """
@@ -76,67 +547,622 @@ class Crucero:
         Returns:
             Habitacion: Objeto habitación encontrado o None si no existe.
         """
-        for habitacion in self.habitaciones:
-            if habitacion.codigo_habitacion == codigo_habitacion:
-                return habitacion
-        return None
+        habitacion = self._indice_habitaciones.get(codigo_habitacion)
+        if habitacion is None and self._perezosa:
+            habitacion = self._crear_habitacion(codigo_habitacion)
+        return habitacion
     
-    def listar_habitaciones_disponibles(self, cubierta=None, acomodacion=None):
+    def listar_habitaciones_disponibles(self, cubierta=None, acomodacion=None,
+                                        fecha_inicio=None, fecha_fin=None):
         """
         Lista las habitaciones disponibles según los criterios especificados.
         
+        Sin fechas se listan las habitaciones que no tienen ninguna reserva. Con
+        fecha de inicio se listan las habitaciones libres en ese rango.
+        
         Args:
             cubierta (str, optional): Tipo de cubierta a filtrar.
             acomodacion (int, optional): Capacidad de acomodación a filtrar.
+            fecha_inicio (date, optional): Primer día del rango buscado.
+            fecha_fin (date, optional): Día de salida del rango buscado. Si es
+                None, se busca solo la noche de fecha_inicio.
             
         Returns:
             list: Lista de habitaciones que cumplen con los criterios y están disponibles.
         """
-        habitaciones_disponibles = []
+        if fecha_inicio is None:
+            return self._indice_disponibilidad.listar(cubierta, acomodacion)
+        if fecha_fin is None:
+            fecha_fin = fecha_inicio + timedelta(days=1)
+        return self._indice_disponibilidad.listar_libres(fecha_inicio, fecha_fin, cubierta, acomodacion)
+    
+    def iterar_habitaciones_disponibles(self, cubierta=None, acomodacion=None,
+                                        fecha_inicio=None, fecha_fin=None):
+        """
+        Recorre las habitaciones disponibles en el orden de la distribución.
         
-        # Normalizar la cubierta para facilitar la comparación
-        cubierta_normalizada = normalizar_texto(cubierta) if cubierta else None
+        Acepta los mismos criterios que listar_habitaciones_disponibles, pero
+        devuelve las habitaciones a medida que se consumen: mostrar la primera
+        página no requiere construir (ni, en modo perezoso, crear) las demás.
         
-        for habitacion in self.habitaciones:
-            if habitacion.disponibilidad:
-                cubierta_hab_normalizada = normalizar_texto(habitacion.cubierta)
-                
-                # Aplicar filtros si se especificaron
-                if cubierta_normalizada and cubierta_hab_normalizada != cubierta_normalizada:
-                    continue
-                if acomodacion and habitacion.acomodacion != acomodacion:
-                    continue
-                habitaciones_disponibles.append(habitacion)
-        return habitaciones_disponibles
+        Args:
+            cubierta (str, optional): Tipo de cubierta a filtrar.
+            acomodacion (int, optional): Capacidad de acomodación a filtrar.
+            fecha_inicio (date, optional): Primer día del rango buscado.
+            fecha_fin (date, optional): Día de salida del rango buscado.
+            
+        Yields:
+            Habitacion: Habitaciones que cumplen con los criterios.
+        """
+        if fecha_inicio is not None and fecha_fin is None:
+            fecha_fin = fecha_inicio + timedelta(days=1)
+        return self._indice_disponibilidad.iterar(cubierta, acomodacion, fecha_inicio, fecha_fin)
     
-    def crear_reserva(self, codigos_usuarios, codigo_habitacion, dias_reserva):
+    def contar_habitaciones_disponibles(self, cubierta=None, acomodacion=None):
         """
-        Crea una nueva reserva en el sistema.
+        Cuenta las habitaciones disponibles según los criterios especificados.
+        
+        A diferencia de listar_habitaciones_disponibles, no construye la lista
+        de habitaciones, por lo que su costo no depende del número de resultados.
+        
+        Args:
+            cubierta (str, optional): Tipo de cubierta a filtrar.
+            acomodacion (int, optional): Capacidad de acomodación a filtrar.
+            
+        Returns:
+            int: Cantidad de habitaciones disponibles que cumplen con los criterios.
+        """
+        return self._indice_disponibilidad.contar(cubierta, acomodacion)
+    
+    def crear_reserva(self, codigos_usuarios, codigo_habitacion, dias_reserva, fecha_inicio=None):
+        """
+        Crea una nueva reserva en el sistema y la asocia a sus usuarios registrados.
         
         Args:
             codigos_usuarios (list): Lista de códigos de usuarios para la reserva.
             codigo_habitacion (str): Código de la habitación a reservar.
             dias_reserva (int): Cantidad de días que durará la reserva.
+            fecha_inicio (date, optional): Primer día de estancia. Si es None,
+                la estancia comienza hoy.
             
         Returns:
             str: Código de la reserva creada o None si no se pudo crear.
+            
+        Raises:
+            ValueError: Si la cantidad de días es menor que 1.
         """
         habitacion = self.buscar_habitacion(codigo_habitacion)
-        if not habitacion or not habitacion.disponibilidad:
+        if not habitacion:
             return None
         
-        # Cambiar disponibilidad de la habitación
-        habitacion.cambiar_disponibilidad(False)
+        # Verificar que el rango de fechas esté libre
+        if fecha_inicio is None:
+            fecha_inicio = date.today()
+        inicio, fin = rango_reserva(fecha_inicio, dias_reserva)
+        if not habitacion.esta_libre(inicio, fin):
+            return None
         
-        # Crear y registrar la reserva
-        reserva = Reserva(dias_reserva, codigos_usuarios, codigo_habitacion)
-        self.reservas.append(reserva)
+        # Crear la reserva y ocupar sus fechas de forma atómica; si otro hilo
+        # ocupó el rango entre la comprobación y este punto, no se reserva
+        codigos_usuarios = [self.usuarios.codigo_canonico(codigo) for codigo in codigos_usuarios]
+        reserva = Reserva(dias_reserva, codigos_usuarios, codigo_habitacion, fecha_inicio=fecha_inicio,
+                          codigo_reserva=self.nuevo_codigo_reserva())
+        if not habitacion.ocupar(inicio, fin, reserva.codigo_reserva):
+            return None
+        self._alta_reserva(reserva)
         
         return reserva.codigo_reserva
     
+    def _alta_reserva(self, reserva):
+        """
+        Registra una reserva cuyas fechas ya están ocupadas en su habitación.
+        
+        La indexa, la asocia a sus usuarios, la guarda en el almacenamiento y
+        avisa a los observadores.
+        
+        Args:
+            reserva (Reserva): Reserva a registrar.
+        """
+        self._indice_reservas[reserva.codigo_reserva] = reserva
+        self._agregar_orden_reserva(reserva.codigo_reserva)
+        self.usuarios.vincular(reserva)
+        self._registrar_operacion({"op": "reserva", "reserva": reserva.a_dict()})
+        self._notificar("reserva", reserva)
+    
+    def crear_reservas_lote(self, solicitudes):
+        """
+        Crea varias reservas en una sola llamada, sin interacción con el usuario.
+        
+        Cada solicitud es un diccionario con las claves:
+        
+        - codigos_usuarios (list): Códigos de los usuarios de la reserva.
+        - dias_reserva (int): Cantidad de días de la reserva.
+        - fecha_inicio (date, optional): Primer día de estancia (hoy si falta).
+        - codigo_habitacion (str, optional): Habitación a reservar. Si falta, se
+          asigna la primera habitación libre que cumpla con cubierta y acomodación.
+        - cubierta (str, optional) y acomodacion (int, optional): Criterios para
+          asignar la habitación cuando no se indica su código. Sin acomodación
+          se asigna cualquier habitación con capacidad para todos los usuarios.
+        - usuarios_nuevos (list, optional): Usuarios aún no registrados, cuyos
+          códigos figuran en codigos_usuarios. Se registran solo si se crea
+          la reserva.
+        
+        Una solicitud inválida no detiene el lote: su resultado indica el error.
+        Todas las reservas creadas y sus usuarios nuevos se guardan en el
+        almacenamiento con una sola operación, que se registra aunque una
+        excepción interrumpa el lote, para no dejar reservas en memoria que
+        no estén guardadas.
+        
+        Args:
+            solicitudes (iterable): Solicitudes de reserva.
+            
+        Returns:
+            list: Un diccionario por solicitud con las claves codigo_reserva,
+                codigo_habitacion, costo y error (None si se creó la reserva).
+        """
+        resultados = []
+        operaciones = []
+        try:
+            for solicitud in solicitudes:
+                resultado = self._crear_reserva_solicitud(solicitud)
+                if resultado["error"] is None:
+                    reserva = self._indice_reservas[resultado["codigo_reserva"]]
+                    # Solo los usuarios que se registraron al crear la reserva
+                    operaciones.extend({"op": "usuario", "usuario": usuario.a_dict()}
+                                       for usuario in solicitud.get("usuarios_nuevos") or ()
+                                       if self.usuarios.buscar(usuario.codigo) is usuario)
+                    operaciones.append({"op": "reserva", "reserva": reserva.a_dict()})
+                resultados.append(resultado)
+        finally:
+            if operaciones:
+                self._registrar_operacion({"op": "lote", "operaciones": operaciones})
+        return resultados
+    
+    def _crear_reserva_solicitud(self, solicitud):
+        """
+        Valida, cotiza y crea la reserva de una solicitud del lote.
+        
+        Args:
+            solicitud (dict): Solicitud con el formato de crear_reservas_lote.
+            
+        Returns:
+            dict: Resultado con codigo_reserva, codigo_habitacion, costo y error.
+        """
+        resultado = {"codigo_reserva": None, "codigo_habitacion": None, "costo": None, "error": None}
+        
+        dias_reserva = solicitud.get("dias_reserva")
+        if not isinstance(dias_reserva, int) or dias_reserva <= 0:
+            resultado["error"] = "La cantidad de días debe ser un entero mayor a 0."
+            return resultado
+        
+        codigos_usuarios = [self.usuarios.codigo_canonico(codigo) for codigo in solicitud.get("codigos_usuarios") or []]
+        if not any(codigos_usuarios):
+            resultado["error"] = "La reserva no tiene usuarios."
+            return resultado
+        for codigo_usuario in codigos_usuarios:
+            usuario = self.usuarios.buscar(codigo_usuario)
+            if usuario and usuario.obtener_reserva():
+                resultado["error"] = f"El usuario {codigo_usuario} ya tiene una reserva."
+                return resultado
+        
+        codigo_habitacion = solicitud.get("codigo_habitacion")
+        cubierta = solicitud.get("cubierta")
+        acomodacion = solicitud.get("acomodacion")
+        if not all(isinstance(valor, str) for valor in (codigo_habitacion, cubierta) if valor is not None):
+            resultado["error"] = "La habitación y la cubierta deben ser textos."
+            return resultado
+        if acomodacion is not None and not isinstance(acomodacion, int):
+            resultado["error"] = "La acomodación debe ser un entero."
+            return resultado
+        
+        fecha_inicio = solicitud.get("fecha_inicio") or date.today()
+        if not isinstance(fecha_inicio, date):
+            resultado["error"] = "La fecha de inicio no es válida."
+            return resultado
+        inicio, fin = rango_reserva(fecha_inicio, dias_reserva)
+        
+        # Habitación indicada o candidatas libres según cubierta y acomodación
+        if codigo_habitacion:
+            habitacion = self.buscar_habitacion(codigo_habitacion)
+            if not habitacion:
+                resultado["error"] = f"La habitación {codigo_habitacion} no existe."
+                return resultado
+            if len(codigos_usuarios) > habitacion.acomodacion:
+                resultado["error"] = (f"La habitación {codigo_habitacion} tiene capacidad "
+                                      f"para {habitacion.acomodacion} personas.")
+                return resultado
+            candidatas = [habitacion] if habitacion.esta_libre(inicio, fin) else []
+        else:
+            candidatas = self._indice_disponibilidad.candidatas(inicio, fin, cubierta, acomodacion)
+        
+        for habitacion in candidatas:
+            if len(codigos_usuarios) > habitacion.acomodacion:
+                continue
+            
+            # Completar con vacantes hasta la capacidad de la habitación
+            usuarios_reserva = codigos_usuarios + [None] * (habitacion.acomodacion - len(codigos_usuarios))
+            reserva = Reserva(dias_reserva, usuarios_reserva, habitacion.codigo_habitacion, fecha_inicio=fecha_inicio,
+                              codigo_reserva=self.nuevo_codigo_reserva())
+            if not habitacion.ocupar(inicio, fin, reserva.codigo_reserva):
+                continue
+            for usuario in solicitud.get("usuarios_nuevos") or ():
+                self.usuarios.registrar(usuario)
+            self._indice_reservas[reserva.codigo_reserva] = reserva
+            self._agregar_orden_reserva(reserva.codigo_reserva)
+            self.usuarios.vincular(reserva)
+            self._notificar("reserva", reserva)
+            resultado["codigo_reserva"] = reserva.codigo_reserva
+            resultado["codigo_habitacion"] = habitacion.codigo_habitacion
+            resultado["costo"] = habitacion.calcular_costo(habitacion.cubierta, dias_reserva, habitacion.acomodacion)
+            return resultado
+        
+        resultado["error"] = "No hay habitaciones disponibles para la solicitud."
+        return resultado
+    
+    def reservar_grupo(self, codigos_usuarios, dias_reserva, fecha_inicio=None, cubierta=None,
+                       max_habitaciones=None, juntos=False):
+        """
+        Reserva las habitaciones de menor costo total para alojar a un grupo.
+        
+        Las habitaciones se eligen con Asignacion.elegir_habitaciones y se
+        reservan todas o ninguna: si otra reserva ocupa alguna antes de
+        confirmarlas, se liberan las ya ocupadas y se vuelve a elegir. Los
+        pasajeros se reparten llenando primero las habitaciones más grandes, y
+        las plazas que sobran quedan como vacantes.
+        
+        Args:
+            codigos_usuarios (list): Códigos de los pasajeros del grupo.
+            dias_reserva (int): Cantidad de días de la estancia.
+            fecha_inicio (date, optional): Primer día de la estancia. Por defecto, hoy.
+            cubierta (str, optional): Usar solo habitaciones de esta cubierta.
+            max_habitaciones (int, optional): Máximo de habitaciones para el grupo.
+            juntos (bool, optional): Si es True, todas las habitaciones quedan en
+                la misma cubierta.
+            
+        Returns:
+            dict: Resultado con codigos_reserva, habitaciones, costo y error
+                (None si se reservó el grupo).
+        """
+        resultado = {"codigos_reserva": [], "habitaciones": [], "costo": None, "error": None}
+        if not isinstance(dias_reserva, int) or dias_reserva <= 0:
+            resultado["error"] = "La cantidad de días debe ser un entero mayor a 0."
+            return resultado
+        codigos_usuarios = [self.usuarios.codigo_canonico(codigo) for codigo in codigos_usuarios]
+        if not codigos_usuarios:
+            resultado["error"] = "El grupo no tiene pasajeros."
+            return resultado
+        for codigo_usuario in codigos_usuarios:
+            usuario = self.usuarios.buscar(codigo_usuario)
+            if usuario and usuario.obtener_reserva():
+                resultado["error"] = f"El usuario {codigo_usuario} ya tiene una reserva."
+                return resultado
+        
+        if fecha_inicio is None:
+            fecha_inicio = date.today()
+        inicio, fin = rango_reserva(fecha_inicio, dias_reserva)
+        
+        for _ in range(INTENTOS_GRUPO):
+            plan = elegir_habitaciones(self._indice_disponibilidad, len(codigos_usuarios), inicio, fin,
+                                       dias_reserva, cubierta, max_habitaciones, juntos)
+            if plan is None:
+                resultado["error"] = "No hay habitaciones suficientes para el grupo."
+                return resultado
+            costo, habitaciones = plan
+            
+            # Ocupar todas las habitaciones o deshacer las ya ocupadas
+            habitaciones.sort(key=lambda habitacion: -habitacion.acomodacion)
+            reservas = []
+            pendientes = iter(codigos_usuarios)
+            for habitacion in habitaciones:
+                usuarios_reserva = [next(pendientes, None) for _ in range(habitacion.acomodacion)]
+                reserva = Reserva(dias_reserva, usuarios_reserva, habitacion.codigo_habitacion,
+                                  fecha_inicio=fecha_inicio, codigo_reserva=self.nuevo_codigo_reserva())
+                if not habitacion.ocupar(inicio, fin, reserva.codigo_reserva):
+                    break
+                reservas.append((habitacion, reserva))
+            else:
+                break
+            for habitacion, reserva in reservas:
+                habitacion.liberar(reserva.fecha_inicio, reserva.codigo_reserva)
+        else:
+            resultado["error"] = "La disponibilidad cambió mientras se reservaba el grupo."
+            return resultado
+        
+        operaciones = []
+        for habitacion, reserva in reservas:
+            self._indice_reservas[reserva.codigo_reserva] = reserva
+            self._agregar_orden_reserva(reserva.codigo_reserva)
+            self.usuarios.vincular(reserva)
+            self._notificar("reserva", reserva)
+            operaciones.append({"op": "reserva", "reserva": reserva.a_dict()})
+            resultado["codigos_reserva"].append(reserva.codigo_reserva)
+            resultado["habitaciones"].append(habitacion.codigo_habitacion)
+        self._registrar_operacion({"op": "lote", "operaciones": operaciones})
+        resultado["costo"] = costo
+        return resultado
+    
+    def retener_habitacion(self, codigo_habitacion, dias_reserva, fecha_inicio=None,
+                           segundos=DURACION_RETENCION):
+        """
+        Retiene las fechas de una habitación mientras se completa la reserva.
+        
+        Durante la retención la habitación no está disponible para otras
+        reservas. Si no se confirma antes de que venza, las fechas se liberan.
+        Las retenciones no se guardan en el almacenamiento.
+        
+        Args:
+            codigo_habitacion (str): Código de la habitación a retener.
+            dias_reserva (int): Cantidad de días a retener.
+            fecha_inicio (date, optional): Primer día. Por defecto, hoy.
+            segundos (float, optional): Duración de la retención. Por defecto, 10 minutos.
+            
+        Returns:
+            str: Código de la retención (el de la reserva que se creará al
+                confirmar), o None si la habitación no existe o no está libre.
+            
+        Raises:
+            ValueError: Si la cantidad de días es menor que 1.
+        """
+        self.expirar_retenciones()
+        habitacion = self.buscar_habitacion(codigo_habitacion)
+        if not habitacion:
+            return None
+        if fecha_inicio is None:
+            fecha_inicio = date.today()
+        inicio, fin = rango_reserva(fecha_inicio, dias_reserva)
+        codigo = self.nuevo_codigo_reserva()
+        if not habitacion.ocupar(inicio, fin, codigo):
+            return None
+        
+        with self._bloqueo_retenciones:
+            vencimiento = self._vencimientos.reloj() + segundos
+            self._retenciones[codigo] = Retencion(codigo, codigo_habitacion, fecha_inicio, dias_reserva, vencimiento)
+            self._vencimientos.programar(codigo, vencimiento)
+        if self._hilo_vencimientos is not None:
+            self._hilo_vencimientos.avisar()
+        self._publicar_disponibilidad()
+        return codigo
+    
+    def confirmar_retencion(self, codigo_retencion, codigos_usuarios):
+        """
+        Convierte una retención vigente en una reserva.
+        
+        Las fechas ya están ocupadas por la retención, así que la habitación no
+        queda libre en ningún momento entre la retención y la reserva.
+        
+        Args:
+            codigo_retencion (str): Código devuelto por retener_habitacion.
+            codigos_usuarios (list): Códigos de los usuarios de la reserva.
+            
+        Returns:
+            str: Código de la reserva creada, o None si la retención no existe o venció.
+        """
+        self.expirar_retenciones()
+        with self._bloqueo_retenciones:
+            retencion = self._retenciones.pop(codigo_retencion, None)
+            if retencion is None:
+                return None
+            self._vencimientos.cancelar(codigo_retencion)
+            vencida = retencion.vencimiento <= self._vencimientos.reloj()
+        
+        # Pudo vencer entre la expiración y la toma del bloqueo
+        if vencida:
+            self._liberar_fechas_retencion(retencion)
+            return None
+        
+        codigos_usuarios = [self.usuarios.codigo_canonico(codigo) for codigo in codigos_usuarios]
+        reserva = Reserva(retencion.dias_reserva, codigos_usuarios, retencion.codigo_habitacion,
+                          fecha_inicio=retencion.fecha_inicio, codigo_reserva=retencion.codigo)
+        self._alta_reserva(reserva)
+        return reserva.codigo_reserva
+    
+    def liberar_retencion(self, codigo_retencion):
+        """
+        Libera una retención antes de que venza.
+        
+        Args:
+            codigo_retencion (str): Código de la retención.
+            
+        Returns:
+            bool: True si se liberó, False si no existía o ya había vencido.
+        """
+        with self._bloqueo_retenciones:
+            retencion = self._retenciones.pop(codigo_retencion, None)
+            if retencion is None:
+                return False
+            self._vencimientos.cancelar(codigo_retencion)
+        self._liberar_fechas_retencion(retencion)
+        return True
+    
+    def _liberar_fechas_retencion(self, retencion):
+        """
+        Devuelve a la disponibilidad las fechas de una retención.
+        
+        Args:
+            retencion (Retencion): Retención ya retirada del registro.
+        """
+        habitacion = self.buscar_habitacion(retencion.codigo_habitacion)
+        if habitacion:
+            self._promover(habitacion, self._liberar_habitacion(habitacion, retencion.fecha_inicio, retencion.codigo))
+            self._publicar_disponibilidad()
+    
+    def _liberar_habitacion(self, habitacion, fecha_inicio, codigo_reserva):
+        """
+        Libera las fechas de una reserva y las asigna a la lista de espera.
+        
+        Las solicitudes en espera del grupo de la habitación que caben en el
+        rango liberado ocupan sus fechas bajo el mismo bloqueo que la
+        liberación, así que esas fechas nunca se ven libres. Falta registrar
+        sus reservas con _promover.
+        
+        Args:
+            habitacion (Habitacion): Habitación a liberar.
+            fecha_inicio (date): Fecha de inicio de la reserva liberada.
+            codigo_reserva (str): Código de la reserva liberada.
+            
+        Returns:
+            list: Solicitudes en espera que ocuparon las fechas liberadas.
+        """
+        if not len(self.lista_espera):
+            habitacion.liberar(fecha_inicio, codigo_reserva)
+            return []
+        grupo = (normalizar_texto_cacheado(habitacion.cubierta), habitacion.acomodacion)
+        asignadas = []
+        
+        def asignar(inicio, fin):
+            asignadas.extend(self.lista_espera.asignar(grupo, inicio, fin))
+            return [(solicitud.inicio, solicitud.fin, solicitud.codigo) for solicitud in asignadas]
+        
+        habitacion.liberar(fecha_inicio, codigo_reserva, asignar)
+        return asignadas
+    
+    def _promover(self, habitacion, asignadas):
+        """
+        Registra las reservas de las solicitudes en espera que ocuparon una habitación.
+        
+        Args:
+            habitacion (Habitacion): Habitación asignada.
+            asignadas (list): Solicitudes devueltas por _liberar_habitacion.
+        """
+        for solicitud in asignadas:
+            self._alta_reserva(Reserva(solicitud.dias_reserva, solicitud.codigos_usuarios, habitacion.codigo_habitacion,
+                                       fecha_inicio=solicitud.fecha_inicio, codigo_reserva=solicitud.codigo))
+    
+    def esperar_reserva(self, codigos_usuarios, dias_reserva, cubierta, acomodacion, fecha_inicio=None, prioridad=0):
+        """
+        Reserva una habitación de una cubierta y acomodación, o espera a que se libere una.
+        
+        Si hay una habitación libre en las fechas pedidas, se reserva de
+        inmediato. Si no, la solicitud queda en la lista de espera y se reserva
+        automáticamente cuando una cancelación (o una retención liberada) deja
+        libres esas fechas en una habitación del grupo. Entre solicitudes que
+        caben, se atiende primero la de mayor prioridad y, a igual prioridad, la
+        más antigua. La lista de espera no se guarda en el almacenamiento.
+        
+        Args:
+            codigos_usuarios (list): Códigos de los usuarios de la reserva.
+            dias_reserva (int): Cantidad de días de la reserva.
+            cubierta (str): Tipo de cubierta.
+            acomodacion (int): Capacidad de acomodación.
+            fecha_inicio (date, optional): Primer día de estancia. Por defecto, hoy.
+            prioridad (int, optional): Prioridad en la lista de espera. Por defecto 0.
+            
+        Returns:
+            dict: Resultado con las claves codigo_reserva (el mismo mientras
+                espera y una vez reservada), codigo_habitacion (None si quedó
+                en espera o si una cancelación simultánea ya la asignó), en_espera (bool) y error (None si no hubo error).
+        """
+        resultado = {"codigo_reserva": None, "codigo_habitacion": None, "en_espera": False, "error": None}
+        if dias_reserva <= 0:
+            resultado["error"] = "La cantidad de días debe ser mayor a 0."
+            return resultado
+        if not any(codigos_usuarios):
+            resultado["error"] = "La reserva no tiene usuarios."
+            return resultado
+        grupo = (normalizar_texto_cacheado(cubierta), acomodacion)
+        if grupo not in self._indice_disponibilidad.grupos():
+            resultado["error"] = "No hay habitaciones de esa cubierta y acomodación."
+            return resultado
+        
+        if fecha_inicio is None:
+            fecha_inicio = date.today()
+        inicio, fin = rango_reserva(fecha_inicio, dias_reserva)
+        codigos_usuarios = [self.usuarios.codigo_canonico(codigo) for codigo in codigos_usuarios]
+        solicitud = SolicitudEspera(self.nuevo_codigo_reserva(), codigos_usuarios, grupo, fecha_inicio,
+                                    dias_reserva, prioridad)
+        resultado["codigo_reserva"] = solicitud.codigo
+        
+        for habitacion in self._indice_disponibilidad.candidatas(inicio, fin, cubierta, acomodacion):
+            if habitacion.ocupar(inicio, fin, solicitud.codigo):
+                self._promover(habitacion, [solicitud])
+                resultado["codigo_habitacion"] = habitacion.codigo_habitacion
+                return resultado
+        
+        # Una habitación pudo liberarse entre la búsqueda y la espera, antes de
+        # que la solicitud estuviera en la lista: volver a buscar una vez
+        self.lista_espera.agregar(solicitud)
+        for habitacion in self._indice_disponibilidad.candidatas(inicio, fin, cubierta, acomodacion):
+            if self.lista_espera.retirar(solicitud.codigo) is None:
+                # Ya la asignó una cancelación
+                return resultado
+            if habitacion.ocupar(inicio, fin, solicitud.codigo):
+                self._promover(habitacion, [solicitud])
+                resultado["codigo_habitacion"] = habitacion.codigo_habitacion
+                return resultado
+            self.lista_espera.agregar(solicitud)
+        resultado["en_espera"] = True
+        return resultado
+    
+    def cancelar_espera(self, codigo_reserva):
+        """
+        Retira una solicitud de la lista de espera.
+        
+        Args:
+            codigo_reserva (str): Código devuelto por esperar_reserva.
+            
+        Returns:
+            bool: True si se retiró, False si no estaba en espera.
+        """
+        return self.lista_espera.retirar(codigo_reserva) is not None
+    
+    def expirar_retenciones(self, ahora=None):
+        """
+        Libera todas las retenciones vencidas.
+        
+        Args:
+            ahora (float, optional): Instante de referencia del reloj de
+                vencimientos. Por defecto, el instante actual.
+            
+        Returns:
+            int: Cantidad de retenciones vencidas.
+        """
+        with self._bloqueo_retenciones:
+            vencidas = [self._retenciones.pop(codigo) for codigo in self._vencimientos.vencidos(ahora)]
+        for retencion in vencidas:
+            self._liberar_fechas_retencion(retencion)
+        return len(vencidas)
+    
+    def proximo_vencimiento(self):
+        """
+        Segundos que faltan para el próximo vencimiento de una retención.
+        
+        Returns:
+            float: Segundos restantes (0 si ya venció), o None si no hay retenciones.
+        """
+        with self._bloqueo_retenciones:
+            proximo = self._vencimientos.proximo()
+            if proximo is None:
+                return None
+            return max(0.0, proximo - self._vencimientos.reloj())
+    
+    def retenciones(self):
+        """
+        Lista las retenciones vigentes.
+        
+        Returns:
+            list: Diccionarios con los datos de cada retención y sus segundos restantes.
+        """
+        with self._bloqueo_retenciones:
+            ahora = self._vencimientos.reloj()
+            return [retencion.a_dict(ahora) for retencion in self._retenciones.values()]
+    
+    def iniciar_vencimientos(self, intervalo=1.0):
+        """
+        Inicia un hilo que vence las retenciones automáticamente.
+        
+        Sin este hilo las retenciones vencidas se liberan al crear otra
+        retención o al llamar a expirar_retenciones.
+        
+        Args:
+            intervalo (float, optional): Espera máxima entre revisiones, en segundos.
+        """
+        if self._hilo_vencimientos is None:
+            self._hilo_vencimientos = VencimientosEnSegundoPlano(self, intervalo)
+            self._hilo_vencimientos.iniciar()
+    
     def cancelar_reserva(self, codigo_reserva):
         """
-        Cancela una reserva existente.
+        Cancela una reserva existente y libera a sus usuarios.
         
         Args:
             codigo_reserva (str): Código de la reserva a cancelar.
@@ -144,21 +1170,166 @@ class Crucero:
         Returns:
             bool: True si se canceló correctamente, False si no se encontró.
         """
-        for reserva in self.reservas:
-            if reserva.codigo_reserva == codigo_reserva:
-                # Liberar la habitación
+        # Eliminar la reserva del índice
+        reserva = self._indice_reservas.pop(codigo_reserva, None)
+        if reserva is None:
+            return False
+        
+        # Liberar las fechas ocupadas en la habitación; las que pasan a una
+        # solicitud en espera se ocupan en el mismo paso
+        habitacion = self.buscar_habitacion(reserva.codigo_habitacion)
+        asignadas = self._liberar_habitacion(habitacion, reserva.fecha_inicio, codigo_reserva) if habitacion else []
+        self.usuarios.desvincular(codigo_reserva)
+        self._retirar_orden_reservas(1)
+        self._registrar_operacion({"op": "cancelacion", "codigo_reserva": codigo_reserva})
+        self._notificar("cancelacion", reserva)
+        if asignadas:
+            self._promover(habitacion, asignadas)
+        return True
+    
+    def archivar_finalizadas(self, fecha=None):
+        """
+        Mueve al historial las reservas cuya estancia terminó.
+        
+        Las reservas archivadas dejan de ocupar memoria como objetos Reserva y
+        sus fechas se liberan del calendario de la habitación. Sus usuarios
+        quedan sin reserva activa y con la fecha de salida registrada.
+        
+        Args:
+            fecha (date, optional): Se archivan las reservas cuyo día de salida
+                es anterior o igual a esta fecha. Por defecto, hoy.
+            
+        Returns:
+            int: Cantidad de reservas archivadas.
+        """
+        if fecha is None:
+            fecha = date.today()
+        finalizadas = [reserva for reserva in list(self._indice_reservas.values()) if reserva.fecha_fin <= fecha]
+        return self._archivar(finalizadas)
+    
+    def _archivar(self, reservas):
+        """
+        Mueve reservas activas al historial y guarda la operación.
+        
+        Args:
+            reservas (list): Reservas a archivar.
+            
+        Returns:
+            int: Cantidad de reservas archivadas.
+        """
+        codigos = []
+        # El bloqueo del historial evita que se selle entre agregar y registrar
+        with self._bloqueo_historial:
+            for reserva in reservas:
+                if self._indice_reservas.pop(reserva.codigo_reserva, None) is None:
+                    continue
                 habitacion = self.buscar_habitacion(reserva.codigo_habitacion)
                 if habitacion:
-                    habitacion.cambiar_disponibilidad(True)
-                
-                # Eliminar la reserva
-                self.reservas.remove(reserva)
-                return True
-        return False
+                    habitacion.liberar(reserva.fecha_inicio, reserva.codigo_reserva)
+                self.usuarios.desvincular(reserva.codigo_reserva, reserva.fecha_fin)
+                self.historial.agregar(reserva)
+                codigos.append(reserva.codigo_reserva)
+                self._notificar("archivo", reserva)
+            
+            if codigos:
+                self._retirar_orden_reservas(len(codigos))
+                self._registrar_operacion({"op": "archivo", "codigos": codigos})
+        return len(codigos)
+    
+    def sellar_historial(self, ruta):
+        """
+        Escribe el historial en un archivo binario y deja de guardarlo en memoria.
+        
+        Se usa al terminar una salida: sus reservas archivadas pasan a un
+        archivo de solo lectura que se consulta con mmap, y el almacenamiento
+        solo guarda la ruta del archivo.
+        
+        Args:
+            ruta (str): Ruta del archivo a escribir.
+            
+        Returns:
+            int: Cantidad de reservas selladas (0 si el historial estaba vacío).
+        """
+        with self._bloqueo_historial:
+            if not len(self.historial):
+                return 0
+            cantidad = escribir_archivo(ruta, self.historial)
+            self.archivos.append(ArchivoReservas(ruta))
+            self.historial = HistorialReservas()
+            self._registrar_operacion({"op": "sellado", "ruta": ruta})
+        return cantidad
+    
+    def historiales(self):
+        """
+        Devuelve el historial en memoria y los archivos sellados.
+        
+        Todos exponen las mismas columnas y consultas.
+        
+        Returns:
+            list: HistorialReservas seguido de cada ArchivoReservas.
+        """
+        return [self.historial] + self.archivos
+    
+    def buscar_reserva(self, codigo_reserva):
+        """
+        Busca una reserva activa o, si no lo está, finalizada.
+        
+        Args:
+            codigo_reserva (str): Código de la reserva.
+            
+        Returns:
+            Reserva: Reserva encontrada (las archivadas se reconstruyen a partir
+                de su vista) o None si no existe.
+        """
+        reserva = self._indice_reservas.get(codigo_reserva)
+        if reserva is not None:
+            return reserva
+        vista = self.buscar_reserva_archivada(codigo_reserva)
+        return vista.a_reserva() if vista is not None else None
+    
+    def buscar_reserva_archivada(self, codigo_reserva):
+        """
+        Busca una reserva finalizada en el historial y en los archivos sellados.
+        
+        Args:
+            codigo_reserva (str): Código de la reserva.
+            
+        Returns:
+            VistaReserva: Vista de la reserva o None si no existe.
+        """
+        for historial in self.historiales():
+            vista = historial.buscar(codigo_reserva)
+            if vista is not None:
+                return vista
+        return None
+    
+    def consultar_archivadas(self, codigo_habitacion=None, codigo_usuario=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Recorre las reservas finalizadas que cumplen con los filtros.
+        
+        En los archivos sellados se usan sus índices por habitación, usuario
+        o fecha, sin recorrer el resto de los registros.
+        
+        Args:
+            codigo_habitacion (str, optional): Solo reservas de esta habitación.
+            codigo_usuario (str, optional): Solo reservas que incluyen a este usuario.
+            fecha_inicio (date, optional): Solo reservas que ocupan alguna noche
+                entre fecha_inicio y fecha_fin.
+            fecha_fin (date, optional): Día de salida del rango. Si es None, se
+                considera solo la noche de fecha_inicio.
+            
+        Yields:
+            VistaReserva: Reservas finalizadas, primero las del historial en
+                memoria y después las de cada archivo.
+        """
+        if codigo_usuario:
+            codigo_usuario = self.usuarios.codigo_canonico(codigo_usuario)
+        for historial in self.historiales():
+            yield from historial.consultar(codigo_habitacion, codigo_usuario, fecha_inicio, fecha_fin)
     
     def obtener_info_reserva(self, codigo_reserva):
         """
-        Obtiene información detallada de una reserva.
+        Obtiene información detallada de una reserva, activa o archivada.
         
         Args:
             codigo_reserva (str): Código de la reserva a consultar.
@@ -166,19 +1337,188 @@ class Crucero:
         Returns:
             str: Información detallada de la reserva o mensaje de error.
         """
-        for reserva in self.reservas:
-            if reserva.codigo_reserva == codigo_reserva:
-                return str(reserva)
+        reserva = self._indice_reservas.get(codigo_reserva) or self.buscar_reserva_archivada(codigo_reserva)
+        if reserva:
+            return str(reserva)
         return "Reserva no encontrada."
     
     def listar_todas_reservas(self):
         """
         Lista todas las reservas activas en el sistema.
         
+        Construye el texto de todas las reservas a la vez; para inventarios
+        grandes conviene iterar_reservas o paginar_reservas, que devuelven las
+        reservas sin formatear.
+        
         Returns:
             list: Lista de strings con la información de cada reserva.
         """
-        return [str(reserva) for reserva in self.reservas]
+        return [str(reserva) for reserva in list(self._indice_reservas.values())]
+    
+    def _posicion_orden(self, clave, despues=False):
+        """
+        Busca una clave en el orden de reservas (búsqueda binaria).
+        
+        Debe llamarse con el bloqueo del orden tomado.
+        
+        Args:
+            clave (tuple): Clave de orden, según _clave_codigo.
+            despues (bool, optional): Si es True, devuelve la posición posterior
+                a los códigos iguales a la clave.
+            
+        Returns:
+            int: Primera posición cuyo código es mayor (o mayor o igual) que la clave.
+        """
+        orden = self._orden_reservas
+        inferior, superior = 0, len(orden)
+        while inferior < superior:
+            medio = (inferior + superior) // 2
+            clave_medio = _clave_codigo(orden[medio])
+            if clave_medio < clave or (despues and clave_medio == clave):
+                inferior = medio + 1
+            else:
+                superior = medio
+        return inferior
+    
+    def _agregar_orden_reserva(self, codigo_reserva):
+        """
+        Agrega el código de una reserva activa al orden de reservas.
+        
+        Los códigos generados son crecientes, así que casi siempre se agregan al
+        final; los importados con otro código se insertan en su posición.
+        
+        Args:
+            codigo_reserva (str): Código de la reserva.
+        """
+        clave = _clave_codigo(codigo_reserva)
+        with self._bloqueo_orden:
+            orden = self._orden_reservas
+            if not orden or _clave_codigo(orden[-1]) < clave:
+                orden.append(codigo_reserva)
+                return
+            posicion = self._posicion_orden(clave)
+            if posicion == len(orden) or orden[posicion] != codigo_reserva:
+                orden.insert(posicion, codigo_reserva)
+    
+    def _retirar_orden_reservas(self, cantidad):
+        """
+        Cuenta reservas retiradas y compacta el orden cuando acumula demasiadas.
+        
+        Los códigos de las reservas canceladas o archivadas quedan en el orden y
+        se saltan al recorrerlo; se eliminan todos juntos cuando superan a las
+        reservas activas, de modo que el costo por retiro es O(1) amortizado.
+        
+        Args:
+            cantidad (int): Cantidad de reservas retiradas.
+        """
+        with self._bloqueo_orden:
+            self._retiradas_orden += cantidad
+            if self._retiradas_orden < max(len(self._indice_reservas), TAMANO_TRAMO):
+                return
+            indice = self._indice_reservas
+            self._orden_reservas = [codigo for codigo in self._orden_reservas if codigo in indice]
+            self._retiradas_orden = 0
+    
+    def iterar_reservas(self, codigo_habitacion=None, codigo_usuario=None, fecha_inicio=None,
+                        fecha_fin=None, cubierta=None, despues_de=None):
+        """
+        Recorre las reservas activas que cumplen con los filtros, en orden de código.
+        
+        Es un generador: las reservas se obtienen a medida que se consumen, sin
+        copiar ni formatear el resto, y el recorrido tolera reservas creadas o
+        canceladas mientras tanto.
+        
+        Args:
+            codigo_habitacion (str, optional): Solo reservas de esta habitación.
+            codigo_usuario (str, optional): Solo reservas que incluyen a este usuario.
+            fecha_inicio (date, optional): Solo reservas que ocupan alguna noche
+                entre fecha_inicio y fecha_fin.
+            fecha_fin (date, optional): Día de salida del rango. Si es None, se
+                considera solo la noche de fecha_inicio.
+            cubierta (str, optional): Solo reservas de habitaciones de esta cubierta.
+            despues_de (str, optional): Empezar después de este código de reserva.
+            
+        Yields:
+            Reserva: Reservas que cumplen con todos los filtros.
+        """
+        filtros = []
+        if codigo_usuario:
+            codigo_usuario = self.usuarios.codigo_canonico(codigo_usuario)
+            filtros.append(lambda reserva: codigo_usuario in reserva.codigos_usuarios)
+        if fecha_inicio is not None:
+            if fecha_fin is None:
+                fecha_fin = fecha_inicio + timedelta(days=1)
+            filtros.append(lambda reserva: reserva.fecha_inicio < fecha_fin and reserva.fecha_fin > fecha_inicio)
+        if cubierta:
+            cubierta_normalizada = normalizar_texto_cacheado(cubierta)
+            def en_cubierta(reserva):
+                habitacion = self.buscar_habitacion(reserva.codigo_habitacion)
+                return habitacion is not None and normalizar_texto_cacheado(habitacion.cubierta) == cubierta_normalizada
+            filtros.append(en_cubierta)
+        
+        clave = _clave_codigo(despues_de) if despues_de else None
+        if codigo_habitacion:
+            # Las reservas de una habitación están en su calendario
+            habitacion = self.buscar_habitacion(codigo_habitacion)
+            calendario = habitacion.calendario if habitacion is not None else None
+            codigos = sorted((codigo for _, _, codigo in calendario.rangos()) if calendario else (),
+                             key=_clave_codigo)
+            tramos = [[codigo for codigo in codigos if clave is None or _clave_codigo(codigo) > clave]]
+        else:
+            tramos = self._tramos_orden(clave)
+        
+        for tramo in tramos:
+            for codigo in tramo:
+                reserva = self._indice_reservas.get(codigo)
+                if reserva is not None and all(filtro(reserva) for filtro in filtros):
+                    yield reserva
+    
+    def _tramos_orden(self, clave):
+        """
+        Recorre el orden de reservas en tramos, tomando el bloqueo solo para copiar cada tramo.
+        
+        Args:
+            clave (tuple): Clave del último código ya recorrido, o None.
+            
+        Yields:
+            list: Códigos de reserva consecutivos.
+        """
+        while True:
+            with self._bloqueo_orden:
+                inicio = 0 if clave is None else self._posicion_orden(clave, despues=True)
+                tramo = self._orden_reservas[inicio:inicio + TAMANO_TRAMO]
+            if not tramo:
+                return
+            yield tramo
+            clave = _clave_codigo(tramo[-1])
+    
+    def paginar_reservas(self, limite=50, cursor=None, **filtros):
+        """
+        Obtiene una página de reservas activas.
+        
+        El cursor es el código de la última reserva de la página anterior, por
+        lo que las páginas siguientes no se desplazan si se crean o cancelan
+        reservas entre una consulta y otra.
+        
+        Args:
+            limite (int, optional): Cantidad máxima de reservas de la página.
+            cursor (str, optional): Cursor devuelto por la página anterior.
+            **filtros: Filtros de iterar_reservas (codigo_habitacion,
+                codigo_usuario, fecha_inicio, fecha_fin y cubierta).
+            
+        Returns:
+            tuple: (lista de Reserva, cursor de la página siguiente o None si
+                no hay más reservas).
+            
+        Raises:
+            ValueError: Si el límite no es positivo.
+        """
+        if limite <= 0:
+            raise ValueError("El límite de la página debe ser mayor a 0.")
+        reservas = list(islice(self.iterar_reservas(despues_de=cursor, **filtros), limite + 1))
+        if len(reservas) > limite:
+            return reservas[:limite], reservas[limite - 1].codigo_reserva
+        return reservas, None
     
     def calcular_costo_reserva(self, codigo_habitacion, dias_reserva):
         """
@@ -194,4 +1534,22 @@ class Crucero:
         habitacion = self.buscar_habitacion(codigo_habitacion)
         if habitacion:
             return habitacion.calcular_costo(habitacion.cubierta, dias_reserva, habitacion.acomodacion)
-        return 0
\ No newline at end of file
+        return 0
+    
+    def cotizar_lote(self, pares):
+        """
+        Calcula el costo de muchas reservas con una sola llamada a la tabla de tarifas.
+        
+        Args:
+            pares (iterable): Tuplas (codigo_habitacion, dias_reserva).
+            
+        Returns:
+            list: Costo total de cada par, o 0 si la habitación no existe.
+        """
+        pares = [(self.buscar_habitacion(codigo_habitacion), dias_reserva)
+                 for codigo_habitacion, dias_reserva in pares]
+        costos = tarifas.cotizar_lote([par for par in pares if par[0] is not None])
+        
+        # Reinsertar 0 para las habitaciones inexistentes
+        costos = iter(costos)
+        return [next(costos) if habitacion is not None else 0 for habitacion, _ in pares]
\ No newline at end of file
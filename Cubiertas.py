@@ -3,21 +3,31 @@ Módulo que define las diferentes clases de cubiertas disponibles en el crucero.
 
 Este módulo implementa las clases específicas para cada tipo de cubierta
 (Normal, Económica y Premium) que heredan de la clase base Habitacion.
+
+Los costos de cada cubierta se registran en la tabla de tarifas compartida
+(Tarifas.tarifas), que es la que calcula el costo de las reservas.
 """
 
 from Habitacion import Habitacion
+from Tarifas import tarifas
 
 class Normal(Habitacion):
     """
     Clase que representa una habitación en la cubierta Normal del crucero.
     
-    Esta clase hereda de Habitacion e implementa un cálculo de costo específico
-    para las habitaciones de la cubierta Normal.
+    Esta clase hereda de Habitacion y define los costos de la cubierta Normal,
+    con los que la tabla de tarifas calcula el costo de sus reservas.
     
     Attributes:
         costo_por_cubierta (float): Costo adicional por estar en la cubierta Normal.
+        factores_acomodacion (dict): Factor del costo de cubierta según la acomodación.
     """
     
+    __slots__ = ()
+    
+    costo_por_cubierta = 100000.0
+    factores_acomodacion = {3: 1.2, 4: 1.5}
+    
     def __init__(self, codigo_habitacion, acomodacion):
         """
         Inicializa una habitación de la cubierta Normal.
@@ -27,42 +37,24 @@ class Normal(Habitacion):
             acomodacion (int): Cantidad de personas que pueden alojarse.
         """
         super().__init__(codigo_habitacion, acomodacion, "Normal")
-        self.costo_por_cubierta = 100000.0
-    
-    def calcular_costo(self, cubierta, dias_reserva, acomodacion):
-        """
-        Calcula el costo total de la reserva para una habitación Normal.
-        
-        El costo varía según la acomodación (cantidad de personas).
-        
-        Args:
-            cubierta (str): Tipo de cubierta de la habitación.
-            dias_reserva (int): Cantidad de días de la reserva.
-            acomodacion (int): Cantidad de personas en la habitación.
-            
-        Returns:
-            float: Costo total calculado para la reserva.
-        """
-        factor_acomodacion = 1.0
-        if self.acomodacion == 3:
-            factor_acomodacion = 1.2
-        elif self.acomodacion == 4:
-            factor_acomodacion = 1.5
-            
-        costo_total = (self.costo_predefinido + (self.costo_por_cubierta * factor_acomodacion)) * dias_reserva
-        return costo_total
 
 class Economica(Habitacion):
     """
     Clase que representa una habitación en la cubierta Económica del crucero.
     
-    Esta clase hereda de Habitacion e implementa un cálculo de costo específico
-    para las habitaciones de la cubierta Económica.
+    Esta clase hereda de Habitacion y define los costos de la cubierta Económica,
+    con los que la tabla de tarifas calcula el costo de sus reservas.
     
     Attributes:
         costo_por_cubierta (float): Costo adicional por estar en la cubierta Económica.
+        factores_acomodacion (dict): Factor del costo de cubierta según la acomodación.
     """
     
+    __slots__ = ()
+    
+    costo_por_cubierta = 80000.0
+    factores_acomodacion = {3: 1.1, 4: 1.3}
+    
     def __init__(self, codigo_habitacion, acomodacion):
         """
         Inicializa una habitación de la cubierta Económica.
@@ -72,43 +64,24 @@ class Economica(Habitacion):
             acomodacion (int): Cantidad de personas que pueden alojarse.
         """
         super().__init__(codigo_habitacion, acomodacion, "Económica")
-        self.costo_por_cubierta = 80000.0
-    
-    def calcular_costo(self, cubierta, dias_reserva, acomodacion):
-        """
-        Calcula el costo total de la reserva para una habitación Económica.
-        
-        El costo varía según la acomodación (cantidad de personas).
-        
-        Args:
-            cubierta (str): Tipo de cubierta de la habitación.
-            dias_reserva (int): Cantidad de días de la reserva.
-            acomodacion (int): Cantidad de personas en la habitación.
-            
-        Returns:
-            float: Costo total calculado para la reserva.
-        """
-        factor_acomodacion = 1.0
-        
-        if self.acomodacion == 3:
-            factor_acomodacion = 1.1
-        elif self.acomodacion == 4:
-            factor_acomodacion = 1.3
-            
-        costo_total = (self.costo_predefinido + (self.costo_por_cubierta * factor_acomodacion)) * dias_reserva
-        return costo_total
 
 class Premium(Habitacion):
     """
     Clase que representa una habitación en la cubierta Premium del crucero.
     
-    Esta clase hereda de Habitacion e implementa un cálculo de costo específico
-    para las habitaciones de la cubierta Premium.
+    Esta clase hereda de Habitacion y define los costos de la cubierta Premium,
+    con los que la tabla de tarifas calcula el costo de sus reservas.
     
     Attributes:
         costo_por_cubierta (float): Costo adicional por estar en la cubierta Premium.
+        factores_acomodacion (dict): Factor del costo de cubierta según la acomodación.
     """
     
+    __slots__ = ()
+    
+    costo_por_cubierta = 150000.0
+    factores_acomodacion = {3: 1.3, 4: 1.7}
+    
     def __init__(self, codigo_habitacion, acomodacion):
         """
         Inicializa una habitación de la cubierta Premium.
@@ -118,28 +91,11 @@ class Premium(Habitacion):
             acomodacion (int): Cantidad de personas que pueden alojarse.
         """
         super().__init__(codigo_habitacion, acomodacion, "Premium")
-        self.costo_por_cubierta = 150000.0
-    
-    def calcular_costo(self, cubierta, dias_reserva, acomodacion):
-        """
-        Calcula el costo total de la reserva para una habitación Premium.
-        
-        El costo varía según la acomodación (cantidad de personas).
-        
-        Args:
-            cubierta (str): Tipo de cubierta de la habitación.
-            dias_reserva (int): Cantidad de días de la reserva.
-            acomodacion (int): Cantidad de personas en la habitación.
-            
-        Returns:
-            float: Costo total calculado para la reserva.
-        """
-        factor_acomodacion = 1.0
-        
-        if self.acomodacion == 3:
-            factor_acomodacion = 1.3
-        elif self.acomodacion == 4:
-            factor_acomodacion = 1.7
-            
-        costo_total = (self.costo_predefinido + (self.costo_por_cubierta * factor_acomodacion)) * dias_reserva
-        return costo_total
\ No newline at end of file
+
+# Clase de habitación de cada cubierta, por nombre de cubierta
+CLASES_CUBIERTA = {"Normal": Normal, "Económica": Economica, "Premium": Premium}
+
+# Registrar los costos de cada cubierta en la tabla de tarifas
+for _cubierta, _clase in CLASES_CUBIERTA.items():
+    tarifas.definir_cubierta(_cubierta, Habitacion.costo_predefinido, _clase.costo_por_cubierta,
+                             _clase.factores_acomodacion)
@@ -0,0 +1,448 @@
+"""
+Módulo que define la distribución de habitaciones de un barco.
+
+Una distribución describe las habitaciones de un barco: código, cubierta y
+acomodación de cada una. Se guarda en columnas (una lista de códigos y dos
+arreglos de números), lo que permite cargarla desde archivos JSON, CSV o
+binarios y construir todas sus habitaciones en bloque, o solo las que se
+usan (HabitacionesPerezosas).
+"""
+
+import csv
+import json
+import os
+import struct
+from array import array
+
+from Cubiertas import CLASES_CUBIERTA
+from Normalizar import normalizar_texto_cacheado
+
+# Formato binario: cabecera, nombres de cubierta, códigos separados por "\0",
+# número de cubierta (1 byte) y acomodación (1 byte) de cada habitación
+_MAGIA_BINARIA = b"CDIS"
+_VERSION_BINARIA = 1
+_CABECERA_BINARIA = struct.Struct("<4sHHI")
+_LONGITUD = struct.Struct("<I")
+
+# Nombre oficial de cada cubierta, por nombre normalizado
+_CUBIERTAS = {normalizar_texto_cacheado(nombre): nombre for nombre in CLASES_CUBIERTA}
+
+def nombre_cubierta(cubierta):
+    """
+    Obtiene el nombre oficial de una cubierta, sin distinguir acentos ni mayúsculas.
+
+    Args:
+        cubierta (str): Nombre de la cubierta (por ejemplo "economica").
+
+    Returns:
+        str: Nombre oficial de la cubierta (por ejemplo "Económica").
+
+    Raises:
+        ValueError: Si la cubierta no existe.
+    """
+    nombre = _CUBIERTAS.get(normalizar_texto_cacheado(cubierta or ""))
+    if nombre is None:
+        raise ValueError(f"Cubierta desconocida: {cubierta}")
+    return nombre
+
+class Distribucion:
+    """
+    Distribución de habitaciones de un barco, guardada en columnas.
+
+    Al recorrerla se obtienen tuplas (codigo_habitacion, cubierta, acomodacion)
+    en el orden de la distribución.
+
+    Attributes:
+        codigos (list): Código de cada habitación.
+        cubiertas (tuple): Nombres oficiales de las cubiertas usadas.
+        numeros_cubierta (array): Posición en cubiertas de la cubierta de cada habitación.
+        acomodaciones (array): Acomodación de cada habitación.
+    """
+
+    __slots__ = ("codigos", "cubiertas", "numeros_cubierta", "acomodaciones", "_posiciones")
+
+    def __init__(self, codigos, cubiertas, numeros_cubierta, acomodaciones):
+        """
+        Inicializa una distribución a partir de sus columnas ya validadas.
+
+        Para construir una distribución desde datos externos se usa
+        Distribucion.desde_entradas o cargar_distribucion.
+
+        Args:
+            codigos (list): Código de cada habitación.
+            cubiertas (tuple): Nombres oficiales de las cubiertas usadas.
+            numeros_cubierta (array): Número de cubierta de cada habitación.
+            acomodaciones (array): Acomodación de cada habitación.
+        """
+        self.codigos = codigos
+        self.cubiertas = tuple(cubiertas)
+        self.numeros_cubierta = numeros_cubierta
+        self.acomodaciones = acomodaciones
+        self._posiciones = None
+
+    @classmethod
+    def desde_entradas(cls, entradas):
+        """
+        Valida una secuencia de habitaciones y construye la distribución.
+
+        Args:
+            entradas (iterable): Tuplas o listas (codigo, cubierta, acomodacion), o
+                diccionarios con las claves codigo_habitacion, cubierta y acomodacion.
+
+        Returns:
+            Distribucion: Distribución validada.
+
+        Raises:
+            ValueError: Si una entrada no es válida o hay códigos repetidos.
+        """
+        codigos = []
+        cubiertas = []
+        numeros = {}
+        numeros_cubierta = array("B")
+        acomodaciones = array("B")
+        for entrada in entradas:
+            if isinstance(entrada, dict):
+                entrada = (entrada.get("codigo_habitacion"), entrada.get("cubierta"), entrada.get("acomodacion"))
+            try:
+                codigo, cubierta, acomodacion = entrada
+                acomodacion = int(acomodacion)
+            except (TypeError, ValueError):
+                raise ValueError(f"Entrada de distribución inválida: {entrada!r}")
+            codigo = str(codigo or "").strip()
+            if not codigo or "\0" in codigo or not 0 < acomodacion < 256:
+                raise ValueError(f"Entrada de distribución inválida: {entrada!r}")
+            # Número de la cubierta, según el nombre tal como viene escrito
+            numero = numeros.get(cubierta)
+            if numero is None:
+                nombre = nombre_cubierta(cubierta)
+                if nombre not in cubiertas:
+                    cubiertas.append(nombre)
+                numero = numeros[cubierta] = cubiertas.index(nombre)
+            codigos.append(codigo)
+            numeros_cubierta.append(numero)
+            acomodaciones.append(acomodacion)
+        distribucion = cls(codigos, cubiertas, numeros_cubierta, acomodaciones)
+        distribucion._validar_codigos()
+        return distribucion
+
+    def _validar_codigos(self):
+        """
+        Comprueba que no haya códigos de habitación repetidos.
+
+        Raises:
+            ValueError: Si hay códigos repetidos.
+        """
+        if len(self.posiciones()) != len(self.codigos):
+            vistos = set()
+            for codigo in self.codigos:
+                if codigo in vistos:
+                    raise ValueError(f"Código de habitación repetido: {codigo}")
+                vistos.add(codigo)
+
+    def posiciones(self):
+        """
+        Obtiene la posición de cada código en la distribución.
+
+        Returns:
+            dict: Posición de cada código de habitación.
+        """
+        if self._posiciones is None:
+            self._posiciones = dict(zip(self.codigos, range(len(self.codigos))))
+        return self._posiciones
+
+    def habitacion(self, posicion):
+        """
+        Obtiene los datos de la habitación en una posición.
+
+        Args:
+            posicion (int): Posición de la habitación.
+
+        Returns:
+            tuple: (codigo_habitacion, cubierta, acomodacion).
+        """
+        return (self.codigos[posicion], self.cubiertas[self.numeros_cubierta[posicion]],
+                self.acomodaciones[posicion])
+
+    def construir(self, posicion):
+        """
+        Crea la habitación de una posición.
+
+        Args:
+            posicion (int): Posición de la habitación.
+
+        Returns:
+            Habitacion: Habitación creada.
+        """
+        clase = CLASES_CUBIERTA[self.cubiertas[self.numeros_cubierta[posicion]]]
+        return clase(self.codigos[posicion], self.acomodaciones[posicion])
+
+    def construir_todas(self):
+        """
+        Crea todas las habitaciones de la distribución.
+
+        La clase de cada cubierta se resuelve una sola vez y las habitaciones se
+        crean en una única pasada sobre las columnas.
+
+        Returns:
+            list: Habitaciones creadas, en el orden de la distribución.
+        """
+        clases = [CLASES_CUBIERTA[cubierta] for cubierta in self.cubiertas]
+        return [clases[numero](codigo, acomodacion)
+                for codigo, numero, acomodacion in zip(self.codigos, self.numeros_cubierta, self.acomodaciones)]
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de habitaciones de la distribución.
+
+        Returns:
+            int: Número de habitaciones.
+        """
+        return len(self.codigos)
+
+    def __iter__(self):
+        """
+        Recorre las habitaciones de la distribución.
+
+        Yields:
+            tuple: (codigo_habitacion, cubierta, acomodacion).
+        """
+        cubiertas = self.cubiertas
+        for codigo, numero, acomodacion in zip(self.codigos, self.numeros_cubierta, self.acomodaciones):
+            yield codigo, cubiertas[numero], acomodacion
+
+    def __getstate__(self):
+        """
+        Devuelve el estado a serializar, sin el índice de posiciones.
+
+        Returns:
+            tuple: Columnas de la distribución.
+        """
+        return (self.codigos, self.cubiertas, self.numeros_cubierta, self.acomodaciones)
+
+    def __setstate__(self, estado):
+        """
+        Restaura el estado serializado por __getstate__.
+
+        Args:
+            estado (tuple): Columnas de la distribución.
+        """
+        self.codigos, self.cubiertas, self.numeros_cubierta, self.acomodaciones = estado
+        self._posiciones = None
+
+def _distribucion_predeterminada():
+    """
+    Genera la distribución del crucero original.
+
+    10 habitaciones por cubierta (Económica, Normal y Premium): 3 para 2
+    personas, 4 para 3 personas y 3 para 4 personas.
+
+    Returns:
+        Distribucion: Distribución de 30 habitaciones.
+    """
+    entradas = []
+    for prefijo, cubierta in (("E", "Económica"), ("N", "Normal"), ("P", "Premium")):
+        for acomodacion, desde, hasta in ((2, 1, 4), (3, 4, 8), (4, 8, 11)):
+            for i in range(desde, hasta):
+                entradas.append((f"{prefijo}{i:02d}", cubierta, acomodacion))
+    return Distribucion.desde_entradas(entradas)
+
+DISTRIBUCION_PREDETERMINADA = _distribucion_predeterminada()
+
+def normalizar_distribucion(entradas):
+    """
+    Convierte una distribución en cualquiera de sus formas a Distribucion.
+
+    Args:
+        entradas (Distribucion | iterable): Distribución ya construida, o
+            entradas con el formato de Distribucion.desde_entradas.
+
+    Returns:
+        Distribucion: Distribución validada.
+    """
+    if isinstance(entradas, Distribucion):
+        return entradas
+    return Distribucion.desde_entradas(entradas)
+
+def _formato(ruta):
+    """
+    Determina el formato de un archivo de distribución por su extensión.
+
+    Args:
+        ruta (str): Ruta del archivo.
+
+    Returns:
+        str: "json", "csv" o "binario".
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".json":
+        return "json"
+    if extension == ".csv":
+        return "csv"
+    return "binario"
+
+def cargar_distribucion(ruta):
+    """
+    Carga una distribución desde un archivo JSON, CSV o binario.
+
+    - JSON: lista de habitaciones, cada una como objeto {"codigo_habitacion",
+      "cubierta", "acomodacion"} o como lista [codigo, cubierta, acomodacion].
+    - CSV: columnas codigo_habitacion, cubierta y acomodacion con encabezado.
+    - Binario (cualquier otra extensión): archivo escrito por guardar_distribucion,
+      que se lee en bloque sin validar cada habitación.
+
+    Args:
+        ruta (str): Ruta del archivo.
+
+    Returns:
+        Distribucion: Distribución cargada.
+
+    Raises:
+        ValueError: Si el archivo no tiene un formato válido.
+    """
+    formato = _formato(ruta)
+    if formato == "json":
+        with open(ruta, encoding="utf-8") as archivo:
+            return Distribucion.desde_entradas(json.load(archivo))
+    if formato == "csv":
+        with open(ruta, newline="", encoding="utf-8") as archivo:
+            lector = csv.reader(archivo)
+            encabezado = [columna.strip() for columna in next(lector, [])]
+            try:
+                columnas = [encabezado.index(nombre) for nombre in ("codigo_habitacion", "cubierta", "acomodacion")]
+            except ValueError:
+                raise ValueError("El CSV debe tener las columnas codigo_habitacion, cubierta y acomodacion.")
+            return Distribucion.desde_entradas([fila[columna] for columna in columnas] for fila in lector if fila)
+    with open(ruta, "rb") as archivo:
+        return _leer_binario(archivo.read())
+
+def _leer_binario(datos):
+    """
+    Reconstruye una distribución desde su formato binario.
+
+    Args:
+        datos (bytes): Contenido del archivo.
+
+    Returns:
+        Distribucion: Distribución leída.
+
+    Raises:
+        ValueError: Si los datos no tienen el formato esperado.
+    """
+    try:
+        magia, version, cantidad_cubiertas, cantidad = _CABECERA_BINARIA.unpack_from(datos, 0)
+        if magia != _MAGIA_BINARIA or version != _VERSION_BINARIA:
+            raise ValueError("El archivo no es una distribución binaria compatible.")
+        posicion = _CABECERA_BINARIA.size
+
+        cubiertas = []
+        for _ in range(cantidad_cubiertas):
+            (longitud,) = _LONGITUD.unpack_from(datos, posicion)
+            posicion += _LONGITUD.size
+            cubiertas.append(nombre_cubierta(datos[posicion:posicion + longitud].decode("utf-8")))
+            posicion += longitud
+
+        (longitud,) = _LONGITUD.unpack_from(datos, posicion)
+        posicion += _LONGITUD.size
+        codigos = datos[posicion:posicion + longitud].decode("utf-8").split("\0") if cantidad else []
+        posicion += longitud
+
+        numeros_cubierta = array("B", datos[posicion:posicion + cantidad])
+        acomodaciones = array("B", datos[posicion + cantidad:posicion + 2 * cantidad])
+    except struct.error:
+        raise ValueError("Distribución binaria incompleta.")
+    if len(codigos) != cantidad or len(acomodaciones) != cantidad:
+        raise ValueError("Distribución binaria incompleta.")
+    if any(numero >= len(cubiertas) for numero in set(numeros_cubierta)):
+        raise ValueError("Distribución binaria con cubiertas inválidas.")
+    distribucion = Distribucion(codigos, cubiertas, numeros_cubierta, acomodaciones)
+    distribucion._validar_codigos()
+    return distribucion
+
+def guardar_distribucion(distribucion, ruta):
+    """
+    Guarda una distribución en un archivo JSON, CSV o binario según su extensión.
+
+    Args:
+        distribucion (Distribucion | iterable): Distribución a guardar.
+        ruta (str): Ruta del archivo (.json, .csv o cualquier otra para binario).
+    """
+    distribucion = normalizar_distribucion(distribucion)
+    formato = _formato(ruta)
+    if formato == "json":
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump([{"codigo_habitacion": codigo, "cubierta": cubierta, "acomodacion": acomodacion}
+                       for codigo, cubierta, acomodacion in distribucion], archivo, ensure_ascii=False)
+        return
+    if formato == "csv":
+        with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(("codigo_habitacion", "cubierta", "acomodacion"))
+            escritor.writerows(distribucion)
+        return
+    with open(ruta, "wb") as archivo:
+        archivo.write(_CABECERA_BINARIA.pack(_MAGIA_BINARIA, _VERSION_BINARIA,
+                                             len(distribucion.cubiertas), len(distribucion)))
+        for cubierta in distribucion.cubiertas:
+            nombre = cubierta.encode("utf-8")
+            archivo.write(_LONGITUD.pack(len(nombre)) + nombre)
+        codigos = "\0".join(distribucion.codigos).encode("utf-8")
+        archivo.write(_LONGITUD.pack(len(codigos)) + codigos)
+        archivo.write(distribucion.numeros_cubierta.tobytes())
+        archivo.write(distribucion.acomodaciones.tobytes())
+
+class HabitacionesPerezosas:
+    """
+    Secuencia de las habitaciones de una distribución que crea cada habitación
+    la primera vez que se usa.
+
+    Se comporta como una lista de solo lectura: admite len(), índices y
+    recorridos (que crean las habitaciones que faltan).
+
+    Attributes:
+        distribucion (Distribucion): Distribución de las habitaciones.
+    """
+
+    def __init__(self, distribucion, obtener):
+        """
+        Inicializa la secuencia.
+
+        Args:
+            distribucion (Distribucion): Distribución de las habitaciones.
+            obtener (callable): Función que recibe un código de habitación y
+                devuelve la habitación, creándola si hace falta.
+        """
+        self.distribucion = distribucion
+        self._obtener = obtener
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de habitaciones.
+
+        Returns:
+            int: Número de habitaciones de la distribución.
+        """
+        return len(self.distribucion)
+
+    def __getitem__(self, posicion):
+        """
+        Obtiene la habitación en una posición, creándola si hace falta.
+
+        Args:
+            posicion (int | slice): Posición o rango de posiciones.
+
+        Returns:
+            Habitacion | list: Habitación o lista de habitaciones.
+        """
+        if isinstance(posicion, slice):
+            return [self._obtener(codigo) for codigo in self.distribucion.codigos[posicion]]
+        return self._obtener(self.distribucion.codigos[posicion])
+
+    def __iter__(self):
+        """
+        Recorre todas las habitaciones, creando las que falten.
+
+        Yields:
+            Habitacion: Habitaciones en el orden de la distribución.
+        """
+        for codigo in self.distribucion.codigos:
+            yield self._obtener(codigo)
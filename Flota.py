@@ -0,0 +1,551 @@
+"""
+Módulo que define la flota de cruceros.
+
+La flota agrupa varias instancias de Crucero, una por cada salida (barco y
+fecha de zarpe), y las reparte en fragmentos. Cada fragmento puede atenderse
+en el proceso principal o en un proceso propio, de modo que una salida con
+mucha carga no frena a las salidas de los demás fragmentos. Las búsquedas de
+habitaciones se envían a todos los fragmentos a la vez y sus resultados se
+combinan.
+
+Cada salida recibe además un origen propio (ver Identificadores) que se graba
+en los códigos de sus reservas y usuarios, así que una operación sobre una
+reserva se envía directamente a su salida a partir del código.
+"""
+
+import heapq
+import json
+import multiprocessing
+import os
+import threading
+import zlib
+
+from Almacenamiento import AlmacenamientoDiario
+from Crucero import Crucero
+from Distribucion import DISTRIBUCION_PREDETERMINADA, cargar_distribucion, normalizar_distribucion
+from Identificadores import MAXIMO_ORIGEN, origen_de
+
+def numero_fragmento(barco, salida, fragmentos):
+    """
+    Calcula el fragmento que atiende una salida.
+
+    El reparto es estable entre ejecuciones (no depende de hash()), por lo que
+    una salida guardada en disco vuelve siempre al mismo fragmento.
+
+    Args:
+        barco (str): Nombre del barco.
+        salida (str): Identificador de la salida.
+        fragmentos (int): Cantidad de fragmentos.
+
+    Returns:
+        int: Número de fragmento, entre 0 y fragmentos - 1.
+    """
+    return zlib.crc32(f"{barco}\0{salida}".encode("utf-8")) % fragmentos
+
+class FragmentoFlota:
+    """
+    Salidas de la flota atendidas por un mismo proceso.
+
+    Attributes:
+        cruceros (dict): Crucero de cada salida, por (barco, salida).
+        directorio (str): Directorio donde se guarda cada salida (None para
+            trabajar solo en memoria).
+        perezosa (bool): Si las habitaciones de cada salida se crean al usarse.
+    """
+
+    def __init__(self, directorio=None, perezosa=False):
+        """
+        Inicializa un fragmento sin salidas.
+
+        Args:
+            directorio (str, optional): Directorio de almacenamiento de las salidas.
+            perezosa (bool, optional): Crear las habitaciones al usarse.
+        """
+        self.cruceros = {}
+        self.directorio = directorio
+        self.perezosa = perezosa
+
+    def agregar(self, barco, salida, distribucion, origen=0):
+        """
+        Crea el crucero de una salida.
+
+        Args:
+            barco (str): Nombre del barco.
+            salida (str): Identificador de la salida.
+            distribucion (tuple): Distribución de habitaciones del barco.
+            origen (int, optional): Origen de los códigos de la salida.
+        """
+        almacenamiento = None
+        if self.directorio:
+            almacenamiento = AlmacenamientoDiario(os.path.join(self.directorio, barco, salida))
+        self.cruceros[(barco, salida)] = Crucero(almacenamiento, distribucion, self.perezosa, origen)
+
+    def ejecutar(self, barco, salida, metodo, argumentos, opciones):
+        """
+        Llama a un método del crucero de una salida.
+
+        Args:
+            barco (str): Nombre del barco.
+            salida (str): Identificador de la salida.
+            metodo (str): Nombre del método de Crucero.
+            argumentos (tuple): Argumentos posicionales del método.
+            opciones (dict): Argumentos con nombre del método.
+
+        Returns:
+            object: Resultado del método.
+
+        Raises:
+            KeyError: Si la salida no pertenece al fragmento.
+        """
+        crucero = self.cruceros.get((barco, salida))
+        if crucero is None:
+            raise KeyError(f"Salida desconocida: {barco} {salida}")
+        return getattr(crucero, metodo)(*argumentos, **opciones)
+
+    def buscar(self, cubierta, acomodacion, fecha_inicio, fecha_fin, limite):
+        """
+        Busca habitaciones disponibles en todas las salidas del fragmento.
+
+        Args:
+            cubierta (str): Cubierta buscada o None para todas.
+            acomodacion (int): Acomodación buscada o None para todas.
+            fecha_inicio (date): Primer día del rango o None.
+            fecha_fin (date): Día de salida del rango o None.
+            limite (int): Cantidad máxima de resultados o None.
+
+        Returns:
+            list: Habitaciones como diccionarios con barco y salida, ordenadas
+                por barco y salida.
+        """
+        resultados = []
+        for (barco, salida), crucero in sorted(self.cruceros.items()):
+            for habitacion in crucero.listar_habitaciones_disponibles(cubierta, acomodacion, fecha_inicio, fecha_fin):
+                datos = habitacion.a_dict()
+                datos["barco"] = barco
+                datos["salida"] = salida
+                resultados.append(datos)
+                if limite and len(resultados) >= limite:
+                    return resultados
+        return resultados
+
+    def cerrar(self):
+        """
+        Cierra el almacenamiento de todas las salidas del fragmento.
+        """
+        for crucero in self.cruceros.values():
+            crucero.cerrar()
+
+    def atender(self, operacion, argumentos):
+        """
+        Ejecuta una operación del fragmento por su nombre.
+
+        Args:
+            operacion (str): agregar, ejecutar, buscar o cerrar.
+            argumentos (tuple): Argumentos de la operación.
+
+        Returns:
+            object: Resultado de la operación.
+        """
+        return getattr(self, operacion)(*argumentos)
+
+def _atender_fragmento(conexion, directorio, perezosa):
+    """
+    Bucle de un proceso de fragmento: recibe operaciones y envía sus resultados.
+
+    Args:
+        conexion (multiprocessing.connection.Connection): Extremo del proceso.
+        directorio (str): Directorio de almacenamiento de las salidas.
+        perezosa (bool): Crear las habitaciones al usarse.
+    """
+    fragmento = FragmentoFlota(directorio, perezosa)
+    while True:
+        try:
+            operacion, argumentos = conexion.recv()
+        except EOFError:
+            fragmento.cerrar()
+            break
+        try:
+            respuesta = ("ok", fragmento.atender(operacion, argumentos))
+        except Exception as error:
+            respuesta = ("error", error)
+        try:
+            conexion.send(respuesta)
+        except Exception as error:
+            # El resultado no se pudo serializar para enviarlo
+            conexion.send(("error", TypeError(f"Resultado no serializable: {error}")))
+        if operacion == "cerrar":
+            break
+
+class _FragmentoLocal:
+    """
+    Fragmento atendido en el proceso principal.
+    """
+
+    def __init__(self, directorio, perezosa):
+        """
+        Inicializa el fragmento.
+
+        Args:
+            directorio (str): Directorio de almacenamiento de las salidas.
+            perezosa (bool): Crear las habitaciones al usarse.
+        """
+        self._fragmento = FragmentoFlota(directorio, perezosa)
+        self._respuesta = None
+        self.bloqueo = threading.Lock()
+
+    def enviar(self, operacion, *argumentos):
+        """
+        Ejecuta una operación y guarda su respuesta para recibir().
+
+        Args:
+            operacion (str): Nombre de la operación.
+            *argumentos: Argumentos de la operación.
+        """
+        try:
+            self._respuesta = ("ok", self._fragmento.atender(operacion, argumentos))
+        except Exception as error:
+            self._respuesta = ("error", error)
+
+    def recibir(self):
+        """
+        Devuelve la respuesta de la última operación enviada.
+
+        Returns:
+            object: Resultado de la operación.
+        """
+        estado, resultado = self._respuesta
+        self._respuesta = None
+        if estado == "error":
+            raise resultado
+        return resultado
+
+    def atender(self, operacion, *argumentos):
+        """
+        Ejecuta una operación directamente.
+
+        Crucero admite llamadas desde varios hilos, así que no se bloquea el
+        fragmento completo.
+
+        Args:
+            operacion (str): Nombre de la operación.
+            *argumentos: Argumentos de la operación.
+
+        Returns:
+            object: Resultado de la operación.
+        """
+        return self._fragmento.atender(operacion, argumentos)
+
+    def detener(self):
+        """
+        Cierra las salidas del fragmento.
+        """
+        self._fragmento.cerrar()
+
+class _FragmentoProceso:
+    """
+    Fragmento atendido en un proceso propio, comunicado por una tubería.
+    """
+
+    def __init__(self, directorio, perezosa):
+        """
+        Inicia el proceso del fragmento.
+
+        Args:
+            directorio (str): Directorio de almacenamiento de las salidas.
+            perezosa (bool): Crear las habitaciones al usarse.
+        """
+        self._conexion, remota = multiprocessing.Pipe()
+        self._proceso = multiprocessing.Process(target=_atender_fragmento, args=(remota, directorio, perezosa),
+                                                daemon=True)
+        self._proceso.start()
+        remota.close()
+        self.bloqueo = threading.Lock()
+
+    def enviar(self, operacion, *argumentos):
+        """
+        Envía una operación al proceso sin esperar la respuesta.
+
+        Args:
+            operacion (str): Nombre de la operación.
+            *argumentos: Argumentos de la operación.
+        """
+        self._conexion.send((operacion, argumentos))
+
+    def recibir(self):
+        """
+        Espera la respuesta de la última operación enviada.
+
+        Returns:
+            object: Resultado de la operación.
+        """
+        estado, resultado = self._conexion.recv()
+        if estado == "error":
+            raise resultado
+        return resultado
+
+    def atender(self, operacion, *argumentos):
+        """
+        Envía una operación y espera su respuesta.
+
+        Args:
+            operacion (str): Nombre de la operación.
+            *argumentos: Argumentos de la operación.
+
+        Returns:
+            object: Resultado de la operación.
+        """
+        with self.bloqueo:
+            self.enviar(operacion, *argumentos)
+            return self.recibir()
+
+    def detener(self):
+        """
+        Cierra las salidas del fragmento y termina su proceso.
+        """
+        if self._proceso.is_alive():
+            self.atender("cerrar")
+        self._conexion.close()
+        self._proceso.join()
+
+class Flota:
+    """
+    Flota de cruceros con salidas repartidas en fragmentos.
+
+    Cada barco tiene su distribución de habitaciones y cada salida de un barco
+    es un Crucero independiente, con sus propias reservas y usuarios. Con
+    procesos > 0, cada fragmento se atiende en un proceso propio; en ese caso
+    los argumentos y resultados de ejecutar() deben poder serializarse con
+    pickle (por ejemplo, códigos o diccionarios, no objetos Habitacion).
+
+    Cada salida tiene un origen entre 1 y MAXIMO_ORIGEN (el 0 queda para los
+    cruceros que no pertenecen a una flota). Con directorio, los orígenes se
+    guardan en directorio/origenes.json para que una salida conserve el suyo
+    entre ejecuciones y sus códigos antiguos sigan llevando a ella.
+
+    Attributes:
+        distribuciones (dict): Distribución de habitaciones de cada barco.
+    """
+
+    def __init__(self, procesos=0, directorio=None, perezosa=False):
+        """
+        Inicializa una flota sin barcos.
+
+        Args:
+            procesos (int, optional): Cantidad de procesos de fragmento. Con 0
+                (por defecto) todas las salidas se atienden en este proceso.
+            directorio (str, optional): Directorio donde se guarda cada salida,
+                en directorio/barco/salida. Por defecto, solo en memoria.
+            perezosa (bool, optional): Crear las habitaciones de cada salida al
+                usarse (ver Crucero), para arrancar rápido con barcos grandes.
+        """
+        self.distribuciones = {}
+        self._salidas = {}
+        self._origenes = {}
+        self._por_origen = {}
+        self._ruta_origenes = None
+        if directorio:
+            self._ruta_origenes = os.path.join(directorio, "origenes.json")
+            if os.path.exists(self._ruta_origenes):
+                with open(self._ruta_origenes, encoding="utf-8") as archivo:
+                    for datos in json.load(archivo):
+                        self._origenes[(datos["barco"], datos["salida"])] = datos["origen"]
+        if procesos > 0:
+            self._fragmentos = [_FragmentoProceso(directorio, perezosa) for _ in range(procesos)]
+        else:
+            self._fragmentos = [_FragmentoLocal(directorio, perezosa)]
+
+    def agregar_barco(self, barco, distribucion=None):
+        """
+        Agrega un barco a la flota.
+
+        Args:
+            barco (str): Nombre del barco.
+            distribucion (Distribucion | iterable | str, optional): Habitaciones
+                del barco, con el formato de Distribucion.normalizar_distribucion,
+                o la ruta de un archivo de distribución (JSON, CSV o binario).
+                Por defecto, la distribución predeterminada de 30 habitaciones.
+        """
+        if distribucion is None:
+            self.distribuciones[barco] = DISTRIBUCION_PREDETERMINADA
+        elif isinstance(distribucion, (str, os.PathLike)):
+            self.distribuciones[barco] = cargar_distribucion(distribucion)
+        else:
+            self.distribuciones[barco] = normalizar_distribucion(distribucion)
+
+    def agregar_salida(self, barco, salida):
+        """
+        Agrega una salida de un barco, creando su Crucero en el fragmento que le corresponde.
+
+        Args:
+            barco (str): Nombre del barco.
+            salida (str): Identificador de la salida (por ejemplo "2025-07-01").
+
+        Returns:
+            bool: True si se agregó, False si la salida ya existía.
+
+        Raises:
+            KeyError: Si el barco no pertenece a la flota.
+            ValueError: Si la flota ya usó todos los orígenes.
+        """
+        if barco not in self.distribuciones:
+            raise KeyError(f"Barco desconocido: {barco}")
+        if (barco, salida) in self._salidas:
+            return False
+        origen = self._origenes.get((barco, salida))
+        if origen is None:
+            origen = max(self._origenes.values(), default=0) + 1
+            if origen > MAXIMO_ORIGEN:
+                raise ValueError(f"La flota no admite más de {MAXIMO_ORIGEN} salidas.")
+            self._origenes[(barco, salida)] = origen
+            self._guardar_origenes()
+        numero = numero_fragmento(barco, salida, len(self._fragmentos))
+        self._fragmentos[numero].atender("agregar", barco, salida, self.distribuciones[barco], origen)
+        self._salidas[(barco, salida)] = numero
+        self._por_origen[origen] = (barco, salida)
+        return True
+
+    def _guardar_origenes(self):
+        """
+        Guarda el origen de cada salida, si la flota tiene directorio.
+
+        Se escribe un archivo temporal y luego se reemplaza el anterior, para
+        no dejar nunca el archivo a medio escribir.
+        """
+        if self._ruta_origenes is None:
+            return
+        os.makedirs(os.path.dirname(self._ruta_origenes), exist_ok=True)
+        ruta_temporal = self._ruta_origenes + ".tmp"
+        with open(ruta_temporal, "w", encoding="utf-8") as archivo:
+            json.dump([{"barco": barco, "salida": salida, "origen": origen}
+                       for (barco, salida), origen in sorted(self._origenes.items())],
+                      archivo, ensure_ascii=False)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(ruta_temporal, self._ruta_origenes)
+
+    def salidas(self):
+        """
+        Lista las salidas de la flota.
+
+        Returns:
+            list: Tuplas (barco, salida) ordenadas.
+        """
+        return sorted(self._salidas)
+
+    def ejecutar(self, barco, salida, metodo, *argumentos, **opciones):
+        """
+        Llama a un método del Crucero de una salida.
+
+        Por ejemplo, flota.ejecutar("Aurora", "2025-07-01", "crear_reserva",
+        ["U001"], "P01", 3).
+
+        Args:
+            barco (str): Nombre del barco.
+            salida (str): Identificador de la salida.
+            metodo (str): Nombre del método de Crucero.
+            *argumentos: Argumentos posicionales del método.
+            **opciones: Argumentos con nombre del método.
+
+        Returns:
+            object: Resultado del método.
+
+        Raises:
+            KeyError: Si la salida no pertenece a la flota.
+        """
+        numero = self._salidas.get((barco, salida))
+        if numero is None:
+            raise KeyError(f"Salida desconocida: {barco} {salida}")
+        return self._fragmentos[numero].atender("ejecutar", barco, salida, metodo, argumentos, opciones)
+
+    def localizar(self, codigo):
+        """
+        Obtiene la salida que emitió un código de reserva o de usuario.
+
+        Args:
+            codigo (str): Código generado por un crucero de la flota.
+
+        Returns:
+            tuple: (barco, salida), o None si el código no tiene origen (por
+                ejemplo, un código antiguo como R001) o su salida no está en la flota.
+        """
+        origen = origen_de(codigo)
+        if origen is None:
+            return None
+        return self._por_origen.get(origen)
+
+    def ejecutar_codigo(self, codigo, metodo, *argumentos, **opciones):
+        """
+        Llama a un método del Crucero de la salida que emitió un código.
+
+        Evita preguntar a todas las salidas dónde está una reserva: por
+        ejemplo, flota.ejecutar_codigo(codigo, "cancelar_reserva", codigo).
+
+        Args:
+            codigo (str): Código de reserva o de usuario de la flota.
+            metodo (str): Nombre del método de Crucero.
+            *argumentos: Argumentos posicionales del método.
+            **opciones: Argumentos con nombre del método.
+
+        Returns:
+            object: Resultado del método.
+
+        Raises:
+            KeyError: Si el código no lleva a ninguna salida de la flota.
+        """
+        ubicacion = self.localizar(codigo)
+        if ubicacion is None:
+            raise KeyError(f"Código sin salida conocida: {codigo}")
+        return self.ejecutar(*ubicacion, metodo, *argumentos, **opciones)
+
+    def buscar_disponibles(self, cubierta=None, acomodacion=None, fecha_inicio=None, fecha_fin=None, limite=None):
+        """
+        Busca habitaciones disponibles en todas las salidas de la flota.
+
+        La búsqueda se envía a todos los fragmentos antes de esperar ninguna
+        respuesta, de modo que los fragmentos en procesos buscan en paralelo.
+
+        Args:
+            cubierta (str, optional): Cubierta buscada. Por defecto, todas.
+            acomodacion (int, optional): Acomodación buscada. Por defecto, todas.
+            fecha_inicio (date, optional): Primer día del rango buscado.
+            fecha_fin (date, optional): Día de salida del rango buscado.
+            limite (int, optional): Cantidad máxima de resultados.
+
+        Returns:
+            list: Habitaciones como diccionarios (con las claves barco y salida),
+                ordenadas por barco y salida.
+        """
+        filtros = (cubierta, acomodacion, fecha_inicio, fecha_fin, limite)
+        # Bloquear los fragmentos siempre en el mismo orden para evitar interbloqueos
+        for fragmento in self._fragmentos:
+            fragmento.bloqueo.acquire()
+        try:
+            for fragmento in self._fragmentos:
+                fragmento.enviar("buscar", *filtros)
+            # Recibir todas las respuestas aunque alguna falle, para no desincronizar las tuberías
+            parciales = []
+            error = None
+            for fragmento in self._fragmentos:
+                try:
+                    parciales.append(fragmento.recibir())
+                except Exception as excepcion:
+                    error = error or excepcion
+            if error is not None:
+                raise error
+        finally:
+            for fragmento in self._fragmentos:
+                fragmento.bloqueo.release()
+
+        resultados = []
+        for datos in heapq.merge(*parciales, key=lambda datos: (datos["barco"], datos["salida"])):
+            resultados.append(datos)
+            if limite and len(resultados) >= limite:
+                break
+        return resultados
+
+    def cerrar(self):
+        """
+        Cierra todas las salidas y termina los procesos de fragmento.
+        """
+        for fragmento in self._fragmentos:
+            fragmento.detener()
@@ -5,6 +5,11 @@ Este módulo implementa la clase base que será heredada por los diferentes tipo
 de habitaciones disponibles en el crucero.
 """
 
+import threading
+
+from Calendario import CalendarioOcupacion
+from Tarifas import tarifas
+
 class Habitacion:
     """
     Clase base que representa una habitación genérica en el crucero.
@@ -16,10 +21,22 @@ class Habitacion:
         codigo_habitacion (str): Código único identificador de la habitación.
         acomodacion (int): Cantidad de personas que pueden alojarse en la habitación.
         cubierta (str): Tipo de cubierta donde se encuentra la habitación.
-        disponibilidad (bool): Indica si la habitación está disponible para reservar.
+        disponibilidad (bool): Indica si la habitación no tiene ninguna fecha reservada.
         costo_predefinido (float): Costo base de la habitación por día.
+        indice_disponibilidad (IndiceDisponibilidad): Índice que se notifica
+            cuando cambia la disponibilidad (None si no está indexada).
+        calendario (CalendarioOcupacion): Rangos de fechas reservados (None
+            hasta la primera reserva, para que crear habitaciones sea barato).
+    
+    Cada habitación tiene su propio bloqueo, de modo que la comprobación y la
+    ocupación de fechas son atómicas sin bloquear al resto de habitaciones.
     """
     
+    __slots__ = ("codigo_habitacion", "acomodacion", "cubierta", "disponibilidad",
+                 "indice_disponibilidad", "calendario", "_bloqueo")
+    
+    costo_predefinido = 100000.0
+    
     def __init__(self, codigo_habitacion, acomodacion, cubierta, disponibilidad=True):
         """
         Inicializa una instancia de la clase Habitacion.
@@ -35,7 +52,23 @@ class Habitacion:
         self.acomodacion = acomodacion
         self.cubierta = cubierta
         self.disponibilidad = disponibilidad
-        self.costo_predefinido = 100000.0
+        self.indice_disponibilidad = None
+        self.calendario = None
+        self._bloqueo = threading.Lock()
+    
+    def a_dict(self):
+        """
+        Convierte la habitación en un diccionario serializable.
+        
+        Returns:
+            dict: Código, cubierta, acomodación y disponibilidad de la habitación.
+        """
+        return {
+            "codigo_habitacion": self.codigo_habitacion,
+            "cubierta": self.cubierta,
+            "acomodacion": self.acomodacion,
+            "disponibilidad": self.disponibilidad,
+        }
     
     def mostrar_habitacion(self):
         """
@@ -51,8 +84,8 @@ class Habitacion:
         """
         Calcula el costo de la habitación para la reserva.
         
-        Método que debe ser sobrescrito por las clases derivadas para 
-        implementar el cálculo específico según el tipo de habitación.
+        El costo se obtiene de la tabla de tarifas según la cubierta y la
+        acomodación de la habitación, que cada clase de Cubiertas registra.
         
         Args:
             cubierta (str): Tipo de cubierta de la habitación.
@@ -62,7 +95,7 @@ class Habitacion:
         Returns:
             float: Costo total calculado para la reserva.
         """
-        return self.costo_predefinido * dias_reserva
+        return tarifas.calcular_costo(self.cubierta, dias_reserva, self.acomodacion)
     
     def cambiar_disponibilidad(self, estado):
         """
@@ -75,8 +108,85 @@ class Habitacion:
             bool: True para confirmar que el cambio se realizó.
         """
         self.disponibilidad = estado
+        
+        # Mantener actualizado el índice de disponibilidad, si existe
+        if self.indice_disponibilidad is not None:
+            self.indice_disponibilidad.actualizar(self)
+            if self.indice_disponibilidad.observador is not None:
+                self.indice_disponibilidad.observador(self)
         return True
     
+    def esta_libre(self, fecha_inicio, fecha_fin):
+        """
+        Comprueba si la habitación está libre en un rango de fechas.
+        
+        Args:
+            fecha_inicio (date): Primer día del rango.
+            fecha_fin (date): Día de salida (no se considera ocupado).
+            
+        Returns:
+            bool: True si ninguna reserva se solapa con el rango.
+        """
+        with self._bloqueo:
+            return self.calendario is None or self.calendario.esta_libre(fecha_inicio, fecha_fin)
+    
+    def ocupar(self, fecha_inicio, fecha_fin, codigo_reserva):
+        """
+        Reserva un rango de fechas de la habitación.
+        
+        Funciona como una operación de comparar e intercambiar: la comprobación
+        de que el rango está libre y su ocupación se hacen bajo el bloqueo de la
+        habitación, por lo que dos hilos nunca ocupan fechas solapadas.
+        
+        Args:
+            fecha_inicio (date): Primer día del rango.
+            fecha_fin (date): Día de salida (no se considera ocupado).
+            codigo_reserva (str): Código de la reserva que ocupa el rango.
+            
+        Returns:
+            bool: True si se ocupó el rango, False si ya estaba ocupado.
+            
+        Raises:
+            ValueError: Si el rango está vacío o invertido.
+        """
+        with self._bloqueo:
+            if self.calendario is None:
+                self.calendario = CalendarioOcupacion()
+            if not self.calendario.ocupar(fecha_inicio, fecha_fin, codigo_reserva):
+                return False
+            if self.disponibilidad:
+                self.cambiar_disponibilidad(False)
+            return True
+    
+    def liberar(self, fecha_inicio, codigo_reserva, asignar=None):
+        """
+        Libera el rango de fechas ocupado por una reserva.
+        
+        Si se indica asignar, el rango libre que queda se ofrece antes de soltar
+        el bloqueo de la habitación, y los rangos que devuelva se ocupan en el
+        mismo paso. Así, fechas que pasan directamente a otra reserva nunca se
+        ven libres desde otro hilo.
+        
+        Args:
+            fecha_inicio (date): Fecha de inicio de la reserva.
+            codigo_reserva (str): Código de la reserva a liberar.
+            asignar (callable, optional): Función que recibe los ordinales
+                (inicio, fin) del rango libre y devuelve una lista de tuplas
+                (inicio, fin, codigo_reserva) a ocupar dentro de él, sin solaparse.
+            
+        Returns:
+            bool: True si se liberó el rango, False si no se encontró.
+        """
+        with self._bloqueo:
+            if self.calendario is None or not self.calendario.liberar(fecha_inicio, codigo_reserva):
+                return False
+            if asignar is not None:
+                for inicio, fin, codigo in asignar(*self.calendario.hueco(fecha_inicio)):
+                    self.calendario.ocupar(inicio, fin, codigo)
+            if not self.calendario:
+                self.cambiar_disponibilidad(True)
+            return True
+    
     def __str__(self):
         """
         Devuelve una representación en cadena de la habitación.
@@ -0,0 +1,285 @@
+"""
+Módulo que define el historial compacto de reservas finalizadas.
+
+Este módulo implementa un almacén columnar para reservas históricas: en lugar
+de conservar un objeto Reserva por registro, cada campo se guarda en un
+arreglo paralelo (array) y los códigos de habitación y de usuario se guardan
+una sola vez en tablas de textos. Las consultas devuelven vistas ligeras que
+leen los arreglos sin copiar los datos.
+"""
+
+from array import array
+from datetime import date, datetime, timedelta
+
+from Reserva import Reserva
+
+class TablaTextos:
+    """
+    Tabla de textos únicos que asigna un número a cada texto.
+
+    Attributes:
+        textos (list): Textos registrados, en orden de registro.
+        _posiciones (dict): Número asignado a cada texto.
+    """
+
+    def __init__(self):
+        """
+        Inicializa una tabla de textos vacía.
+        """
+        self.textos = []
+        self._posiciones = {}
+
+    def numero(self, texto):
+        """
+        Obtiene el número de un texto, registrándolo si es nuevo.
+
+        Args:
+            texto (str): Texto a registrar.
+
+        Returns:
+            int: Número asignado al texto.
+        """
+        posicion = self._posiciones.get(texto)
+        if posicion is None:
+            posicion = self._posiciones[texto] = len(self.textos)
+            self.textos.append(texto)
+        return posicion
+
+    def buscar(self, texto):
+        """
+        Obtiene el número de un texto sin registrarlo.
+
+        Args:
+            texto (str): Texto a buscar.
+
+        Returns:
+            int: Número del texto o None si no está registrado.
+        """
+        return self._posiciones.get(texto)
+
+class VistaReserva:
+    """
+    Vista de solo lectura de una reserva guardada en el historial.
+
+    Expone los mismos atributos que Reserva, pero los lee de los arreglos del
+    historial cada vez que se consultan.
+
+    Attributes:
+        posicion (int): Posición del registro en el historial.
+    """
+
+    __slots__ = ("_historial", "posicion")
+
+    def __init__(self, historial, posicion):
+        """
+        Inicializa una vista sobre un registro del historial.
+
+        Args:
+            historial (HistorialReservas): Historial que contiene el registro.
+            posicion (int): Posición del registro.
+        """
+        self._historial = historial
+        self.posicion = posicion
+
+    @property
+    def codigo_reserva(self):
+        """str: Código de la reserva."""
+        return self._historial._codigos_reserva[self.posicion]
+
+    @property
+    def codigo_habitacion(self):
+        """str: Código de la habitación reservada."""
+        historial = self._historial
+        return historial.habitaciones.textos[historial._habitaciones[self.posicion]]
+
+    @property
+    def dias_reserva(self):
+        """int: Cantidad de días de la reserva."""
+        return self._historial._dias[self.posicion]
+
+    @property
+    def fecha_inicio(self):
+        """date: Primer día de estancia."""
+        return date.fromordinal(self._historial._inicios[self.posicion])
+
+    @property
+    def fecha_fin(self):
+        """date: Día de salida de la habitación."""
+        return date.fromordinal(self._historial._inicios[self.posicion] + self._historial._dias[self.posicion])
+
+    @property
+    def fecha_reserva(self):
+        """datetime: Fecha en que se realizó la reserva."""
+        return datetime.fromtimestamp(self._historial._fechas_reserva[self.posicion])
+
+    @property
+    def codigos_usuarios(self):
+        """list: Códigos de usuarios de la reserva (None para las vacantes)."""
+        historial = self._historial
+        desde = historial._desplazamientos[self.posicion]
+        hasta = historial._desplazamientos[self.posicion + 1]
+        textos = historial.usuarios.textos
+        return [textos[numero] if numero >= 0 else None for numero in historial._usuarios[desde:hasta]]
+
+    def a_reserva(self):
+        """
+        Construye un objeto Reserva con los datos del registro.
+
+        Returns:
+            Reserva: Reserva equivalente, con su código original.
+        """
+        return Reserva(self.dias_reserva, self.codigos_usuarios, self.codigo_habitacion,
+                       fecha_reserva=self.fecha_reserva, fecha_inicio=self.fecha_inicio,
+                       codigo_reserva=self.codigo_reserva)
+
+    def __str__(self):
+        """
+        Devuelve una representación en cadena de la reserva.
+
+        Returns:
+            str: Misma representación que Reserva.
+        """
+        return str(self.a_reserva())
+
+class HistorialReservas:
+    """
+    Almacén columnar de reservas finalizadas.
+
+    Cada reserva ocupa una posición en arreglos paralelos: habitación (número
+    en la tabla de habitaciones), día de inicio (ordinal), días, fecha de
+    reserva (marca de tiempo) y un tramo del arreglo de usuarios delimitado
+    por los desplazamientos.
+
+    Attributes:
+        habitaciones (TablaTextos): Códigos de habitación del historial.
+        usuarios (TablaTextos): Códigos de usuario del historial.
+    """
+
+    def __init__(self):
+        """
+        Inicializa un historial vacío.
+        """
+        self.habitaciones = TablaTextos()
+        self.usuarios = TablaTextos()
+        self._codigos_reserva = []
+        self._posiciones = {}
+        self._habitaciones = array("I")
+        self._inicios = array("I")
+        self._dias = array("H")
+        self._fechas_reserva = array("d")
+        self._usuarios = array("i")
+        self._desplazamientos = array("I", [0])
+
+    def agregar(self, reserva):
+        """
+        Agrega una reserva al historial.
+
+        Args:
+            reserva (Reserva): Reserva a agregar. El objeto no se conserva.
+
+        Returns:
+            VistaReserva: Vista del registro agregado.
+        """
+        posicion = len(self._codigos_reserva)
+        self._codigos_reserva.append(reserva.codigo_reserva)
+        self._posiciones[reserva.codigo_reserva] = posicion
+        self._habitaciones.append(self.habitaciones.numero(reserva.codigo_habitacion))
+        self._inicios.append(reserva.fecha_inicio.toordinal())
+        self._dias.append(reserva.dias_reserva)
+        self._fechas_reserva.append(reserva.fecha_reserva.timestamp())
+
+        # Las vacantes se guardan como -1
+        self._usuarios.extend(self.usuarios.numero(codigo) if codigo else -1
+                              for codigo in reserva.codigos_usuarios)
+        self._desplazamientos.append(len(self._usuarios))
+        return VistaReserva(self, posicion)
+
+    def buscar(self, codigo_reserva):
+        """
+        Busca una reserva del historial por su código.
+
+        Args:
+            codigo_reserva (str): Código de la reserva.
+
+        Returns:
+            VistaReserva: Vista del registro o None si no existe.
+        """
+        posicion = self._posiciones.get(codigo_reserva)
+        if posicion is None:
+            return None
+        return VistaReserva(self, posicion)
+
+    def consultar(self, codigo_habitacion=None, codigo_usuario=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Recorre las reservas del historial que cumplen con los filtros.
+
+        Args:
+            codigo_habitacion (str, optional): Solo reservas de esta habitación.
+            codigo_usuario (str, optional): Solo reservas que incluyen a este usuario.
+            fecha_inicio (date, optional): Solo reservas que ocupan alguna noche
+                entre fecha_inicio y fecha_fin.
+            fecha_fin (date, optional): Día de salida del rango. Si es None, se
+                considera solo la noche de fecha_inicio.
+
+        Yields:
+            VistaReserva: Reservas que cumplen con todos los filtros, en orden de llegada.
+        """
+        habitacion = usuario = None
+        if codigo_habitacion:
+            habitacion = self.habitaciones.buscar(codigo_habitacion)
+            if habitacion is None:
+                return
+        if codigo_usuario:
+            usuario = self.usuarios.buscar(codigo_usuario)
+            if usuario is None:
+                return
+        desde = hasta = None
+        if fecha_inicio is not None:
+            if fecha_fin is None:
+                fecha_fin = fecha_inicio + timedelta(days=1)
+            desde, hasta = fecha_inicio.toordinal(), fecha_fin.toordinal()
+
+        for posicion in range(len(self._codigos_reserva)):
+            if habitacion is not None and self._habitaciones[posicion] != habitacion:
+                continue
+            if desde is not None:
+                inicio = self._inicios[posicion]
+                if inicio >= hasta or inicio + self._dias[posicion] <= desde:
+                    continue
+            if usuario is not None:
+                if usuario not in self._usuarios[self._desplazamientos[posicion]:self._desplazamientos[posicion + 1]]:
+                    continue
+            yield VistaReserva(self, posicion)
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de reservas del historial.
+
+        Returns:
+            int: Número de registros.
+        """
+        return len(self._codigos_reserva)
+
+    def __getitem__(self, posicion):
+        """
+        Devuelve la vista del registro en una posición.
+
+        Args:
+            posicion (int): Posición del registro.
+
+        Returns:
+            VistaReserva: Vista del registro.
+        """
+        if not 0 <= posicion < len(self._codigos_reserva):
+            raise IndexError(posicion)
+        return VistaReserva(self, posicion)
+
+    def __iter__(self):
+        """
+        Recorre los registros del historial en orden de llegada.
+
+        Yields:
+            VistaReserva: Vista de cada registro.
+        """
+        for posicion in range(len(self._codigos_reserva)):
+            yield VistaReserva(self, posicion)
@@ -0,0 +1,203 @@
+"""
+Módulo que define la generación de códigos de reserva y de usuario.
+
+Cada código es un número de 63 bits escrito en decimal con ancho fijo detrás
+del prefijo (R para reservas, U para usuarios). El número se compone de:
+
+- Milisegundos desde EPOCA (41 bits): los códigos se ordenan por creación.
+- Origen (12 bits): número del crucero que emitió el código. Flota asigna un
+  origen distinto a cada salida, así que el código indica qué salida tiene
+  la reserva sin preguntar a todas.
+- Secuencia (10 bits): distingue los códigos del mismo origen en el mismo
+  milisegundo.
+
+Dos generadores con distinto origen nunca emiten el mismo código, y cada
+proceso comparte un único generador por origen. El último número emitido se
+guarda con los contadores del almacenamiento, de modo que tras reiniciar (o
+si el reloj retrocede) los códigos siguen creciendo.
+
+Al número se le suma 10**18 para que siempre tenga 19 dígitos: los códigos
+conservan su orden al compararlos como texto y normalizar_codigo_usuario los
+deja como están. Los códigos antiguos (R001, U001) siguen siendo válidos y
+quedan antes que los nuevos en el orden de Crucero.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Instante cero de los códigos
+EPOCA = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+BITS_ORIGEN = 12
+BITS_SECUENCIA = 10
+
+# Origen más alto que cabe en un código; el 0 es el de un crucero sin flota
+MAXIMO_ORIGEN = (1 << BITS_ORIGEN) - 1
+
+# Se suma al número para que todos los códigos tengan 19 dígitos
+_BASE = 10 ** 18
+_MAXIMO_VALOR = 9 * 10 ** 18 - 1
+_DIGITOS = 19
+
+_EPOCA_SEGUNDOS = EPOCA.timestamp()
+
+class GeneradorIdentificadores:
+    """
+    Generador de códigos únicos de un origen, ordenados por creación.
+
+    Si se piden más de 1024 códigos en un mismo milisegundo, se toman los del
+    milisegundo siguiente (sin esperar); el reloj real los alcanza enseguida.
+
+    Attributes:
+        origen (int): Origen que se graba en los códigos.
+    """
+
+    def __init__(self, origen=0, reloj=time.time):
+        """
+        Inicializa un generador.
+
+        Args:
+            origen (int, optional): Origen de los códigos, entre 0 y MAXIMO_ORIGEN.
+            reloj (callable, optional): Función que devuelve el instante actual
+                en segundos. Por defecto time.time.
+
+        Raises:
+            ValueError: Si el origen está fuera de rango.
+        """
+        if not 0 <= origen <= MAXIMO_ORIGEN:
+            raise ValueError(f"Origen fuera de rango (0 a {MAXIMO_ORIGEN}): {origen}")
+        self.origen = origen
+        self.reloj = reloj
+        self._milisegundo = -1
+        self._secuencia = 0
+        self._bloqueo = threading.Lock()
+
+    def siguiente(self):
+        """
+        Genera el número siguiente.
+
+        Returns:
+            int: Número único, mayor que todos los emitidos antes por este generador.
+
+        Raises:
+            OverflowError: Si el reloj superó el rango de los códigos.
+        """
+        ahora = max(0, int((self.reloj() - _EPOCA_SEGUNDOS) * 1000))
+        with self._bloqueo:
+            if ahora > self._milisegundo:
+                self._milisegundo, self._secuencia = ahora, 0
+            else:
+                self._secuencia += 1
+                if self._secuencia >> BITS_SECUENCIA:
+                    self._milisegundo, self._secuencia = self._milisegundo + 1, 0
+            valor = self._componer(self._milisegundo, self._secuencia)
+        if valor > _MAXIMO_VALOR:
+            raise OverflowError("El reloj superó el rango de los códigos.")
+        return valor
+
+    def codigo(self, prefijo):
+        """
+        Genera un código nuevo.
+
+        Args:
+            prefijo (str): Prefijo del código ("R" o "U").
+
+        Returns:
+            str: Prefijo seguido de 19 dígitos.
+        """
+        return f"{prefijo}{_BASE + self.siguiente()}"
+
+    def _componer(self, milisegundo, secuencia):
+        """
+        Arma el número de un milisegundo y una secuencia de este origen.
+
+        Args:
+            milisegundo (int): Milisegundos desde EPOCA.
+            secuencia (int): Secuencia dentro del milisegundo.
+
+        Returns:
+            int: Número del código, sin la base.
+        """
+        return (((milisegundo << BITS_ORIGEN) | self.origen) << BITS_SECUENCIA) | secuencia
+
+    @property
+    def ultimo(self):
+        """int: Último número emitido (0 si todavía no emitió ninguno)."""
+        with self._bloqueo:
+            if self._milisegundo < 0:
+                return 0
+            return self._componer(self._milisegundo, self._secuencia)
+
+    def avanzar(self, valor):
+        """
+        Garantiza que los próximos números sean mayores que uno ya emitido.
+
+        Se usa al cargar el último número guardado, por si el reloj retrocedió
+        desde entonces.
+
+        Args:
+            valor (int): Número emitido antes (de cualquier origen).
+        """
+        milisegundo = valor >> (BITS_ORIGEN + BITS_SECUENCIA)
+        secuencia = valor & ((1 << BITS_SECUENCIA) - 1)
+        with self._bloqueo:
+            if (milisegundo, secuencia) > (self._milisegundo, self._secuencia):
+                self._milisegundo, self._secuencia = milisegundo, secuencia
+
+_generadores = {}
+_bloqueo_generadores = threading.Lock()
+
+def generador(origen=0):
+    """
+    Devuelve el generador compartido de un origen en este proceso.
+
+    Todos los cruceros del proceso con el mismo origen usan el mismo
+    generador, así que no repiten códigos entre sí.
+
+    Args:
+        origen (int, optional): Origen de los códigos. Por defecto 0.
+
+    Returns:
+        GeneradorIdentificadores: Generador del origen.
+    """
+    with _bloqueo_generadores:
+        compartido = _generadores.get(origen)
+        if compartido is None:
+            compartido = _generadores[origen] = GeneradorIdentificadores(origen)
+        return compartido
+
+def descomponer(codigo):
+    """
+    Obtiene el instante, el origen y la secuencia de un código.
+
+    Args:
+        codigo (str): Código de reserva o de usuario.
+
+    Returns:
+        tuple: (instante como datetime UTC, origen, secuencia), o None si el
+            código no tiene el formato de este módulo (por ejemplo, R001).
+    """
+    numero = codigo[1:]
+    if len(numero) != _DIGITOS or not numero.isdigit():
+        return None
+    valor = int(numero) - _BASE
+    if valor < 0:
+        return None
+    secuencia = valor & ((1 << BITS_SECUENCIA) - 1)
+    origen = (valor >> BITS_SECUENCIA) & MAXIMO_ORIGEN
+    milisegundo = valor >> (BITS_ORIGEN + BITS_SECUENCIA)
+    return EPOCA + timedelta(milliseconds=milisegundo), origen, secuencia
+
+def origen_de(codigo):
+    """
+    Obtiene el origen de un código.
+
+    Args:
+        codigo (str): Código de reserva o de usuario.
+
+    Returns:
+        int: Origen del código, o None si no tiene el formato de este módulo.
+    """
+    partes = descomponer(codigo)
+    return partes[1] if partes is not None else None
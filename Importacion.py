@@ -0,0 +1,259 @@
+"""
+Módulo de importación y exportación masiva de reservas.
+
+Este módulo permite cargar reservas de grupos desde archivos CSV o JSONL
+(por ejemplo, los enviados por agencias de viaje) y exportar las reservas
+activas a esos mismos formatos. Los archivos se procesan fila a fila, sin
+cargarlos completos en memoria, y las reservas se crean por lotes mediante
+Crucero.crear_reservas_lote.
+
+Columnas reconocidas:
+    codigo_habitacion: Habitación a reservar (opcional).
+    cubierta, acomodacion: Criterios de asignación si no se indica habitación.
+    dias_reserva: Cantidad de días de la reserva.
+    fecha_inicio: Primer día de estancia en formato AAAA-MM-DD (opcional).
+    usuarios: Códigos de usuarios registrados, separados por ";".
+    nombres: Nombres de pasajeros nuevos, separados por ";". Cada nombre se
+        registra como un usuario nuevo con código automático, solo si se crea
+        la reserva de su fila (los usuarios de cada lote se guardan con sus
+        reservas en una sola operación).
+
+En los archivos JSONL, usuarios y nombres pueden ser también listas de textos.
+"""
+
+import csv
+import json
+import os
+from datetime import date
+from itertools import islice
+
+from Usuario import Usuario
+
+COLUMNAS_EXPORTACION = ["codigo_reserva", "codigo_habitacion", "cubierta", "acomodacion",
+                        "dias_reserva", "fecha_inicio", "usuarios", "costo"]
+
+def _es_jsonl(ruta):
+    """
+    Indica si una ruta corresponde a un archivo JSONL según su extensión.
+
+    Args:
+        ruta (str): Ruta del archivo.
+
+    Returns:
+        bool: True para .jsonl y .ndjson, False en otro caso (CSV).
+    """
+    return os.path.splitext(ruta)[1].lower() in (".jsonl", ".ndjson")
+
+def _texto(valor, campo):
+    """
+    Convierte un valor de celda en un texto sin espacios sobrantes.
+
+    Args:
+        valor (str | None): Valor de la celda.
+        campo (str): Descripción del campo para el mensaje de error.
+
+    Returns:
+        str: Texto de la celda, o None si está vacía.
+
+    Raises:
+        ValueError: Si el valor no es un texto.
+    """
+    if valor is None:
+        return None
+    if not isinstance(valor, str):
+        raise ValueError(f"Valor inválido para {campo}.")
+    return valor.strip() or None
+
+def _lista(valor, campo):
+    """
+    Convierte un valor de celda en una lista de textos no vacíos.
+
+    Args:
+        valor (str | list | None): Texto separado por ";" o lista de textos.
+        campo (str): Descripción del campo para el mensaje de error.
+
+    Returns:
+        list: Elementos sin espacios sobrantes.
+
+    Raises:
+        ValueError: Si el valor no es un texto ni una lista de textos.
+    """
+    if valor is None:
+        return []
+    if isinstance(valor, str):
+        valor = valor.split(";")
+    elif not isinstance(valor, list) or not all(isinstance(elemento, str) for elemento in valor):
+        raise ValueError(f"Valor inválido para {campo}.")
+    return [elemento.strip() for elemento in valor if elemento.strip()]
+
+def leer_filas(ruta):
+    """
+    Lee un archivo CSV o JSONL fila a fila.
+
+    Args:
+        ruta (str): Ruta del archivo a leer.
+
+    Yields:
+        tuple: (número de fila, diccionario de la fila o None, error o None).
+    """
+    with open(ruta, encoding="utf-8", newline="") as archivo:
+        if _es_jsonl(ruta):
+            for numero, linea in enumerate(archivo, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except ValueError:
+                    yield numero, None, "Línea JSON inválida."
+                    continue
+                if isinstance(fila, dict):
+                    yield numero, fila, None
+                else:
+                    yield numero, None, "La línea no es un objeto JSON."
+        else:
+            # La fila 1 es la cabecera
+            for numero, fila in enumerate(csv.DictReader(archivo), start=2):
+                yield numero, fila, None
+
+def convertir_fila(fila, crucero):
+    """
+    Valida una fila y la convierte en una solicitud de reserva.
+
+    Por cada nombre de pasajero nuevo se crea un usuario, que la solicitud
+    lleva en usuarios_nuevos para que el crucero lo registre solo si crea la
+    reserva.
+
+    Args:
+        fila (dict): Fila leída del archivo.
+        crucero (Crucero): Crucero donde se validan los usuarios existentes.
+
+    Returns:
+        dict: Solicitud con el formato de Crucero.crear_reservas_lote.
+
+    Raises:
+        ValueError: Si algún valor de la fila no es válido.
+    """
+    try:
+        dias_reserva = int(fila.get("dias_reserva"))
+    except (TypeError, ValueError):
+        raise ValueError("Valor inválido para días de reserva.")
+
+    acomodacion = fila.get("acomodacion")
+    try:
+        acomodacion = int(acomodacion) if acomodacion not in (None, "") else None
+    except (TypeError, ValueError):
+        raise ValueError("Valor inválido para acomodación.")
+
+    fecha_inicio = _texto(fila.get("fecha_inicio"), "la fecha de inicio")
+    try:
+        fecha_inicio = date.fromisoformat(fecha_inicio) if fecha_inicio else None
+    except ValueError:
+        raise ValueError("Valor inválido para la fecha de inicio.")
+
+    codigo_habitacion = _texto(fila.get("codigo_habitacion"), "la habitación")
+    cubierta = _texto(fila.get("cubierta"), "la cubierta")
+    codigos_usuarios = _lista(fila.get("usuarios"), "usuarios")
+    nombres = _lista(fila.get("nombres"), "nombres")
+    for codigo in codigos_usuarios:
+        if crucero.buscar_usuario(codigo) is None:
+            raise ValueError(f"El usuario {codigo} no está registrado.")
+    usuarios_nuevos = [Usuario(nombre, crucero.nuevo_codigo_usuario()) for nombre in nombres]
+    codigos_usuarios.extend(usuario.codigo for usuario in usuarios_nuevos)
+
+    return {
+        "codigo_habitacion": codigo_habitacion,
+        "cubierta": cubierta,
+        "acomodacion": acomodacion,
+        "dias_reserva": dias_reserva,
+        "fecha_inicio": fecha_inicio,
+        "codigos_usuarios": codigos_usuarios,
+        "usuarios_nuevos": usuarios_nuevos,
+    }
+
+def importar_reservas(crucero, ruta, tamano_lote=5000):
+    """
+    Importa reservas desde un archivo CSV o JSONL.
+
+    Las filas se validan y se envían a Crucero.crear_reservas_lote en lotes
+    de tamaño fijo. Una fila con errores se informa en el resumen y no
+    interrumpe la importación.
+
+    Args:
+        crucero (Crucero): Crucero donde se crean las reservas.
+        ruta (str): Ruta del archivo a importar.
+        tamano_lote (int, optional): Filas por lote. Por defecto 5000.
+
+    Returns:
+        dict: Resumen con las claves procesadas, creadas, costo_total,
+            reservas (lista de (fila, código de reserva)) y errores
+            (lista de (fila, mensaje)).
+    """
+    resumen = {"procesadas": 0, "creadas": 0, "costo_total": 0.0, "reservas": [], "errores": []}
+    filas = leer_filas(ruta)
+
+    while True:
+        bloque = list(islice(filas, tamano_lote))
+        if not bloque:
+            break
+
+        numeros = []
+        solicitudes = []
+        for numero, fila, error in bloque:
+            resumen["procesadas"] += 1
+            if error is None:
+                try:
+                    solicitudes.append(convertir_fila(fila, crucero))
+                    numeros.append(numero)
+                    continue
+                except ValueError as excepcion:
+                    error = str(excepcion)
+            resumen["errores"].append((numero, error))
+
+        for numero, resultado in zip(numeros, crucero.crear_reservas_lote(solicitudes)):
+            if resultado["error"]:
+                resumen["errores"].append((numero, resultado["error"]))
+            else:
+                resumen["creadas"] += 1
+                resumen["costo_total"] += resultado["costo"]
+                resumen["reservas"].append((numero, resultado["codigo_reserva"]))
+
+    resumen["errores"].sort()
+    return resumen
+
+def exportar_reservas(crucero, ruta):
+    """
+    Exporta las reservas activas a un archivo CSV o JSONL.
+
+    Args:
+        crucero (Crucero): Crucero cuyas reservas se exportan.
+        ruta (str): Ruta del archivo de salida; la extensión define el formato.
+
+    Returns:
+        int: Cantidad de reservas exportadas.
+    """
+    cantidad = 0
+    jsonl = _es_jsonl(ruta)
+    with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+        escritor = None if jsonl else csv.DictWriter(archivo, fieldnames=COLUMNAS_EXPORTACION)
+        if escritor:
+            escritor.writeheader()
+
+        for reserva in crucero.reservas:
+            habitacion = crucero.buscar_habitacion(reserva.codigo_habitacion)
+            usuarios = [codigo for codigo in reserva.codigos_usuarios if codigo]
+            fila = {
+                "codigo_reserva": reserva.codigo_reserva,
+                "codigo_habitacion": reserva.codigo_habitacion,
+                "cubierta": habitacion.cubierta if habitacion else None,
+                "acomodacion": habitacion.acomodacion if habitacion else None,
+                "dias_reserva": reserva.dias_reserva,
+                "fecha_inicio": reserva.fecha_inicio.isoformat(),
+                "usuarios": usuarios if jsonl else ";".join(usuarios),
+                "costo": crucero.calcular_costo_reserva(reserva.codigo_habitacion, reserva.dias_reserva),
+            }
+            if jsonl:
+                archivo.write(json.dumps(fila, ensure_ascii=False) + "\n")
+            else:
+                escritor.writerow(fila)
+            cantidad += 1
+    return cantidad
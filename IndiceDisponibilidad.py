@@ -0,0 +1,364 @@
+"""
+Módulo que define el índice de disponibilidad de habitaciones del crucero.
+
+Este módulo implementa un índice que agrupa las habitaciones disponibles por
+cubierta (normalizada) y acomodación, de forma que las búsquedas filtradas
+no necesiten recorrer todas las habitaciones del crucero.
+"""
+
+import heapq
+from itertools import repeat
+from operator import attrgetter
+
+from Normalizar import normalizar_texto_cacheado
+
+# Marca de habitación ausente en un grupo (None indica una habitación pendiente)
+_AUSENTE = object()
+
+class IndiceDisponibilidad:
+    """
+    Índice de habitaciones disponibles agrupadas por cubierta y acomodación.
+
+    Cada grupo se identifica por la tupla (cubierta normalizada, acomodación) y
+    contiene las habitaciones disponibles de ese grupo. El índice se actualiza
+    de forma incremental cada vez que una habitación cambia su disponibilidad.
+    También se guardan todas las habitaciones de cada grupo, que sirven como
+    candidatas para las búsquedas por rango de fechas.
+
+    Las habitaciones pueden registrarse como pendientes (registrar_pendientes):
+    el grupo guarda None en su lugar y la habitación se crea la primera vez
+    que una consulta la devuelve. Una habitación pendiente nunca tiene
+    reservas, así que siempre está disponible.
+
+    Attributes:
+        _disponibles (dict): Grupos de habitaciones disponibles. Cada clave es
+            una tupla (cubierta, acomodacion) y cada valor un diccionario de
+            código de habitación a objeto Habitacion.
+        _todas (dict): Grupos con todas las habitaciones registradas.
+        _claves (dict): Grupo al que pertenece cada habitación creada.
+        _orden (dict): Posición de registro de cada habitación, usada para
+            devolver los resultados en el orden original. Con habitaciones
+            pendientes son las posiciones de la distribución.
+        _ordenados (dict): Códigos de cada grupo ordenados por posición de
+            registro; se calculan al recorrer el grupo y se descartan cuando
+            el grupo recibe habitaciones nuevas.
+        observador (callable): Función que recibe cada habitación que cambia
+            de disponibilidad (por ejemplo, el flujo de cambios), o None.
+    """
+
+    def __init__(self):
+        """
+        Inicializa un índice de disponibilidad vacío.
+        """
+        self._disponibles = {}
+        self._todas = {}
+        self._claves = {}
+        self._orden = {}
+        self._ordenados = {}
+        self._obtener = None
+        self.observador = None
+
+    def registrar(self, habitacion):
+        """
+        Registra una habitación en el índice y la enlaza para recibir sus cambios.
+
+        Args:
+            habitacion (Habitacion): Habitación a registrar.
+        """
+        codigo = habitacion.codigo_habitacion
+        clave = (normalizar_texto_cacheado(habitacion.cubierta), habitacion.acomodacion)
+        self._claves[codigo] = clave
+        # Una habitación pendiente conserva la posición en que se registró
+        self._orden.setdefault(codigo, len(self._orden))
+        self._disponibles.setdefault(clave, {})
+        grupo = self._todas.setdefault(clave, {})
+        if codigo not in grupo:
+            self._ordenados.pop(clave, None)
+        grupo[codigo] = habitacion
+        habitacion.indice_disponibilidad = self
+        self.actualizar(habitacion)
+
+    def registrar_lote(self, habitaciones):
+        """
+        Registra varias habitaciones en bloque.
+
+        Equivale a llamar a registrar con cada habitación, pero primero reparte
+        las habitaciones por grupo y luego agrega cada grupo con una sola
+        actualización de sus diccionarios.
+
+        Args:
+            habitaciones (list): Habitaciones a registrar.
+        """
+        tramos = {}
+        for par, habitacion in zip(map(attrgetter("cubierta", "acomodacion"), habitaciones), habitaciones):
+            tramo = tramos.get(par)
+            if tramo is None:
+                tramo = tramos[par] = []
+            tramo.append(habitacion)
+
+        self._agregar_orden(list(map(attrgetter("codigo_habitacion"), habitaciones)))
+        for (cubierta, acomodacion), tramo in tramos.items():
+            clave = (normalizar_texto_cacheado(cubierta), acomodacion)
+            codigos = list(map(attrgetter("codigo_habitacion"), tramo))
+            self._claves.update(dict.fromkeys(codigos, clave))
+            self._todas.setdefault(clave, {}).update(zip(codigos, tramo))
+            self._ordenados.pop(clave, None)
+            disponibles = self._disponibles.setdefault(clave, {})
+            for habitacion in tramo:
+                habitacion.indice_disponibilidad = self
+                if habitacion.disponibilidad:
+                    disponibles[habitacion.codigo_habitacion] = habitacion
+                else:
+                    disponibles.pop(habitacion.codigo_habitacion, None)
+
+    def registrar_pendientes(self, distribucion, obtener):
+        """
+        Registra las habitaciones de una distribución sin crearlas.
+
+        Args:
+            distribucion (Distribucion): Distribución de las habitaciones.
+            obtener (callable): Función que recibe un código de habitación y
+                devuelve la habitación, creándola y registrándola con registrar.
+        """
+        self._obtener = obtener
+        if not self._orden:
+            # Las posiciones de la distribución son el orden de registro; se
+            # comparten entre los cruceros que usan la misma distribución
+            self._orden = distribucion.posiciones()
+        else:
+            self._agregar_orden(distribucion.codigos)
+
+        tramos = {}
+        for codigo, par in zip(distribucion.codigos, zip(distribucion.numeros_cubierta, distribucion.acomodaciones)):
+            tramo = tramos.get(par)
+            if tramo is None:
+                tramo = tramos[par] = []
+            tramo.append(codigo)
+
+        for (numero, acomodacion), codigos in tramos.items():
+            clave = (normalizar_texto_cacheado(distribucion.cubiertas[numero]), acomodacion)
+            pendientes = dict.fromkeys(codigos)
+            self._todas.setdefault(clave, {}).update(pendientes)
+            self._disponibles.setdefault(clave, {}).update(pendientes)
+            self._ordenados.pop(clave, None)
+
+    def _agregar_orden(self, codigos):
+        """
+        Asigna posiciones de registro a los códigos que aún no la tienen.
+
+        Args:
+            codigos (list): Códigos de habitación en orden de registro.
+        """
+        inicio = len(self._orden)
+        nuevos = [codigo for codigo in codigos if codigo not in self._orden] if self._orden else codigos
+        self._orden.update(zip(nuevos, range(inicio, inicio + len(nuevos))))
+
+    def _habitaciones(self, grupo):
+        """
+        Obtiene las habitaciones de un grupo, creando las pendientes.
+
+        Args:
+            grupo (dict): Grupo de habitaciones por código.
+
+        Returns:
+            list: Habitaciones del grupo.
+        """
+        if self._obtener is None:
+            return list(grupo.values())
+        return [habitacion if habitacion is not None else self._obtener(codigo)
+                for codigo, habitacion in list(grupo.items())]
+
+    def actualizar(self, habitacion):
+        """
+        Actualiza el grupo de la habitación según su disponibilidad actual.
+
+        Args:
+            habitacion (Habitacion): Habitación cuyo estado cambió.
+        """
+        codigo = habitacion.codigo_habitacion
+        grupo = self._disponibles[self._claves[codigo]]
+        if habitacion.disponibilidad:
+            grupo[codigo] = habitacion
+        else:
+            grupo.pop(codigo, None)
+
+    def _claves_grupos(self, cubierta=None, acomodacion=None):
+        """
+        Obtiene las claves de los grupos que cumplen con los filtros indicados.
+
+        Args:
+            cubierta (str, optional): Tipo de cubierta a filtrar.
+            acomodacion (int, optional): Capacidad de acomodación a filtrar.
+
+        Returns:
+            list: Tuplas (cubierta normalizada, acomodación).
+        """
+        cubierta_normalizada = normalizar_texto_cacheado(cubierta) if cubierta else None
+
+        # Con ambos filtros el grupo se obtiene directamente
+        if cubierta_normalizada and acomodacion:
+            clave = (cubierta_normalizada, acomodacion)
+            return [clave] if clave in self._todas else []
+
+        return [(cubierta_grupo, acomodacion_grupo) for cubierta_grupo, acomodacion_grupo in self._todas
+                if (not cubierta_normalizada or cubierta_grupo == cubierta_normalizada)
+                and (not acomodacion or acomodacion_grupo == acomodacion)]
+
+    def _grupos(self, cubierta=None, acomodacion=None, grupos_origen=None):
+        """
+        Obtiene los grupos que cumplen con los filtros indicados.
+
+        Args:
+            cubierta (str, optional): Tipo de cubierta a filtrar.
+            acomodacion (int, optional): Capacidad de acomodación a filtrar.
+            grupos_origen (dict, optional): Grupos sobre los que filtrar. Por
+                defecto se usan los de habitaciones disponibles.
+
+        Returns:
+            list: Lista de diccionarios de habitaciones.
+        """
+        if grupos_origen is None:
+            grupos_origen = self._disponibles
+        return [grupos_origen[clave] for clave in self._claves_grupos(cubierta, acomodacion)
+                if grupos_origen.get(clave)]
+
+    def _codigos_ordenados(self, clave):
+        """
+        Obtiene los códigos de un grupo en orden de registro.
+
+        Args:
+            clave (tuple): Clave del grupo.
+
+        Returns:
+            list: Códigos de todas las habitaciones del grupo, ordenados.
+        """
+        codigos = self._ordenados.get(clave)
+        if codigos is None:
+            codigos = self._ordenados[clave] = sorted(self._todas[clave], key=self._orden.__getitem__)
+        return codigos
+
+    def listar(self, cubierta=None, acomodacion=None):
+        """
+        Lista las habitaciones disponibles que cumplen con los filtros.
+
+        Args:
+            cubierta (str, optional): Tipo de cubierta a filtrar.
+            acomodacion (int, optional): Capacidad de acomodación a filtrar.
+
+        Returns:
+            list: Habitaciones disponibles en el orden en que fueron registradas.
+        """
+        habitaciones = []
+        for grupo in self._grupos(cubierta, acomodacion):
+            habitaciones.extend(self._habitaciones(grupo))
+        habitaciones.sort(key=lambda habitacion: self._orden[habitacion.codigo_habitacion])
+        return habitaciones
+
+    def iterar(self, cubierta=None, acomodacion=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Recorre las habitaciones disponibles en orden de registro, sin construir la lista.
+
+        Sin fechas se devuelven las habitaciones sin ninguna reserva; con fechas,
+        las libres en ese rango. Las habitaciones pendientes se crean solo al
+        devolverlas. Solo se recorren los grupos que cumplen con los filtros,
+        mezclando sus códigos ya ordenados, así que detenerse tras una página
+        no depende del total de habitaciones del crucero.
+
+        Args:
+            cubierta (str, optional): Tipo de cubierta a filtrar.
+            acomodacion (int, optional): Capacidad de acomodación a filtrar.
+            fecha_inicio (date, optional): Primer día del rango.
+            fecha_fin (date, optional): Día de salida (obligatorio con fecha_inicio).
+
+        Yields:
+            Habitacion: Habitaciones que cumplen con los filtros.
+        """
+        grupos_origen = self._disponibles if fecha_inicio is None else self._todas
+        claves = self._claves_grupos(cubierta, acomodacion)
+        if len(claves) == 1:
+            recorrido = zip(self._codigos_ordenados(claves[0]), repeat(claves[0]))
+        else:
+            orden = self._orden
+            recorrido = heapq.merge(*(zip(self._codigos_ordenados(clave), repeat(clave)) for clave in claves),
+                                    key=lambda par: orden[par[0]])
+        for codigo, clave in recorrido:
+            habitacion = grupos_origen[clave].get(codigo, _AUSENTE)
+            if habitacion is _AUSENTE:
+                continue
+            if habitacion is None:
+                habitacion = self._obtener(codigo)
+            if (fecha_inicio is None or habitacion.disponibilidad
+                    or habitacion.esta_libre(fecha_inicio, fecha_fin)):
+                yield habitacion
+
+    def grupos(self):
+        """
+        Devuelve los grupos registrados en el índice.
+
+        Returns:
+            list: Tuplas (cubierta normalizada, acomodación) de cada grupo.
+        """
+        return list(self._todas)
+
+    def contar(self, cubierta=None, acomodacion=None):
+        """
+        Cuenta las habitaciones disponibles sin construir la lista de resultados.
+
+        Args:
+            cubierta (str, optional): Tipo de cubierta a filtrar.
+            acomodacion (int, optional): Capacidad de acomodación a filtrar.
+
+        Returns:
+            int: Cantidad de habitaciones disponibles que cumplen con los filtros.
+        """
+        return sum(len(grupo) for grupo in self._grupos(cubierta, acomodacion))
+
+    def listar_libres(self, fecha_inicio, fecha_fin, cubierta=None, acomodacion=None):
+        """
+        Lista las habitaciones libres en un rango de fechas.
+
+        Solo se revisan las habitaciones de los grupos que cumplen con los
+        filtros, y cada comprobación de fechas es una búsqueda binaria.
+
+        Args:
+            fecha_inicio (date): Primer día del rango.
+            fecha_fin (date): Día de salida (no se considera ocupado).
+            cubierta (str, optional): Tipo de cubierta a filtrar.
+            acomodacion (int, optional): Capacidad de acomodación a filtrar.
+
+        Returns:
+            list: Habitaciones libres en el orden en que fueron registradas.
+        """
+        habitaciones = []
+        for grupo in self._grupos(cubierta, acomodacion, self._todas):
+            for habitacion in self._habitaciones(grupo):
+                if habitacion.disponibilidad or habitacion.esta_libre(fecha_inicio, fecha_fin):
+                    habitaciones.append(habitacion)
+        habitaciones.sort(key=lambda habitacion: self._orden[habitacion.codigo_habitacion])
+        return habitaciones
+
+    def candidatas(self, fecha_inicio, fecha_fin, cubierta=None, acomodacion=None):
+        """
+        Recorre las habitaciones libres en un rango de fechas sin ordenarlas.
+
+        Primero se devuelven las habitaciones sin ninguna reserva, que no
+        requieren consultar su calendario, y después las demás habitaciones
+        libres en el rango. Al ser un generador, quien lo consume puede
+        detenerse en la primera habitación que le sirva.
+
+        Args:
+            fecha_inicio (date): Primer día del rango.
+            fecha_fin (date): Día de salida (no se considera ocupado).
+            cubierta (str, optional): Tipo de cubierta a filtrar.
+            acomodacion (int, optional): Capacidad de acomodación a filtrar.
+
+        Yields:
+            Habitacion: Habitaciones libres en el rango indicado.
+        """
+        for grupo in self._grupos(cubierta, acomodacion):
+            for codigo, habitacion in list(grupo.items()):
+                yield habitacion if habitacion is not None else self._obtener(codigo)
+        for grupo in self._grupos(cubierta, acomodacion, self._todas):
+            for habitacion in list(grupo.values()):
+                if habitacion is not None and not habitacion.disponibilidad and habitacion.esta_libre(fecha_inicio, fecha_fin):
+                    yield habitacion
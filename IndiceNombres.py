@@ -0,0 +1,155 @@
+"""
+Módulo que define el índice de trigramas para buscar usuarios por nombre.
+
+Cada palabra del nombre normalizado (sin acentos ni mayúsculas) se parte en
+trigramas, con dos espacios al principio y uno al final ("jose" da "  j",
+" jo", "jos", "ose" y "se "). La búsqueda puntúa a cada usuario según la
+proporción de trigramas de la consulta que aparecen en su nombre, por lo que
+tolera errores de escritura, palabras en otro orden y nombres incompletos.
+
+Para no contar coincidencias de todos los usuarios, solo se toman como
+candidatos los usuarios de las listas de trigramas menos frecuentes de la
+consulta: quien no aparece en ninguna de ellas no puede alcanzar la
+puntuación mínima (filtrado por prefijo). Si esas listas también son largas
+(nombres muy comunes), se cuentan las coincidencias de todas las listas de
+una vez con Counter, que recorre los arrays en C.
+"""
+
+import heapq
+import re
+from array import array
+from collections import Counter
+from math import ceil
+
+from Normalizar import normalizar_texto
+
+# Proporción mínima predeterminada de trigramas de la consulta presentes en el nombre
+SIMILITUD_MINIMA = 0.5
+
+# Costo relativo de verificar un candidato recalculando sus trigramas frente
+# a contarlo en una lista con Counter
+_COSTO_VERIFICACION = 12
+
+_PALABRAS = re.compile(r"[^\W_]+")
+
+def trigramas(texto):
+    """
+    Calcula los trigramas de las palabras de un texto.
+
+    Args:
+        texto (str): Texto a partir (se normaliza antes).
+
+    Returns:
+        set: Trigramas del texto.
+    """
+    resultado = set()
+    for palabra in _PALABRAS.findall(normalizar_texto(texto or "")):
+        palabra = f"  {palabra} "
+        for posicion in range(len(palabra) - 2):
+            resultado.add(palabra[posicion:posicion + 3])
+    return resultado
+
+class IndiceTrigramas:
+    """
+    Índice invertido de trigramas de los nombres de usuario.
+
+    Los usuarios se numeran en orden de registro y cada trigrama guarda los
+    números de los usuarios que lo contienen en un array compacto. Los
+    trigramas de cada nombre no se guardan: se recalculan solo para los
+    candidatos de una búsqueda.
+
+    Attributes:
+        _usuarios (list): Usuarios indexados, por número.
+        _listas (dict): Números de usuario (array) por trigrama.
+        _tamanos (array): Cantidad de trigramas del nombre de cada usuario.
+    """
+
+    def __init__(self):
+        """
+        Inicializa un índice vacío.
+        """
+        self._usuarios = []
+        self._listas = {}
+        self._tamanos = array("H")
+
+    def agregar(self, usuario):
+        """
+        Indexa el nombre de un usuario.
+
+        Args:
+            usuario (Usuario): Usuario a indexar.
+        """
+        numero = len(self._usuarios)
+        propios = trigramas(usuario.nombre)
+        self._tamanos.append(min(len(propios), 0xFFFF))
+        self._usuarios.append(usuario)
+        listas = self._listas
+        for trigrama in propios:
+            lista = listas.get(trigrama)
+            if lista is None:
+                lista = listas[trigrama] = array("I")
+            lista.append(numero)
+
+    def buscar(self, consulta, limite=10, similitud_minima=SIMILITUD_MINIMA):
+        """
+        Busca los usuarios cuyo nombre se parece más a la consulta.
+
+        Args:
+            consulta (str): Nombre o parte del nombre, con o sin acentos.
+            limite (int, optional): Cantidad máxima de resultados.
+            similitud_minima (float, optional): Proporción mínima de trigramas
+                de la consulta que deben estar en el nombre (entre 0 y 1).
+
+        Returns:
+            list: Tuplas (puntuación, usuario) de mayor a menor puntuación; a
+                igual puntuación, primero los nombres más parecidos en conjunto
+                (similitud de Jaccard) y después los registrados antes.
+        """
+        buscados = trigramas(consulta)
+        if not buscados or limite <= 0:
+            return []
+        vacia = array("I")
+        listas = sorted((self._listas.get(trigrama, vacia) for trigrama in buscados), key=len)
+
+        # Un candidato debe tener al menos "necesarios" trigramas de la
+        # consulta, así que debe aparecer en alguna de las listas más cortas
+        necesarios = max(1, ceil(similitud_minima * len(buscados) - 1e-9))
+        prefijo = listas[:len(buscados) - necesarios + 1]
+        por_comunes = {}
+        if sum(map(len, prefijo)) * _COSTO_VERIFICACION < sum(map(len, listas)):
+            candidatos = set()
+            for lista in prefijo:
+                candidatos.update(lista)
+            for numero in candidatos:
+                comunes = len(buscados & trigramas(self._usuarios[numero].nombre))
+                if comunes >= necesarios:
+                    por_comunes.setdefault(comunes, []).append(numero)
+        else:
+            conteos = Counter()
+            for lista in listas:
+                conteos.update(lista)
+            for numero, comunes in conteos.items():
+                if comunes >= necesarios:
+                    por_comunes.setdefault(comunes, []).append(numero)
+
+        # La puntuación es la proporción de la consulta encontrada; a igual
+        # puntuación desempata la similitud de Jaccard (un nombre más largo
+        # que la consulta se parece menos)
+        resultados = []
+        tamanos = self._tamanos
+        for comunes in sorted(por_comunes, reverse=True):
+            numeros = heapq.nsmallest(limite - len(resultados), por_comunes[comunes],
+                                      key=lambda numero: (tamanos[numero], numero))
+            resultados.extend((comunes / len(buscados), self._usuarios[numero]) for numero in numeros)
+            if len(resultados) >= limite:
+                break
+        return resultados
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de usuarios indexados.
+
+        Returns:
+            int: Número de usuarios.
+        """
+        return len(self._usuarios)
@@ -0,0 +1,261 @@
+"""
+Módulo que define la lista de espera de reservas.
+
+Cuando ninguna habitación de una cubierta y acomodación está libre en las
+fechas pedidas, la solicitud puede quedar en espera. Al liberarse fechas de
+una habitación de ese grupo, se elige la solicitud de mayor prioridad (y más
+antigua) cuya estancia cabe en el rango libre.
+
+Las solicitudes de cada grupo se agrupan por estancia exacta (día de inicio y
+de salida), cada una con su propio montículo de prioridades. Elegir una
+solicitud solo recorre las estancias distintas que caben en el rango libre y
+cuesta O(log n) en el número de solicitudes en espera.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+
+class SolicitudEspera:
+    """
+    Solicitud de reserva en espera de una habitación libre.
+
+    Attributes:
+        codigo (str): Código de la reserva que se creará al asignarla.
+        codigos_usuarios (list): Códigos de los usuarios de la reserva.
+        grupo (tuple): Grupo pedido (cubierta normalizada, acomodación).
+        fecha_inicio (date): Primer día de la estancia.
+        dias_reserva (int): Cantidad de días de la estancia.
+        prioridad (int): Prioridad de la solicitud (mayor se atiende antes).
+        inicio (int): Ordinal del primer día.
+        fin (int): Ordinal del día de salida.
+    """
+
+    __slots__ = ("codigo", "codigos_usuarios", "grupo", "fecha_inicio", "dias_reserva", "prioridad",
+                 "inicio", "fin")
+
+    def __init__(self, codigo, codigos_usuarios, grupo, fecha_inicio, dias_reserva, prioridad=0):
+        """
+        Inicializa una solicitud en espera.
+
+        Args:
+            codigo (str): Código de la reserva que se creará al asignarla.
+            codigos_usuarios (list): Códigos de los usuarios de la reserva.
+            grupo (tuple): Grupo pedido (cubierta normalizada, acomodación).
+            fecha_inicio (date): Primer día de la estancia.
+            dias_reserva (int): Cantidad de días de la estancia.
+            prioridad (int, optional): Prioridad de la solicitud. Por defecto 0.
+        """
+        self.codigo = codigo
+        self.codigos_usuarios = codigos_usuarios
+        self.grupo = grupo
+        self.fecha_inicio = fecha_inicio
+        self.dias_reserva = dias_reserva
+        self.prioridad = prioridad
+        self.inicio = fecha_inicio.toordinal()
+        self.fin = self.inicio + dias_reserva
+
+    def a_dict(self):
+        """
+        Convierte la solicitud en un diccionario serializable.
+
+        Returns:
+            dict: Datos de la solicitud.
+        """
+        return {
+            "codigo_reserva": self.codigo,
+            "codigos_usuarios": list(self.codigos_usuarios),
+            "cubierta": self.grupo[0],
+            "acomodacion": self.grupo[1],
+            "fecha_inicio": self.fecha_inicio.isoformat(),
+            "dias_reserva": self.dias_reserva,
+            "prioridad": self.prioridad,
+        }
+
+class ListaEspera:
+    """
+    Solicitudes en espera agrupadas por cubierta, acomodación y estancia.
+
+    Retirar una solicitud no la busca en su montículo: se quita del registro
+    de solicitudes y su entrada se descarta al llegar a la cima.
+
+    Attributes:
+        _solicitudes (dict): Solicitudes en espera por código.
+        _colas (dict): Montículo de (-prioridad, orden, código) por (grupo, inicio, fin).
+        _inicios (dict): Días de inicio distintos de cada grupo, ordenados.
+        _fines (dict): Días de salida distintos por (grupo, inicio), ordenados.
+    """
+
+    def __init__(self):
+        """
+        Inicializa una lista de espera vacía.
+        """
+        self._solicitudes = {}
+        self._colas = {}
+        self._inicios = {}
+        self._fines = {}
+        self._secuencia = count()
+        self._bloqueo = threading.Lock()
+
+    def agregar(self, solicitud):
+        """
+        Pone una solicitud en espera.
+
+        Args:
+            solicitud (SolicitudEspera): Solicitud a agregar.
+        """
+        grupo, inicio, fin = solicitud.grupo, solicitud.inicio, solicitud.fin
+        with self._bloqueo:
+            self._solicitudes[solicitud.codigo] = solicitud
+            cola = self._colas.get((grupo, inicio, fin))
+            if cola is None:
+                cola = self._colas[(grupo, inicio, fin)] = []
+                fines = self._fines.get((grupo, inicio))
+                if fines is None:
+                    fines = self._fines[(grupo, inicio)] = []
+                    insort(self._inicios.setdefault(grupo, []), inicio)
+                insort(fines, fin)
+            heapq.heappush(cola, (-solicitud.prioridad, next(self._secuencia), solicitud.codigo))
+
+    def retirar(self, codigo):
+        """
+        Quita una solicitud de la espera.
+
+        Args:
+            codigo (str): Código de la solicitud.
+
+        Returns:
+            SolicitudEspera: La solicitud retirada, o None si ya no estaba en espera.
+        """
+        with self._bloqueo:
+            return self._solicitudes.pop(codigo, None)
+
+    def asignar(self, grupo, inicio, fin):
+        """
+        Elige y retira las solicitudes que ocupan un rango libre de una habitación.
+
+        Se toma la solicitud de mayor prioridad cuya estancia cabe en el rango;
+        los tramos que quedan libres antes y después de ella se ofrecen a las
+        siguientes solicitudes.
+
+        Args:
+            grupo (tuple): Grupo de la habitación (cubierta normalizada, acomodación).
+            inicio (int): Ordinal del primer día libre.
+            fin (int): Ordinal del día en que el rango deja de estar libre.
+
+        Returns:
+            list: Solicitudes asignadas, sin solaparse entre sí.
+        """
+        asignadas = []
+        with self._bloqueo:
+            if grupo not in self._inicios:
+                return asignadas
+            tramos = [(inicio, fin)]
+            while tramos:
+                desde, hasta = tramos.pop()
+                mejor = self._mejor(grupo, desde, hasta)
+                if mejor is None:
+                    continue
+                _, _, codigo = heapq.heappop(self._colas[mejor])
+                solicitud = self._solicitudes.pop(codigo)
+                asignadas.append(solicitud)
+                self._limpiar(mejor)
+                if desde < solicitud.inicio:
+                    tramos.append((desde, solicitud.inicio))
+                if solicitud.fin < hasta:
+                    tramos.append((solicitud.fin, hasta))
+        return asignadas
+
+    def _mejor(self, grupo, desde, hasta):
+        """
+        Busca la estancia con la solicitud de mayor prioridad que cabe en un rango.
+
+        Debe llamarse con el bloqueo tomado.
+
+        Args:
+            grupo (tuple): Grupo de la habitación.
+            desde (int): Ordinal del primer día libre.
+            hasta (int): Ordinal del día en que el rango deja de estar libre.
+
+        Returns:
+            tuple: Clave (grupo, inicio, fin) de la mejor cola, o None si ninguna cabe.
+        """
+        inicios = self._inicios.get(grupo)
+        if not inicios:
+            return None
+        mejor = None
+        cima_mejor = None
+        for inicio in inicios[bisect_left(inicios, desde):bisect_left(inicios, hasta)]:
+            fines = self._fines[(grupo, inicio)]
+            for fin in fines[:bisect_right(fines, hasta)]:
+                clave = (grupo, inicio, fin)
+                cima = self._cima(clave)
+                if cima is not None and (cima_mejor is None or cima < cima_mejor):
+                    mejor, cima_mejor = clave, cima
+        return mejor
+
+    def _cima(self, clave):
+        """
+        Devuelve la entrada vigente de mayor prioridad de una cola.
+
+        Descarta las entradas de solicitudes retiradas y elimina la cola si
+        queda vacía. Debe llamarse con el bloqueo tomado.
+
+        Args:
+            clave (tuple): Clave (grupo, inicio, fin) de la cola.
+
+        Returns:
+            tuple: Entrada (-prioridad, orden, código), o None si la cola está vacía.
+        """
+        cola = self._colas[clave]
+        while cola and cola[0][2] not in self._solicitudes:
+            heapq.heappop(cola)
+        if not cola:
+            self._limpiar(clave)
+            return None
+        return cola[0]
+
+    def _limpiar(self, clave):
+        """
+        Elimina una cola vacía y sus entradas en los índices de inicio y salida.
+
+        Debe llamarse con el bloqueo tomado.
+
+        Args:
+            clave (tuple): Clave (grupo, inicio, fin) de la cola.
+        """
+        if self._colas.get(clave):
+            return
+        grupo, inicio, fin = clave
+        self._colas.pop(clave, None)
+        fines = self._fines[(grupo, inicio)]
+        fines.pop(bisect_left(fines, fin))
+        if not fines:
+            del self._fines[(grupo, inicio)]
+            inicios = self._inicios[grupo]
+            inicios.pop(bisect_left(inicios, inicio))
+            if not inicios:
+                del self._inicios[grupo]
+
+    def pendientes(self, grupo=None):
+        """
+        Lista las solicitudes en espera.
+
+        Args:
+            grupo (tuple, optional): Solo las de este grupo (cubierta normalizada, acomodación).
+
+        Returns:
+            list: Solicitudes en espera, en el orden en que se agregaron.
+        """
+        with self._bloqueo:
+            return [solicitud for solicitud in self._solicitudes.values() if grupo is None or solicitud.grupo == grupo]
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de solicitudes en espera.
+
+        Returns:
+            int: Número de solicitudes en espera.
+        """
+        return len(self._solicitudes)
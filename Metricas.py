@@ -0,0 +1,423 @@
+"""
+Módulo que define las métricas de operación del sistema de reservas.
+
+Las métricas son opcionales: un Crucero no mide nada hasta que se instrumenta
+con Metricas.instrumentar, que reemplaza los métodos de esa instancia por
+versiones que registran su latencia y su resultado. Sin instrumentar, las
+llamadas van directamente a los métodos originales y no tienen ningún costo
+adicional.
+
+Se registran:
+
+- Histogramas de latencia por operación.
+- Contadores de llamadas por operación y resultado (exito, fallo, error).
+- Indicadores de ocupación y de aciertos de caché, calculados al exportar.
+
+Las métricas se exportan en el formato de texto de Prometheus o como un
+diccionario serializable a JSON.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from Normalizar import normalizar_texto_cacheado
+
+# Límites superiores (en segundos) de los intervalos de los histogramas
+LIMITES_LATENCIA = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+                    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Métodos de Crucero que se miden al instrumentar
+OPERACIONES_CRUCERO = (
+    "crear_reserva", "crear_reservas_lote", "cancelar_reserva", "archivar_finalizadas",
+    "listar_habitaciones_disponibles", "contar_habitaciones_disponibles", "buscar_habitacion",
+    "buscar_usuario", "registrar_usuario", "registrar_usuarios", "obtener_info_reserva",
+    "listar_todas_reservas", "calcular_costo_reserva", "cotizar_lote", "_registrar_operacion",
+    "retener_habitacion", "confirmar_retencion", "esperar_reserva",
+    "buscar_usuarios_similares", "sellar_historial", "buscar_reserva_archivada",
+)
+
+# Operaciones que no devuelven nada: cuentan siempre como éxito si no fallan
+OPERACIONES_SIN_RESULTADO = frozenset({"_registrar_operacion"})
+
+class Histograma:
+    """
+    Histograma de valores con intervalos fijos.
+
+    Attributes:
+        limites (tuple): Límite superior de cada intervalo.
+        conteos (list): Observaciones de cada intervalo (el último es +Inf).
+        suma (float): Suma de todas las observaciones.
+        cantidad (int): Cantidad de observaciones.
+    """
+
+    __slots__ = ("limites", "conteos", "suma", "cantidad")
+
+    def __init__(self, limites=LIMITES_LATENCIA):
+        """
+        Inicializa un histograma vacío.
+
+        Args:
+            limites (tuple, optional): Límites superiores ordenados.
+        """
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.cantidad = 0
+
+    def observar(self, valor):
+        """
+        Registra una observación.
+
+        Args:
+            valor (float): Valor observado.
+        """
+        self.conteos[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.cantidad += 1
+
+    def acumulados(self):
+        """
+        Calcula los conteos acumulados por límite, como los exporta Prometheus.
+
+        Returns:
+            list: Tuplas (límite, observaciones menores o iguales), terminando en +Inf.
+        """
+        acumulado = 0
+        resultado = []
+        for limite, conteo in zip(self.limites + (float("inf"),), self.conteos):
+            acumulado += conteo
+            resultado.append((limite, acumulado))
+        return resultado
+
+    def percentil(self, porcentaje):
+        """
+        Estima un percentil como el límite del intervalo que lo contiene.
+
+        Args:
+            porcentaje (float): Percentil a estimar (0-100).
+
+        Returns:
+            float: Límite superior del intervalo, o None si no hay observaciones.
+        """
+        if not self.cantidad:
+            return None
+        objetivo = self.cantidad * porcentaje / 100
+        for limite, acumulado in self.acumulados():
+            if acumulado >= objetivo:
+                return limite
+        return float("inf")
+
+def _formato_numero(valor):
+    """
+    Formatea un número como lo espera el formato de texto de Prometheus.
+
+    Args:
+        valor (float): Valor a formatear.
+
+    Returns:
+        str: Valor formateado.
+    """
+    if valor == float("inf"):
+        return "+Inf"
+    if isinstance(valor, float) and valor.is_integer() and abs(valor) < 1e15:
+        return str(int(valor))
+    return repr(valor)
+
+def _etiquetas(etiquetas):
+    """
+    Formatea las etiquetas de una muestra de Prometheus.
+
+    Args:
+        etiquetas (tuple): Pares (nombre, valor).
+
+    Returns:
+        str: Etiquetas entre llaves, o cadena vacía si no hay.
+    """
+    if not etiquetas:
+        return ""
+    pares = ",".join(f'{nombre}="{str(valor).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                     for nombre, valor in etiquetas)
+    return "{" + pares + "}"
+
+class Metricas:
+    """
+    Registro de contadores, histogramas e indicadores.
+
+    Attributes:
+        prefijo (str): Prefijo de los nombres de las métricas exportadas.
+        etiquetas (tuple): Etiquetas comunes a todas las muestras (por ejemplo
+            el barco y la salida).
+    """
+
+    def __init__(self, prefijo="crucero", etiquetas=None):
+        """
+        Inicializa un registro de métricas vacío.
+
+        Args:
+            prefijo (str, optional): Prefijo de los nombres. Por defecto "crucero".
+            etiquetas (dict, optional): Etiquetas comunes a todas las muestras.
+        """
+        self.prefijo = prefijo
+        self.etiquetas = tuple(sorted((etiquetas or {}).items()))
+        self._contadores = {}
+        self._histogramas = {}
+        self._operaciones = {}
+        self._indicadores = {}
+        self._descripciones = {}
+        self._bloqueo = threading.Lock()
+        self._instrumentados = {}
+
+    def describir(self, nombre, descripcion):
+        """
+        Asocia una descripción a una métrica, exportada como HELP.
+
+        Args:
+            nombre (str): Nombre de la métrica, sin prefijo.
+            descripcion (str): Descripción de la métrica.
+        """
+        self._descripciones[nombre] = descripcion
+
+    def incrementar(self, nombre, cantidad=1, **etiquetas):
+        """
+        Incrementa un contador.
+
+        Args:
+            nombre (str): Nombre del contador, sin prefijo.
+            cantidad (int, optional): Incremento. Por defecto 1.
+            **etiquetas: Etiquetas de la muestra.
+        """
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._bloqueo:
+            self._contadores[clave] = self._contadores.get(clave, 0) + cantidad
+
+    def observar(self, nombre, valor, **etiquetas):
+        """
+        Registra una observación en un histograma.
+
+        Args:
+            nombre (str): Nombre del histograma, sin prefijo.
+            valor (float): Valor observado.
+            **etiquetas: Etiquetas de la muestra.
+        """
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._bloqueo:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = Histograma()
+            histograma.observar(valor)
+
+    def registrar_indicador(self, nombre, funcion, **etiquetas):
+        """
+        Registra un indicador cuyo valor se calcula al exportar.
+
+        Args:
+            nombre (str): Nombre del indicador, sin prefijo.
+            funcion (callable): Función sin argumentos que devuelve el valor.
+            **etiquetas: Etiquetas de la muestra.
+        """
+        self._indicadores[(nombre, tuple(sorted(etiquetas.items())))] = funcion
+
+    def _operacion(self, operacion):
+        """
+        Obtiene el histograma y los contadores de resultados de una operación.
+
+        Args:
+            operacion (str): Nombre de la operación.
+
+        Returns:
+            tuple: (Histograma, lista de conteos [exito, fallo, error]).
+        """
+        with self._bloqueo:
+            datos = self._operaciones.get(operacion)
+            if datos is None:
+                datos = self._operaciones[operacion] = (Histograma(), [0, 0, 0])
+        return datos
+
+    def medir(self, operacion, funcion, con_resultado=True):
+        """
+        Envuelve una función para medir su latencia y contar sus resultados.
+
+        Una llamada cuenta como error si lanza una excepción y, si la función
+        tiene resultado, como fallo si devuelve None o False. El histograma y
+        los contadores se resuelven al envolver, de modo que cada llamada solo
+        toma el reloj dos veces y actualiza tres enteros bajo el bloqueo.
+
+        Args:
+            operacion (str): Nombre de la operación.
+            funcion (callable): Función a medir.
+            con_resultado (bool, optional): Distinguir éxito y fallo por el
+                valor devuelto. Por defecto True.
+
+        Returns:
+            callable: Función envuelta.
+        """
+        histograma, resultados = self._operacion(operacion)
+        limites, conteos = histograma.limites, histograma.conteos
+        bloqueo = self._bloqueo
+        reloj = time.perf_counter
+
+        def registrar(inicio, indice):
+            duracion = reloj() - inicio
+            with bloqueo:
+                conteos[bisect_left(limites, duracion)] += 1
+                histograma.suma += duracion
+                histograma.cantidad += 1
+                resultados[indice] += 1
+
+        @wraps(funcion)
+        def medida(*argumentos, **opciones):
+            inicio = reloj()
+            try:
+                resultado = funcion(*argumentos, **opciones)
+            except BaseException:
+                registrar(inicio, 2)
+                raise
+            registrar(inicio, 1 if con_resultado and (resultado is None or resultado is False) else 0)
+            return resultado
+
+        return medida
+
+    def instrumentar(self, crucero, operaciones=OPERACIONES_CRUCERO):
+        """
+        Activa las métricas de un crucero.
+
+        Reemplaza los métodos indicados de esa instancia (no de la clase) por
+        versiones medidas, y registra indicadores de ocupación y de la caché de
+        normalización.
+
+        Args:
+            crucero (Crucero): Crucero a instrumentar.
+            operaciones (tuple, optional): Nombres de los métodos a medir.
+
+        Returns:
+            Crucero: El mismo crucero, para encadenar llamadas.
+        """
+        if id(crucero) in self._instrumentados:
+            return crucero
+        for operacion in operaciones:
+            nombre = operacion.lstrip("_")
+            setattr(crucero, operacion, self.medir(nombre, getattr(crucero, operacion),
+                                                   operacion not in OPERACIONES_SIN_RESULTADO))
+        self._instrumentados[id(crucero)] = (crucero, tuple(operaciones))
+
+        self.describir("operacion_segundos", "Latencia de las operaciones de Crucero en segundos.")
+        self.describir("operaciones_total", "Llamadas a las operaciones de Crucero por resultado.")
+        self.registrar_indicador("habitaciones", lambda: len(crucero.habitaciones))
+        self.registrar_indicador("habitaciones_disponibles",
+                                 lambda: crucero._indice_disponibilidad.contar())
+        self.registrar_indicador("ocupacion_ratio", lambda: 1 - crucero._indice_disponibilidad.contar()
+                                 / max(len(crucero.habitaciones), 1))
+        self.registrar_indicador("reservas_activas", lambda: len(crucero._indice_reservas))
+        self.registrar_indicador("reservas_archivadas", lambda: len(crucero.historial))
+        self.registrar_indicador("usuarios", lambda: len(crucero.usuarios))
+        self.registrar_indicador("cache_normalizar_aciertos", lambda: normalizar_texto_cacheado.cache_info().hits)
+        self.registrar_indicador("cache_normalizar_fallos", lambda: normalizar_texto_cacheado.cache_info().misses)
+        self.describir("ocupacion_ratio", "Fracción de habitaciones con al menos una reserva.")
+        return crucero
+
+    def desinstrumentar(self, crucero):
+        """
+        Desactiva las métricas de un crucero, restaurando sus métodos originales.
+
+        Args:
+            crucero (Crucero): Crucero instrumentado con este registro.
+        """
+        _, operaciones = self._instrumentados.pop(id(crucero), (None, ()))
+        for operacion in operaciones:
+            crucero.__dict__.pop(operacion, None)
+
+    def _muestras(self):
+        """
+        Toma una copia consistente de contadores e histogramas y calcula los indicadores.
+
+        Returns:
+            tuple: (contadores, histogramas, indicadores).
+        """
+        with self._bloqueo:
+            contadores = dict(self._contadores)
+            histogramas = {clave: (histograma.acumulados(), histograma.suma, histograma.cantidad)
+                           for clave, histograma in self._histogramas.items()}
+            for operacion, (histograma, resultados) in self._operaciones.items():
+                etiqueta = (("operacion", operacion),)
+                if histograma.cantidad:
+                    histogramas[("operacion_segundos", etiqueta)] = (histograma.acumulados(), histograma.suma,
+                                                                     histograma.cantidad)
+                for resultado, cantidad in zip(("exito", "fallo", "error"), resultados):
+                    if cantidad:
+                        contadores[("operaciones_total", etiqueta + (("resultado", resultado),))] = cantidad
+        indicadores = {clave: funcion() for clave, funcion in list(self._indicadores.items())}
+        return contadores, histogramas, indicadores
+
+    def a_prometheus(self):
+        """
+        Exporta las métricas en el formato de texto de Prometheus.
+
+        Returns:
+            str: Métricas en formato de exposición de Prometheus (versión 0.0.4).
+        """
+        contadores, histogramas, indicadores = self._muestras()
+        lineas = []
+        tipos_escritos = set()
+
+        def cabecera(nombre, tipo):
+            if nombre in tipos_escritos:
+                return
+            tipos_escritos.add(nombre)
+            descripcion = self._descripciones.get(nombre)
+            if descripcion:
+                lineas.append(f"# HELP {self.prefijo}_{nombre} {descripcion}")
+            lineas.append(f"# TYPE {self.prefijo}_{nombre} {tipo}")
+
+        for (nombre, etiquetas), valor in sorted(contadores.items()):
+            cabecera(nombre, "counter")
+            lineas.append(f"{self.prefijo}_{nombre}{_etiquetas(self.etiquetas + etiquetas)} {_formato_numero(valor)}")
+        for (nombre, etiquetas), (acumulados, suma, cantidad) in sorted(histogramas.items()):
+            cabecera(nombre, "histogram")
+            base = self.etiquetas + etiquetas
+            for limite, acumulado in acumulados:
+                lineas.append(f"{self.prefijo}_{nombre}_bucket{_etiquetas(base + (('le', _formato_numero(limite)),))} "
+                              f"{acumulado}")
+            lineas.append(f"{self.prefijo}_{nombre}_sum{_etiquetas(base)} {_formato_numero(suma)}")
+            lineas.append(f"{self.prefijo}_{nombre}_count{_etiquetas(base)} {cantidad}")
+        for (nombre, etiquetas), valor in sorted(indicadores.items()):
+            cabecera(nombre, "gauge")
+            lineas.append(f"{self.prefijo}_{nombre}{_etiquetas(self.etiquetas + etiquetas)} {_formato_numero(valor)}")
+        return "\n".join(lineas) + "\n"
+
+    def a_dict(self):
+        """
+        Exporta las métricas como un diccionario serializable a JSON.
+
+        Returns:
+            dict: Contadores, histogramas (con p50 y p99 estimados) e
+                indicadores, cada uno como lista de muestras con sus etiquetas.
+        """
+        contadores, histogramas, indicadores = self._muestras()
+        comunes = dict(self.etiquetas)
+        resultado = {"contadores": [], "histogramas": [], "indicadores": []}
+        for (nombre, etiquetas), valor in sorted(contadores.items()):
+            resultado["contadores"].append({"nombre": nombre, "etiquetas": {**comunes, **dict(etiquetas)},
+                                            "valor": valor})
+        for (nombre, etiquetas), (acumulados, suma, cantidad) in sorted(histogramas.items()):
+            histograma = Histograma()
+            anterior = 0
+            for posicion, (_, acumulado) in enumerate(acumulados):
+                histograma.conteos[posicion] = acumulado - anterior
+                anterior = acumulado
+            histograma.cantidad = cantidad
+            resultado["histogramas"].append({
+                "nombre": nombre,
+                "etiquetas": {**comunes, **dict(etiquetas)},
+                "cantidad": cantidad,
+                "suma": suma,
+                "p50": histograma.percentil(50),
+                "p99": histograma.percentil(99),
+                "intervalos": [[None if limite == float("inf") else limite, acumulado]
+                               for limite, acumulado in acumulados],
+            })
+        for (nombre, etiquetas), valor in sorted(indicadores.items()):
+            resultado["indicadores"].append({"nombre": nombre, "etiquetas": {**comunes, **dict(etiquetas)},
+                                             "valor": valor})
+        return resultado
@@ -6,37 +6,97 @@ y convirtiendo a minúsculas para facilitar comparaciones no sensibles a
 estos detalles.
 """
 
+import unicodedata
+from functools import lru_cache
+
+def _construir_tabla_acentos():
+    """
+    Construye la tabla de traducción de letras latinas acentuadas.
+
+    Recorre los bloques Latin-1 y Latin Extendido (A y B) y asocia cada letra
+    que se descompone en una letra base más marcas diacríticas con su letra
+    base, por ejemplo 'á' -> 'a', 'ñ' -> 'n' o 'ő' -> 'o'.
+
+    Returns:
+        dict: Tabla para str.translate.
+    """
+    tabla = {}
+    for codigo in range(0x00C0, 0x0250):
+        caracter = chr(codigo)
+        base = "".join(c for c in unicodedata.normalize("NFKD", caracter) if not unicodedata.combining(c))
+        if base and base != caracter and base.isascii():
+            tabla[codigo] = base
+    return tabla
+
+# Tabla precalculada una sola vez al importar el módulo
+_TABLA_ACENTOS = _construir_tabla_acentos()
+
+# Acentos que se reemplazan en bloque antes de usar la tabla, en grupos: si
+# tras un grupo el texto ya es ASCII, no se buscan los siguientes. str.replace
+# recorre el texto en C, mientras que str.translate consulta la tabla por cada
+# carácter y es varias veces más lento en textos largos con acentos.
+_GRUPOS_ACENTOS = (
+    # Español
+    (('á', 'a'), ('é', 'e'), ('í', 'i'), ('ó', 'o'), ('ú', 'u'), ('ñ', 'n'), ('ü', 'u')),
+    # Otros frecuentes
+    (('à', 'a'), ('è', 'e'), ('ì', 'i'), ('ò', 'o'), ('ù', 'u'),
+     ('ä', 'a'), ('ë', 'e'), ('ï', 'i'), ('ö', 'o'),
+     ('â', 'a'), ('ê', 'e'), ('î', 'i'), ('ô', 'o'), ('û', 'u'), ('ã', 'a')),
+)
+
 def normalizar_texto(texto):
     """
     Normaliza un texto eliminando acentos y convirtiéndolo a minúsculas.
-    
+
     Esta función normaliza el texto para hacer búsquedas y comparaciones
-    no sensibles a acentos y mayúsculas/minúsculas.
-    
+    no sensibles a acentos y mayúsculas/minúsculas. Los acentos de letras
+    latinas se eliminan reemplazando en bloque los más frecuentes y luego,
+    si queda alguno, con una tabla de traducción precalculada; cualquier otra
+    marca diacrítica se elimina mediante la descomposición NFKD.
+
     Args:
         texto (str): Texto a normalizar.
-        
+
     Returns:
         str: Texto normalizado (sin acentos y en minúsculas).
     """
     # Si el texto es None o vacío, devolver como está
     if not texto:
         return texto
-    
-    # Convertir a minúsculas
+
+    # Convertir a minúsculas; el texto ASCII ya no tiene acentos
     texto = texto.lower()
-    
-    # Diccionario de caracteres acentuados y sus equivalentes sin acento
-    acentos = {
-        'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u',
-        'à': 'a', 'è': 'e', 'ì': 'i', 'ò': 'o', 'ù': 'u',
-        'ä': 'a', 'ë': 'e', 'ï': 'i', 'ö': 'o', 'ü': 'u',
-        'â': 'a', 'ê': 'e', 'î': 'i', 'ô': 'o', 'û': 'u',
-        'ã': 'a', 'ñ': 'n'
-    }
-    
-    # Reemplazar cada caracter acentuado por su equivalente sin acento
-    for acento, normal in acentos.items():
-        texto = texto.replace(acento, normal)
-    
-    return texto
\ No newline at end of file
+    if texto.isascii():
+        return texto
+
+    # Reemplazar en bloque los acentos frecuentes, sin comprobar antes si
+    # están: buscarlos cuesta lo mismo que reemplazarlos
+    for grupo in _GRUPOS_ACENTOS:
+        for acento, normal in grupo:
+            texto = texto.replace(acento, normal)
+        if texto.isascii():
+            return texto
+
+    # Reemplazar en una sola pasada los demás caracteres latinos acentuados
+    texto = texto.translate(_TABLA_ACENTOS)
+    if texto.isascii():
+        return texto
+
+    # Eliminar las marcas diacríticas restantes
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+@lru_cache(maxsize=4096)
+def normalizar_texto_cacheado(texto):
+    """
+    Versión de normalizar_texto que guarda los resultados recientes.
+
+    Pensada para textos que se repiten mucho, como los nombres de cubierta o
+    las respuestas de confirmación del menú.
+
+    Args:
+        texto (str): Texto a normalizar.
+
+    Returns:
+        str: Texto normalizado (sin acentos y en minúsculas).
+    """
+    return normalizar_texto(texto)
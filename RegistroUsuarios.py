@@ -0,0 +1,199 @@
+"""
+Módulo que define el registro de usuarios del sistema de reservas.
+
+Este módulo implementa el registro que mantiene los usuarios indexados por
+código, por nombre normalizado y por trigramas del nombre, junto con los vínculos entre cada usuario y
+su reserva activa en ambos sentidos.
+"""
+
+import threading
+
+from IndiceNombres import SIMILITUD_MINIMA, IndiceTrigramas
+from Normalizar import normalizar_texto
+from Usuario import normalizar_codigo_usuario
+
+class RegistroUsuarios:
+    """
+    Registro de usuarios con búsqueda por código y por nombre.
+
+    Los códigos se convierten a su forma canónica antes de cualquier búsqueda,
+    por lo que "U7", "U07" y "U007" encuentran al mismo usuario. Cada usuario
+    conoce el código de su reserva (Usuario.reserva) y el registro conoce los
+    usuarios de cada reserva, de modo que asociar o liberar los N pasajeros de
+    una reserva es O(N).
+
+    Attributes:
+        _por_codigo (dict): Usuarios por código canónico.
+        _por_nombre (dict): Usuarios por nombre normalizado, agrupados por código.
+        _por_reserva (dict): Usuarios vinculados a cada código de reserva.
+        _trigramas (IndiceTrigramas): Índice para la búsqueda aproximada por nombre.
+        _bloqueo (threading.Lock): Protege los índices secundarios.
+    """
+
+    def __init__(self):
+        """
+        Inicializa un registro de usuarios vacío.
+        """
+        self._por_codigo = {}
+        self._por_nombre = {}
+        self._por_reserva = {}
+        self._trigramas = IndiceTrigramas()
+        self._bloqueo = threading.Lock()
+
+    @staticmethod
+    def codigo_canonico(codigo):
+        """
+        Convierte un código de usuario a su forma canónica.
+
+        Args:
+            codigo (str): Código de usuario (None para las vacantes).
+
+        Returns:
+            str: Código canónico, o None para las vacantes.
+        """
+        return normalizar_codigo_usuario(codigo) if codigo else None
+
+    def registrar(self, usuario):
+        """
+        Agrega un usuario al registro.
+
+        Args:
+            usuario (Usuario): Usuario a registrar.
+
+        Returns:
+            bool: True si se registró, False si ya existía un usuario con ese código.
+        """
+        with self._bloqueo:
+            if self._por_codigo.setdefault(usuario.codigo, usuario) is not usuario:
+                return False
+            self._por_nombre.setdefault(normalizar_texto(usuario.nombre), {})[usuario.codigo] = usuario
+            self._trigramas.agregar(usuario)
+        return True
+
+    def buscar(self, codigo):
+        """
+        Busca un usuario por su código.
+
+        Args:
+            codigo (str): Código del usuario, en cualquier forma equivalente.
+
+        Returns:
+            Usuario: Usuario encontrado o None si no existe.
+        """
+        if not codigo:
+            return None
+        usuario = self._por_codigo.get(codigo)
+        if usuario is None:
+            usuario = self._por_codigo.get(normalizar_codigo_usuario(codigo))
+        return usuario
+
+    def buscar_por_nombre(self, nombre):
+        """
+        Busca los usuarios con un nombre, sin distinguir acentos ni mayúsculas.
+
+        Args:
+            nombre (str): Nombre a buscar.
+
+        Returns:
+            list: Usuarios con ese nombre, en orden de registro.
+        """
+        return list(self._por_nombre.get(normalizar_texto(nombre), {}).values())
+
+    def buscar_similares(self, nombre, limite=10, similitud_minima=SIMILITUD_MINIMA):
+        """
+        Busca los usuarios con nombres parecidos, tolerando errores de escritura.
+
+        No distingue acentos, mayúsculas, signos de puntuación ni el orden de
+        las palabras, así que "Muñoz, José" encuentra a "Jose Munoz".
+
+        Args:
+            nombre (str): Nombre o parte del nombre a buscar.
+            limite (int, optional): Cantidad máxima de resultados.
+            similitud_minima (float, optional): Proporción mínima (entre 0 y 1)
+                de la consulta que debe coincidir con el nombre.
+
+        Returns:
+            list: Tuplas (puntuación, usuario), de la más parecida a la menos.
+        """
+        return self._trigramas.buscar(nombre, limite, similitud_minima)
+
+    def vincular(self, reserva):
+        """
+        Asocia una reserva a los usuarios registrados que la componen.
+
+        Args:
+            reserva (Reserva): Reserva a asociar.
+
+        Returns:
+            list: Usuarios vinculados a la reserva.
+        """
+        usuarios = []
+        for codigo_usuario in reserva.codigos_usuarios:
+            usuario = self.buscar(codigo_usuario)
+            if usuario and usuario.agregar_reserva(reserva.codigo_reserva):
+                usuarios.append(usuario)
+        if usuarios:
+            self._por_reserva[reserva.codigo_reserva] = usuarios
+        return usuarios
+
+    def desvincular(self, codigo_reserva, fecha_salida=None):
+        """
+        Libera a los usuarios de una reserva.
+
+        Args:
+            codigo_reserva (str): Código de la reserva.
+            fecha_salida (date, optional): Fecha de salida a registrar en los
+                usuarios, si la reserva terminó.
+
+        Returns:
+            list: Usuarios que estaban vinculados a la reserva.
+        """
+        usuarios = self._por_reserva.pop(codigo_reserva, [])
+        for usuario in usuarios:
+            if usuario.obtener_reserva() == codigo_reserva:
+                usuario.cancelar_reserva()
+                if fecha_salida is not None:
+                    usuario.fecha_salida = fecha_salida
+        return usuarios
+
+    def usuarios_de_reserva(self, codigo_reserva):
+        """
+        Obtiene los usuarios vinculados a una reserva activa.
+
+        Args:
+            codigo_reserva (str): Código de la reserva.
+
+        Returns:
+            list: Usuarios de la reserva (vacía si no tiene o no existe).
+        """
+        return list(self._por_reserva.get(codigo_reserva, ()))
+
+    def usuarios(self):
+        """
+        Obtiene una copia de los usuarios registrados.
+
+        Returns:
+            list: Usuarios en orden de registro.
+        """
+        return list(self._por_codigo.values())
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de usuarios registrados.
+
+        Returns:
+            int: Número de usuarios.
+        """
+        return len(self._por_codigo)
+
+    def __contains__(self, codigo):
+        """
+        Indica si un código de usuario está registrado.
+
+        Args:
+            codigo (str): Código del usuario.
+
+        Returns:
+            bool: True si el usuario existe.
+        """
+        return self.buscar(codigo) is not None
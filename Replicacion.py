@@ -0,0 +1,486 @@
+"""
+Módulo que define el flujo de cambios del crucero y sus réplicas de lectura.
+
+El crucero primario publica cada operación que guarda en su almacenamiento
+(usuarios, reservas, cancelaciones, lotes y archivos) y cada cambio de
+disponibilidad de una habitación en un flujo ordenado: cada cambio lleva un
+número de secuencia y el instante en que se publicó.
+
+Las réplicas se conectan por un socket local, piden los cambios desde su
+última secuencia y los aplican sobre una copia de solo lectura del crucero.
+Si la réplica es nueva o se atrasó más de lo que guarda el flujo, primero
+recibe una instantánea del estado y sigue desde ella. El protocolo es de una
+línea JSON por mensaje, por lo que una réplica también puede leer de una
+tubería o de cualquier archivo (Replica.consumir).
+
+Uso:
+    python Servidor.py --replicacion 9090             # primario
+    python Replicacion.py --primario 127.0.0.1:9090 --puerto 8081
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import deque
+from itertools import islice
+
+from Almacenamiento import Almacenamiento
+from Crucero import Crucero
+from Metricas import Metricas
+
+# Cantidad de cambios recientes que guarda el flujo para las réplicas atrasadas
+CAPACIDAD_FLUJO = 100000
+
+# Segundos sin cambios tras los que el primario envía un latido
+LATIDO = 1.0
+
+def _linea(mensaje):
+    """
+    Codifica un mensaje del protocolo como una línea JSON.
+
+    Args:
+        mensaje (dict): Mensaje a codificar.
+
+    Returns:
+        bytes: Línea terminada en salto de línea.
+    """
+    return (json.dumps(mensaje, ensure_ascii=False) + "\n").encode("utf-8")
+
+class FlujoCambios:
+    """
+    Flujo ordenado de los cambios de un crucero primario.
+
+    Guarda los últimos cambios ya codificados, para enviarlos a cualquier
+    cantidad de réplicas sin volver a serializarlos.
+
+    Attributes:
+        crucero (Crucero): Crucero que publica los cambios.
+        identificador (str): Identificador del flujo; cambia al reiniciar el
+            primario, y con él la numeración de las secuencias.
+        secuencia (int): Secuencia del último cambio publicado.
+        suscriptores (int): Réplicas conectadas.
+    """
+
+    def __init__(self, crucero, capacidad=CAPACIDAD_FLUJO):
+        """
+        Crea el flujo y lo conecta al crucero.
+
+        Args:
+            crucero (Crucero): Crucero primario.
+            capacidad (int, optional): Cambios recientes que se guardan.
+        """
+        self.crucero = crucero
+        self.identificador = uuid.uuid4().hex
+        self.secuencia = 0
+        self.suscriptores = 0
+        self._recientes = deque(maxlen=capacidad)
+        self._condicion = threading.Condition()
+        crucero.conectar_flujo(self)
+
+    def publicar(self, operacion):
+        """
+        Publica una operación del almacenamiento o un cambio de disponibilidad.
+
+        Crucero la llama bajo el bloqueo del almacenamiento, en el orden en
+        que registra las operaciones.
+
+        Args:
+            operacion (dict): Operación con la clave "op" y sus datos.
+        """
+        self._agregar(dict(operacion))
+
+    def _agregar(self, cambio):
+        """
+        Numera un cambio, lo guarda y despierta a las réplicas que esperan.
+
+        Args:
+            cambio (dict): Cambio a publicar.
+        """
+        with self._condicion:
+            self.secuencia += 1
+            cambio["secuencia"] = self.secuencia
+            cambio["instante"] = time.time()
+            self._recientes.append(_linea(cambio))
+            self._condicion.notify_all()
+
+    def cambios_desde(self, secuencia):
+        """
+        Obtiene los cambios posteriores a una secuencia.
+
+        Args:
+            secuencia (int): Última secuencia que tiene la réplica.
+
+        Returns:
+            list: Líneas codificadas de los cambios, o None si ya no están
+                todos en el flujo y la réplica necesita una instantánea.
+        """
+        with self._condicion:
+            faltantes = self.secuencia - secuencia
+            if faltantes < 0 or faltantes > len(self._recientes):
+                return None
+            lineas = list(islice(reversed(self._recientes), faltantes))
+        lineas.reverse()
+        return lineas
+
+    def esperar(self, secuencia, segundos):
+        """
+        Espera a que se publique un cambio posterior a una secuencia.
+
+        Args:
+            secuencia (int): Última secuencia conocida.
+            segundos (float): Espera máxima.
+
+        Returns:
+            bool: True si hay cambios nuevos.
+        """
+        with self._condicion:
+            return self._condicion.wait_for(lambda: self.secuencia > secuencia, segundos)
+
+    def instantanea(self):
+        """
+        Genera una instantánea del estado junto con la secuencia que le corresponde.
+
+        Se toma bajo el bloqueo del almacenamiento, así que ninguna operación se
+        publica mientras tanto. Una operación en curso puede quedar reflejada en
+        la instantánea y llegar además como cambio: aplicarla de nuevo no tiene
+        efecto.
+
+        Returns:
+            tuple: (secuencia, estado con el formato de exportar_estado).
+        """
+        def secuencia_actual():
+            with self._condicion:
+                return self.secuencia
+        return self.crucero.exportar_estado_publicado(secuencia_actual)
+
+    def registrar_metricas(self, metricas):
+        """
+        Agrega los indicadores del flujo a unas métricas.
+
+        Args:
+            metricas (Metricas): Métricas donde registrar los indicadores.
+        """
+        metricas.describir("flujo_secuencia", "Secuencia del último cambio publicado.")
+        metricas.registrar_indicador("flujo_secuencia", lambda: self.secuencia)
+        metricas.describir("flujo_suscriptores", "Réplicas conectadas al flujo de cambios.")
+        metricas.registrar_indicador("flujo_suscriptores", lambda: self.suscriptores)
+
+    def cerrar(self):
+        """
+        Desconecta el flujo del crucero.
+        """
+        self.crucero.desconectar_flujo()
+
+class _AtenderReplica(socketserver.StreamRequestHandler):
+    """
+    Envía el flujo de cambios a una réplica conectada.
+    """
+
+    def handle(self):
+        """
+        Atiende la conexión hasta que la réplica se desconecte o el publicador se detenga.
+        """
+        flujo = self.server.flujo
+        try:
+            pedido = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            return
+        secuencia = pedido.get("desde")
+        if pedido.get("flujo") != flujo.identificador:
+            secuencia = None
+        with flujo._condicion:
+            flujo.suscriptores += 1
+        try:
+            while not self.server.detenido:
+                lineas = flujo.cambios_desde(secuencia) if secuencia is not None else None
+                if lineas is None:
+                    secuencia, estado = flujo.instantanea()
+                    self.wfile.write(_linea({"tipo": "instantanea", "flujo": flujo.identificador,
+                                             "secuencia": secuencia, "estado": estado}))
+                elif lineas:
+                    self.wfile.write(b"".join(lineas))
+                    secuencia += len(lineas)
+                elif not flujo.esperar(secuencia, LATIDO):
+                    self.wfile.write(_linea({"tipo": "latido", "secuencia": flujo.secuencia,
+                                             "instante": time.time()}))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with flujo._condicion:
+                flujo.suscriptores -= 1
+
+class PublicadorCambios(socketserver.ThreadingTCPServer):
+    """
+    Servidor que publica un flujo de cambios a las réplicas, un hilo por réplica.
+
+    Attributes:
+        flujo (FlujoCambios): Flujo que se publica.
+        host (str): Dirección de escucha.
+        puerto (int): Puerto de escucha (el real, si se pidió el 0).
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, flujo, host="127.0.0.1", puerto=9090):
+        """
+        Crea el publicador y abre el puerto, sin empezar a atender.
+
+        Args:
+            flujo (FlujoCambios): Flujo a publicar.
+            host (str, optional): Dirección de escucha.
+            puerto (int, optional): Puerto de escucha; 0 elige uno libre.
+        """
+        super().__init__((host, puerto), _AtenderReplica)
+        self.flujo = flujo
+        self.detenido = False
+        self.host, self.puerto = self.server_address[:2]
+        self._hilo = None
+
+    def iniciar(self):
+        """
+        Empieza a atender réplicas en un hilo propio.
+        """
+        self._hilo = threading.Thread(target=self.serve_forever, name="publicador-cambios", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """
+        Deja de atender réplicas y cierra el puerto.
+        """
+        self.detenido = True
+        self.shutdown()
+        self.server_close()
+
+class _AlmacenamientoInstantanea(Almacenamiento):
+    """
+    Almacenamiento en memoria que parte de una instantánea recibida.
+    """
+
+    def __init__(self, estado):
+        """
+        Args:
+            estado (dict): Estado con el formato de estado_vacio.
+        """
+        self._estado = estado
+
+    def cargar(self):
+        """
+        Devuelve la instantánea recibida.
+
+        Returns:
+            dict: Estado de la instantánea.
+        """
+        return self._estado
+
+class Replica:
+    """
+    Copia de solo lectura de un crucero, actualizada con su flujo de cambios.
+
+    Los atributos que la réplica no define se buscan en su crucero, así que
+    puede usarse en lugar de un Crucero para las consultas (por ejemplo, con
+    ServidorCrucero en modo de solo lectura). Al recibir una instantánea el
+    crucero se reemplaza por uno nuevo: conviene acceder siempre a través de
+    la réplica y no guardar referencias a replica.crucero.
+
+    Attributes:
+        crucero (Crucero): Copia actual del crucero primario.
+        secuencia (int): Secuencia del último cambio aplicado.
+        secuencia_primario (int): Última secuencia conocida del primario.
+        retraso_segundos (float): Tiempo entre la publicación del último
+            cambio aplicado y su aplicación.
+        cambios_aplicados (int): Cambios aplicados desde el inicio.
+        instantaneas (int): Instantáneas cargadas desde el inicio.
+        conectada (bool): True mientras hay conexión con el primario.
+    """
+
+    def __init__(self, distribucion=None, perezosa=False):
+        """
+        Crea una réplica vacía.
+
+        Args:
+            distribucion (Distribucion, optional): Distribución del barco; debe
+                ser la misma que la del primario.
+            perezosa (bool, optional): Crear las habitaciones solo al usarse.
+        """
+        self._distribucion = distribucion
+        self._perezosa = perezosa
+        self.crucero = Crucero(distribucion=distribucion, perezosa=perezosa)
+        self.flujo = None
+        self.secuencia = 0
+        self.secuencia_primario = 0
+        self.retraso_segundos = 0.0
+        self.cambios_aplicados = 0
+        self.instantaneas = 0
+        self.conectada = False
+        self._detenida = threading.Event()
+        self._hilo = None
+        self._socket = None
+
+    def __getattr__(self, nombre):
+        """
+        Delega en el crucero actual los atributos que la réplica no tiene.
+
+        Args:
+            nombre (str): Nombre del atributo.
+
+        Returns:
+            object: Atributo del crucero.
+        """
+        if nombre == "crucero":
+            raise AttributeError(nombre)
+        return getattr(self.crucero, nombre)
+
+    def aplicar(self, mensaje):
+        """
+        Aplica un mensaje del flujo: instantánea, latido o cambio.
+
+        Args:
+            mensaje (dict): Mensaje decodificado.
+        """
+        tipo = mensaje.get("tipo")
+        if tipo == "instantanea":
+            crucero = Crucero(_AlmacenamientoInstantanea(mensaje["estado"]), distribucion=self._distribucion,
+                              perezosa=self._perezosa)
+            anterior, self.crucero = self.crucero, crucero
+            anterior.cerrar()
+            self.flujo = mensaje["flujo"]
+            self.secuencia = self.secuencia_primario = mensaje["secuencia"]
+            self.retraso_segundos = 0.0
+            self.instantaneas += 1
+        elif tipo == "latido":
+            self.secuencia_primario = max(self.secuencia_primario, mensaje["secuencia"])
+            if self.secuencia >= mensaje["secuencia"]:
+                self.retraso_segundos = 0.0
+        elif mensaje["secuencia"] > self.secuencia:
+            # La disponibilidad se deriva de las reservas aplicadas
+            if mensaje["op"] != "disponibilidad":
+                self.crucero.aplicar_operacion(mensaje)
+            self.secuencia = mensaje["secuencia"]
+            self.secuencia_primario = max(self.secuencia_primario, self.secuencia)
+            self.retraso_segundos = max(0.0, time.time() - mensaje["instante"])
+            self.cambios_aplicados += 1
+
+    def consumir(self, lector):
+        """
+        Aplica los mensajes de un archivo, tubería o socket hasta que se cierre.
+
+        Args:
+            lector: Objeto binario que se recorre línea a línea.
+        """
+        for linea in lector:
+            if self._detenida.is_set():
+                break
+            self.aplicar(json.loads(linea))
+
+    def conectar(self, host, puerto, reintento=1.0):
+        """
+        Sigue el flujo de un primario en un hilo propio, reconectando si se corta.
+
+        Al reconectar pide los cambios desde su última secuencia; el primario
+        envía una instantánea si ya no los tiene o si se reinició.
+
+        Args:
+            host (str): Dirección del publicador de cambios.
+            puerto (int): Puerto del publicador.
+            reintento (float, optional): Segundos entre intentos de conexión.
+        """
+        def seguir():
+            while not self._detenida.is_set():
+                try:
+                    with socket.create_connection((host, puerto)) as conexion:
+                        self._socket = conexion
+                        conexion.sendall(_linea({"desde": self.secuencia, "flujo": self.flujo}))
+                        self.conectada = True
+                        with conexion.makefile("rb") as lector:
+                            self.consumir(lector)
+                except OSError:
+                    pass
+                finally:
+                    self.conectada = False
+                    self._socket = None
+                self._detenida.wait(reintento)
+
+        self._hilo = threading.Thread(target=seguir, name="replica", daemon=True)
+        self._hilo.start()
+
+    def estado_replicacion(self):
+        """
+        Resume el retraso de la réplica respecto del primario.
+
+        Returns:
+            dict: Secuencias, cambios pendientes, retraso en segundos,
+                contadores y estado de la conexión.
+        """
+        return {
+            "secuencia": self.secuencia,
+            "secuencia_primario": self.secuencia_primario,
+            "retraso_cambios": self.secuencia_primario - self.secuencia,
+            "retraso_segundos": self.retraso_segundos,
+            "cambios_aplicados": self.cambios_aplicados,
+            "instantaneas": self.instantaneas,
+            "conectada": self.conectada,
+        }
+
+    def registrar_metricas(self, metricas):
+        """
+        Agrega los indicadores de retraso de la réplica a unas métricas.
+
+        Args:
+            metricas (Metricas): Métricas donde registrar los indicadores.
+        """
+        metricas.describir("replica_retraso_segundos",
+                           "Tiempo entre la publicación y la aplicación del último cambio.")
+        metricas.registrar_indicador("replica_retraso_segundos", lambda: self.retraso_segundos)
+        metricas.describir("replica_retraso_cambios", "Cambios publicados aún no aplicados.")
+        metricas.registrar_indicador("replica_retraso_cambios", lambda: self.secuencia_primario - self.secuencia)
+        metricas.describir("replica_conectada", "1 si la réplica está conectada al primario.")
+        metricas.registrar_indicador("replica_conectada", lambda: int(self.conectada))
+
+    def cerrar(self):
+        """
+        Deja de seguir al primario y cierra el crucero de la réplica.
+        """
+        self._detenida.set()
+        conexion = self._socket
+        if conexion is not None:
+            try:
+                conexion.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._hilo is not None:
+            self._hilo.join()
+        self.crucero.cerrar()
+
+def main():
+    """
+    Inicia una réplica y un servidor HTTP/JSON de solo lectura sobre ella.
+    """
+    # Servidor importa este módulo para publicar el flujo del primario
+    from Servidor import servir
+
+    parser = argparse.ArgumentParser(description="Réplica de lectura del sistema de reservas de crucero.")
+    parser.add_argument("--primario", default="127.0.0.1:9090", help="Publicador de cambios (host:puerto)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8081)
+    argumentos = parser.parse_args()
+
+    host_primario, _, puerto_primario = argumentos.primario.rpartition(":")
+    replica = Replica()
+    replica.conectar(host_primario or "127.0.0.1", int(puerto_primario))
+    metricas = Metricas()
+    replica.registrar_metricas(metricas)
+    try:
+        asyncio.run(servir(replica, argumentos.host, argumentos.puerto, metricas, solo_lectura=True))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        replica.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,9 @@ Este módulo implementa la clase que maneja las reservas de habitaciones
 en el sistema de gestión del crucero.
 """
 
-from datetime import datetime
+from datetime import date, datetime, timedelta
+
+from Identificadores import generador
 
 class Reserva:
     """
@@ -17,15 +19,21 @@ class Reserva:
     Attributes:
         dias_reserva (int): Cantidad de días que dura la reserva.
         fecha_reserva (datetime): Fecha en que se realizó la reserva.
+        fecha_inicio (date): Primer día de estancia en la habitación.
         codigos_usuarios (list): Lista de códigos de usuarios asignados a la reserva.
         codigo_habitacion (str): Código de la habitación reservada.
         codigo_reserva (str): Código único identificador de la reserva.
-        contador_reservas (int): Contador de clase para generar códigos únicos.
+        generador_codigos (GeneradorIdentificadores): Generador de clase de los
+            códigos de reservas creadas sin código (origen 0).
     """
+    
+    __slots__ = ("dias_reserva", "fecha_reserva", "fecha_inicio", "codigos_usuarios",
+                 "codigo_habitacion", "codigo_reserva")
   
-    contador_reservas = 1
+    generador_codigos = generador()
     
-    def __init__(self, dias_reserva, codigos_usuarios, codigo_habitacion, fecha_reserva=None):
+    def __init__(self, dias_reserva, codigos_usuarios, codigo_habitacion, fecha_reserva=None,
+                 fecha_inicio=None, codigo_reserva=None):
         """
         Inicializa una nueva instancia de reserva.
         
@@ -35,6 +43,10 @@ class Reserva:
             codigo_habitacion (str): Código de la habitación reservada.
             fecha_reserva (datetime, optional): Fecha de la reserva. Si es None,
                 se establece la fecha actual.
+            fecha_inicio (date, optional): Primer día de estancia. Si es None,
+                se utiliza el día de la reserva.
+            codigo_reserva (str, optional): Código de la reserva. Si es None,
+                se genera automáticamente (Crucero pasa uno con su origen).
         """
         self.dias_reserva = dias_reserva
         
@@ -44,13 +56,82 @@ class Reserva:
         else:
             self.fecha_reserva = fecha_reserva
         
+        # Por defecto la estancia comienza el mismo día de la reserva
+        if fecha_inicio is None:
+            self.fecha_inicio = self.fecha_reserva.date()
+        else:
+            self.fecha_inicio = fecha_inicio
+        
         # Guardar información de usuarios y habitación
         self.codigos_usuarios = codigos_usuarios
         self.codigo_habitacion = codigo_habitacion
         
-        # Generar código único para la reserva
-        self.codigo_reserva = f"R{Reserva.contador_reservas:03d}"
-        Reserva.contador_reservas += 1
+        # Generar código único para la reserva o conservar el proporcionado
+        if codigo_reserva is None:
+            self.codigo_reserva = Reserva.generar_codigo()
+        else:
+            self.codigo_reserva = codigo_reserva
+    
+    @classmethod
+    def generar_codigo(cls):
+        """
+        Genera un código de reserva único sin crear la reserva.
+        
+        Sirve para apartar el código de una reserva que se confirmará después
+        (por ejemplo, una retención).
+        
+        Returns:
+            str: Código de reserva nuevo.
+        """
+        return cls.generador_codigos.codigo("R")
+    
+    @property
+    def fecha_fin(self):
+        """
+        Día de salida de la habitación (no incluido en la estancia).
+        
+        Returns:
+            date: Fecha de inicio más los días de la reserva.
+        """
+        return self.fecha_inicio + timedelta(days=self.dias_reserva)
+    
+    def a_dict(self):
+        """
+        Convierte la reserva en un diccionario serializable.
+        
+        Returns:
+            dict: Datos de la reserva con las fechas en formato ISO.
+        """
+        return {
+            "codigo_reserva": self.codigo_reserva,
+            "codigo_habitacion": self.codigo_habitacion,
+            "codigos_usuarios": list(self.codigos_usuarios),
+            "dias_reserva": self.dias_reserva,
+            "fecha_inicio": self.fecha_inicio.isoformat(),
+            "fecha_reserva": self.fecha_reserva.isoformat(),
+        }
+    
+    @classmethod
+    def desde_dict(cls, datos):
+        """
+        Reconstruye una reserva a partir de un diccionario.
+        
+        No consume códigos del contador de reservas.
+        
+        Args:
+            datos (dict): Datos generados por a_dict.
+            
+        Returns:
+            Reserva: Reserva reconstruida con su código original.
+        """
+        return cls(
+            datos["dias_reserva"],
+            list(datos["codigos_usuarios"]),
+            datos["codigo_habitacion"],
+            fecha_reserva=datetime.fromisoformat(datos["fecha_reserva"]),
+            fecha_inicio=date.fromisoformat(datos["fecha_inicio"]),
+            codigo_reserva=datos["codigo_reserva"],
+        )
     
     def __str__(self):
         """
@@ -61,4 +142,4 @@ class Reserva:
                 habitación, días y fecha.
         """
         usuarios_str = ", ".join([str(u) if u else "Vacante" for u in self.codigos_usuarios])
-        return f"Reserva: {self.codigo_reserva} | Usuarios: {usuarios_str} | Habitación: {self.codigo_habitacion} | Días: {self.dias_reserva} | Fecha: {self.fecha_reserva.strftime('%Y-%m-%d')}"
\ No newline at end of file
+        return f"Reserva: {self.codigo_reserva} | Usuarios: {usuarios_str} | Habitación: {self.codigo_habitacion} | Inicio: {self.fecha_inicio.strftime('%Y-%m-%d')} | Días: {self.dias_reserva} | Fecha: {self.fecha_reserva.strftime('%Y-%m-%d')}"
\ No newline at end of file
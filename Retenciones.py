@@ -0,0 +1,212 @@
+"""
+Módulo que define las retenciones temporales de habitaciones.
+
+Una retención ocupa las fechas de una habitación durante unos minutos mientras
+se completan los datos de la reserva. Si no se confirma a tiempo, vence y la
+habitación vuelve a estar disponible. Los vencimientos se ordenan en un
+montículo, de modo que encontrar las retenciones vencidas cuesta O(log n) por
+retención y nunca requiere recorrer las reservas.
+"""
+
+import heapq
+import threading
+import time
+from itertools import count
+
+# Duración predeterminada de una retención, en segundos
+DURACION_RETENCION = 600
+
+class Retencion:
+    """
+    Retención temporal de las fechas de una habitación.
+
+    Attributes:
+        codigo (str): Código de la reserva que se creará al confirmar.
+        codigo_habitacion (str): Código de la habitación retenida.
+        fecha_inicio (date): Primer día retenido.
+        dias_reserva (int): Cantidad de días retenidos.
+        vencimiento (float): Instante de vencimiento (reloj del planificador).
+    """
+
+    __slots__ = ("codigo", "codigo_habitacion", "fecha_inicio", "dias_reserva", "vencimiento")
+
+    def __init__(self, codigo, codigo_habitacion, fecha_inicio, dias_reserva, vencimiento):
+        """
+        Inicializa una retención.
+
+        Args:
+            codigo (str): Código de la reserva que se creará al confirmar.
+            codigo_habitacion (str): Código de la habitación retenida.
+            fecha_inicio (date): Primer día retenido.
+            dias_reserva (int): Cantidad de días retenidos.
+            vencimiento (float): Instante de vencimiento.
+        """
+        self.codigo = codigo
+        self.codigo_habitacion = codigo_habitacion
+        self.fecha_inicio = fecha_inicio
+        self.dias_reserva = dias_reserva
+        self.vencimiento = vencimiento
+
+    def a_dict(self, ahora):
+        """
+        Convierte la retención en un diccionario serializable.
+
+        Args:
+            ahora (float): Instante actual del reloj del planificador.
+
+        Returns:
+            dict: Datos de la retención con los segundos que le quedan.
+        """
+        return {
+            "codigo_retencion": self.codigo,
+            "codigo_habitacion": self.codigo_habitacion,
+            "fecha_inicio": self.fecha_inicio.isoformat(),
+            "dias_reserva": self.dias_reserva,
+            "segundos_restantes": max(0.0, self.vencimiento - ahora),
+        }
+
+class PlanificadorVencimientos:
+    """
+    Montículo de vencimientos con cancelación perezosa.
+
+    Cancelar o reprogramar una clave no la busca en el montículo: solo se
+    actualiza el diccionario de vencimientos vigentes, y las entradas viejas
+    se descartan al llegar a la cima.
+
+    Attributes:
+        reloj (callable): Función que devuelve el instante actual en segundos.
+    """
+
+    def __init__(self, reloj=time.monotonic):
+        """
+        Inicializa un planificador vacío.
+
+        Args:
+            reloj (callable, optional): Reloj a usar. Por defecto time.monotonic.
+        """
+        self.reloj = reloj
+        self._monticulo = []
+        self._vigentes = {}
+        self._secuencia = count()
+
+    def programar(self, clave, vencimiento):
+        """
+        Programa (o reprograma) el vencimiento de una clave.
+
+        Args:
+            clave (str): Clave a programar.
+            vencimiento (float): Instante de vencimiento.
+        """
+        self._vigentes[clave] = vencimiento
+        heapq.heappush(self._monticulo, (vencimiento, next(self._secuencia), clave))
+
+    def cancelar(self, clave):
+        """
+        Cancela el vencimiento de una clave.
+
+        Args:
+            clave (str): Clave a cancelar.
+
+        Returns:
+            bool: True si la clave estaba programada.
+        """
+        return self._vigentes.pop(clave, None) is not None
+
+    def vencidos(self, ahora=None):
+        """
+        Extrae todas las claves cuyo vencimiento ya llegó.
+
+        Args:
+            ahora (float, optional): Instante de referencia. Por defecto, el reloj.
+
+        Returns:
+            list: Claves vencidas, en orden de vencimiento.
+        """
+        if ahora is None:
+            ahora = self.reloj()
+        vencidas = []
+        monticulo = self._monticulo
+        while monticulo and monticulo[0][0] <= ahora:
+            vencimiento, _, clave = heapq.heappop(monticulo)
+            if self._vigentes.get(clave) == vencimiento:
+                del self._vigentes[clave]
+                vencidas.append(clave)
+        return vencidas
+
+    def proximo(self):
+        """
+        Devuelve el próximo vencimiento vigente.
+
+        Returns:
+            float: Instante del próximo vencimiento, o None si no hay.
+        """
+        monticulo = self._monticulo
+        while monticulo and self._vigentes.get(monticulo[0][2]) != monticulo[0][0]:
+            heapq.heappop(monticulo)
+        return monticulo[0][0] if monticulo else None
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de claves programadas.
+
+        Returns:
+            int: Número de vencimientos vigentes.
+        """
+        return len(self._vigentes)
+
+class VencimientosEnSegundoPlano:
+    """
+    Hilo que vence las retenciones de un crucero a medida que llegan.
+
+    Duerme hasta el próximo vencimiento (o hasta que se programe uno más
+    cercano) y vence todas las retenciones pendientes de una vez.
+
+    Attributes:
+        crucero (Crucero): Crucero cuyas retenciones se vencen.
+        intervalo (float): Espera máxima entre revisiones, en segundos.
+    """
+
+    def __init__(self, crucero, intervalo=1.0):
+        """
+        Inicializa el hilo sin iniciarlo.
+
+        Args:
+            crucero (Crucero): Crucero cuyas retenciones se vencen.
+            intervalo (float, optional): Espera máxima entre revisiones.
+        """
+        self.crucero = crucero
+        self.intervalo = intervalo
+        self._despertar = threading.Event()
+        self._detenido = False
+        self._hilo = threading.Thread(target=self._ejecutar, name="vencimientos", daemon=True)
+
+    def iniciar(self):
+        """
+        Inicia el hilo.
+        """
+        self._hilo.start()
+
+    def avisar(self):
+        """
+        Despierta el hilo para que recalcule su espera (nueva retención programada).
+        """
+        self._despertar.set()
+
+    def detener(self):
+        """
+        Detiene el hilo y espera a que termine.
+        """
+        self._detenido = True
+        self._despertar.set()
+        self._hilo.join()
+
+    def _ejecutar(self):
+        """
+        Bucle del hilo: vence las retenciones y espera al próximo vencimiento.
+        """
+        while not self._detenido:
+            self.crucero.expirar_retenciones()
+            restante = self.crucero.proximo_vencimiento()
+            espera = self.intervalo if restante is None else min(self.intervalo, restante)
+            self._despertar.wait(espera)
+            self._despertar.clear()
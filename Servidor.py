@@ -0,0 +1,644 @@
+"""
+Módulo que implementa un servidor HTTP/JSON para el sistema de reservas.
+
+Este módulo expone las operaciones de Crucero a través de HTTP usando solo
+asyncio (sin dependencias externas). Las consultas se responden directamente
+desde memoria; las operaciones que escriben en el almacenamiento (reservar y
+cancelar) se ejecutan en un grupo de hilos para no bloquear el bucle de
+eventos, apoyándose en el bloqueo por habitación de Crucero.
+
+Rutas:
+    GET    /habitaciones                 Listar habitaciones disponibles.
+           ?cubierta=&acomodacion=&fecha_inicio=&fecha_fin=
+    GET    /habitaciones/<codigo>        Buscar una habitación.
+    GET    /usuarios?nombre=&limite=     Buscar usuarios por nombre aproximado,
+                                         con su reserva activa.
+    GET    /reservas                     Listar las reservas activas.
+           ?habitacion=&usuario=&cubierta=&fecha_inicio=&fecha_fin=
+           &limite=&cursor=              Con limite o cursor se responde una
+                                         página {"reservas", "cursor"}.
+    POST   /reservas                     Realizar una reserva. Cuerpo JSON con
+           codigos_usuarios, codigo_habitacion, dias_reserva y fecha_inicio.
+    GET    /reservas/<codigo>            Consultar una reserva, activa o archivada.
+    GET    /historial                    Listar las reservas finalizadas
+           ?habitacion=&usuario=&fecha_inicio=&fecha_fin=&limite=
+                                         (historial y archivos sellados).
+    DELETE /reservas/<codigo>            Cancelar una reserva.
+    GET    /retenciones                  Listar las retenciones vigentes.
+    POST   /retenciones                  Retener una habitación. Cuerpo JSON con
+           codigo_habitacion, dias_reserva, fecha_inicio y segundos.
+    POST   /retenciones/<codigo>/confirmar  Convertir la retención en reserva.
+           Cuerpo JSON con codigos_usuarios.
+    DELETE /retenciones/<codigo>         Liberar una retención.
+    GET    /espera                       Listar las solicitudes en espera.
+    POST   /espera                       Reservar o esperar una habitación. Cuerpo
+           JSON con codigos_usuarios, cubierta, acomodacion, dias_reserva,
+           fecha_inicio y prioridad.
+    DELETE /espera/<codigo>              Retirar una solicitud de la espera.
+    GET    /metricas                     Métricas en formato de Prometheus
+           ?formato=json                 (o en JSON). Solo con --metricas.
+
+Uso:
+    python Servidor.py [--host 127.0.0.1] [--puerto 8080] [--datos DIRECTORIO] [--metricas]
+        [--replicacion PUERTO]
+
+Con --replicacion, las réplicas de Replicacion.py pueden seguir los cambios
+y atender las consultas en otros procesos.
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from itertools import islice
+from urllib.parse import parse_qs, urlsplit
+
+from Almacenamiento import AlmacenamientoDiario
+from Crucero import Crucero
+from Metricas import Metricas
+from Replicacion import FlujoCambios, PublicadorCambios
+from Retenciones import DURACION_RETENCION
+
+MENSAJES_ESTADO = {
+    200: "OK", 201: "Created", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+TAMANO_MAXIMO_CUERPO = 1024 * 1024
+
+# Reservas por página de GET /reservas cuando no se indica limite
+LIMITE_PAGINA = 100
+
+class ErrorHTTP(Exception):
+    """
+    Error que se responde al cliente con un código de estado HTTP.
+
+    Attributes:
+        estado (int): Código de estado HTTP.
+        mensaje (str): Descripción del error.
+    """
+
+    def __init__(self, estado, mensaje):
+        """
+        Inicializa el error.
+
+        Args:
+            estado (int): Código de estado HTTP.
+            mensaje (str): Descripción del error.
+        """
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+def habitacion_a_dict(habitacion):
+    """
+    Convierte una habitación en un diccionario serializable.
+
+    Args:
+        habitacion (Habitacion): Habitación a convertir.
+
+    Returns:
+        dict: Código, cubierta, acomodación, disponibilidad y costo diario.
+    """
+    datos = habitacion.a_dict()
+    datos["costo_diario"] = habitacion.calcular_costo(habitacion.cubierta, 1, habitacion.acomodacion)
+    return datos
+
+def _fecha(texto, campo):
+    """
+    Convierte un texto AAAA-MM-DD en fecha.
+
+    Args:
+        texto (str): Texto a convertir (None o vacío devuelve None).
+        campo (str): Nombre del campo, para el mensaje de error.
+
+    Returns:
+        date: Fecha convertida o None.
+
+    Raises:
+        ErrorHTTP: Si el texto no es una fecha válida.
+    """
+    if not texto:
+        return None
+    try:
+        return date.fromisoformat(texto)
+    except (TypeError, ValueError):
+        raise ErrorHTTP(400, f"Valor inválido para {campo}.")
+
+def _cuerpo_json(cuerpo):
+    """
+    Interpreta el cuerpo de una petición como un objeto JSON.
+
+    Args:
+        cuerpo (bytes): Cuerpo de la petición (vacío equivale a {}).
+
+    Returns:
+        dict: Objeto del cuerpo.
+
+    Raises:
+        ErrorHTTP: Si el cuerpo no es un objeto JSON.
+    """
+    try:
+        datos = json.loads(cuerpo or b"{}")
+    except ValueError:
+        raise ErrorHTTP(400, "El cuerpo no es JSON válido.")
+    if not isinstance(datos, dict):
+        raise ErrorHTTP(400, "El cuerpo debe ser un objeto JSON.")
+    return datos
+
+def _codigos_usuarios(datos):
+    """
+    Obtiene los códigos de usuarios de un cuerpo JSON.
+
+    Args:
+        datos (dict): Objeto del cuerpo de la petición.
+
+    Returns:
+        list: Códigos de usuarios.
+
+    Raises:
+        ErrorHTTP: Si codigos_usuarios no es una lista no vacía de textos no vacíos.
+    """
+    codigos_usuarios = datos.get("codigos_usuarios")
+    if not isinstance(codigos_usuarios, list) or not all(
+            isinstance(codigo, str) and codigo.strip() for codigo in codigos_usuarios):
+        raise ErrorHTTP(400, "codigos_usuarios debe ser una lista de códigos de usuario.")
+    if not codigos_usuarios:
+        raise ErrorHTTP(400, "La reserva no tiene usuarios.")
+    return codigos_usuarios
+
+class ServidorCrucero:
+    """
+    Servidor HTTP/JSON asíncrono sobre una instancia de Crucero.
+
+    Attributes:
+        crucero (Crucero): Sistema de reservas atendido por el servidor.
+        host (str): Dirección en la que escucha el servidor.
+        puerto (int): Puerto en el que escucha el servidor.
+        metricas (Metricas): Métricas expuestas en /metricas, o None.
+        solo_lectura (bool): Si es True, solo se atienden consultas GET
+            (por ejemplo, sobre una réplica).
+    """
+
+    def __init__(self, crucero, host="127.0.0.1", puerto=8080, hilos=8, metricas=None, solo_lectura=False):
+        """
+        Inicializa el servidor.
+
+        Args:
+            crucero (Crucero): Sistema de reservas a exponer.
+            host (str, optional): Dirección de escucha. Por defecto 127.0.0.1.
+            puerto (int, optional): Puerto de escucha. Por defecto 8080.
+            hilos (int, optional): Hilos para las operaciones de escritura.
+            metricas (Metricas, optional): Métricas del crucero a exponer.
+            solo_lectura (bool, optional): Rechazar las peticiones que modifican datos.
+        """
+        self.crucero = crucero
+        self.host = host
+        self.puerto = puerto
+        self.metricas = metricas
+        self.solo_lectura = solo_lectura
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="crucero")
+        self._servidor = None
+
+    async def iniciar(self):
+        """
+        Empieza a aceptar conexiones.
+
+        Returns:
+            asyncio.Server: Servidor de asyncio en ejecución.
+        """
+        self._servidor = await asyncio.start_server(self._atender_conexion, self.host, self.puerto)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        return self._servidor
+
+    async def detener(self):
+        """
+        Deja de aceptar conexiones y libera el grupo de hilos.
+        """
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        self._ejecutor.shutdown(wait=True)
+
+    async def _en_hilo(self, funcion, *argumentos):
+        """
+        Ejecuta una función bloqueante en el grupo de hilos.
+
+        Args:
+            funcion (callable): Función a ejecutar.
+            *argumentos: Argumentos de la función.
+
+        Returns:
+            object: Resultado de la función.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._ejecutor, funcion, *argumentos)
+
+    async def _atender_conexion(self, lector, escritor):
+        """
+        Atiende las peticiones de una conexión, manteniéndola abierta entre peticiones.
+
+        Args:
+            lector (asyncio.StreamReader): Flujo de entrada de la conexión.
+            escritor (asyncio.StreamWriter): Flujo de salida de la conexión.
+        """
+        try:
+            while True:
+                try:
+                    cabecera = await lector.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                lineas = cabecera.decode("latin-1").split("\r\n")
+                try:
+                    metodo, ruta, version = lineas[0].split(" ", 2)
+                except ValueError:
+                    break
+                cabeceras = {}
+                for linea in lineas[1:]:
+                    if ":" in linea:
+                        nombre, valor = linea.split(":", 1)
+                        cabeceras[nombre.strip().lower()] = valor.strip()
+
+                # Solo dígitos: int() aceptaría también signos, espacios y "_"
+                longitud = cabeceras.get("content-length") or "0"
+                longitud = int(longitud) if longitud.isascii() and longitud.isdigit() else None
+                if longitud is None:
+                    estado, respuesta = 400, {"error": "Content-Length inválido."}
+                    mantener = False
+                elif longitud > TAMANO_MAXIMO_CUERPO:
+                    estado, respuesta = 413, {"error": "Cuerpo demasiado grande."}
+                    mantener = False
+                else:
+                    cuerpo = await lector.readexactly(longitud) if longitud else b""
+                    estado, respuesta = await self._procesar(metodo, ruta, cuerpo)
+                    mantener = (cabeceras.get("connection", "").lower() != "close"
+                                and version.upper() == "HTTP/1.1")
+
+                if isinstance(respuesta, str):
+                    datos = respuesta.encode("utf-8")
+                    tipo = "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    datos = json.dumps(respuesta, ensure_ascii=False).encode("utf-8")
+                    tipo = "application/json; charset=utf-8"
+                escritor.write(
+                    f"HTTP/1.1 {estado} {MENSAJES_ESTADO.get(estado, '')}\r\n"
+                    f"Content-Type: {tipo}\r\n"
+                    f"Content-Length: {len(datos)}\r\n"
+                    f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode("latin-1") + datos
+                )
+                await escritor.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _procesar(self, metodo, ruta, cuerpo):
+        """
+        Dirige una petición a la operación correspondiente.
+
+        Args:
+            metodo (str): Método HTTP.
+            ruta (str): Ruta de la petición, con sus parámetros.
+            cuerpo (bytes): Cuerpo de la petición.
+
+        Returns:
+            tuple: (código de estado, objeto serializable de respuesta, o texto plano).
+        """
+        url = urlsplit(ruta)
+        partes = [parte for parte in url.path.split("/") if parte]
+        parametros = {clave: valores[0] for clave, valores in parse_qs(url.query).items()}
+        try:
+            if self.solo_lectura and metodo != "GET":
+                raise ErrorHTTP(405, "Servidor de solo lectura.")
+            if partes == ["habitaciones"] and metodo == "GET":
+                return 200, self._listar_habitaciones(parametros)
+            if len(partes) == 2 and partes[0] == "habitaciones" and metodo == "GET":
+                habitacion = self.crucero.buscar_habitacion(partes[1])
+                if not habitacion:
+                    raise ErrorHTTP(404, "Habitación no encontrada.")
+                return 200, habitacion_a_dict(habitacion)
+            if partes == ["usuarios"] and metodo == "GET":
+                return 200, self._buscar_usuarios(parametros)
+            if partes == ["reservas"] and metodo == "GET":
+                return 200, self._listar_reservas(parametros)
+            if partes == ["reservas"] and metodo == "POST":
+                return await self._reservar(cuerpo)
+            if len(partes) == 2 and partes[0] == "reservas" and metodo == "GET":
+                return 200, self._consultar(partes[1])
+            if len(partes) == 2 and partes[0] == "reservas" and metodo == "DELETE":
+                if not await self._en_hilo(self.crucero.cancelar_reserva, partes[1]):
+                    raise ErrorHTTP(404, "Reserva no encontrada.")
+                return 200, {"codigo_reserva": partes[1], "cancelada": True}
+            if partes == ["historial"] and metodo == "GET":
+                return 200, self._listar_archivadas(parametros)
+            if partes == ["retenciones"] and metodo == "GET":
+                return 200, self.crucero.retenciones()
+            if partes == ["retenciones"] and metodo == "POST":
+                return await self._retener(cuerpo)
+            if len(partes) == 3 and partes[0] == "retenciones" and partes[2] == "confirmar" and metodo == "POST":
+                return await self._confirmar_retencion(partes[1], cuerpo)
+            if len(partes) == 2 and partes[0] == "retenciones" and metodo == "DELETE":
+                if not await self._en_hilo(self.crucero.liberar_retencion, partes[1]):
+                    raise ErrorHTTP(404, "Retención no encontrada o vencida.")
+                return 200, {"codigo_retencion": partes[1], "liberada": True}
+            if partes == ["espera"] and metodo == "GET":
+                return 200, [solicitud.a_dict() for solicitud in self.crucero.lista_espera.pendientes()]
+            if partes == ["espera"] and metodo == "POST":
+                return await self._esperar(cuerpo)
+            if len(partes) == 2 and partes[0] == "espera" and metodo == "DELETE":
+                if not await self._en_hilo(self.crucero.cancelar_espera, partes[1]):
+                    raise ErrorHTTP(404, "Solicitud no encontrada en la espera.")
+                return 200, {"codigo_reserva": partes[1], "retirada": True}
+            if partes == ["metricas"] and metodo == "GET" and self.metricas is not None:
+                if parametros.get("formato") == "json":
+                    return 200, self.metricas.a_dict()
+                return 200, self.metricas.a_prometheus()
+            if partes and partes[0] in ("habitaciones", "usuarios", "reservas", "historial", "retenciones", "espera"):
+                raise ErrorHTTP(405, "Método no permitido.")
+            raise ErrorHTTP(404, "Ruta no encontrada.")
+        except ErrorHTTP as error:
+            return error.estado, {"error": error.mensaje}
+        except Exception as error:
+            return 500, {"error": str(error)}
+
+    def _listar_habitaciones(self, parametros):
+        """
+        Lista las habitaciones disponibles según los parámetros de la consulta.
+
+        Args:
+            parametros (dict): Parámetros cubierta, acomodacion, fecha_inicio y fecha_fin.
+
+        Returns:
+            list: Habitaciones disponibles como diccionarios.
+        """
+        acomodacion = parametros.get("acomodacion")
+        try:
+            acomodacion = int(acomodacion) if acomodacion else None
+        except ValueError:
+            raise ErrorHTTP(400, "Valor inválido para acomodación.")
+        habitaciones = self.crucero.listar_habitaciones_disponibles(
+            parametros.get("cubierta"), acomodacion,
+            _fecha(parametros.get("fecha_inicio"), "fecha_inicio"),
+            _fecha(parametros.get("fecha_fin"), "fecha_fin"),
+        )
+        return [habitacion_a_dict(habitacion) for habitacion in habitaciones]
+
+    def _buscar_usuarios(self, parametros):
+        """
+        Busca usuarios por nombre aproximado.
+
+        Args:
+            parametros (dict): Parámetros nombre y limite.
+
+        Returns:
+            list: Usuarios como diccionarios, con su puntuación y su reserva activa.
+        """
+        if not parametros.get("nombre"):
+            raise ErrorHTTP(400, "Se requiere el parámetro nombre.")
+        try:
+            limite = int(parametros.get("limite") or 10)
+        except ValueError:
+            raise ErrorHTTP(400, "Valor inválido para limite.")
+        return [
+            {"codigo": usuario.codigo, "nombre": usuario.nombre, "reserva": usuario.obtener_reserva(),
+             "puntuacion": round(puntuacion, 3)}
+            for puntuacion, usuario in self.crucero.buscar_usuarios_similares(parametros["nombre"], limite)
+        ]
+
+    def _listar_reservas(self, parametros):
+        """
+        Lista por páginas las reservas activas según los filtros de la consulta.
+
+        Args:
+            parametros (dict): Parámetros habitacion, usuario, cubierta,
+                fecha_inicio, fecha_fin, limite (por defecto LIMITE_PAGINA) y cursor.
+
+        Returns:
+            dict: Reservas de la página como diccionarios y el cursor de la
+                siguiente (None si no hay más).
+        """
+        filtros = {
+            "codigo_habitacion": parametros.get("habitacion"),
+            "codigo_usuario": parametros.get("usuario"),
+            "cubierta": parametros.get("cubierta"),
+            "fecha_inicio": _fecha(parametros.get("fecha_inicio"), "fecha_inicio"),
+            "fecha_fin": _fecha(parametros.get("fecha_fin"), "fecha_fin"),
+        }
+        try:
+            limite = int(parametros.get("limite") or LIMITE_PAGINA)
+            if limite <= 0:
+                raise ValueError
+        except ValueError:
+            raise ErrorHTTP(400, "Valor inválido para limite.")
+        reservas, cursor = self.crucero.paginar_reservas(limite, parametros.get("cursor"), **filtros)
+        return {"reservas": [reserva.a_dict() for reserva in reservas], "cursor": cursor}
+
+    def _listar_archivadas(self, parametros):
+        """
+        Lista las reservas finalizadas según los filtros de la consulta.
+
+        Args:
+            parametros (dict): Parámetros habitacion, usuario, fecha_inicio,
+                fecha_fin y limite.
+
+        Returns:
+            list: Reservas como diccionarios, hasta el límite indicado.
+        """
+        try:
+            limite = int(parametros.get("limite") or 100)
+            if limite <= 0:
+                raise ValueError
+        except ValueError:
+            raise ErrorHTTP(400, "Valor inválido para limite.")
+        vistas = self.crucero.consultar_archivadas(
+            parametros.get("habitacion"), parametros.get("usuario"),
+            _fecha(parametros.get("fecha_inicio"), "fecha_inicio"),
+            _fecha(parametros.get("fecha_fin"), "fecha_fin"),
+        )
+        return [vista.a_reserva().a_dict() for vista in islice(vistas, limite)]
+
+    def _consultar(self, codigo_reserva):
+        """
+        Consulta una reserva activa o archivada.
+
+        Args:
+            codigo_reserva (str): Código de la reserva.
+
+        Returns:
+            dict: Datos de la reserva y su descripción en texto.
+        """
+        reserva = self.crucero.buscar_reserva(codigo_reserva)
+        if reserva is None:
+            raise ErrorHTTP(404, "Reserva no encontrada.")
+        datos = reserva.a_dict()
+        datos["descripcion"] = str(reserva)
+        return datos
+
+    async def _reservar(self, cuerpo):
+        """
+        Crea una reserva a partir del cuerpo JSON de la petición.
+
+        Args:
+            cuerpo (bytes): Cuerpo JSON de la petición.
+
+        Returns:
+            tuple: (201, datos de la reserva) si se creó.
+        """
+        datos = _cuerpo_json(cuerpo)
+        try:
+            dias_reserva = int(datos["dias_reserva"])
+            codigo_habitacion = str(datos["codigo_habitacion"])
+        except (ValueError, KeyError, TypeError):
+            raise ErrorHTTP(400, "Se requieren codigo_habitacion, dias_reserva y codigos_usuarios.")
+        if dias_reserva <= 0:
+            raise ErrorHTTP(400, "La cantidad de días debe ser mayor a 0.")
+        codigos_usuarios = _codigos_usuarios(datos)
+        fecha_inicio = _fecha(datos.get("fecha_inicio"), "fecha_inicio")
+
+        codigo_reserva = await self._en_hilo(self.crucero.crear_reserva, codigos_usuarios,
+                                             codigo_habitacion, dias_reserva, fecha_inicio)
+        if not codigo_reserva:
+            raise ErrorHTTP(409, "Habitación no disponible o no existe.")
+        return 201, {
+            "codigo_reserva": codigo_reserva,
+            "costo": self.crucero.calcular_costo_reserva(codigo_habitacion, dias_reserva),
+        }
+
+    async def _retener(self, cuerpo):
+        """
+        Retiene una habitación a partir del cuerpo JSON de la petición.
+
+        La retención no se guarda en el almacenamiento, pero antes se vencen
+        las retenciones pendientes (lo que sí escribe), así que se atiende en
+        el grupo de hilos.
+
+        Args:
+            cuerpo (bytes): Cuerpo JSON con codigo_habitacion, dias_reserva,
+                fecha_inicio (opcional) y segundos (opcional).
+
+        Returns:
+            tuple: (201, datos de la retención) si se retuvo.
+        """
+        datos = _cuerpo_json(cuerpo)
+        try:
+            dias_reserva = int(datos["dias_reserva"])
+            codigo_habitacion = str(datos["codigo_habitacion"])
+            segundos = float(datos.get("segundos") or DURACION_RETENCION)
+        except (ValueError, KeyError, TypeError):
+            raise ErrorHTTP(400, "Se requieren codigo_habitacion y dias_reserva.")
+        if dias_reserva <= 0 or segundos <= 0:
+            raise ErrorHTTP(400, "Los días y los segundos deben ser mayores a 0.")
+        fecha_inicio = _fecha(datos.get("fecha_inicio"), "fecha_inicio")
+
+        codigo_retencion = await self._en_hilo(self.crucero.retener_habitacion, codigo_habitacion,
+                                               dias_reserva, fecha_inicio, segundos)
+        if not codigo_retencion:
+            raise ErrorHTTP(409, "Habitación no disponible o no existe.")
+        return 201, {"codigo_retencion": codigo_retencion, "segundos": segundos}
+
+    async def _confirmar_retencion(self, codigo_retencion, cuerpo):
+        """
+        Convierte una retención en reserva a partir del cuerpo JSON de la petición.
+
+        Args:
+            codigo_retencion (str): Código de la retención.
+            cuerpo (bytes): Cuerpo JSON con codigos_usuarios.
+
+        Returns:
+            tuple: (201, datos de la reserva) si se confirmó.
+        """
+        codigos_usuarios = _codigos_usuarios(_cuerpo_json(cuerpo))
+
+        codigo_reserva = await self._en_hilo(self.crucero.confirmar_retencion, codigo_retencion, codigos_usuarios)
+        if not codigo_reserva:
+            raise ErrorHTTP(404, "Retención no encontrada o vencida.")
+        return 201, {"codigo_reserva": codigo_reserva}
+
+    async def _esperar(self, cuerpo):
+        """
+        Reserva una habitación de una cubierta y acomodación o deja la solicitud en espera.
+
+        Args:
+            cuerpo (bytes): Cuerpo JSON de la petición.
+
+        Returns:
+            tuple: (201, resultado) si se reservó, o (202, resultado) si quedó en espera.
+        """
+        datos = _cuerpo_json(cuerpo)
+        try:
+            dias_reserva = int(datos["dias_reserva"])
+            cubierta = str(datos["cubierta"])
+            acomodacion = int(datos["acomodacion"])
+            prioridad = int(datos.get("prioridad") or 0)
+        except (ValueError, KeyError, TypeError):
+            raise ErrorHTTP(400, "Se requieren cubierta, acomodacion, dias_reserva y codigos_usuarios.")
+        codigos_usuarios = _codigos_usuarios(datos)
+        fecha_inicio = _fecha(datos.get("fecha_inicio"), "fecha_inicio")
+
+        resultado = await self._en_hilo(self.crucero.esperar_reserva, codigos_usuarios, dias_reserva,
+                                        cubierta, acomodacion, fecha_inicio, prioridad)
+        if resultado["error"]:
+            raise ErrorHTTP(400, resultado["error"])
+        return (202 if resultado["en_espera"] else 201), resultado
+
+async def servir(crucero, host, puerto, metricas=None, solo_lectura=False):
+    """
+    Ejecuta el servidor hasta que se interrumpa.
+
+    Args:
+        crucero (Crucero): Sistema de reservas a exponer.
+        host (str): Dirección de escucha.
+        puerto (int): Puerto de escucha.
+        metricas (Metricas, optional): Métricas a exponer en /metricas.
+        solo_lectura (bool, optional): Atender solo consultas.
+    """
+    servidor = ServidorCrucero(crucero, host, puerto, metricas=metricas, solo_lectura=solo_lectura)
+    if not solo_lectura:
+        crucero.iniciar_vencimientos()
+    await servidor.iniciar()
+    print(f"Servidor de reservas escuchando en http://{servidor.host}:{servidor.puerto}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await servidor.detener()
+
+def main():
+    """
+    Punto de entrada del servidor desde la línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON del sistema de reservas de crucero.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--datos", default="datos_crucero", help="Directorio del almacenamiento")
+    parser.add_argument("--metricas", action="store_true", help="Medir las operaciones y exponer /metricas")
+    parser.add_argument("--replicacion", type=int, metavar="PUERTO",
+                        help="Publicar el flujo de cambios para réplicas en este puerto")
+    argumentos = parser.parse_args()
+
+    crucero = Crucero(AlmacenamientoDiario(argumentos.datos))
+    metricas = None
+    if argumentos.metricas:
+        metricas = Metricas()
+        metricas.instrumentar(crucero)
+    publicador = None
+    if argumentos.replicacion is not None:
+        flujo = FlujoCambios(crucero)
+        publicador = PublicadorCambios(flujo, argumentos.host, argumentos.replicacion)
+        publicador.iniciar()
+        if metricas is not None:
+            flujo.registrar_metricas(metricas)
+    try:
+        asyncio.run(servir(crucero, argumentos.host, argumentos.puerto, metricas))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if publicador is not None:
+            publicador.detener()
+        crucero.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+Módulo que define la simulación de escenarios de tarifas sobre la demanda histórica.
+
+Cada escenario es una tabla de tarifas candidata (otros costos por cubierta o
+factores de acomodación). La simulación repite, en el orden en que se
+hicieron, las reservas activas y archivadas del crucero: cada reserva se
+mantiene, se pierde o se multiplica según cuánto cambia su tarifa respecto de
+la vigente (elasticidad por anticipación de la reserva), y solo se acepta si
+su grupo (cubierta, acomodación) tiene habitaciones libres todas sus noches.
+
+La demanda se reduce a columnas compactas (array) que cada proceso recibe una
+sola vez al iniciarse; cada escenario viaja como una tupla con la tarifa de
+cada grupo. Así el costo de comunicación no crece con la demanda y los
+escenarios se reparten entre los procesos casi sin pérdida.
+"""
+
+import argparse
+import json
+import os
+import random
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import product
+from math import ceil
+
+from Tarifas import tarifas
+
+# Elasticidad de la demanda según la anticipación de la reserva, como tuplas
+# (días de anticipación máximos, elasticidad); quien reserva con más tiempo
+# compara más y es más sensible al precio. La última fila no tiene límite.
+ELASTICIDADES = ((7, 0.6), (30, 1.0), (90, 1.4), (None, 1.8))
+
+# Máximo de reservas que puede generar una reserva histórica al bajar la tarifa
+DEMANDA_MAXIMA = 3.0
+
+# Tramos de escenarios por proceso, para repartir la carga aunque unos
+# escenarios tarden más que otros
+TRAMOS_POR_PROCESO = 4
+
+class Demanda:
+    """
+    Demanda histórica del crucero en columnas compactas y serializables.
+
+    Las reservas se guardan ordenadas por fecha de reserva. Los días se miden
+    desde el primer día ocupado por alguna reserva.
+
+    Attributes:
+        claves (list): Grupos (cubierta normalizada, acomodación), por número.
+        capacidades (list): Cantidad de habitaciones de cada grupo.
+        tarifas_base (list): Tarifa diaria vigente de cada grupo.
+        elasticidades (tuple): Elasticidad de cada tramo de anticipación.
+        primer_dia (int): Ordinal del primer día ocupado.
+        noches (int): Cantidad de noches del horizonte simulado.
+        grupos (array): Grupo de cada reserva.
+        inicios (array): Primer día de cada reserva, desde primer_dia.
+        dias (array): Días de cada reserva.
+        plazas (array): Pasajeros de cada reserva.
+        tramos (array): Tramo de anticipación de cada reserva.
+    """
+
+    __slots__ = ("claves", "capacidades", "tarifas_base", "elasticidades", "primer_dia", "noches",
+                 "grupos", "inicios", "dias", "plazas", "tramos")
+
+    def __init__(self, claves, capacidades, tarifas_base, elasticidades, primer_dia, noches,
+                 grupos, inicios, dias, plazas, tramos):
+        """
+        Inicializa la demanda a partir de sus columnas.
+
+        Args:
+            claves (list): Grupos (cubierta normalizada, acomodación), por número.
+            capacidades (list): Cantidad de habitaciones de cada grupo.
+            tarifas_base (list): Tarifa diaria vigente de cada grupo.
+            elasticidades (tuple): Elasticidad de cada tramo de anticipación.
+            primer_dia (int): Ordinal del primer día ocupado.
+            noches (int): Cantidad de noches del horizonte simulado.
+            grupos (array): Grupo de cada reserva.
+            inicios (array): Primer día de cada reserva, desde primer_dia.
+            dias (array): Días de cada reserva.
+            plazas (array): Pasajeros de cada reserva.
+            tramos (array): Tramo de anticipación de cada reserva.
+        """
+        self.claves = claves
+        self.capacidades = capacidades
+        self.tarifas_base = tarifas_base
+        self.elasticidades = elasticidades
+        self.primer_dia = primer_dia
+        self.noches = noches
+        self.grupos = grupos
+        self.inicios = inicios
+        self.dias = dias
+        self.plazas = plazas
+        self.tramos = tramos
+
+    @classmethod
+    def desde_crucero(cls, crucero, tabla=tarifas, elasticidades=ELASTICIDADES):
+        """
+        Reúne la demanda de las reservas activas y archivadas de un crucero.
+
+        Las reservas de habitaciones que ya no existen se omiten.
+
+        Args:
+            crucero (Crucero): Crucero cuyas reservas forman la demanda.
+            tabla (TablaTarifas, optional): Tarifas con las que se hicieron las
+                reservas. Por defecto, la tabla compartida.
+            elasticidades (tuple, optional): Tuplas (días de anticipación
+                máximos, elasticidad); la última fila con límite None.
+
+        Returns:
+            Demanda: Demanda del crucero.
+        """
+        # Las habitaciones se agrupan desde el índice, sin crear las perezosas
+        claves = []
+        capacidades = []
+        grupo_habitacion = {}
+        for clave, habitaciones in crucero._indice_disponibilidad._todas.items():
+            numero = len(claves)
+            claves.append(clave)
+            capacidades.append(len(habitaciones))
+            grupo_habitacion.update(dict.fromkeys(habitaciones, numero))
+
+        limites = [limite for limite, _ in elasticidades[:-1]]
+        filas = []
+        for reserva in list(crucero._indice_reservas.values()):
+            grupo = grupo_habitacion.get(reserva.codigo_habitacion)
+            if grupo is None:
+                continue
+            inicio = reserva.fecha_inicio.toordinal()
+            filas.append((reserva.fecha_reserva.timestamp(), grupo, inicio, reserva.dias_reserva,
+                          len(reserva.codigos_usuarios),
+                          bisect_left(limites, inicio - reserva.fecha_reserva.toordinal())))
+
+        # El historial y los archivos ya son columnares: se leen sus arreglos directamente
+        dias_reserva = {}
+        for historial in crucero.historiales():
+            grupos_historial = [grupo_habitacion.get(codigo) for codigo in historial.habitaciones.textos]
+            desplazamientos = historial._desplazamientos
+            for posicion, habitacion in enumerate(historial._habitaciones):
+                grupo = grupos_historial[habitacion]
+                if grupo is None:
+                    continue
+                marca = historial._fechas_reserva[posicion]
+                dia_reserva = dias_reserva.get(marca)
+                if dia_reserva is None:
+                    dia_reserva = dias_reserva[marca] = date.fromtimestamp(marca).toordinal()
+                inicio = historial._inicios[posicion]
+                filas.append((marca, grupo, inicio, historial._dias[posicion],
+                              desplazamientos[posicion + 1] - desplazamientos[posicion],
+                              bisect_left(limites, inicio - dia_reserva)))
+        filas.sort(key=lambda fila: fila[0])
+
+        primer_dia = min((fila[2] for fila in filas), default=0)
+        noches = max((fila[2] + fila[3] for fila in filas), default=primer_dia) - primer_dia
+        return cls(
+            claves,
+            capacidades,
+            [tabla.tarifa_diaria(cubierta, acomodacion) for cubierta, acomodacion in claves],
+            tuple(elasticidad for _, elasticidad in elasticidades),
+            primer_dia,
+            noches,
+            array("H", [fila[1] for fila in filas]),
+            array("I", [fila[2] - primer_dia for fila in filas]),
+            array("H", [fila[3] for fila in filas]),
+            array("B", [min(fila[4], 255) for fila in filas]),
+            array("B", [fila[5] for fila in filas]),
+        )
+
+    def precios(self, tabla):
+        """
+        Obtiene la tarifa diaria de cada grupo según una tabla de tarifas.
+
+        Args:
+            tabla (TablaTarifas): Tabla del escenario.
+
+        Returns:
+            tuple: Tarifa diaria de cada grupo, en el orden de claves.
+        """
+        return tuple(tabla.tarifa_diaria(cubierta, acomodacion) for cubierta, acomodacion in self.claves)
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de reservas de la demanda.
+
+        Returns:
+            int: Número de reservas.
+        """
+        return len(self.grupos)
+
+def escenario(cambios, base=tarifas):
+    """
+    Crea la tabla de tarifas de un escenario a partir de la tabla vigente.
+
+    Args:
+        cambios (dict): Parámetros a cambiar por cubierta, con el formato de
+            Tarifas.cargar; los que faltan se toman de la tabla base:
+            {"Premium": {"costo_por_cubierta": 160000,
+                         "factores_acomodacion": {"3": 1.3, "4": 1.7}}}
+        base (TablaTarifas, optional): Tabla de partida. Por defecto, la compartida.
+
+    Returns:
+        TablaTarifas: Tabla del escenario.
+
+    Raises:
+        KeyError: Si una cubierta no está definida en la tabla base.
+    """
+    tabla = base.copiar()
+    for cubierta, parametros in cambios.items():
+        costo_predefinido, costo_por_cubierta, factores = base._cubiertas[base._clave(cubierta)]
+        if "factores_acomodacion" in parametros:
+            factores = {int(acomodacion): factor
+                        for acomodacion, factor in parametros["factores_acomodacion"].items()}
+        tabla.definir_cubierta(cubierta, parametros.get("costo_predefinido", costo_predefinido),
+                               parametros.get("costo_por_cubierta", costo_por_cubierta), factores)
+    return tabla
+
+def rejilla_escenarios(costos=None, factores=None, base=tarifas):
+    """
+    Genera todas las combinaciones de costos y factores por cubierta.
+
+    Args:
+        costos (dict, optional): Valores de costo_por_cubierta a probar por cubierta.
+        factores (dict, optional): Diccionarios de factores de acomodación a
+            probar por cubierta.
+        base (TablaTarifas, optional): Tabla de partida. Por defecto, la compartida.
+
+    Yields:
+        tuple: (nombre, TablaTarifas) de cada combinación.
+    """
+    dimensiones = [(cubierta, "costo_por_cubierta", valores) for cubierta, valores in (costos or {}).items()]
+    dimensiones += [(cubierta, "factores_acomodacion", valores) for cubierta, valores in (factores or {}).items()]
+    for combinacion in product(*(valores for _, _, valores in dimensiones)):
+        cambios = {}
+        partes = []
+        for (cubierta, parametro, _), valor in zip(dimensiones, combinacion):
+            cambios.setdefault(cubierta, {})[parametro] = valor
+            partes.append(f"{cubierta}.{parametro}={json.dumps(valor, sort_keys=True)}")
+        yield " ".join(partes) or "vigente", escenario(cambios, base)
+
+def _reproducir(demanda, precios, semilla):
+    """
+    Repite la demanda con las tarifas de un escenario.
+
+    Args:
+        demanda (Demanda): Demanda a repetir.
+        precios (tuple): Tarifa diaria de cada grupo.
+        semilla (str): Semilla del generador aleatorio del escenario.
+
+    Returns:
+        dict: Ingresos, reservas, noches y rechazos del escenario.
+    """
+    elasticidades = demanda.elasticidades
+    esperadas = []
+    for precio, base in zip(precios, demanda.tarifas_base):
+        proporcion = precio / base if base > 0 else 1.0
+        esperadas.append([DEMANDA_MAXIMA if proporcion <= 0 else min(DEMANDA_MAXIMA, proporcion ** -elasticidad)
+                          for elasticidad in elasticidades])
+    ocupacion = [array("I", bytes(4 * demanda.noches)) for _ in demanda.claves]
+    capacidades = demanda.capacidades
+    ingresos_grupo = [0.0] * len(demanda.claves)
+    reservas = noches_vendidas = pasajeros = perdidas = rechazadas = 0
+    aleatorio = random.Random(semilla).random
+
+    for grupo, inicio, dias, plazas, tramo in zip(demanda.grupos, demanda.inicios, demanda.dias,
+                                                  demanda.plazas, demanda.tramos):
+        esperada = esperadas[grupo][tramo]
+        copias = int(esperada)
+        if aleatorio() < esperada - copias:
+            copias += 1
+        if not copias:
+            perdidas += 1
+            continue
+        noches = ocupacion[grupo]
+        capacidad = capacidades[grupo]
+        fin = inicio + dias
+        for _ in range(copias):
+            if max(noches[inicio:fin]) >= capacidad:
+                rechazadas += 1
+                break
+            for noche in range(inicio, fin):
+                noches[noche] += 1
+            reservas += 1
+            noches_vendidas += dias
+            pasajeros += plazas
+            ingresos_grupo[grupo] += precios[grupo] * dias
+
+    disponibles = sum(capacidades) * demanda.noches
+    return {
+        "ingresos": sum(ingresos_grupo),
+        "ingresos_por_grupo": ingresos_grupo,
+        "reservas": reservas,
+        "noches": noches_vendidas,
+        "pasajeros": pasajeros,
+        "ocupacion": noches_vendidas / disponibles if disponibles else 0.0,
+        "perdidas": perdidas,
+        "rechazadas": rechazadas,
+    }
+
+# Demanda de cada proceso del grupo, recibida una sola vez al iniciarlo
+_demanda_proceso = None
+
+def _iniciar_proceso(demanda):
+    """
+    Guarda la demanda en un proceso del grupo.
+
+    Args:
+        demanda (Demanda): Demanda a repetir.
+    """
+    global _demanda_proceso
+    _demanda_proceso = demanda
+
+def _simular_tramo(tramo):
+    """
+    Simula un tramo de escenarios en un proceso del grupo.
+
+    Args:
+        tramo (list): Tuplas (semilla, precios) de cada escenario.
+
+    Returns:
+        list: Resultado de cada escenario, en el mismo orden.
+    """
+    return [_reproducir(_demanda_proceso, precios, semilla) for semilla, precios in tramo]
+
+def simular(demanda, escenarios, procesos=None, semilla=0):
+    """
+    Simula varios escenarios de tarifas sobre una demanda.
+
+    El resultado de cada escenario depende solo de la semilla y de su
+    posición, no de cómo se repartan los escenarios entre los procesos.
+
+    Args:
+        demanda (Demanda): Demanda a repetir.
+        escenarios (iterable): Tuplas (nombre, TablaTarifas) de cada escenario.
+        procesos (int, optional): Procesos a usar. Por defecto, uno por
+            núcleo; con 1 se simula en el proceso actual.
+        semilla (int, optional): Semilla de la simulación.
+
+    Returns:
+        list: Diccionario con el nombre, los ingresos, la ocupación y los
+            rechazos de cada escenario, en el orden recibido.
+    """
+    nombres = []
+    tareas = []
+    for posicion, (nombre, tabla) in enumerate(escenarios):
+        nombres.append(nombre)
+        tareas.append((f"{semilla}:{posicion}", demanda.precios(tabla)))
+    procesos = min(procesos or os.cpu_count() or 1, len(tareas))
+
+    if procesos <= 1:
+        resultados = [_reproducir(demanda, precios, semilla) for semilla, precios in tareas]
+    else:
+        tamano = ceil(len(tareas) / (procesos * TRAMOS_POR_PROCESO))
+        tramos = [tareas[desde:desde + tamano] for desde in range(0, len(tareas), tamano)]
+        with ProcessPoolExecutor(procesos, initializer=_iniciar_proceso, initargs=(demanda,)) as grupo:
+            resultados = [resultado for tramo in grupo.map(_simular_tramo, tramos) for resultado in tramo]
+
+    for nombre, (_, precios), resultado in zip(nombres, tareas, resultados):
+        ingresos_cubierta = {}
+        for (cubierta, _), ingresos in zip(demanda.claves, resultado.pop("ingresos_por_grupo")):
+            ingresos_cubierta[cubierta] = ingresos_cubierta.get(cubierta, 0.0) + ingresos
+        resultado["nombre"] = nombre
+        resultado["ingresos_por_cubierta"] = ingresos_cubierta
+    return resultados
+
+def _valores(texto, convertir):
+    """
+    Interpreta una opción CUBIERTA=v1;v2;... de la línea de comandos.
+
+    Args:
+        texto (str): Texto de la opción.
+        convertir (callable): Conversión de cada valor.
+
+    Returns:
+        tuple: (cubierta, lista de valores).
+    """
+    cubierta, _, valores = texto.partition("=")
+    return cubierta, [convertir(valor) for valor in valores.split(";") if valor]
+
+def main():
+    """
+    Simula escenarios de tarifas sobre la demanda guardada y muestra los mejores.
+    """
+    # Crucero importa las cubiertas, que registran las tarifas vigentes
+    from Almacenamiento import AlmacenamientoDiario
+    from Crucero import Crucero
+
+    parser = argparse.ArgumentParser(description="Simulación de escenarios de tarifas del crucero.")
+    parser.add_argument("--datos", default="datos_crucero", help="Directorio del almacenamiento")
+    parser.add_argument("--costos", action="append", default=[], metavar="CUBIERTA=V1;V2",
+                        help="Valores de costo_por_cubierta a probar (repetible)")
+    parser.add_argument("--factores", action="append", default=[], metavar='CUBIERTA={"3":1.2};{"3":1.3}',
+                        help="Factores de acomodación a probar, en JSON (repetible)")
+    parser.add_argument("--escenarios", help="Archivo JSON con una lista de {nombre, cubiertas}")
+    parser.add_argument("--procesos", type=int, help="Procesos a usar (por defecto, uno por núcleo)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--mejores", type=int, default=10, help="Escenarios a mostrar")
+    parser.add_argument("--json", action="store_true", help="Mostrar todos los resultados en JSON")
+    argumentos = parser.parse_args()
+
+    crucero = Crucero(AlmacenamientoDiario(argumentos.datos))
+    try:
+        demanda = Demanda.desde_crucero(crucero)
+    finally:
+        crucero.cerrar()
+
+    escenarios = [("vigente", tarifas)]
+    if argumentos.escenarios:
+        with open(argumentos.escenarios, encoding="utf-8") as archivo:
+            escenarios += [(datos["nombre"], escenario(datos.get("cubiertas", {}))) for datos in json.load(archivo)]
+    if argumentos.costos or argumentos.factores:
+        escenarios += rejilla_escenarios(dict(_valores(texto, float) for texto in argumentos.costos),
+                                         dict(_valores(texto, json.loads) for texto in argumentos.factores))
+
+    resultados = simular(demanda, escenarios, argumentos.procesos, argumentos.semilla)
+    if argumentos.json:
+        print(json.dumps(resultados, ensure_ascii=False, indent=2))
+        return
+    print(f"{len(demanda)} reservas, {len(resultados)} escenarios")
+    resultados.sort(key=lambda resultado: resultado["ingresos"], reverse=True)
+    for resultado in resultados[:argumentos.mejores]:
+        print(f"${resultado['ingresos']:>16,.0f}  ocupación {resultado['ocupacion']:6.1%}  "
+              f"perdidas {resultado['perdidas']:>6}  rechazadas {resultado['rechazadas']:>6}  {resultado['nombre']}")
+
+if __name__ == "__main__":
+    main()
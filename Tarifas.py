@@ -0,0 +1,183 @@
+"""
+Módulo que define la tabla de tarifas del crucero.
+
+Este módulo implementa una tabla central de tarifas diarias por cubierta y
+acomodación. Las tarifas se calculan una sola vez a partir de los costos de
+cada cubierta y pueden modificarse en tiempo de ejecución (o cargarse desde un
+archivo JSON) sin editar las clases de Cubiertas.
+"""
+
+import json
+
+from Normalizar import normalizar_texto
+
+class TablaTarifas:
+    """
+    Tabla de tarifas diarias indexada por (cubierta, acomodación).
+
+    Cada cubierta se define con su costo base, su costo por cubierta y los
+    factores por acomodación. La tarifa diaria de una combinación es
+    costo_predefinido + costo_por_cubierta * factor, salvo que se haya
+    establecido explícitamente otra tarifa.
+
+    Attributes:
+        _cubiertas (dict): Parámetros de cada cubierta normalizada, como tuplas
+            (costo_predefinido, costo_por_cubierta, factores_acomodacion).
+        _tarifas (dict): Tarifas diarias ya calculadas o establecidas,
+            indexadas por (cubierta normalizada, acomodación).
+        _alias (dict): Nombre de cubierta tal como se consultó a su forma
+            normalizada, para no normalizar en cada consulta.
+    """
+
+    def __init__(self):
+        """
+        Inicializa una tabla de tarifas vacía.
+        """
+        self._cubiertas = {}
+        self._tarifas = {}
+        self._alias = {}
+
+    def _clave(self, cubierta):
+        """
+        Obtiene la forma normalizada de un nombre de cubierta.
+
+        Args:
+            cubierta (str): Nombre de la cubierta.
+
+        Returns:
+            str: Nombre normalizado.
+        """
+        clave = self._alias.get(cubierta)
+        if clave is None:
+            clave = normalizar_texto(cubierta)
+            self._alias[cubierta] = clave
+        return clave
+
+    def definir_cubierta(self, cubierta, costo_predefinido, costo_por_cubierta, factores_acomodacion):
+        """
+        Define (o redefine) los parámetros de costo de una cubierta.
+
+        Las tarifas calculadas de la cubierta se descartan para recalcularlas.
+
+        Args:
+            cubierta (str): Nombre de la cubierta.
+            costo_predefinido (float): Costo base por día.
+            costo_por_cubierta (float): Costo adicional de la cubierta por día.
+            factores_acomodacion (dict): Factor por cantidad de personas. Las
+                acomodaciones que no aparecen usan factor 1.0.
+        """
+        clave = self._clave(cubierta)
+        self._cubiertas[clave] = (costo_predefinido, costo_por_cubierta, dict(factores_acomodacion))
+        for clave_tarifa in [clave_tarifa for clave_tarifa in self._tarifas if clave_tarifa[0] == clave]:
+            del self._tarifas[clave_tarifa]
+
+    def copiar(self):
+        """
+        Crea una copia independiente de la tabla.
+
+        Returns:
+            TablaTarifas: Tabla con los mismos parámetros y tarifas establecidas.
+        """
+        copia = TablaTarifas()
+        copia._cubiertas = {clave: (costo_predefinido, costo_por_cubierta, dict(factores))
+                            for clave, (costo_predefinido, costo_por_cubierta, factores) in self._cubiertas.items()}
+        copia._tarifas = dict(self._tarifas)
+        copia._alias = dict(self._alias)
+        return copia
+
+    def establecer_tarifa(self, cubierta, acomodacion, tarifa_diaria):
+        """
+        Establece explícitamente la tarifa diaria de una combinación.
+
+        Args:
+            cubierta (str): Nombre de la cubierta.
+            acomodacion (int): Cantidad de personas.
+            tarifa_diaria (float): Tarifa por día.
+        """
+        self._tarifas[(self._clave(cubierta), acomodacion)] = float(tarifa_diaria)
+
+    def tarifa_diaria(self, cubierta, acomodacion):
+        """
+        Obtiene la tarifa diaria de una cubierta y acomodación.
+
+        Args:
+            cubierta (str): Nombre de la cubierta.
+            acomodacion (int): Cantidad de personas.
+
+        Returns:
+            float: Tarifa por día.
+
+        Raises:
+            KeyError: Si la cubierta no está definida en la tabla.
+        """
+        clave = (self._clave(cubierta), acomodacion)
+        tarifa = self._tarifas.get(clave)
+        if tarifa is None:
+            costo_predefinido, costo_por_cubierta, factores = self._cubiertas[clave[0]]
+            tarifa = costo_predefinido + (costo_por_cubierta * factores.get(acomodacion, 1.0))
+            self._tarifas[clave] = tarifa
+        return tarifa
+
+    def calcular_costo(self, cubierta, dias_reserva, acomodacion):
+        """
+        Calcula el costo total de una reserva.
+
+        Args:
+            cubierta (str): Nombre de la cubierta.
+            dias_reserva (int): Cantidad de días de la reserva.
+            acomodacion (int): Cantidad de personas.
+
+        Returns:
+            float: Costo total de la reserva.
+        """
+        return self.tarifa_diaria(cubierta, acomodacion) * dias_reserva
+
+    def cotizar_lote(self, pares):
+        """
+        Calcula el costo de muchas reservas en una sola llamada.
+
+        Args:
+            pares (iterable): Tuplas (habitacion, dias_reserva).
+
+        Returns:
+            list: Costo total de cada par, en el mismo orden.
+        """
+        tarifas = {}
+        costos = []
+        for habitacion, dias_reserva in pares:
+            clave = (habitacion.cubierta, habitacion.acomodacion)
+            tarifa = tarifas.get(clave)
+            if tarifa is None:
+                tarifa = tarifas[clave] = self.tarifa_diaria(*clave)
+            costos.append(tarifa * dias_reserva)
+        return costos
+
+    def cargar(self, ruta):
+        """
+        Carga tarifas desde un archivo JSON.
+
+        El archivo puede contener una clave "cubiertas" con los parámetros de
+        cada cubierta y una clave "tarifas" con tarifas diarias explícitas:
+
+            {
+                "cubiertas": {"Premium": {"costo_predefinido": 100000,
+                                          "costo_por_cubierta": 160000,
+                                          "factores_acomodacion": {"3": 1.3, "4": 1.7}}},
+                "tarifas": [{"cubierta": "Normal", "acomodacion": 4, "tarifa_diaria": 260000}]
+            }
+
+        Args:
+            ruta (str): Ruta del archivo JSON.
+        """
+        with open(ruta, encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+        for cubierta, parametros in datos.get("cubiertas", {}).items():
+            factores = {int(acomodacion): factor
+                        for acomodacion, factor in parametros.get("factores_acomodacion", {}).items()}
+            self.definir_cubierta(cubierta, parametros["costo_predefinido"],
+                                  parametros["costo_por_cubierta"], factores)
+        for tarifa in datos.get("tarifas", []):
+            self.establecer_tarifa(tarifa["cubierta"], tarifa["acomodacion"], tarifa["tarifa_diaria"])
+
+# Tabla de tarifas compartida; las clases de Cubiertas registran sus costos en ella
+tarifas = TablaTarifas()
@@ -5,7 +5,31 @@ Este módulo implementa la clase que maneja los datos de los usuarios
 que realizan reservas en el sistema de gestión del crucero.
 """
 
-from datetime import datetime
+from datetime import date, datetime
+
+from Identificadores import generador
+
+def normalizar_codigo_usuario(codigo):
+    """
+    Convierte un código de usuario a su forma canónica.
+    
+    Los números y los códigos con prefijo U se escriben como U seguido del
+    número con al menos 3 dígitos, de modo que 7, "7", "u7", "U07" y "U007"
+    representan al mismo usuario ("U007"). Los códigos generados por
+    Identificadores (U seguido de 19 dígitos) no cambian. Los códigos con otro
+    formato se devuelven sin cambios, salvo los espacios en los extremos.
+    
+    Args:
+        codigo (str | int): Código o número de usuario.
+        
+    Returns:
+        str: Código canónico del usuario.
+    """
+    texto = str(codigo).strip()
+    numero = texto[1:] if texto[:1] in ("U", "u") else texto
+    if numero.isdigit():
+        return f"U{int(numero):03d}"
+    return texto
 
 class Usuario:
     """
@@ -18,12 +42,15 @@ class Usuario:
         nombre (str): Nombre del usuario.
         codigo (str): Código único identificador del usuario.
         fecha_registro (datetime): Fecha en que el usuario se registró.
-        fecha_salida (datetime): Fecha en que el usuario terminó su estancia (si aplica).
+        fecha_salida (date): Fecha en que el usuario terminó su estancia (si aplica).
         reserva (str): Código de la reserva asociada al usuario (si tiene).
-        contador_usuarios (int): Contador de clase para generar códigos únicos.
+        generador_codigos (GeneradorIdentificadores): Generador de clase de los
+            códigos de usuarios creados sin código (origen 0).
     """
 
-    contador_usuarios = 1
+    __slots__ = ("nombre", "codigo", "fecha_registro", "fecha_salida", "reserva")
+
+    generador_codigos = generador()
     
     def __init__(self, nombre, codigo=None, fecha_registro=None):
         """
@@ -31,7 +58,9 @@ class Usuario:
         
         Args:
             nombre (str): Nombre del usuario.
-            codigo (str, optional): Código del usuario. Si es None, se genera automáticamente.
+            codigo (str, optional): Código del usuario. Si es None, se genera
+                automáticamente (Crucero.nuevo_codigo_usuario genera uno con el
+                origen del crucero).
             fecha_registro (datetime, optional): Fecha de registro. Si es None,
                 se establece la fecha actual.
         """
@@ -39,14 +68,10 @@ class Usuario:
         
         # Asignar código automático o procesar el código proporcionado
         if codigo is None:
-            self.codigo = f"U{Usuario.contador_usuarios:03d}"
-            Usuario.contador_usuarios += 1
+            self.codigo = Usuario.generador_codigos.codigo("U")
         else:
             # Asegurar formato correcto del código
-            if not str(codigo).upper().startswith('U'):
-                self.codigo = f"U{int(codigo):03d}"
-            else:
-                self.codigo = codigo
+            self.codigo = normalizar_codigo_usuario(codigo)
         
         # Asignar fecha actual si no se proporciona una
         if fecha_registro is None:
@@ -93,6 +118,45 @@ class Usuario:
         """
         return self.reserva
     
+    def a_dict(self):
+        """
+        Convierte el usuario en un diccionario serializable.
+        
+        La reserva asociada no se incluye porque se reconstruye a partir
+        de las reservas guardadas.
+        
+        Returns:
+            dict: Datos del usuario con las fechas en formato ISO (fecha_salida
+                es None si el usuario no terminó ninguna estancia).
+        """
+        return {
+            "nombre": self.nombre,
+            "codigo": self.codigo,
+            "fecha_registro": self.fecha_registro.isoformat(),
+            "fecha_salida": self.fecha_salida.isoformat() if self.fecha_salida else None,
+        }
+    
+    @classmethod
+    def desde_dict(cls, datos):
+        """
+        Reconstruye un usuario a partir de un diccionario.
+        
+        Args:
+            datos (dict): Datos generados por a_dict.
+            
+        Returns:
+            Usuario: Usuario reconstruido con su código original.
+        """
+        usuario = cls(
+            datos["nombre"],
+            datos["codigo"],
+            datetime.fromisoformat(datos["fecha_registro"]),
+        )
+        # Los datos guardados antes de incluir la fecha de salida no la tienen
+        if datos.get("fecha_salida"):
+            usuario.fecha_salida = date.fromisoformat(datos["fecha_salida"])
+        return usuario
+    
     def __str__(self):
         """
         Devuelve una representación en cadena del usuario.
@@ -0,0 +1,126 @@
+"""
+Tiempo de arranque de un crucero según el tamaño de su distribución.
+
+Compara, para barcos de 30, 3.000 y 300.000 habitaciones:
+
+- constructores: el camino original, que crea cada habitación con su
+  constructor y la registra una por una en los índices.
+- lote: Crucero con la distribución, que crea e indexa en bloque.
+- perezosa: Crucero(perezosa=True), que solo indexa los códigos y crea cada
+  habitación al usarse.
+- cargar_json / cargar_csv / cargar_binario: lectura de la distribución
+  desde cada formato de archivo.
+
+Uso:
+    python benchmarks/arranque_distribucion.py [--tamanos 30,3000,300000] [--repeticiones N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import Crucero
+from Cubiertas import CLASES_CUBIERTA
+from Distribucion import Distribucion, cargar_distribucion, guardar_distribucion
+from IndiceDisponibilidad import IndiceDisponibilidad
+
+def generar_distribucion(cantidad):
+    """
+    Genera una distribución con la misma proporción que la predeterminada.
+
+    Cada cubierta tiene un tercio de las habitaciones: 30% para 2 personas,
+    40% para 3 personas y 30% para 4 personas, numeradas de forma consecutiva.
+
+    Args:
+        cantidad (int): Cantidad aproximada de habitaciones.
+
+    Returns:
+        Distribucion: Distribución generada.
+    """
+    por_cubierta = max(cantidad // 3, 1)
+    entradas = []
+    for prefijo, cubierta in (("E", "Económica"), ("N", "Normal"), ("P", "Premium")):
+        for numero in range(por_cubierta):
+            fraccion = numero / por_cubierta
+            acomodacion = 2 if fraccion < 0.3 else 3 if fraccion < 0.7 else 4
+            entradas.append((f"{prefijo}{numero + 1:06d}", cubierta, acomodacion))
+    return Distribucion.desde_entradas(entradas)
+
+def arranque_constructores(distribucion):
+    """
+    Crea e indexa las habitaciones una por una, como el arranque original.
+
+    Args:
+        distribucion (Distribucion): Distribución a construir.
+
+    Returns:
+        list: Habitaciones creadas.
+    """
+    habitaciones = []
+    indice_habitaciones = {}
+    indice_disponibilidad = IndiceDisponibilidad()
+    for codigo, cubierta, acomodacion in distribucion:
+        habitaciones.append(CLASES_CUBIERTA[cubierta](codigo, acomodacion))
+    for habitacion in habitaciones:
+        indice_habitaciones[habitacion.codigo_habitacion] = habitacion
+        indice_disponibilidad.registrar(habitacion)
+    return habitaciones
+
+def medir(funcion, repeticiones):
+    """
+    Mide el menor tiempo de varias ejecuciones.
+
+    Args:
+        funcion (callable): Función a medir.
+        repeticiones (int): Cantidad de ejecuciones.
+
+    Returns:
+        float: Menor tiempo en milisegundos.
+    """
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+def main():
+    """
+    Ejecuta las mediciones y muestra los resultados.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", default="30,3000,300000", help="Cantidades de habitaciones, separadas por comas")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Mostrar los resultados en formato JSON")
+    argumentos = parser.parse_args()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for cantidad in (int(tamano) for tamano in argumentos.tamanos.split(",")):
+            distribucion = generar_distribucion(cantidad)
+            tiempos = {
+                "constructores": medir(lambda: arranque_constructores(distribucion), argumentos.repeticiones),
+                "lote": medir(lambda: Crucero(distribucion=distribucion), argumentos.repeticiones),
+                "perezosa": medir(lambda: Crucero(distribucion=distribucion, perezosa=True), argumentos.repeticiones),
+            }
+            for formato, extension in (("json", "json"), ("csv", "csv"), ("binario", "bin")):
+                ruta = os.path.join(directorio, f"distribucion_{cantidad}.{extension}")
+                guardar_distribucion(distribucion, ruta)
+                tiempos[f"cargar_{formato}"] = medir(lambda: cargar_distribucion(ruta), argumentos.repeticiones)
+            resultados[len(distribucion)] = tiempos
+
+    if argumentos.json:
+        print(json.dumps({"ms": resultados}, indent=2))
+        return
+    columnas = list(next(iter(resultados.values())))
+    print(f"{'habitaciones':>12}" + "".join(f"{columna:>15}" for columna in columnas))
+    for cantidad, tiempos in resultados.items():
+        print(f"{cantidad:>12}" + "".join(f"{tiempos[columna]:>13.2f}ms" for columna in columnas))
+
+if __name__ == "__main__":
+    main()
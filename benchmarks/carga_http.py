@@ -0,0 +1,190 @@
+"""
+Generador de carga para el servidor HTTP/JSON de reservas.
+
+Levanta un ServidorCrucero en un puerto libre (o usa uno ya en ejecución con
+--url) y lanza varios clientes concurrentes con conexiones persistentes. Cada
+cliente mezcla consultas (listar habitaciones, consultar reservas) con
+reservas y cancelaciones, y se mide la latencia de cada petición.
+
+Informa peticiones por segundo y latencias p50/p99 por tipo de operación.
+
+Uso:
+    python benchmarks/carga_http.py [--clientes N] [--peticiones N] [--url http://host:puerto] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Almacenamiento import AlmacenamientoDiario
+from Crucero import Crucero
+from Servidor import ServidorCrucero
+
+async def peticion(lector, escritor, metodo, ruta, cuerpo=None):
+    """
+    Envía una petición HTTP por una conexión persistente y lee la respuesta.
+
+    Args:
+        lector (asyncio.StreamReader): Flujo de entrada de la conexión.
+        escritor (asyncio.StreamWriter): Flujo de salida de la conexión.
+        metodo (str): Método HTTP.
+        ruta (str): Ruta de la petición.
+        cuerpo (dict, optional): Cuerpo JSON de la petición.
+
+    Returns:
+        tuple: (código de estado, respuesta JSON decodificada).
+    """
+    datos = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else b""
+    escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\n"
+                   f"Content-Length: {len(datos)}\r\n\r\n".encode("latin-1") + datos)
+    await escritor.drain()
+    cabecera = await lector.readuntil(b"\r\n\r\n")
+    lineas = cabecera.decode("latin-1").split("\r\n")
+    estado = int(lineas[0].split(" ")[1])
+    longitud = 0
+    for linea in lineas[1:]:
+        if linea.lower().startswith("content-length:"):
+            longitud = int(linea.split(":", 1)[1])
+    return estado, json.loads(await lector.readexactly(longitud))
+
+async def cliente(host, puerto, cantidad, semilla, latencias):
+    """
+    Ejecuta una secuencia de peticiones mixtas sobre una conexión.
+
+    Args:
+        host (str): Dirección del servidor.
+        puerto (int): Puerto del servidor.
+        cantidad (int): Cantidad de peticiones a enviar.
+        semilla (int): Semilla del generador aleatorio del cliente.
+        latencias (dict): Latencias por operación, se completa en el lugar.
+    """
+    azar = random.Random(semilla)
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    propias = []
+    try:
+        for numero in range(cantidad):
+            eleccion = azar.random()
+            if eleccion < 0.5:
+                operacion, metodo, ruta, cuerpo = "listar", "GET", "/habitaciones?cubierta=Normal", None
+            elif eleccion < 0.7 and propias:
+                operacion, metodo, ruta, cuerpo = "consultar", "GET", f"/reservas/{azar.choice(propias)}", None
+            elif eleccion < 0.9 or not propias:
+                operacion, metodo, ruta = "reservar", "POST", "/reservas"
+                cuerpo = {
+                    "codigos_usuarios": [f"C{semilla:03d}-{numero}"],
+                    "codigo_habitacion": azar.choice(["E01", "E02", "N01", "N02", "P01", "P02"]),
+                    "dias_reserva": azar.randint(1, 5),
+                    "fecha_inicio": f"2025-{azar.randint(1, 12):02d}-{azar.randint(1, 28):02d}",
+                }
+            else:
+                operacion, metodo, ruta, cuerpo = "cancelar", "DELETE", f"/reservas/{propias.pop()}", None
+
+            inicio = time.perf_counter()
+            estado, respuesta = await peticion(lector, escritor, metodo, ruta, cuerpo)
+            latencias.setdefault(operacion, []).append(time.perf_counter() - inicio)
+            if operacion == "reservar" and estado == 201:
+                propias.append(respuesta["codigo_reserva"])
+    finally:
+        escritor.close()
+
+def percentil(valores, porcentaje):
+    """
+    Calcula un percentil por el método del rango más cercano.
+
+    Args:
+        valores (list): Valores ordenados.
+        porcentaje (float): Percentil a calcular (0-100).
+
+    Returns:
+        float: Valor del percentil.
+    """
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(len(valores) * porcentaje / 100))]
+
+async def ejecutar(argumentos):
+    """
+    Ejecuta la prueba de carga completa.
+
+    Args:
+        argumentos (argparse.Namespace): Opciones de la línea de comandos.
+
+    Returns:
+        dict: Resultados de la prueba.
+    """
+    servidor = directorio = crucero = None
+    if argumentos.url:
+        url = urlsplit(argumentos.url)
+        host, puerto = url.hostname, url.port or 80
+    else:
+        directorio = tempfile.TemporaryDirectory()
+        crucero = Crucero(AlmacenamientoDiario(directorio.name))
+        servidor = ServidorCrucero(crucero, "127.0.0.1", 0)
+        await servidor.iniciar()
+        host, puerto = servidor.host, servidor.puerto
+
+    latencias = {}
+    inicio = time.perf_counter()
+    try:
+        await asyncio.gather(*(cliente(host, puerto, argumentos.peticiones, semilla, latencias)
+                               for semilla in range(argumentos.clientes)))
+    finally:
+        duracion = time.perf_counter() - inicio
+        if servidor is not None:
+            await servidor.detener()
+            crucero.cerrar()
+            directorio.cleanup()
+
+    total = sum(len(valores) for valores in latencias.values())
+    todas = sorted(valor for valores in latencias.values() for valor in valores)
+    resultados = {
+        "clientes": argumentos.clientes,
+        "peticiones": total,
+        "segundos": duracion,
+        "peticiones_por_segundo": total / duracion,
+        "p50_ms": percentil(todas, 50) * 1000,
+        "p99_ms": percentil(todas, 99) * 1000,
+        "operaciones": {},
+    }
+    for operacion, valores in sorted(latencias.items()):
+        valores.sort()
+        resultados["operaciones"][operacion] = {
+            "peticiones": len(valores),
+            "p50_ms": percentil(valores, 50) * 1000,
+            "p99_ms": percentil(valores, 99) * 1000,
+        }
+    return resultados
+
+def main():
+    """
+    Ejecuta la prueba de carga y muestra los resultados.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--peticiones", type=int, default=200, help="Peticiones por cliente")
+    parser.add_argument("--url", help="Servidor ya en ejecución (por defecto se levanta uno local)")
+    parser.add_argument("--json", action="store_true", help="Mostrar los resultados en formato JSON")
+    argumentos = parser.parse_args()
+
+    resultados = asyncio.run(ejecutar(argumentos))
+    if argumentos.json:
+        print(json.dumps(resultados, indent=2))
+        return
+    print(f"{resultados['peticiones']} peticiones de {resultados['clientes']} clientes "
+          f"en {resultados['segundos']:.2f}s")
+    print(f"  {resultados['peticiones_por_segundo']:.0f} peticiones/s, "
+          f"p50 {resultados['p50_ms']:.2f}ms, p99 {resultados['p99_ms']:.2f}ms")
+    for operacion, datos in resultados["operaciones"].items():
+        print(f"  {operacion:<10} {datos['peticiones']:>7}  p50 {datos['p50_ms']:7.2f}ms  "
+              f"p99 {datos['p99_ms']:7.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Prueba de estrés de reservas concurrentes.
+
+Lanza miles de reservas simultáneas desde un grupo de hilos sobre un mismo
+crucero (incluyendo cancelaciones y registros de usuarios) y verifica que:
+
+- Ninguna habitación tiene reservas con fechas solapadas.
+- Todos los códigos de reserva y de usuario generados son únicos.
+- Las reservas activas coinciden con las creadas menos las canceladas.
+
+Uso:
+    python benchmarks/estres_reservas.py [--reservas N] [--hilos N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import Crucero
+from Usuario import Usuario
+
+def intentar_reserva(crucero, semilla, fecha_base):
+    """
+    Intenta una reserva aleatoria y cancela algunas de las que consigue.
+
+    Args:
+        crucero (Crucero): Crucero compartido entre los hilos.
+        semilla (int): Semilla para los valores aleatorios de este intento.
+        fecha_base (date): Primera fecha posible de inicio.
+
+    Returns:
+        tuple: (código de usuario, código de reserva o None, si se canceló).
+    """
+    aleatorio = random.Random(semilla)
+    usuario = Usuario(f"Pasajero {semilla}")
+    crucero.registrar_usuario(usuario)
+
+    habitacion = aleatorio.choice(crucero.habitaciones)
+    fecha_inicio = fecha_base + timedelta(days=aleatorio.randrange(30))
+    codigo_reserva = crucero.crear_reserva([usuario.codigo], habitacion.codigo_habitacion,
+                                           aleatorio.randint(1, 5), fecha_inicio)
+
+    cancelada = False
+    if codigo_reserva and aleatorio.random() < 0.2:
+        cancelada = crucero.cancelar_reserva(codigo_reserva)
+    return usuario.codigo, codigo_reserva, cancelada
+
+def verificar(crucero, resultados):
+    """
+    Comprueba que el estado final del crucero es consistente.
+
+    Args:
+        crucero (Crucero): Crucero tras la prueba.
+        resultados (list): Resultados devueltos por intentar_reserva.
+
+    Returns:
+        list: Lista de errores encontrados (vacía si todo es correcto).
+    """
+    errores = []
+
+    codigos_usuarios = [codigo for codigo, _, _ in resultados]
+    if len(set(codigos_usuarios)) != len(codigos_usuarios):
+        errores.append("Códigos de usuario duplicados")
+
+    creadas = [codigo for _, codigo, _ in resultados if codigo]
+    if len(set(creadas)) != len(creadas):
+        errores.append("Códigos de reserva duplicados")
+
+    canceladas = sum(1 for _, _, cancelada in resultados if cancelada)
+    if len(crucero.reservas) != len(creadas) - canceladas:
+        errores.append(f"Se esperaban {len(creadas) - canceladas} reservas activas, hay {len(crucero.reservas)}")
+
+    # Ninguna habitación puede tener dos reservas solapadas
+    por_habitacion = {}
+    for reserva in crucero.reservas:
+        por_habitacion.setdefault(reserva.codigo_habitacion, []).append(reserva)
+    for codigo_habitacion, reservas in por_habitacion.items():
+        reservas.sort(key=lambda reserva: reserva.fecha_inicio)
+        for anterior, siguiente in zip(reservas, reservas[1:]):
+            if siguiente.fecha_inicio < anterior.fecha_fin:
+                errores.append(f"Doble reserva en {codigo_habitacion}: "
+                               f"{anterior.codigo_reserva} y {siguiente.codigo_reserva}")
+        if len(crucero.buscar_habitacion(codigo_habitacion).calendario or ()) != len(reservas):
+            errores.append(f"Calendario de {codigo_habitacion} inconsistente con sus reservas")
+    return errores
+
+def main():
+    """
+    Ejecuta la prueba de estrés y termina con código 1 si hay errores.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reservas", type=int, default=5000)
+    parser.add_argument("--hilos", type=int, default=32)
+    argumentos = parser.parse_args()
+
+    # Cambiar de hilo con mucha frecuencia para provocar más intercalados
+    sys.setswitchinterval(1e-6)
+
+    crucero = Crucero()
+    fecha_base = date.today()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=argumentos.hilos) as ejecutor:
+        resultados = list(ejecutor.map(lambda semilla: intentar_reserva(crucero, semilla, fecha_base),
+                                       range(argumentos.reservas)))
+    duracion = time.perf_counter() - inicio
+
+    errores = verificar(crucero, resultados)
+    exitosas = sum(1 for _, codigo, _ in resultados if codigo)
+    print(f"{argumentos.reservas} intentos con {argumentos.hilos} hilos en {duracion:.2f}s: "
+          f"{exitosas} reservas creadas, {len(crucero.reservas)} activas")
+    for error in errores:
+        print(f"ERROR: {error}")
+    sys.exit(1 if errores else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Medición de memoria por registro de reservas, habitaciones y usuarios.
+
+Compara los bytes por registro de:
+
+- Objetos con __dict__ (equivalentes a las clases sin __slots__).
+- Objetos con __slots__ (Reserva, Normal y Usuario actuales).
+- El historial columnar (HistorialReservas) para reservas finalizadas.
+- El archivo binario (ArchivoReservas) abierto con mmap: memoria de Python
+  al abrirlo y bytes por registro en disco.
+
+La memoria se mide con tracemalloc e incluye los objetos contenidos
+(listas de usuarios, fechas, calendarios), no solo la instancia.
+
+Uso:
+    python benchmarks/memoria_reservas.py [--registros N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ArchivoReservas import ArchivoReservas, escribir_archivo
+from Cubiertas import Normal
+from Historial import HistorialReservas
+from Reserva import Reserva
+from Usuario import Usuario
+
+class ReservaConDict(Reserva):
+    """Reserva con __dict__, como antes de usar __slots__."""
+
+class NormalConDict(Normal):
+    """Habitación Normal con __dict__, como antes de usar __slots__."""
+
+class UsuarioConDict(Usuario):
+    """Usuario con __dict__, como antes de usar __slots__."""
+
+def medir(construir, cantidad):
+    """
+    Mide los bytes por registro que ocupan los objetos construidos.
+
+    Args:
+        construir (callable): Función que recibe un índice y devuelve un registro.
+        cantidad (int): Cantidad de registros a construir.
+
+    Returns:
+        float: Bytes asignados por registro.
+    """
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    registros = [construir(indice) for indice in range(cantidad)]
+    usado = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    del registros
+    return usado / cantidad
+
+def medir_historial(reservas):
+    """
+    Mide los bytes por registro del historial columnar.
+
+    Args:
+        reservas (list): Reservas a agregar al historial.
+
+    Returns:
+        float: Bytes asignados por registro.
+    """
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    historial = HistorialReservas()
+    for reserva in reservas:
+        historial.agregar(reserva)
+    usado = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    return usado / len(reservas)
+
+def medir_archivo(reservas):
+    """
+    Mide los bytes por registro de un archivo binario abierto con mmap.
+
+    Args:
+        reservas (list): Reservas a escribir en el archivo.
+
+    Returns:
+        tuple: (bytes de memoria de Python por registro al abrirlo, bytes por
+            registro en disco).
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "historial.arch")
+        escribir_archivo(ruta, reservas)
+        tracemalloc.start()
+        inicio = tracemalloc.get_traced_memory()[0]
+        archivo = ArchivoReservas(ruta)
+        usado = tracemalloc.get_traced_memory()[0] - inicio
+        tracemalloc.stop()
+        archivo.cerrar()
+        return usado / len(reservas), os.path.getsize(ruta) / len(reservas)
+
+def main():
+    """
+    Ejecuta las mediciones y muestra los resultados.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--registros", type=int, default=100000)
+    parser.add_argument("--json", action="store_true", help="Mostrar los resultados en formato JSON")
+    argumentos = parser.parse_args()
+    cantidad = argumentos.registros
+
+    fecha_reserva = datetime(2025, 1, 1, 12, 0)
+    fecha_base = date(2025, 6, 1)
+
+    def reserva(clase):
+        return lambda indice: clase(3, [f"U{indice % 5000:03d}", None], f"E{indice % 300:02d}",
+                                    fecha_reserva=fecha_reserva,
+                                    fecha_inicio=fecha_base + timedelta(days=indice % 365),
+                                    codigo_reserva=f"R{indice:06d}")
+
+    resultados = {
+        "reserva_dict": medir(reserva(ReservaConDict), cantidad),
+        "reserva_slots": medir(reserva(Reserva), cantidad),
+        "reserva_historial": medir_historial([reserva(Reserva)(indice) for indice in range(cantidad)]),
+        "habitacion_dict": medir(lambda indice: NormalConDict(f"N{indice:05d}", 2), cantidad),
+        "habitacion_slots": medir(lambda indice: Normal(f"N{indice:05d}", 2), cantidad),
+        "usuario_dict": medir(lambda indice: UsuarioConDict("Pasajero", f"U{indice:06d}", fecha_reserva), cantidad),
+        "usuario_slots": medir(lambda indice: Usuario("Pasajero", f"U{indice:06d}", fecha_reserva), cantidad),
+    }
+
+    resultados["reserva_archivo"], resultados["reserva_archivo_disco"] = medir_archivo(
+        [reserva(Reserva)(indice) for indice in range(cantidad)])
+
+    if argumentos.json:
+        print(json.dumps({"registros": cantidad, "bytes_por_registro": resultados}, indent=2))
+        return
+    print(f"Bytes por registro ({cantidad} registros):")
+    for nombre, valor in resultados.items():
+        print(f"  {nombre:<20} {valor:10.1f}")
+
+if __name__ == "__main__":
+    main()
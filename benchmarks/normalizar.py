@@ -0,0 +1,89 @@
+"""
+Micro-benchmark de normalizar_texto.
+
+Compara la implementación original (22 reemplazos sucesivos con str.replace)
+con la implementación actual (tabla de acentos precalculada) y con su variante
+cacheada, sobre textos cortos (nombres de cubierta), medianos (nombres de
+pasajeros) y largos (párrafos).
+
+Uso:
+    python benchmarks/normalizar.py [--repeticiones N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Normalizar import normalizar_texto, normalizar_texto_cacheado
+
+def normalizar_texto_original(texto):
+    """
+    Implementación original de normalizar_texto, usada como referencia.
+
+    Args:
+        texto (str): Texto a normalizar.
+
+    Returns:
+        str: Texto normalizado (sin acentos y en minúsculas).
+    """
+    if not texto:
+        return texto
+    texto = texto.lower()
+    acentos = {
+        'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u',
+        'à': 'a', 'è': 'e', 'ì': 'i', 'ò': 'o', 'ù': 'u',
+        'ä': 'a', 'ë': 'e', 'ï': 'i', 'ö': 'o', 'ü': 'u',
+        'â': 'a', 'ê': 'e', 'î': 'i', 'ô': 'o', 'û': 'u',
+        'ã': 'a', 'ñ': 'n'
+    }
+    for acento, normal in acentos.items():
+        texto = texto.replace(acento, normal)
+    return texto
+
+TEXTOS = {
+    "corto_acentos": "Económica",
+    "corto_ascii": "Premium",
+    "medio_acentos": "José María Muñoz Gómez",
+    "largo_acentos": "La habitación económica de la cubierta está reservada para José Muñoz y "
+                     "María Gómez durante la travesía por el Caribe. " * 20,
+    "largo_ascii": "The economy cabin on the lower deck is booked for the whole sailing. " * 20,
+}
+
+IMPLEMENTACIONES = {
+    "original": normalizar_texto_original,
+    "actual": normalizar_texto,
+    "cacheada": normalizar_texto_cacheado,
+}
+
+def main():
+    """
+    Ejecuta el micro-benchmark y muestra los tiempos por llamada.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticiones", type=int, default=20000)
+    parser.add_argument("--json", action="store_true", help="Mostrar los resultados en formato JSON")
+    argumentos = parser.parse_args()
+
+    resultados = {}
+    for nombre_texto, texto in TEXTOS.items():
+        # Todas las implementaciones deben dar el mismo resultado para estos textos
+        assert normalizar_texto(texto) == normalizar_texto_original(texto)
+        for nombre, funcion in IMPLEMENTACIONES.items():
+            tiempo = min(timeit.repeat(lambda: funcion(texto), number=argumentos.repeticiones, repeat=3))
+            resultados.setdefault(nombre_texto, {})[nombre] = tiempo / argumentos.repeticiones * 1e9
+
+    if argumentos.json:
+        print(json.dumps({"ns_por_llamada": resultados}, indent=2))
+        return
+    print(f"{'texto':<16}" + "".join(f"{nombre:>14}" for nombre in IMPLEMENTACIONES) + f"{'aceleración':>14}")
+    for nombre_texto, tiempos in resultados.items():
+        aceleracion = tiempos["original"] / tiempos["actual"]
+        print(f"{nombre_texto:<16}" + "".join(f"{tiempos[nombre]:>12.0f}ns" for nombre in IMPLEMENTACIONES)
+              + f"{aceleracion:>13.1f}x")
+
+if __name__ == "__main__":
+    main()
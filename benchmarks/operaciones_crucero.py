@@ -0,0 +1,282 @@
+"""
+Suite de benchmarks de las operaciones frecuentes de Crucero.
+
+Mide, para inventarios de distintos tamaños (habitaciones y reservas activas):
+
+- buscar_habitacion (código existente y código inexistente).
+- listar_habitaciones_disponibles con cada combinación de filtros (cubierta,
+  acomodación y rango de fechas).
+- crear_reserva y cancelar_reserva.
+- listar_todas_reservas y paginar_reservas (primera página y página intermedia).
+- Primera página de iterar_habitaciones_disponibles.
+- calcular_costo_reserva.
+- buscar_usuarios_similares entre tantos pasajeros como habitaciones.
+- normalizar_texto.
+
+Los resultados se guardan en JSON (--salida) y pueden compararse con una
+ejecución anterior (--comparar): el programa termina con código 1 si alguna
+operación es más lenta que la referencia por encima de la tolerancia.
+
+Uso:
+    python benchmarks/operaciones_crucero.py [--tamanos 30,3000,100000] [--salida resultados.json]
+        [--comparar referencia.json] [--tolerancia 0.25] [--json] [--metricas]
+
+Con --metricas el crucero se instrumenta con Metricas antes de medir, para
+estimar el costo de la instrumentación comparando con una ejecución sin ella.
+
+Para el tamaño máximo (1.000.000 de habitaciones y reservas) use
+--tamanos 1000000; requiere varios GB de memoria.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+from datetime import date, datetime, timedelta
+from itertools import islice, product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from arranque_distribucion import generar_distribucion
+from Crucero import Crucero
+from Metricas import Metricas
+from Normalizar import normalizar_texto
+from Usuario import Usuario
+
+FECHA_BASE = date(2025, 1, 1)
+
+# Días del año entre los que se reparten las reservas de relleno
+DIAS_TEMPORADA = 300
+
+# Nombres y apellidos de los pasajeros de relleno
+NOMBRES = ("José", "María", "Juan", "Ana", "Luis", "Carmen", "Pedro", "Lucía", "Jorge", "Sofía")
+APELLIDOS = ("Muñoz", "García", "Pérez", "López", "Sánchez", "Ramírez", "Fernández", "Gómez", "Díaz",
+             "Martínez", "Rodríguez", "Álvarez", "Romero", "Navarro", "Torres", "Domínguez")
+
+def por_llamada(funcion, repeticiones):
+    """
+    Mide el tiempo por llamada de una función sin efectos, con timeit.
+
+    Args:
+        funcion (callable): Función sin argumentos.
+        repeticiones (int): Cantidad de mediciones; se toma la mejor.
+
+    Returns:
+        dict: Nanosegundos por llamada y llamadas por medición.
+    """
+    temporizador = timeit.Timer(funcion)
+    numero, _ = temporizador.autorange()
+    mejor = min(temporizador.repeat(repeat=repeticiones, number=numero))
+    return {"ns_por_llamada": mejor / numero * 1e9, "llamadas": numero}
+
+def por_lote(operaciones, repeticiones, preparar):
+    """
+    Mide el tiempo por operación de una secuencia de operaciones con efectos.
+
+    Args:
+        operaciones (int): Cantidad de operaciones por medición.
+        repeticiones (int): Cantidad de mediciones; se toma la mejor.
+        preparar (callable): Función que devuelve (ejecutar, deshacer): ejecutar
+            realiza las operaciones medidas y deshacer restaura el estado.
+
+    Returns:
+        dict: Nanosegundos por operación y operaciones por medición.
+    """
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        ejecutar, deshacer = preparar()
+        inicio = time.perf_counter()
+        ejecutar()
+        mejor = min(mejor, time.perf_counter() - inicio)
+        deshacer()
+    return {"ns_por_llamada": mejor / operaciones * 1e9, "llamadas": operaciones}
+
+def preparar_crucero(tamano, semilla):
+    """
+    Crea un crucero con tamano habitaciones y tamano reservas activas.
+
+    Una de cada dos habitaciones recibe dos reservas de 3 días, una en cada
+    mitad de la temporada; así la mitad de las habitaciones queda disponible y
+    las consultas por fecha encuentran habitaciones ocupadas y libres.
+
+    Args:
+        tamano (int): Cantidad de habitaciones y de reservas.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        Crucero: Crucero preparado.
+    """
+    crucero = Crucero(distribucion=generar_distribucion(tamano))
+    azar = random.Random(semilla)
+    mitad = DIAS_TEMPORADA // 2
+    for habitacion in list(crucero.habitaciones)[::2]:
+        for desde in (0, mitad):
+            inicio = FECHA_BASE + timedelta(days=desde + azar.randrange(mitad - 3))
+            crucero.crear_reserva([None], habitacion.codigo_habitacion, 3, inicio)
+    return crucero
+
+def medir_tamano(tamano, repeticiones, semilla, metricas=False):
+    """
+    Ejecuta todos los benchmarks para un tamaño de inventario.
+
+    Args:
+        tamano (int): Cantidad de habitaciones y de reservas.
+        repeticiones (int): Cantidad de mediciones por benchmark.
+        semilla (int): Semilla del generador aleatorio.
+        metricas (bool, optional): Instrumentar el crucero antes de medir.
+
+    Returns:
+        dict: Resultado de cada benchmark, por nombre.
+    """
+    inicio = time.perf_counter()
+    crucero = preparar_crucero(tamano, semilla)
+    preparacion = time.perf_counter() - inicio
+    if metricas:
+        Metricas().instrumentar(crucero)
+    codigos = [habitacion.codigo_habitacion for habitacion in crucero.habitaciones]
+    azar = random.Random(semilla)
+    codigo = codigos[len(codigos) // 2]
+
+    resultados = {"preparacion": {"segundos": preparacion, "habitaciones": len(codigos),
+                                  "reservas": len(crucero.reservas)}}
+    resultados["buscar_habitacion"] = por_llamada(lambda: crucero.buscar_habitacion(codigo), repeticiones)
+    resultados["buscar_habitacion_inexistente"] = por_llamada(lambda: crucero.buscar_habitacion("X000"),
+                                                               repeticiones)
+
+    # Todas las combinaciones de filtros de la búsqueda
+    fecha_inicio = FECHA_BASE + timedelta(days=DIAS_TEMPORADA // 2)
+    fecha_fin = fecha_inicio + timedelta(days=2)
+    for cubierta, acomodacion, fechas in product((None, "Premium"), (None, 3), (False, True)):
+        nombre = "listar_disponibles"
+        nombre += "_cubierta" if cubierta else ""
+        nombre += "_acomodacion" if acomodacion else ""
+        nombre += "_fechas" if fechas else ""
+        argumentos = (cubierta, acomodacion) + ((fecha_inicio, fecha_fin) if fechas else (None, None))
+        resultados[nombre] = por_llamada(lambda: crucero.listar_habitaciones_disponibles(*argumentos),
+                                         repeticiones)
+
+    # Crear y cancelar reservas fuera de la temporada, deshaciendo cada medición
+    operaciones = min(1000, len(codigos))
+    muestra = azar.sample(codigos, operaciones)
+    fecha_libre = FECHA_BASE + timedelta(days=DIAS_TEMPORADA + 30)
+
+    def preparar_creacion():
+        creadas = []
+        def ejecutar():
+            for codigo_habitacion in muestra:
+                creadas.append(crucero.crear_reserva(["U001"], codigo_habitacion, 2, fecha_libre))
+        def deshacer():
+            for codigo_reserva in creadas:
+                crucero.cancelar_reserva(codigo_reserva)
+        return ejecutar, deshacer
+
+    def preparar_cancelacion():
+        creadas = [crucero.crear_reserva(["U001"], codigo_habitacion, 2, fecha_libre) for codigo_habitacion in muestra]
+        def ejecutar():
+            for codigo_reserva in creadas:
+                crucero.cancelar_reserva(codigo_reserva)
+        return ejecutar, lambda: None
+
+    resultados["crear_reserva"] = por_lote(operaciones, repeticiones, preparar_creacion)
+    resultados["cancelar_reserva"] = por_lote(operaciones, repeticiones, preparar_cancelacion)
+
+    resultados["listar_todas_reservas"] = por_llamada(crucero.listar_todas_reservas, repeticiones)
+    cursor_medio = list(crucero._indice_reservas)[len(crucero._indice_reservas) // 2]
+    resultados["paginar_reservas"] = por_llamada(lambda: crucero.paginar_reservas(50), repeticiones)
+    resultados["paginar_reservas_cursor"] = por_llamada(lambda: crucero.paginar_reservas(50, cursor_medio),
+                                                        repeticiones)
+    resultados["paginar_habitaciones"] = por_llamada(
+        lambda: list(islice(crucero.iterar_habitaciones_disponibles(), 50)), repeticiones)
+    resultados["calcular_costo_reserva"] = por_llamada(lambda: crucero.calcular_costo_reserva(codigo, 5),
+                                                       repeticiones)
+    resultados["normalizar_texto"] = por_llamada(lambda: normalizar_texto("Económica"), repeticiones)
+
+    # Búsqueda aproximada por nombre (nombre frecuente, con y sin errores)
+    crucero.registrar_usuarios([
+        Usuario(f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}")
+        for _ in range(len(codigos))
+    ])
+    resultados["buscar_usuarios_similares"] = por_llamada(
+        lambda: crucero.buscar_usuarios_similares("Muñoz, José"), repeticiones)
+    resultados["buscar_usuarios_similares_errata"] = por_llamada(
+        lambda: crucero.buscar_usuarios_similares("Munos Jsoe"), repeticiones)
+    return resultados
+
+def comparar(resultados, referencia, tolerancia):
+    """
+    Compara los resultados con una ejecución de referencia.
+
+    Args:
+        resultados (dict): Resultados actuales, por tamaño.
+        referencia (dict): Resultados de referencia, por tamaño.
+        tolerancia (float): Aumento relativo permitido (0.25 = 25% más lento).
+
+    Returns:
+        list: Descripción de cada regresión encontrada.
+    """
+    regresiones = []
+    for tamano, benchmarks in resultados.items():
+        for nombre, datos in benchmarks.items():
+            anterior = referencia.get(tamano, {}).get(nombre, {}).get("ns_por_llamada")
+            actual = datos.get("ns_por_llamada")
+            if anterior and actual and actual > anterior * (1 + tolerancia):
+                regresiones.append(f"{tamano} {nombre}: {anterior:.0f}ns -> {actual:.0f}ns "
+                                   f"(+{(actual / anterior - 1) * 100:.0f}%)")
+    return regresiones
+
+def main():
+    """
+    Ejecuta la suite, guarda los resultados y los compara con la referencia.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", default="30,3000,100000", help="Tamaños de inventario, separados por comas")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="Archivo JSON de una ejecución de referencia")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Aumento relativo permitido")
+    parser.add_argument("--json", action="store_true", help="Mostrar los resultados en formato JSON")
+    parser.add_argument("--metricas", action="store_true", help="Medir con las métricas activadas")
+    argumentos = parser.parse_args()
+
+    resultados = {}
+    for tamano in (int(valor) for valor in argumentos.tamanos.split(",")):
+        resultados[str(tamano)] = medir_tamano(tamano, argumentos.repeticiones, argumentos.semilla,
+                                               argumentos.metricas)
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "metricas": argumentos.metricas,
+        "resultados": resultados,
+    }
+    if argumentos.salida:
+        with open(argumentos.salida, "w", encoding="utf-8") as archivo:
+            json.dump(informe, archivo, indent=2)
+
+    if argumentos.json:
+        print(json.dumps(informe, indent=2))
+    else:
+        for tamano, benchmarks in resultados.items():
+            print(f"\n{tamano} habitaciones / reservas (preparación {benchmarks['preparacion']['segundos']:.2f}s)")
+            for nombre, datos in benchmarks.items():
+                if "ns_por_llamada" in datos:
+                    print(f"  {nombre:<45} {datos['ns_por_llamada']:>14.0f} ns")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as archivo:
+            referencia = json.load(archivo)["resultados"]
+        regresiones = comparar(resultados, referencia, argumentos.tolerancia)
+        for regresion in regresiones:
+            print(f"REGRESIÓN {regresion}", file=sys.stderr)
+        if regresiones:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
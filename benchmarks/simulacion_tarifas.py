@@ -0,0 +1,105 @@
+"""
+Escalado de la simulación de escenarios de tarifas según la cantidad de procesos.
+
+Genera un barco con reservas al azar durante un año, arma una rejilla de
+escenarios (costos por cubierta) y mide cuánto tarda Simulacion.simular con
+1, 2, 4... procesos, hasta la cantidad de núcleos. Comprueba además que los
+resultados no dependen de la cantidad de procesos.
+
+Uso:
+    python benchmarks/simulacion_tarifas.py [--habitaciones N] [--reservas N] [--escenarios N] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arranque_distribucion import generar_distribucion
+from Crucero import Crucero
+from Simulacion import Demanda, rejilla_escenarios, simular
+
+def generar_demanda(habitaciones, reservas, semilla=1):
+    """
+    Crea un crucero en memoria con reservas al azar y reúne su demanda.
+
+    Args:
+        habitaciones (int): Cantidad aproximada de habitaciones.
+        reservas (int): Cantidad de reservas a intentar.
+        semilla (int, optional): Semilla del generador aleatorio.
+
+    Returns:
+        Demanda: Demanda de las reservas creadas.
+    """
+    crucero = Crucero(distribucion=generar_distribucion(habitaciones))
+    aleatorio = random.Random(semilla)
+    hoy = date.today()
+    for _ in range(reservas):
+        habitacion = aleatorio.choice(crucero.habitaciones)
+        crucero.crear_reserva([None] * habitacion.acomodacion, habitacion.codigo_habitacion,
+                              aleatorio.randint(2, 10), hoy + timedelta(days=aleatorio.randint(0, 365)))
+    return Demanda.desde_crucero(crucero)
+
+def generar_escenarios(cantidad):
+    """
+    Arma una rejilla de costos por cubierta con al menos la cantidad pedida.
+
+    Args:
+        cantidad (int): Cantidad mínima de escenarios.
+
+    Returns:
+        list: Tuplas (nombre, TablaTarifas).
+    """
+    valores = 1
+    while valores ** 3 < cantidad:
+        valores += 1
+    pasos = [0.7 + 0.6 * paso / max(valores - 1, 1) for paso in range(valores)]
+    return list(rejilla_escenarios({
+        "Económica": [80000 * paso for paso in pasos],
+        "Normal": [100000 * paso for paso in pasos],
+        "Premium": [150000 * paso for paso in pasos],
+    }))
+
+def main():
+    """
+    Ejecuta las mediciones y muestra los resultados.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--habitaciones", type=int, default=3000)
+    parser.add_argument("--reservas", type=int, default=50000)
+    parser.add_argument("--escenarios", type=int, default=64)
+    parser.add_argument("--json", action="store_true", help="Mostrar los resultados en formato JSON")
+    argumentos = parser.parse_args()
+
+    demanda = generar_demanda(argumentos.habitaciones, argumentos.reservas)
+    escenarios = generar_escenarios(argumentos.escenarios)
+    cantidades = [1]
+    while cantidades[-1] * 2 <= (os.cpu_count() or 1):
+        cantidades.append(cantidades[-1] * 2)
+
+    tiempos = {}
+    referencia = None
+    for procesos in cantidades:
+        inicio = time.perf_counter()
+        resultados = simular(demanda, escenarios, procesos)
+        tiempos[procesos] = time.perf_counter() - inicio
+        if referencia is None:
+            referencia = resultados
+        elif resultados != referencia:
+            raise AssertionError(f"Los resultados con {procesos} procesos no coinciden con 1 proceso")
+
+    if argumentos.json:
+        print(json.dumps({"reservas": len(demanda), "escenarios": len(escenarios), "s": tiempos}, indent=2))
+        return
+    print(f"{len(demanda)} reservas, {len(escenarios)} escenarios")
+    print(f"{'procesos':>8}{'tiempo':>12}{'aceleración':>14}")
+    for procesos, tiempo in tiempos.items():
+        print(f"{procesos:>8}{tiempo:>11.2f}s{tiempos[1] / tiempo:>13.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,16 @@ realizar operaciones como listar habitaciones, buscar por criterios,
 realizar reservas, cancelarlas y consultar información.
 """
 
+from datetime import date, datetime, timedelta
+
 from Crucero import Crucero
-from Usuario import Usuario
-from Normalizar import normalizar_texto
+from Usuario import Usuario, normalizar_codigo_usuario
+from Almacenamiento import AlmacenamientoDiario
+from Normalizar import normalizar_texto_cacheado
+from Retenciones import DURACION_RETENCION
+
+# Cantidad de filas que se muestran antes de preguntar si continuar
+TAMANO_PAGINA = 20
 
 def mostrar_menu():
     """
@@ -29,6 +36,72 @@ def mostrar_menu():
     print(" 7️⃣  Salir 🚪")
     print("=" * 40)
 
+def leer_fecha(mensaje):
+    """
+    Solicita una fecha al usuario en formato AAAA-MM-DD.
+    
+    Args:
+        mensaje (str): Texto que se muestra al solicitar la fecha.
+        
+    Returns:
+        date: Fecha ingresada o None si se dejó en blanco.
+        
+    Raises:
+        ValueError: Si el texto ingresado no es una fecha válida.
+    """
+    texto = input(mensaje).strip()
+    if texto == "":
+        return None
+    return datetime.strptime(texto, "%Y-%m-%d").date()
+
+def mostrar_paginado(registros, titulo, mensaje_vacio, tamano=TAMANO_PAGINA):
+    """
+    Muestra registros por páginas, formateando solo los que se muestran.
+    
+    Args:
+        registros (iterable): Registros a mostrar (se convierten con str).
+        titulo (str): Texto que se muestra antes del primer registro.
+        mensaje_vacio (str): Texto que se muestra si no hay registros.
+        tamano (int, optional): Registros por página.
+        
+    Returns:
+        int: Cantidad de registros mostrados.
+    """
+    mostrados = 0
+    for registro in registros:
+        if mostrados == 0:
+            print(f"\n{titulo}")
+        elif mostrados % tamano == 0:
+            if input("Enter para ver más, 'q' para volver: ").strip().lower() == "q":
+                break
+        print(registro)
+        mostrados += 1
+    if mostrados == 0:
+        print(f"\n{mensaje_vacio}")
+    return mostrados
+
+def elegir_usuario_por_nombre(crucero, nombre):
+    """
+    Busca usuarios por nombre aproximado y permite elegir uno.
+    
+    Args:
+        crucero (Crucero): Sistema de reservas.
+        nombre (str): Nombre o parte del nombre a buscar.
+        
+    Returns:
+        Usuario: Usuario elegido, o None si no hay coincidencias o no se eligió ninguno.
+    """
+    similares = crucero.buscar_usuarios_similares(nombre)
+    if not similares:
+        return None
+    print("\nUsuarios encontrados:")
+    for numero, (_, usuario) in enumerate(similares, 1):
+        print(f"{numero}. {usuario} - Reserva: {usuario.obtener_reserva() or 'ninguna'}")
+    eleccion = input("Elija un número (en blanco para volver): ").strip()
+    if not eleccion.isdigit() or not 1 <= int(eleccion) <= len(similares):
+        return None
+    return similares[int(eleccion) - 1][1]
+
 def main():
     """
     Función principal que maneja la lógica del sistema de crucero.
@@ -37,8 +110,8 @@ def main():
     las opciones seleccionadas por el usuario, realizando las
     operaciones correspondientes.
     """
-    crucero = Crucero()
-    usuarios = []
+    crucero = Crucero(AlmacenamientoDiario("datos_crucero"))
+    crucero.iniciar_vencimientos()
     
     while True:
         mostrar_menu()
@@ -46,13 +119,8 @@ def main():
         
         if opcion == "1":
             # Listar todas las habitaciones disponibles
-            habitaciones = crucero.listar_habitaciones_disponibles()
-            if habitaciones:
-                print("\nHabitaciones disponibles:")
-                for habitacion in habitaciones:
-                    print(habitacion)
-            else:
-                print("\nNo hay habitaciones disponibles.")
+            mostrar_paginado(crucero.iterar_habitaciones_disponibles(),
+                             "Habitaciones disponibles:", "No hay habitaciones disponibles.")
         
         elif opcion == "2":
             # Buscar habitaciones por cubierta y/o acomodación
@@ -60,7 +128,7 @@ def main():
             cubierta = input("Ingrese la cubierta (deje en blanco para todas): ")
             
             if cubierta:
-                cubierta_normalizada = normalizar_texto(cubierta)
+                cubierta_normalizada = normalizar_texto_cacheado(cubierta)
                 if cubierta_normalizada == "economica":
                     cubierta = "Económica"
                 elif cubierta_normalizada == "normal":
@@ -86,23 +154,55 @@ def main():
                 print("Valor inválido para acomodación.")
                 continue
             
-            habitaciones = crucero.listar_habitaciones_disponibles(cubierta, acomodacion)
-            if habitaciones:
-                print("\nHabitaciones que cumplen con los criterios:")
-                for habitacion in habitaciones:
-                    print(habitacion)
-            else:
-                print("\nNo hay habitaciones que cumplan con los criterios.")
+            # Rango de fechas opcional para buscar habitaciones libres
+            fecha_inicio = None
+            fecha_fin = None
+            try:
+                fecha_inicio = leer_fecha("Ingrese la fecha de inicio AAAA-MM-DD (deje en blanco para ignorar fechas): ")
+                if fecha_inicio:
+                    noches = input("Ingrese la cantidad de noches (deje en blanco para 1): ").strip()
+                    noches = int(noches) if noches else 1
+                    if noches <= 0:
+                        print("La cantidad de noches debe ser mayor a 0.")
+                        continue
+                    fecha_fin = fecha_inicio + timedelta(days=noches)
+            except ValueError:
+                print("Valor inválido para las fechas.")
+                continue
+            
+            mostrar_paginado(crucero.iterar_habitaciones_disponibles(cubierta, acomodacion, fecha_inicio, fecha_fin),
+                             "Habitaciones que cumplen con los criterios:",
+                             "No hay habitaciones que cumplan con los criterios.")
         
         elif opcion == "3":
             # Realizar una reserva
             codigo_habitacion = input("\nIngrese el código de la habitación a reservar: ")
             habitacion = crucero.buscar_habitacion(codigo_habitacion)
             
-            if not habitacion or not habitacion.disponibilidad:
+            if not habitacion:
                 print("Habitación no disponible o no existe.")
                 continue
             
+            # Solicitar fecha de inicio y días de reserva
+            try:
+                fecha_inicio = leer_fecha("Ingrese la fecha de inicio AAAA-MM-DD (deje en blanco para hoy): ")
+                if fecha_inicio is None:
+                    fecha_inicio = date.today()
+                dias_reserva = int(input("Ingrese la cantidad de días de reserva: "))
+                if dias_reserva <= 0:
+                    print("La cantidad de días debe ser mayor a 0.")
+                    continue
+            except ValueError:
+                print("Valor inválido para la fecha o los días de reserva.")
+                continue
+            
+            # Retener la habitación mientras se registran los usuarios
+            codigo_retencion = crucero.retener_habitacion(codigo_habitacion, dias_reserva, fecha_inicio)
+            if not codigo_retencion:
+                print("Habitación no disponible en esas fechas.")
+                continue
+            print(f"Habitación retenida por {DURACION_RETENCION // 60} minutos.")
+            
             capacidad = habitacion.acomodacion
             print(f"\nLa habitación seleccionada tiene capacidad para {capacidad} personas.")
             
@@ -122,25 +222,20 @@ def main():
                         codigo = None  # Se asignará automáticamente
                     else:
                         try:
-                            numero = int(codigo_input)
-                            codigo = f"U{numero:02d}"
+                            codigo = normalizar_codigo_usuario(int(codigo_input))
                         except ValueError:
                             print("Número de usuario inválido, se asignará automáticamente.")
                             codigo = None
                     
                     # Verificar si el usuario ya existe
-                    usuario_existente = None
-                    for u in usuarios:
-                        if codigo and u.codigo == codigo:
-                            usuario_existente = u
-                            break
+                    usuario_existente = crucero.buscar_usuario(codigo) if codigo else None
                     
                     if usuario_existente:
                         usuario = usuario_existente
                         print(f"Usuario existente encontrado: {usuario}")
                     else:
-                        usuario = Usuario(nombre, codigo)
-                        usuarios.append(usuario)
+                        usuario = Usuario(nombre, codigo or crucero.nuevo_codigo_usuario())
+                        crucero.registrar_usuario(usuario)
                         print(f"Nuevo usuario registrado: {usuario}")
                     
                     # Verificar si el usuario ya tiene una reserva
@@ -161,53 +256,32 @@ def main():
             # Verificar que haya al menos un usuario registrado
             if not any(codigos_usuarios):
                 print("No se registró ningún usuario. Reserva cancelada.")
-                continue
-            
-            # Solicitar días de reserva
-            try:
-                dias_reserva = int(input("\nIngrese la cantidad de días de reserva: "))
-                if dias_reserva <= 0:
-                    print("La cantidad de días debe ser mayor a 0.")
-                    continue
-            except ValueError:
-                print("Valor inválido para días de reserva.")
+                crucero.liberar_retencion(codigo_retencion)
                 continue
             
             # Mostrar costo y confirmar reserva
             costo = habitacion.calcular_costo(habitacion.cubierta, dias_reserva, habitacion.acomodacion)
             print(f"\nCosto de la reserva: ${costo}")
             
-            confirmacion = normalizar_texto(input("¿Confirmar reserva? (S/N): "))
+            confirmacion = normalizar_texto_cacheado(input("¿Confirmar reserva? (S/N): "))
             if confirmacion == "s" or confirmacion == "si":
-                codigo_reserva = crucero.crear_reserva(codigos_usuarios, codigo_habitacion, dias_reserva)
+                codigo_reserva = crucero.confirmar_retencion(codigo_retencion, codigos_usuarios)
                 if codigo_reserva:
-                    # Asociar la reserva a los usuarios registrados
-                    for codigo_usuario in codigos_usuarios:
-                        if codigo_usuario:  # No asociar vacantes
-                            for u in usuarios:
-                                if u.codigo == codigo_usuario:
-                                    u.agregar_reserva(codigo_reserva)
-                                    break
+                    # El crucero asocia la reserva a los usuarios registrados
                     print(f"\nReserva realizada con éxito. Código: {codigo_reserva}")
                 else:
-                    print("\nNo se pudo realizar la reserva.")
+                    print("\nLa retención venció. No se pudo realizar la reserva.")
             else:
+                crucero.liberar_retencion(codigo_retencion)
                 print("\nReserva cancelada.")
         
         elif opcion == "4":
             # Cancelar una reserva
-            codigo = input("\nIngrese el código del usuario (ejemplo: U01): ")
+            codigo = input("\nIngrese el código o el nombre del usuario (ejemplo: U001 o Muñoz, José): ")
             
-            # Asegurar formato correcto del código
-            if not codigo.upper().startswith('U'):
-                codigo = f"U{codigo}"
-            
-            # Buscar el usuario
-            usuario = None
-            for u in usuarios:
-                if u.codigo == codigo:
-                    usuario = u
-                    break
+            # Buscar el usuario (acepta U1, U01, U001 o solo el número) y,
+            # si no es un código, por nombre aproximado
+            usuario = crucero.buscar_usuario(codigo) or elegir_usuario_por_nombre(crucero, codigo)
             
             if not usuario:
                 print("Usuario no encontrado.")
@@ -220,10 +294,9 @@ def main():
                 continue
             
             # Confirmar cancelación
-            confirmacion = normalizar_texto(input(f"¿Confirmar cancelación de la reserva {codigo_reserva}? (S/N): "))
+            confirmacion = normalizar_texto_cacheado(input(f"¿Confirmar cancelación de la reserva {codigo_reserva}? (S/N): "))
             if confirmacion == "s" or confirmacion == "si":
                 if crucero.cancelar_reserva(codigo_reserva):
-                    usuario.cancelar_reserva()
                     print("\nReserva cancelada con éxito.")
                 else:
                     print("\nNo se pudo cancelar la reserva.")
@@ -238,17 +311,12 @@ def main():
         
         elif opcion == "6":
             # Listar todas las reservas activas
-            reservas = crucero.listar_todas_reservas()
-            if reservas:
-                print("\nReservas activas:")
-                for reserva in reservas:
-                    print(reserva)
-            else:
-                print("\nNo hay reservas activas.")
+            mostrar_paginado(crucero.iterar_reservas(), "Reservas activas:", "No hay reservas activas.")
         
         elif opcion == "7":
             # Salir del sistema
             print("\nGracias por usar el sistema de reservas de crucero.")
+            crucero.cerrar()
             break
         
         else:
@@ -0,0 +1,237 @@
+"""
+Pruebas de los almacenamientos persistentes del crucero.
+
+Comprueban que el estado se recupera al reabrir el crucero con el diario de
+operaciones (con y sin instantánea, y tras una caída a mitad de escribir) y
+con SQLite, incluida la migración de bases sin la fecha de salida de los
+usuarios.
+
+Uso:
+    python -m pytest tests
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Almacenamiento import AlmacenamientoDiario, AlmacenamientoSQLite
+from Crucero import Crucero
+from Usuario import Usuario
+
+class PruebasAlmacenamiento:
+    """
+    Pruebas comunes a los almacenamientos; cada subclase indica cuál abrir.
+    """
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.fecha = date.today() + timedelta(days=30)
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _almacenamiento(self):
+        raise NotImplementedError
+
+    def _abrir(self):
+        return Crucero(self._almacenamiento())
+
+    def test_reabrir_recupera_usuarios_y_reservas(self):
+        crucero = self._abrir()
+        crucero.registrar_usuario(Usuario("Ana", "U1"))
+        crucero.registrar_usuarios([Usuario("Luis", "U2"), Usuario("Eva", "U3")])
+        primera = crucero.crear_reserva(["U1", "U2"], "E01", 3, self.fecha)
+        cancelada = crucero.crear_reserva(["U3"], "E02", 2, self.fecha)
+        crucero.cancelar_reserva(cancelada)
+        crucero.cerrar()
+
+        crucero = self._abrir()
+        self.assertEqual(len(crucero.usuarios), 3)
+        reserva = crucero.buscar_reserva(primera)
+        self.assertEqual(reserva.codigos_usuarios, ["U001", "U002"])
+        self.assertEqual(reserva.fecha_inicio, self.fecha)
+        self.assertEqual(crucero.buscar_usuario("U1").obtener_reserva(), primera)
+        self.assertIsNone(crucero.buscar_reserva(cancelada))
+        # Las fechas de la reserva cancelada vuelven a estar libres
+        self.assertIsNotNone(crucero.crear_reserva(["U3"], "E02", 2, self.fecha))
+        # Y las de la reserva recuperada siguen ocupadas
+        self.assertIsNone(crucero.crear_reserva(["U3"], "E01", 1, self.fecha))
+        crucero.cerrar()
+
+    def test_codigos_no_se_repiten_al_reabrir(self):
+        crucero = self._abrir()
+        codigo = crucero.crear_reserva(["U1"], "E01", 2, self.fecha)
+        crucero.cancelar_reserva(codigo)
+        crucero.cerrar()
+
+        crucero = self._abrir()
+        self.assertGreater(crucero.crear_reserva(["U1"], "E01", 2, self.fecha), codigo)
+        crucero.cerrar()
+
+    def test_archivar_guarda_historial_y_fecha_salida(self):
+        crucero = self._abrir()
+        crucero.registrar_usuario(Usuario("Ana", "U1"))
+        codigo = crucero.crear_reserva(["U1"], "E01", 2, self.fecha)
+        self.assertEqual(crucero.archivar_finalizadas(self.fecha + timedelta(days=2)), 1)
+        crucero.cerrar()
+
+        crucero = self._abrir()
+        self.assertEqual(list(crucero.iterar_reservas()), [])
+        self.assertEqual([vista.codigo_reserva for vista in crucero.historial], [codigo])
+        usuario = crucero.buscar_usuario("U1")
+        self.assertEqual(usuario.fecha_salida, self.fecha + timedelta(days=2))
+        self.assertIsNone(usuario.obtener_reserva())
+        crucero.cerrar()
+
+    def test_sellar_historial_guarda_la_ruta(self):
+        crucero = self._abrir()
+        codigo = crucero.crear_reserva(["U1"], "E01", 2, self.fecha)
+        crucero.archivar_finalizadas(self.fecha + timedelta(days=2))
+        ruta = os.path.join(self.directorio, "salida.bin")
+        self.assertEqual(crucero.sellar_historial(ruta), 1)
+        crucero.cerrar()
+
+        crucero = self._abrir()
+        self.assertEqual(len(crucero.historial), 0)
+        self.assertEqual([archivo.ruta for archivo in crucero.archivos], [ruta])
+        self.assertIsNotNone(crucero.buscar_reserva_archivada(codigo))
+        crucero.cerrar()
+
+class PruebasDiario(PruebasAlmacenamiento, unittest.TestCase):
+    """
+    Diario de operaciones con instantáneas periódicas.
+    """
+
+    intervalo = 1000
+
+    def _almacenamiento(self):
+        return AlmacenamientoDiario(self.directorio, intervalo_instantanea=self.intervalo)
+
+    def _ruta(self, nombre):
+        return os.path.join(self.directorio, nombre)
+
+    def test_linea_incompleta_no_pierde_operaciones_posteriores(self):
+        crucero = self._abrir()
+        primera = crucero.crear_reserva(["U1"], "E01", 2, self.fecha)
+        crucero.cerrar()
+        # Simular una caída a mitad de escribir la siguiente operación
+        with open(self._ruta(AlmacenamientoDiario.ARCHIVO_DIARIO), "a", encoding="utf-8") as diario:
+            diario.write('{"op": "reserva", "reserva": {"codigo_res')
+
+        crucero = self._abrir()
+        self.assertIsNotNone(crucero.buscar_reserva(primera))
+        segunda = crucero.crear_reserva(["U2"], "E02", 2, self.fecha)
+        tercera = crucero.crear_reserva(["U3"], "E03", 2, self.fecha)
+        crucero.cerrar()
+
+        crucero = self._abrir()
+        for codigo in (primera, segunda, tercera):
+            self.assertIsNotNone(crucero.buscar_reserva(codigo))
+        self.assertEqual(len(list(crucero.iterar_reservas())), 3)
+        crucero.cerrar()
+
+    def test_reserva_en_conflicto_se_omite_y_se_avisa(self):
+        crucero = self._abrir()
+        primera = crucero.crear_reserva(["U1"], "E01", 2, self.fecha)
+        crucero.cerrar()
+        ruta = self._ruta(AlmacenamientoDiario.ARCHIVO_DIARIO)
+        with open(ruta, encoding="utf-8") as diario:
+            operacion = json.loads(diario.readline())
+        # Otra reserva de la misma habitación y fechas, como la dejaría un diario dañado
+        operacion["reserva"]["codigo_reserva"] = "R9"
+        with open(ruta, "a", encoding="utf-8") as diario:
+            diario.write(json.dumps(operacion) + "\n")
+
+        with self.assertLogs("Crucero", level="WARNING") as avisos:
+            crucero = self._abrir()
+        self.assertIn("R9", avisos.output[0])
+        self.assertIsNotNone(crucero.buscar_reserva(primera))
+        self.assertIsNone(crucero.buscar_reserva("R9"))
+        crucero.cerrar()
+
+class PruebasDiarioCompactado(PruebasDiario):
+    """
+    Diario que se compacta cada pocas operaciones.
+    """
+
+    intervalo = 3
+
+    def test_compactar_escribe_instantanea_y_vacia_diario(self):
+        crucero = self._abrir()
+        codigos = [crucero.crear_reserva([f"U{i}"], f"E0{i}", 2, self.fecha) for i in range(1, 5)]
+        crucero.cerrar()
+
+        with open(self._ruta(AlmacenamientoDiario.ARCHIVO_INSTANTANEA), encoding="utf-8") as archivo:
+            instantanea = json.load(archivo)
+        self.assertEqual(set(instantanea["reservas"]), set(codigos[:3]))
+        with open(self._ruta(AlmacenamientoDiario.ARCHIVO_DIARIO), encoding="utf-8") as diario:
+            self.assertEqual(len(diario.readlines()), 1)
+
+        crucero = self._abrir()
+        self.assertEqual(sorted(reserva.codigo_reserva for reserva in crucero.iterar_reservas()), sorted(codigos))
+        crucero.cerrar()
+
+    def test_caida_tras_compactar(self):
+        crucero = self._abrir()
+        codigos = [crucero.crear_reserva([f"U{i}"], f"E0{i}", 2, self.fecha) for i in range(1, 4)]
+        crucero.cerrar()
+        # La instantánea temporal de una compactación interrumpida se ignora
+        with open(self._ruta(AlmacenamientoDiario.ARCHIVO_INSTANTANEA + ".tmp"), "w", encoding="utf-8") as archivo:
+            archivo.write('{"usuarios": {')
+        with open(self._ruta(AlmacenamientoDiario.ARCHIVO_DIARIO), "a", encoding="utf-8") as diario:
+            diario.write('{"op": "cancel')
+
+        crucero = self._abrir()
+        codigos.append(crucero.crear_reserva(["U4"], "E04", 2, self.fecha))
+        crucero.cerrar()
+
+        crucero = self._abrir()
+        self.assertEqual(sorted(reserva.codigo_reserva for reserva in crucero.iterar_reservas()), sorted(codigos))
+        crucero.cerrar()
+
+class PruebasSQLite(PruebasAlmacenamiento, unittest.TestCase):
+    """
+    Base de datos SQLite.
+    """
+
+    def _almacenamiento(self):
+        return AlmacenamientoSQLite(os.path.join(self.directorio, "crucero.db"))
+
+    def test_caida_sin_cerrar_conserva_lo_confirmado(self):
+        crucero = self._abrir()
+        codigo = crucero.crear_reserva(["U1"], "E01", 2, self.fecha)
+        # Sin cerrar: cada operación ya se confirmó en su propia transacción
+        crucero = self._abrir()
+        self.assertIsNotNone(crucero.buscar_reserva(codigo))
+        crucero.cerrar()
+
+    def test_migra_bases_sin_fecha_salida(self):
+        ruta = os.path.join(self.directorio, "crucero.db")
+        conexion = sqlite3.connect(ruta)
+        conexion.execute("CREATE TABLE usuarios (codigo TEXT PRIMARY KEY, nombre TEXT NOT NULL,"
+                         " fecha_registro TEXT NOT NULL)")
+        conexion.execute("INSERT INTO usuarios VALUES ('U001', 'Ana', '2024-01-01T00:00:00')")
+        conexion.commit()
+        conexion.close()
+
+        crucero = self._abrir()
+        usuario = crucero.buscar_usuario("U1")
+        self.assertEqual(usuario.nombre, "Ana")
+        self.assertIsNone(usuario.fecha_salida)
+        crucero.crear_reserva(["U1"], "E01", 2, self.fecha)
+        crucero.archivar_finalizadas(self.fecha + timedelta(days=2))
+        crucero.cerrar()
+
+        crucero = self._abrir()
+        self.assertEqual(crucero.buscar_usuario("U1").fecha_salida, self.fecha + timedelta(days=2))
+        crucero.cerrar()
+
+if __name__ == "__main__":
+    unittest.main()
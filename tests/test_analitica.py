@@ -0,0 +1,127 @@
+"""
+Pruebas de la analítica incremental de ocupación e ingresos.
+
+Los agregados mantenidos con cada cambio se comparan con los de una
+analítica nueva, que los recalcula desde cero, y con un recorrido directo
+de las reservas.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import random
+import sys
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Analitica import Analitica, numpy
+from Crucero import Crucero
+from Tarifas import tarifas
+
+class PruebasAnaliticaIncremental(unittest.TestCase):
+    """
+    Analítica sin NumPy (arreglos de la biblioteca estándar).
+    """
+
+    usar_numpy = False
+
+    def setUp(self):
+        self.fecha = date.today() + timedelta(days=30)
+        self.crucero = Crucero()
+        self.analitica = Analitica(self.crucero, self.usar_numpy)
+
+    def tearDown(self):
+        self.analitica.cerrar()
+        self.crucero.cerrar()
+
+    def _operar(self, semilla, cantidad=300):
+        """
+        Aplica una mezcla aleatoria de reservas, cancelaciones, esperas y archivos.
+        """
+        azar = random.Random(semilla)
+        activas = []
+        for paso in range(cantidad):
+            opcion = azar.random()
+            inicio = self.fecha + timedelta(days=azar.randrange(40))
+            if opcion < 0.45:
+                habitacion = azar.choice(self.crucero.habitaciones)
+                usuarios = [f"U{azar.randrange(1000)}" for _ in range(azar.randint(1, habitacion.acomodacion))]
+                codigo = self.crucero.crear_reserva(usuarios, habitacion.codigo_habitacion, azar.randint(1, 5), inicio)
+                if codigo:
+                    activas.append(codigo)
+            elif opcion < 0.6:
+                # Reservas con plazas vacantes
+                for resultado in self.crucero.crear_reservas_lote([
+                        {"codigos_usuarios": [f"U{paso}"], "dias_reserva": azar.randint(1, 4), "fecha_inicio": inicio,
+                         "cubierta": azar.choice(["economica", "normal", "premium"])}]):
+                    if resultado["codigo_reserva"]:
+                        activas.append(resultado["codigo_reserva"])
+            elif opcion < 0.7:
+                resultado = self.crucero.esperar_reserva([f"U{paso}"], 2, "premium", azar.choice([2, 3, 4]), inicio)
+                if resultado["codigo_reserva"]:
+                    activas.append(resultado["codigo_reserva"])
+            elif opcion < 0.95 and activas:
+                self.crucero.cancelar_reserva(activas.pop(azar.randrange(len(activas))))
+            else:
+                self.crucero.archivar_finalizadas(self.fecha + timedelta(days=azar.randrange(10)))
+
+    def _comparar(self, esperada, obtenida):
+        desde, hasta = self.fecha - timedelta(days=1), self.fecha + timedelta(days=50)
+        self.assertEqual(obtenida.ocupacion_por_noche(desde, hasta), esperada.ocupacion_por_noche(desde, hasta))
+        grupos_esperados = esperada.por_grupo()
+        grupos_obtenidos = obtenida.por_grupo()
+        self.assertEqual(set(grupos_obtenidos), set(grupos_esperados))
+        for clave, datos in grupos_esperados.items():
+            for campo in ("reservas", "plazas", "vacantes"):
+                self.assertEqual(grupos_obtenidos[clave][campo], datos[campo], (clave, campo))
+            self.assertAlmostEqual(grupos_obtenidos[clave]["ingresos"], datos["ingresos"], places=4)
+        self.assertAlmostEqual(obtenida.ingresos("premium", 2), esperada.ingresos("Premium", 2), places=4)
+        self.assertAlmostEqual(obtenida.tasa_vacantes(), esperada.tasa_vacantes())
+
+    def test_incremental_igual_a_recalcular(self):
+        for semilla in range(3):
+            with self.subTest(semilla=semilla):
+                self._operar(semilla)
+                recalculada = Analitica(self.crucero, self.usar_numpy)
+                try:
+                    self._comparar(recalculada, self.analitica)
+                finally:
+                    recalculada.cerrar()
+
+    def test_igual_a_recorrer_las_reservas(self):
+        self._operar(7)
+        reservas = list(self.crucero.reservas) + [vista.a_reserva() for vista in self.crucero.historial]
+        for noche in (self.fecha + timedelta(days=dias) for dias in range(0, 45, 3)):
+            en_la_noche = [reserva for reserva in reservas if reserva.fecha_inicio <= noche < reserva.fecha_fin]
+            self.assertEqual(self.analitica.habitaciones_ocupadas(noche), len(en_la_noche))
+            self.assertEqual(self.analitica.huespedes(noche),
+                             sum(1 for reserva in en_la_noche for codigo in reserva.codigos_usuarios if codigo))
+        ingresos = 0.0
+        for reserva in reservas:
+            habitacion = self.crucero.buscar_habitacion(reserva.codigo_habitacion)
+            ingresos += tarifas.calcular_costo(habitacion.cubierta, reserva.dias_reserva, habitacion.acomodacion)
+        self.assertAlmostEqual(self.analitica.ingresos(), ingresos, places=4)
+        resumen = self.analitica.resumen(self.fecha)
+        self.assertEqual(resumen["reservas"], len(reservas))
+
+    def test_archivadas_siguen_contando_y_ya_no_se_descuentan(self):
+        codigo = self.crucero.crear_reserva(["U1"], "E01", 2, self.fecha)
+        ingresos = self.analitica.ingresos()
+        self.crucero.archivar_finalizadas(self.fecha + timedelta(days=2))
+        self.assertEqual(self.analitica.habitaciones_ocupadas(self.fecha), 1)
+        self.assertFalse(self.crucero.cancelar_reserva(codigo))
+        self.assertEqual(self.analitica.ingresos(), ingresos)
+
+@unittest.skipIf(numpy is None, "NumPy no está instalado.")
+class PruebasAnaliticaIncrementalNumpy(PruebasAnaliticaIncremental):
+    """
+    La misma analítica con arreglos de NumPy.
+    """
+
+    usar_numpy = True
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Pruebas de los archivos sellados de reservas finalizadas.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Almacenamiento import AlmacenamientoDiario
+from ArchivoReservas import ArchivoReservas, escribir_archivo
+from Crucero import Crucero
+from Historial import HistorialReservas
+from Reserva import Reserva
+
+def datos(vista):
+    """
+    Atributos de una reserva o vista de reserva, para compararlas.
+    """
+    return (vista.codigo_reserva, vista.codigo_habitacion, vista.fecha_inicio, vista.dias_reserva,
+            vista.fecha_reserva, list(vista.codigos_usuarios))
+
+class PruebasArchivoReservas(unittest.TestCase):
+    """
+    Un archivo sellado responde igual que el historial en memoria.
+    """
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.ruta = os.path.join(self.directorio, "salida.arch")
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_consultas_iguales_al_historial(self):
+        azar = random.Random(5)
+        inicio = date(2026, 1, 1)
+        historial = HistorialReservas()
+        for numero in range(300):
+            usuarios = [azar.choice([None, f"U{azar.randrange(1, 40):03d}"]) for _ in range(azar.randint(1, 4))]
+            historial.agregar(Reserva(azar.randint(1, 14), usuarios, f"N{azar.randint(1, 10):02d}",
+                                      fecha_reserva=datetime(2025, 12, 1, 8, 30),
+                                      fecha_inicio=inicio + timedelta(days=azar.randrange(60)),
+                                      codigo_reserva=f"R{numero:04d}"))
+
+        self.assertEqual(escribir_archivo(self.ruta, historial), len(historial))
+        self.assertFalse(os.path.exists(self.ruta + ".tmp"))
+        archivo = ArchivoReservas(self.ruta)
+        try:
+            self.assertEqual(len(archivo), len(historial))
+            for vista in historial:
+                self.assertEqual(datos(archivo.buscar(vista.codigo_reserva)), datos(vista))
+            self.assertIsNone(archivo.buscar("R9999"))
+            with self.assertRaises(IndexError):
+                archivo[len(archivo)]
+
+            filtros = [{}, {"codigo_habitacion": "N03"}, {"codigo_habitacion": "E01"},
+                       {"codigo_usuario": "U007"}, {"codigo_usuario": "U999"},
+                       {"codigo_habitacion": "N05", "codigo_usuario": "U012"}]
+            for dias in (0, 10, 30, 59, 75):
+                fecha = inicio + timedelta(days=dias)
+                filtros.append({"fecha_inicio": fecha})
+                filtros.append({"fecha_inicio": fecha, "fecha_fin": fecha + timedelta(days=5)})
+                filtros.append({"codigo_habitacion": "N02", "fecha_inicio": fecha})
+                filtros.append({"codigo_usuario": "U020", "fecha_inicio": fecha,
+                                "fecha_fin": fecha + timedelta(days=3)})
+            for filtro in filtros:
+                with self.subTest(**filtro):
+                    self.assertEqual(sorted(datos(vista) for vista in archivo.consultar(**filtro)),
+                                     sorted(datos(vista) for vista in historial.consultar(**filtro)))
+        finally:
+            archivo.cerrar()
+
+    def test_archivo_no_valido(self):
+        with open(self.ruta, "wb") as archivo:
+            archivo.write(b"NOESARCH" + bytes(64))
+        with self.assertRaises(ValueError):
+            ArchivoReservas(self.ruta)
+
+class PruebasSelladoHistorial(unittest.TestCase):
+    """
+    Sellado del historial del crucero y consultas sobre los archivos.
+    """
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.ruta = os.path.join(self.directorio, "salida.arch")
+        self.fecha = date.today() + timedelta(days=30)
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _abrir(self):
+        return Crucero(AlmacenamientoDiario(os.path.join(self.directorio, "datos")))
+
+    def test_sellar_y_reabrir(self):
+        crucero = self._abrir()
+        primera = crucero.crear_reserva(["U1", "U2"], "N01", 3, self.fecha)
+        segunda = crucero.crear_reserva(["U3"], "P01", 5, self.fecha)
+        activa = crucero.crear_reserva(["U1"], "N01", 2, self.fecha + timedelta(days=10))
+        self.assertEqual(crucero.archivar_finalizadas(self.fecha + timedelta(days=5)), 2)
+        self.assertEqual(crucero.sellar_historial(self.ruta), 2)
+        self.assertEqual(len(crucero.historial), 0)
+        # Sin reservas archivadas no se escribe otro archivo
+        self.assertEqual(crucero.sellar_historial(self.ruta + ".2"), 0)
+        self.assertFalse(os.path.exists(self.ruta + ".2"))
+
+        vista = crucero.buscar_reserva_archivada(primera)
+        self.assertEqual((vista.codigo_habitacion, vista.dias_reserva, vista.codigos_usuarios),
+                         ("N01", 3, ["U001", "U002"]))
+        self.assertIsNone(crucero.buscar_reserva_archivada(activa))
+        self.assertEqual([vista.codigo_reserva for vista in crucero.consultar_archivadas(codigo_usuario="U1")],
+                         [primera])
+        self.assertEqual([vista.codigo_reserva for vista in crucero.consultar_archivadas(codigo_habitacion="P01")],
+                         [segunda])
+        ultima_noche = crucero.consultar_archivadas(fecha_inicio=self.fecha + timedelta(days=4))
+        self.assertEqual([vista.codigo_reserva for vista in ultima_noche], [segunda])
+        crucero.cerrar()
+
+        crucero = self._abrir()
+        try:
+            self.assertEqual([archivo.ruta for archivo in crucero.archivos], [self.ruta])
+            self.assertEqual(crucero.buscar_reserva_archivada(segunda).codigos_usuarios, ["U003"])
+            self.assertEqual(crucero.buscar_reserva(activa).codigo_habitacion, "N01")
+        finally:
+            crucero.cerrar()
+
+if __name__ == "__main__":
+    unittest.main()
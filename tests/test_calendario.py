@@ -0,0 +1,62 @@
+"""
+Pruebas de la validación de rangos de fechas de las reservas.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Calendario import CalendarioOcupacion, rango_reserva
+from Crucero import Crucero
+
+class PruebasDiasReserva(unittest.TestCase):
+    """
+    Las reservas de cero días o menos se rechazan en todas las vías de alta.
+    """
+
+    def setUp(self):
+        self.crucero = Crucero()
+        self.fecha = date.today() + timedelta(days=30)
+
+    def test_rango_reserva_rechaza_dias_no_positivos(self):
+        for dias in (0, -3):
+            with self.assertRaises(ValueError):
+                rango_reserva(self.fecha, dias)
+        self.assertEqual(rango_reserva(self.fecha, 1), (self.fecha, self.fecha + timedelta(days=1)))
+
+    def test_calendario_rechaza_rangos_vacios_o_invertidos(self):
+        calendario = CalendarioOcupacion()
+        with self.assertRaises(ValueError):
+            calendario.ocupar(self.fecha, self.fecha, "R1")
+        with self.assertRaises(ValueError):
+            calendario.ocupar(self.fecha, self.fecha - timedelta(days=3), "R1")
+        self.assertEqual(calendario.rangos(), [])
+
+    def test_crear_reserva_rechaza_dias_no_positivos(self):
+        for codigo_habitacion, dias in (("P09", 0), ("P10", -3)):
+            with self.assertRaises(ValueError):
+                self.crucero.crear_reserva(["U3"], codigo_habitacion, dias, self.fecha)
+        self.assertEqual(list(self.crucero.iterar_reservas()), [])
+        # La habitación sigue libre para una reserva válida en las mismas fechas
+        self.assertIsNotNone(self.crucero.crear_reserva(["U3"], "P10", 3, self.fecha - timedelta(days=3)))
+
+    def test_retener_habitacion_rechaza_dias_no_positivos(self):
+        with self.assertRaises(ValueError):
+            self.crucero.retener_habitacion("E01", 0, self.fecha)
+        self.assertEqual(self.crucero.retenciones(), [])
+
+    def test_lote_informa_dias_no_positivos(self):
+        resultados = self.crucero.crear_reservas_lote([
+            {"codigos_usuarios": ["U3"], "codigo_habitacion": "P09", "dias_reserva": 0, "fecha_inicio": self.fecha},
+            {"codigos_usuarios": ["U4"], "codigo_habitacion": "P10", "dias_reserva": -3, "fecha_inicio": self.fecha},
+        ])
+        self.assertTrue(all(resultado["error"] and not resultado["codigo_reserva"] for resultado in resultados))
+
+if __name__ == "__main__":
+    unittest.main()
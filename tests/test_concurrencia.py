@@ -0,0 +1,107 @@
+"""
+Pruebas de las reservas concurrentes sobre una misma habitación.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import random
+import sys
+import threading
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import Crucero
+
+HILOS = 32
+
+def sin_solapamientos(habitacion):
+    """
+    Comprueba que los rangos ocupados de una habitación no se solapan.
+
+    Args:
+        habitacion (Habitacion): Habitación a revisar.
+
+    Returns:
+        bool: True si cada rango termina antes de que empiece el siguiente.
+    """
+    rangos = habitacion.calendario.rangos() if habitacion.calendario is not None else []
+    return all(inicio < fin for inicio, fin, _ in rangos) and all(
+        anterior[1] <= siguiente[0] for anterior, siguiente in zip(rangos, rangos[1:]))
+
+class PruebasReservasConcurrentes(unittest.TestCase):
+    """
+    Varios hilos compiten por las mismas fechas de una habitación.
+    """
+
+    def setUp(self):
+        # Cambiar de hilo con más frecuencia para que las carreras aparezcan
+        self._intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.crucero = Crucero()
+        self.fecha = date.today() + timedelta(days=60)
+
+    def tearDown(self):
+        sys.setswitchinterval(self._intervalo)
+
+    def _en_hilos(self, funcion):
+        """
+        Ejecuta una función en HILOS hilos que arrancan a la vez.
+
+        Args:
+            funcion (callable): Recibe el número de hilo y devuelve su resultado.
+
+        Returns:
+            list: Resultado de cada hilo.
+        """
+        barrera = threading.Barrier(HILOS)
+        resultados = [None] * HILOS
+
+        def ejecutar(numero):
+            barrera.wait()
+            resultados[numero] = funcion(numero)
+
+        hilos = [threading.Thread(target=ejecutar, args=(numero,)) for numero in range(HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return resultados
+
+    def test_mismas_fechas_una_sola_reserva(self):
+        for intento in range(20):
+            fecha = self.fecha + timedelta(days=10 * intento)
+            codigos = self._en_hilos(
+                lambda numero: self.crucero.crear_reserva([f"U{numero}"], "P01", 3, fecha))
+            creadas = [codigo for codigo in codigos if codigo]
+            self.assertEqual(len(creadas), 1)
+            self.assertIsNotNone(self.crucero.buscar_reserva(creadas[0]))
+        habitacion = self.crucero.buscar_habitacion("P01")
+        self.assertEqual(len(habitacion.calendario), 20)
+        self.assertTrue(sin_solapamientos(habitacion))
+
+    def test_fechas_solapadas_sin_solapamientos(self):
+        azar = random.Random(7)
+        pedidos = [(azar.randrange(20), azar.randint(1, 5)) for _ in range(HILOS)]
+        codigos = self._en_hilos(lambda numero: self.crucero.crear_reserva(
+            [f"U{numero}"], "E01", pedidos[numero][1], self.fecha + timedelta(days=pedidos[numero][0])))
+        habitacion = self.crucero.buscar_habitacion("E01")
+        self.assertTrue(sin_solapamientos(habitacion))
+        self.assertEqual(sorted(codigo for codigo in codigos if codigo),
+                         sorted(codigo for _, _, codigo in habitacion.calendario.rangos()))
+
+    def test_retenciones_y_reservas_sobre_las_mismas_fechas(self):
+        def competir(numero):
+            if numero % 2:
+                return self.crucero.retener_habitacion("N01", 2, self.fecha)
+            return self.crucero.crear_reserva([f"U{numero}"], "N01", 2, self.fecha)
+
+        codigos = self._en_hilos(competir)
+        self.assertEqual(len([codigo for codigo in codigos if codigo]), 1)
+        self.assertTrue(sin_solapamientos(self.crucero.buscar_habitacion("N01")))
+
+if __name__ == "__main__":
+    unittest.main()
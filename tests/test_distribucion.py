@@ -0,0 +1,135 @@
+"""
+Pruebas de la carga de distribuciones de habitaciones y de su construcción.
+
+Uso:
+    python -m pytest tests
+"""
+
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import Crucero
+from Distribucion import (DISTRIBUCION_PREDETERMINADA, Distribucion, cargar_distribucion, guardar_distribucion,
+                          nombre_cubierta)
+
+ENTRADAS = [("A1", "premium", 2), ("A2", "Premium", 4), ("B1", "economica", 3), ("C1", "Normal", 2)]
+
+class PruebasCargarDistribucion(unittest.TestCase):
+    """
+    Lectura y escritura de distribuciones en JSON, CSV y binario.
+    """
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.distribucion = Distribucion.desde_entradas(ENTRADAS)
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _ruta(self, nombre):
+        return os.path.join(self.directorio, nombre)
+
+    def test_nombres_oficiales_de_cubierta(self):
+        self.assertEqual(list(self.distribucion), [("A1", "Premium", 2), ("A2", "Premium", 4),
+                                                   ("B1", "Económica", 3), ("C1", "Normal", 2)])
+        self.assertEqual(self.distribucion.cubiertas, ("Premium", "Económica", "Normal"))
+        self.assertEqual(nombre_cubierta("ECONÓMICA"), "Económica")
+        with self.assertRaises(ValueError):
+            nombre_cubierta("suite")
+
+    def test_guardar_y_cargar_cada_formato(self):
+        for nombre in ("barco.json", "barco.csv", "barco.bin", "predeterminada.bin"):
+            with self.subTest(archivo=nombre):
+                distribucion = DISTRIBUCION_PREDETERMINADA if nombre.startswith("pre") else self.distribucion
+                guardar_distribucion(distribucion, self._ruta(nombre))
+                cargada = cargar_distribucion(self._ruta(nombre))
+                self.assertEqual(list(cargada), list(distribucion))
+                self.assertEqual(cargada.posiciones(), distribucion.posiciones())
+
+    def test_json_con_listas_y_objetos(self):
+        with open(self._ruta("barco.json"), "w", encoding="utf-8") as archivo:
+            json.dump([["A1", "premium", 2], {"codigo_habitacion": "B1", "cubierta": "normal", "acomodacion": "3"}],
+                      archivo)
+        self.assertEqual(list(cargar_distribucion(self._ruta("barco.json"))),
+                         [("A1", "Premium", 2), ("B1", "Normal", 3)])
+
+    def test_csv_con_columnas_en_otro_orden(self):
+        with open(self._ruta("barco.csv"), "w", encoding="utf-8", newline="") as archivo:
+            archivo.write("acomodacion,codigo_habitacion,cubierta\n2,A1,Premium\n\n4,A2,normal\n")
+        self.assertEqual(list(cargar_distribucion(self._ruta("barco.csv"))),
+                         [("A1", "Premium", 2), ("A2", "Normal", 4)])
+
+    def test_entradas_invalidas(self):
+        for entradas in ([("A1", "Premium", 2), ("A1", "Normal", 2)],
+                         [("A1", "Premium", 0)],
+                         [("A1", "Premium", 300)],
+                         [("A1", "Premium", "dos")],
+                         [("", "Premium", 2)],
+                         [("A1", "Suite", 2)],
+                         [("A1", "Premium")]):
+            with self.subTest(entradas=entradas):
+                with self.assertRaises(ValueError):
+                    Distribucion.desde_entradas(entradas)
+
+    def test_archivos_invalidos(self):
+        with open(self._ruta("barco.csv"), "w", encoding="utf-8") as archivo:
+            archivo.write("codigo,cubierta\nA1,Premium\n")
+        guardar_distribucion(self.distribucion, self._ruta("barco.bin"))
+        with open(self._ruta("barco.bin"), "rb") as archivo:
+            datos = archivo.read()
+        with open(self._ruta("cortada.bin"), "wb") as archivo:
+            archivo.write(datos[:-3])
+        with open(self._ruta("otra.bin"), "wb") as archivo:
+            archivo.write(b"XXXX" + datos[4:])
+        for nombre in ("barco.csv", "cortada.bin", "otra.bin"):
+            with self.subTest(archivo=nombre):
+                with self.assertRaises(ValueError):
+                    cargar_distribucion(self._ruta(nombre))
+
+    def test_pickle_conserva_las_columnas(self):
+        copia = pickle.loads(pickle.dumps(self.distribucion))
+        self.assertEqual(list(copia), list(self.distribucion))
+        self.assertEqual(copia.posiciones(), self.distribucion.posiciones())
+
+class PruebasConstruirHabitaciones(unittest.TestCase):
+    """
+    Habitaciones creadas en bloque o al usarse.
+    """
+
+    def setUp(self):
+        self.fecha = date.today() + timedelta(days=30)
+        self.distribucion = Distribucion.desde_entradas(ENTRADAS)
+
+    def test_construir_todas(self):
+        habitaciones = self.distribucion.construir_todas()
+        self.assertEqual([(habitacion.codigo_habitacion, habitacion.cubierta, habitacion.acomodacion)
+                          for habitacion in habitaciones], list(self.distribucion))
+        self.assertEqual([type(habitacion).__name__ for habitacion in habitaciones],
+                         ["Premium", "Premium", "Economica", "Normal"])
+
+    def test_crucero_perezoso_equivale_al_completo(self):
+        completo = Crucero(distribucion=self.distribucion)
+        perezoso = Crucero(distribucion=self.distribucion, perezosa=True)
+        for crucero in (completo, perezoso):
+            self.assertIsNotNone(crucero.crear_reserva(["U1"], "A2", 2, self.fecha))
+            self.assertIsNone(crucero.buscar_habitacion("Z9"))
+
+        hasta = self.fecha + timedelta(days=2)
+        for filtros in ((None, None, self.fecha, hasta), ("premium", None, self.fecha, hasta), (None, 2, None, None)):
+            with self.subTest(filtros=filtros):
+                self.assertEqual(
+                    [habitacion.codigo_habitacion for habitacion in perezoso.listar_habitaciones_disponibles(*filtros)],
+                    [habitacion.codigo_habitacion for habitacion in completo.listar_habitaciones_disponibles(*filtros)])
+        self.assertEqual([habitacion.codigo_habitacion for habitacion in perezoso.habitaciones],
+                         [codigo for codigo, _, _ in self.distribucion])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Pruebas de la flota de cruceros y del envío de operaciones a cada salida.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Flota import Flota, numero_fragmento
+from Identificadores import origen_de
+
+class PruebasFlota(unittest.TestCase):
+    """
+    Flota atendida en el proceso principal.
+    """
+
+    procesos = 0
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.fecha = date.today() + timedelta(days=30)
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _flota(self, directorio=None):
+        flota = Flota(self.procesos, directorio)
+        flota.agregar_barco("Aurora")
+        flota.agregar_barco("Boreal", [("P01", "Premium", 2), ("N01", "Normal", 4)])
+        for barco, salida in (("Aurora", "2025-07-01"), ("Aurora", "2025-08-01"), ("Boreal", "2025-07-01")):
+            flota.agregar_salida(barco, salida)
+        return flota
+
+    def test_agregar_salidas(self):
+        flota = self._flota()
+        try:
+            self.assertFalse(flota.agregar_salida("Aurora", "2025-07-01"))
+            with self.assertRaises(KeyError):
+                flota.agregar_salida("Cenit", "2025-07-01")
+            self.assertEqual(flota.salidas(), [("Aurora", "2025-07-01"), ("Aurora", "2025-08-01"),
+                                               ("Boreal", "2025-07-01")])
+        finally:
+            flota.cerrar()
+
+    def test_cada_salida_tiene_sus_reservas(self):
+        flota = self._flota()
+        try:
+            julio = flota.ejecutar("Aurora", "2025-07-01", "crear_reserva", ["U1"], "E01", 2, self.fecha)
+            agosto = flota.ejecutar("Aurora", "2025-08-01", "crear_reserva", ["U1"], "E01", 2, self.fecha)
+            self.assertIsNotNone(julio)
+            self.assertIsNotNone(agosto)
+            self.assertNotEqual(origen_de(julio), origen_de(agosto))
+            self.assertIsNone(flota.ejecutar("Aurora", "2025-07-01", "crear_reserva", ["U2"], "E01", 2, self.fecha))
+            with self.assertRaises(KeyError):
+                flota.ejecutar("Aurora", "2025-09-01", "crear_reserva", ["U1"], "E01", 2, self.fecha)
+        finally:
+            flota.cerrar()
+
+    def test_los_codigos_llevan_a_su_salida(self):
+        flota = self._flota()
+        try:
+            codigo = flota.ejecutar("Boreal", "2025-07-01", "crear_reserva", ["U1"], "P01", 2, self.fecha)
+            self.assertEqual(flota.localizar(codigo), ("Boreal", "2025-07-01"))
+            self.assertTrue(flota.ejecutar_codigo(codigo, "cancelar_reserva", codigo))
+            self.assertFalse(flota.ejecutar("Boreal", "2025-07-01", "cancelar_reserva", codigo))
+
+            # Los códigos sin origen no llevan a ninguna salida
+            self.assertIsNone(flota.localizar("R001"))
+            with self.assertRaises(KeyError):
+                flota.ejecutar_codigo("R001", "cancelar_reserva", "R001")
+        finally:
+            flota.cerrar()
+
+    def test_buscar_en_todas_las_salidas(self):
+        flota = self._flota()
+        try:
+            flota.ejecutar("Boreal", "2025-07-01", "crear_reserva", ["U1"], "P01", 2, self.fecha)
+            hasta = self.fecha + timedelta(days=2)
+            resultados = flota.buscar_disponibles("premium", 2, self.fecha, hasta)
+            salidas = [(datos["barco"], datos["salida"]) for datos in resultados]
+            self.assertEqual(salidas, sorted(salidas))
+            self.assertEqual(salidas.count(("Aurora", "2025-07-01")), 3)
+            self.assertNotIn(("Boreal", "2025-07-01"), salidas)
+            self.assertEqual(len(flota.buscar_disponibles(limite=4)), 4)
+        finally:
+            flota.cerrar()
+
+    def test_origenes_se_conservan_al_reiniciar(self):
+        flota = self._flota(self.directorio)
+        codigo = flota.ejecutar("Aurora", "2025-08-01", "crear_reserva", ["U1"], "E01", 2, self.fecha)
+        flota.cerrar()
+
+        # Otro orden de alta no cambia el origen de cada salida
+        flota = Flota(self.procesos, self.directorio)
+        try:
+            flota.agregar_barco("Aurora")
+            flota.agregar_barco("Boreal", [("P01", "Premium", 2), ("N01", "Normal", 4)])
+            flota.agregar_salida("Boreal", "2025-07-01")
+            flota.agregar_salida("Aurora", "2025-08-01")
+            self.assertEqual(flota.localizar(codigo), ("Aurora", "2025-08-01"))
+            self.assertIsNotNone(flota.ejecutar_codigo(codigo, "buscar_reserva", codigo))
+        finally:
+            flota.cerrar()
+
+class PruebasFlotaProcesos(PruebasFlota):
+    """
+    La misma flota con las salidas repartidas en dos procesos.
+    """
+
+    procesos = 2
+
+class PruebasNumeroFragmento(unittest.TestCase):
+    """
+    Reparto estable de las salidas entre fragmentos.
+    """
+
+    def test_estable_y_en_rango(self):
+        numeros = [numero_fragmento("Aurora", f"2025-07-{dia:02d}", 4) for dia in range(1, 29)]
+        self.assertTrue(all(0 <= numero < 4 for numero in numeros))
+        self.assertGreater(len(set(numeros)), 1)
+        self.assertEqual(numeros, [numero_fragmento("Aurora", f"2025-07-{dia:02d}", 4) for dia in range(1, 29)])
+
+if __name__ == "__main__":
+    unittest.main()
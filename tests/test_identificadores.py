@@ -0,0 +1,106 @@
+"""
+Pruebas de la generación de códigos de reserva y de usuario.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import Crucero
+from Identificadores import (EPOCA, MAXIMO_ORIGEN, GeneradorIdentificadores, descomponer, generador,
+                             origen_de)
+
+class Reloj:
+    """
+    Reloj que solo avanza (o retrocede) cuando la prueba lo indica.
+    """
+
+    def __init__(self, segundos):
+        self.ahora = EPOCA.timestamp() + segundos
+
+    def __call__(self):
+        return self.ahora
+
+class PruebasIdentificadores(unittest.TestCase):
+    """
+    Formato, orden y origen de los códigos generados.
+    """
+
+    def setUp(self):
+        self.reloj = Reloj(3600)
+
+    def test_formato_y_descomposicion(self):
+        identificadores = GeneradorIdentificadores(7, self.reloj)
+        self.assertEqual(identificadores.ultimo, 0)
+        codigo = identificadores.codigo("R")
+        self.assertEqual(len(codigo), 20)
+        self.assertTrue(codigo.startswith("R1"))
+        self.assertEqual(descomponer(codigo), (EPOCA + timedelta(hours=1), 7, 0))
+        self.assertEqual(descomponer(identificadores.codigo("U")), (EPOCA + timedelta(hours=1), 7, 1))
+        self.assertEqual(int(codigo[1:]) - 10 ** 18 + 1, identificadores.ultimo)
+        self.assertEqual(origen_de(codigo), 7)
+
+    def test_codigos_antiguos_y_no_validos(self):
+        for codigo in ("R001", "U001", "Rabcdefghijklmnopqrs", "R0999999999999999999"):
+            with self.subTest(codigo=codigo):
+                self.assertIsNone(descomponer(codigo))
+                self.assertIsNone(origen_de(codigo))
+
+    def test_origen_fuera_de_rango(self):
+        for origen in (-1, MAXIMO_ORIGEN + 1):
+            with self.assertRaises(ValueError):
+                GeneradorIdentificadores(origen)
+        codigo = GeneradorIdentificadores(MAXIMO_ORIGEN, self.reloj).codigo("R")
+        self.assertEqual(origen_de(codigo), MAXIMO_ORIGEN)
+
+    def test_orden_en_el_mismo_milisegundo(self):
+        identificadores = GeneradorIdentificadores(2, self.reloj)
+        codigos = [identificadores.codigo("R") for _ in range(1500)]
+        self.assertEqual(codigos, sorted(set(codigos)))
+        # Agotada la secuencia, se toman códigos del milisegundo siguiente
+        instante, origen, secuencia = descomponer(codigos[1024])
+        self.assertEqual((instante, origen, secuencia), (EPOCA + timedelta(hours=1, milliseconds=1), 2, 0))
+
+    def test_orden_si_el_reloj_retrocede(self):
+        identificadores = GeneradorIdentificadores(1, self.reloj)
+        anterior = identificadores.codigo("R")
+        self.reloj.ahora -= 60
+        siguiente = identificadores.codigo("R")
+        self.assertGreater(siguiente, anterior)
+
+        # Un generador nuevo, con el reloj atrasado, sigue desde el último número guardado
+        reiniciado = GeneradorIdentificadores(1, self.reloj)
+        reiniciado.avanzar(identificadores.ultimo)
+        self.assertGreater(reiniciado.codigo("R"), siguiente)
+        # Avanzar a un número anterior no cambia nada
+        ultimo = reiniciado.ultimo
+        reiniciado.avanzar(0)
+        self.assertEqual(reiniciado.ultimo, ultimo)
+
+    def test_origenes_distintos_no_coinciden(self):
+        primero = GeneradorIdentificadores(1, self.reloj)
+        segundo = GeneradorIdentificadores(2, self.reloj)
+        codigos = [generador.codigo("R") for _ in range(50) for generador in (primero, segundo)]
+        self.assertEqual(len(set(codigos)), len(codigos))
+        self.assertEqual({origen_de(codigo) for codigo in codigos[::2]}, {1})
+
+    def test_generador_compartido_por_origen(self):
+        self.assertIs(generador(11), generador(11))
+        self.assertIsNot(generador(11), generador(12))
+        crucero = Crucero(origen=11)
+        try:
+            self.assertIs(crucero.identificadores, generador(11))
+            codigo_reserva = crucero.crear_reserva(["U1"], "N01", 2)
+            self.assertEqual(origen_de(codigo_reserva), 11)
+            self.assertEqual(origen_de(crucero.nuevo_codigo_usuario()), 11)
+        finally:
+            crucero.cerrar()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Pruebas de la importación y exportación masiva de reservas.
+
+Uso:
+    python -m pytest tests
+"""
+
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Almacenamiento import AlmacenamientoDiario
+from Crucero import Crucero
+from Importacion import exportar_reservas, importar_reservas
+from Usuario import Usuario
+
+class PruebasImportacion(unittest.TestCase):
+    """
+    Importación de archivos CSV y JSONL, y su exportación de vuelta.
+    """
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.fecha = date.today() + timedelta(days=30)
+        self.crucero = Crucero()
+        self.crucero.registrar_usuarios([Usuario("Ana", "U1"), Usuario("Luis", "U2")])
+
+    def tearDown(self):
+        self.crucero.cerrar()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _jsonl(self, filas):
+        ruta = os.path.join(self.directorio, "reservas.jsonl")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            for fila in filas:
+                archivo.write((fila if isinstance(fila, str) else json.dumps(fila)) + "\n")
+        return ruta
+
+    def test_importar_csv(self):
+        ruta = os.path.join(self.directorio, "reservas.csv")
+        with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(["codigo_habitacion", "cubierta", "acomodacion", "dias_reserva",
+                               "fecha_inicio", "usuarios", "nombres"])
+            escritor.writerow(["E01", "", "", "3", self.fecha.isoformat(), "U1", ""])
+            escritor.writerow(["", "premium", "2", "2", self.fecha.isoformat(), "U2", "Eva"])
+            escritor.writerow(["E02", "", "", "cero", "", "", "Juan"])
+
+        resumen = importar_reservas(self.crucero, ruta)
+        self.assertEqual(resumen["procesadas"], 3)
+        self.assertEqual(resumen["creadas"], 2)
+        self.assertEqual([numero for numero, _ in resumen["errores"]], [4])
+        codigo = dict(resumen["reservas"])[3]
+        reserva = self.crucero.buscar_reserva(codigo)
+        self.assertEqual(self.crucero.buscar_habitacion(reserva.codigo_habitacion).cubierta.lower(), "premium")
+        self.assertEqual([usuario.nombre for usuario in self.crucero.buscar_usuarios_por_nombre("Eva")], ["Eva"])
+        self.assertEqual(self.crucero.buscar_usuarios_por_nombre("Juan"), [])
+
+    def test_filas_mal_formadas_se_rechazan_una_a_una(self):
+        ruta = self._jsonl([
+            [1, 2],
+            "{no es json",
+            {"codigo_habitacion": 5, "dias_reserva": 2, "usuarios": "U1"},
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "usuarios": 5},
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "usuarios": ["U1", 7]},
+            {"cubierta": 3, "dias_reserva": 2, "usuarios": "U1"},
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "fecha_inicio": 20250101, "usuarios": "U1"},
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "acomodacion": [2], "usuarios": "U1"},
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "usuarios": ["U1"], "nombres": ["Eva"]},
+        ])
+
+        resumen = importar_reservas(self.crucero, ruta)
+        self.assertEqual(resumen["procesadas"], 9)
+        self.assertEqual(resumen["creadas"], 1)
+        self.assertEqual([numero for numero, _ in resumen["errores"]], list(range(1, 9)))
+        self.assertEqual(dict(resumen["errores"])[1], "La línea no es un objeto JSON.")
+
+    def test_usuarios_nuevos_solo_si_se_crea_la_reserva(self):
+        ruta = self._jsonl([
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "fecha_inicio": self.fecha.isoformat(),
+             "nombres": "Eva"},
+            # Misma habitación y fechas: la reserva falla y Juan no se registra
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "fecha_inicio": self.fecha.isoformat(),
+             "nombres": "Juan"},
+        ])
+
+        resumen = importar_reservas(self.crucero, ruta)
+        self.assertEqual(resumen["creadas"], 1)
+        self.assertEqual([numero for numero, _ in resumen["errores"]], [2])
+        self.assertEqual(len(self.crucero.buscar_usuarios_por_nombre("Eva")), 1)
+        self.assertEqual(self.crucero.buscar_usuarios_por_nombre("Juan"), [])
+        self.assertEqual(len(self.crucero.usuarios), 3)
+
+    def test_exportar_e_importar_conserva_las_reservas(self):
+        self.crucero.crear_reserva(["U1"], "E01", 3, self.fecha)
+        self.crucero.crear_reserva(["U2"], "E02", 2, self.fecha + timedelta(days=1))
+        for extension in ("csv", "jsonl"):
+            with self.subTest(formato=extension):
+                ruta = os.path.join(self.directorio, f"exportadas.{extension}")
+                self.assertEqual(exportar_reservas(self.crucero, ruta), 2)
+
+                destino = Crucero()
+                destino.registrar_usuarios([Usuario("Ana", "U1"), Usuario("Luis", "U2")])
+                resumen = importar_reservas(destino, ruta)
+                self.assertEqual(resumen["creadas"], 2)
+                self.assertEqual(resumen["errores"], [])
+                self.assertEqual(
+                    sorted((r.codigo_habitacion, r.fecha_inicio, r.dias_reserva, r.codigos_usuarios[0])
+                           for r in destino.reservas),
+                    sorted((r.codigo_habitacion, r.fecha_inicio, r.dias_reserva, r.codigos_usuarios[0])
+                           for r in self.crucero.reservas))
+                destino.cerrar()
+
+class PruebasReservasLote(unittest.TestCase):
+    """
+    Creación de reservas por lotes con Crucero.crear_reservas_lote.
+    """
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.fecha = date.today() + timedelta(days=30)
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _abrir(self):
+        return Crucero(AlmacenamientoDiario(self.directorio))
+
+    def test_resultado_por_solicitud(self):
+        crucero = self._abrir()
+        resultados = crucero.crear_reservas_lote([
+            {"codigos_usuarios": ["U1"], "dias_reserva": 2, "fecha_inicio": self.fecha, "codigo_habitacion": "E01"},
+            {"codigos_usuarios": ["U2"], "dias_reserva": 0, "fecha_inicio": self.fecha},
+            {"codigos_usuarios": ["U3"], "dias_reserva": 2, "fecha_inicio": self.fecha, "cubierta": 3},
+            {"codigos_usuarios": ["U4"], "dias_reserva": 2, "fecha_inicio": self.fecha, "codigo_habitacion": "X99"},
+            {"codigos_usuarios": ["U5"], "dias_reserva": 2, "fecha_inicio": self.fecha, "cubierta": "premium",
+             "acomodacion": 2},
+        ])
+        self.assertEqual([resultado["error"] is None for resultado in resultados], [True, False, False, False, True])
+        self.assertEqual(resultados[0]["codigo_habitacion"], "E01")
+        self.assertGreater(resultados[0]["costo"], 0)
+        crucero.cerrar()
+
+        # Todas las reservas del lote se guardaron con una sola operación
+        with open(os.path.join(self.directorio, AlmacenamientoDiario.ARCHIVO_DIARIO), encoding="utf-8") as diario:
+            operaciones = [json.loads(linea) for linea in diario]
+        self.assertEqual([operacion["op"] for operacion in operaciones], ["lote"])
+        crucero = self._abrir()
+        self.assertEqual(len(crucero.reservas), 2)
+        crucero.cerrar()
+
+    def test_excepcion_a_mitad_del_lote_guarda_lo_aplicado(self):
+        crucero = self._abrir()
+        original = crucero._crear_reserva_solicitud
+
+        def fallar_en_la_segunda(solicitud):
+            if solicitud["codigos_usuarios"] == ["U2"]:
+                raise RuntimeError("fallo simulado")
+            return original(solicitud)
+
+        with mock.patch.object(crucero, "_crear_reserva_solicitud", fallar_en_la_segunda):
+            with self.assertRaises(RuntimeError):
+                crucero.crear_reservas_lote([
+                    {"codigos_usuarios": ["U1"], "dias_reserva": 2, "fecha_inicio": self.fecha,
+                     "codigo_habitacion": "E01"},
+                    {"codigos_usuarios": ["U2"], "dias_reserva": 2, "fecha_inicio": self.fecha},
+                ])
+        codigos = [reserva.codigo_reserva for reserva in crucero.reservas]
+        crucero.cerrar()
+
+        crucero = self._abrir()
+        self.assertEqual([reserva.codigo_reserva for reserva in crucero.reservas], codigos)
+        self.assertEqual(len(codigos), 1)
+        crucero.cerrar()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Pruebas de la búsqueda aproximada de usuarios por nombre con trigramas.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import random
+import sys
+import unittest
+from math import ceil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from IndiceNombres import SIMILITUD_MINIMA, IndiceTrigramas, trigramas
+from Usuario import Usuario
+
+NOMBRES = ["José", "María", "Juan", "Ana", "Luis", "Carmen", "Jorge", "Lucía", "Pedro", "Sofía", "Iñaki", "Zoe"]
+APELLIDOS = ["Muñoz", "García", "Pérez", "López", "Gómez", "Díaz", "Ruiz", "Álvarez", "Núñez", "Ybarra"]
+
+def buscar_recorriendo(usuarios, consulta, limite=10, similitud_minima=SIMILITUD_MINIMA):
+    """
+    Búsqueda de referencia: puntúa a todos los usuarios, uno por uno.
+    """
+    buscados = trigramas(consulta)
+    if not buscados or limite <= 0:
+        return []
+    necesarios = max(1, ceil(similitud_minima * len(buscados) - 1e-9))
+    puntuados = []
+    for numero, usuario in enumerate(usuarios):
+        propios = trigramas(usuario.nombre)
+        comunes = len(buscados & propios)
+        if comunes >= necesarios:
+            puntuados.append((-comunes, len(propios), numero))
+    return [(-comunes / len(buscados), usuarios[numero]) for comunes, _, numero in sorted(puntuados)[:limite]]
+
+class PruebasTrigramas(unittest.TestCase):
+    """
+    Trigramas de las palabras de un texto.
+    """
+
+    def test_trigramas_con_relleno(self):
+        self.assertEqual(trigramas("José"), {"  j", " jo", "jos", "ose", "se "})
+        self.assertEqual(trigramas("Muñoz, José"), trigramas("jose MUNOZ"))
+        self.assertEqual(trigramas(""), set())
+        self.assertEqual(trigramas(None), set())
+
+class PruebasIndiceTrigramas(unittest.TestCase):
+    """
+    El índice devuelve lo mismo que puntuar a todos los usuarios.
+    """
+
+    def _indice(self, usuarios):
+        indice = IndiceTrigramas()
+        for usuario in usuarios:
+            indice.agregar(usuario)
+        return indice
+
+    def test_tolera_errores_y_orden_de_palabras(self):
+        usuarios = [Usuario("José Muñoz", "U1"), Usuario("Josefina Muñoz Pérez", "U2"), Usuario("Ana Gómez", "U3")]
+        indice = self._indice(usuarios)
+        self.assertEqual(len(indice), 3)
+        for consulta in ("Muñoz, José", "jose munoz", "Jsoe Munoz", "jose munos"):
+            with self.subTest(consulta=consulta):
+                self.assertIs(indice.buscar(consulta)[0][1], usuarios[0])
+        puntuacion, usuario = indice.buscar("jose munoz")[0]
+        self.assertEqual(puntuacion, 1.0)
+        # A igual puntuación, primero el nombre más parecido en conjunto
+        self.assertEqual([usuario.codigo for _, usuario in indice.buscar("munoz")], ["U001", "U002"])
+        self.assertEqual(indice.buscar("xyz"), [])
+        self.assertEqual(indice.buscar("   "), [])
+        self.assertEqual(indice.buscar("jose", limite=0), [])
+
+    def test_igual_a_recorrer_todos(self):
+        azar = random.Random(3)
+        usuarios = [Usuario(f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}", f"U{numero}")
+                    for numero in range(2000)]
+        # Nombres poco comunes, para recorrer también solo las listas más cortas
+        usuarios += [Usuario(f"Xiomara Quetzal {numero}", f"U{2000 + numero}") for numero in range(5)]
+        indice = self._indice(usuarios)
+
+        consultas = ["jose munoz", "Maria Garcia Perez", "Xiomara Quetzal", "xiomara", "inaki ybarra", "zoe",
+                     "lopes", "Lucia Alvarez Nunez", "pedro"]
+        for numero in range(20):
+            nombre = list(azar.choice(usuarios).nombre)
+            posicion = azar.randrange(len(nombre) - 1)
+            nombre[posicion], nombre[posicion + 1] = nombre[posicion + 1], nombre[posicion]
+            consultas.append("".join(nombre))
+        for consulta in consultas:
+            for limite, similitud in ((10, SIMILITUD_MINIMA), (3, 0.8), (50, 0.2)):
+                with self.subTest(consulta=consulta, limite=limite, similitud=similitud):
+                    esperados = buscar_recorriendo(usuarios, consulta, limite, similitud)
+                    obtenidos = indice.buscar(consulta, limite, similitud)
+                    self.assertEqual([(puntuacion, usuario.codigo) for puntuacion, usuario in obtenidos],
+                                     [(puntuacion, usuario.codigo) for puntuacion, usuario in esperados])
+
+if __name__ == "__main__":
+    unittest.main()
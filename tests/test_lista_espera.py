@@ -0,0 +1,114 @@
+"""
+Pruebas de la lista de espera de reservas.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import Crucero
+
+# Habitaciones premium de acomodación 2 en la distribución predeterminada
+GRUPO = ("P01", "P02", "P03")
+
+class PruebasListaEspera(unittest.TestCase):
+    """
+    Solicitudes que esperan y se promueven al liberarse una habitación.
+    """
+
+    def setUp(self):
+        self.fecha = date.today() + timedelta(days=30)
+        self.crucero = Crucero()
+        # Ocupar todo el grupo en las fechas de las pruebas
+        self.ocupantes = [self.crucero.crear_reserva([f"U{numero}"], codigo, 3, self.fecha)
+                          for numero, codigo in enumerate(GRUPO, start=1)]
+
+    def tearDown(self):
+        self.crucero.cerrar()
+
+    def _esperar(self, usuario, dias=2, prioridad=0, fecha=None):
+        return self.crucero.esperar_reserva([usuario], dias, "Premium", 2, fecha or self.fecha, prioridad)
+
+    def test_reserva_enseguida_si_hay_lugar(self):
+        resultado = self.crucero.esperar_reserva(["U9"], 2, "normal", 2, self.fecha)
+        self.assertFalse(resultado["en_espera"])
+        self.assertEqual(self.crucero.buscar_reserva(resultado["codigo_reserva"]).codigo_habitacion,
+                         resultado["codigo_habitacion"])
+
+    def test_promocion_al_cancelar(self):
+        resultado = self._esperar("U9")
+        self.assertTrue(resultado["en_espera"])
+        self.assertIsNone(self.crucero.buscar_reserva(resultado["codigo_reserva"]))
+
+        self.crucero.cancelar_reserva(self.ocupantes[1])
+        reserva = self.crucero.buscar_reserva(resultado["codigo_reserva"])
+        self.assertEqual(reserva.codigo_habitacion, "P02")
+        self.assertEqual(reserva.codigos_usuarios[0], "U009")
+        self.assertEqual(len(self.crucero.lista_espera), 0)
+
+    def _retener_p03(self, segundos=600):
+        # Cambiar la reserva de P03 por una retención de las mismas fechas
+        self.crucero.cancelar_reserva(self.ocupantes[2])
+        return self.crucero.retener_habitacion("P03", 3, self.fecha, segundos)
+
+    def test_promocion_al_liberar_retencion(self):
+        codigo_retencion = self._retener_p03()
+        resultado = self._esperar("U9")
+        self.assertTrue(resultado["en_espera"])
+
+        self.crucero.liberar_retencion(codigo_retencion)
+        reserva = self.crucero.buscar_reserva(resultado["codigo_reserva"])
+        self.assertEqual(reserva.codigo_habitacion, "P03")
+
+    def test_promocion_al_vencer_retencion(self):
+        codigo_retencion = self._retener_p03(segundos=5)
+        resultado = self._esperar("U9")
+        self.assertTrue(resultado["en_espera"])
+
+        self.assertEqual(self.crucero.expirar_retenciones(self.crucero._vencimientos.reloj() + 5), 1)
+        self.assertIsNone(self.crucero.confirmar_retencion(codigo_retencion, ["U1"]))
+        self.assertEqual(self.crucero.buscar_reserva(resultado["codigo_reserva"]).codigo_habitacion, "P03")
+
+    def test_prioridad_y_antiguedad(self):
+        primera = self._esperar("U7")
+        urgente = self._esperar("U8", prioridad=5)
+        segunda = self._esperar("U9")
+
+        self.crucero.cancelar_reserva(self.ocupantes[0])
+        self.assertIsNotNone(self.crucero.buscar_reserva(urgente["codigo_reserva"]))
+        self.crucero.cancelar_reserva(self.ocupantes[1])
+        self.assertIsNotNone(self.crucero.buscar_reserva(primera["codigo_reserva"]))
+        self.assertIsNone(self.crucero.buscar_reserva(segunda["codigo_reserva"]))
+        self.assertEqual([solicitud.codigo for solicitud in self.crucero.lista_espera.pendientes()],
+                         [segunda["codigo_reserva"]])
+
+    def test_solo_se_promueve_lo_que_cabe(self):
+        self.crucero.crear_reserva(["U4"], "P03", 3, self.fecha + timedelta(days=3))
+        larga = self._esperar("U8", dias=5)
+        corta = self._esperar("U9", dias=3)
+
+        # Se liberan los tres primeros días de P03: la solicitud de cinco sigue esperando
+        self.crucero.cancelar_reserva(self.ocupantes[2])
+        self.assertIsNone(self.crucero.buscar_reserva(larga["codigo_reserva"]))
+        self.assertEqual(self.crucero.buscar_reserva(corta["codigo_reserva"]).codigo_habitacion, "P03")
+
+    def test_cancelar_espera(self):
+        resultado = self._esperar("U9")
+        self.assertTrue(self.crucero.cancelar_espera(resultado["codigo_reserva"]))
+        self.assertFalse(self.crucero.cancelar_espera(resultado["codigo_reserva"]))
+        self.crucero.cancelar_reserva(self.ocupantes[0])
+        self.assertIsNone(self.crucero.buscar_reserva(resultado["codigo_reserva"]))
+
+    def test_errores(self):
+        self.assertIsNotNone(self.crucero.esperar_reserva(["U9"], 2, "suite", 2, self.fecha)["error"])
+        self.assertIsNotNone(self.crucero.esperar_reserva(["U9"], 0, "Premium", 2, self.fecha)["error"])
+        self.assertIsNotNone(self.crucero.esperar_reserva([], 2, "Premium", 2, self.fecha)["error"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Pruebas del recorrido por páginas de reservas y habitaciones.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+from datetime import date, timedelta
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import TAMANO_TRAMO, Crucero
+
+class PruebasPaginarReservas(unittest.TestCase):
+    """
+    Páginas de reservas activas con cursor.
+    """
+
+    def setUp(self):
+        self.fecha = date.today() + timedelta(days=30)
+        self.crucero = Crucero()
+        # Más reservas que un tramo, para recorrer el orden en varios tramos
+        self.codigos = []
+        for semana in range(TAMANO_TRAMO // len(self.crucero.habitaciones) + 2):
+            for numero, habitacion in enumerate(self.crucero.habitaciones):
+                self.codigos.append(self.crucero.crear_reserva(
+                    [f"U{numero}"], habitacion.codigo_habitacion, 3, self.fecha + timedelta(weeks=semana)))
+        self.assertGreater(len(self.codigos), TAMANO_TRAMO)
+
+    def tearDown(self):
+        self.crucero.cerrar()
+
+    def _todas_las_paginas(self, limite, **filtros):
+        codigos = []
+        cursor = None
+        while True:
+            reservas, cursor = self.crucero.paginar_reservas(limite, cursor, **filtros)
+            self.assertLessEqual(len(reservas), limite)
+            codigos.extend(reserva.codigo_reserva for reserva in reservas)
+            if cursor is None:
+                return codigos
+
+    def test_paginas_recorren_todo_en_orden(self):
+        for limite in (1, 7, 50, TAMANO_TRAMO, len(self.codigos), len(self.codigos) + 1):
+            with self.subTest(limite=limite):
+                self.assertEqual(self._todas_las_paginas(limite), sorted(self.codigos))
+        self.assertEqual([reserva.codigo_reserva for reserva in self.crucero.iterar_reservas()], sorted(self.codigos))
+
+    def test_ultima_pagina_completa_no_deja_cursor(self):
+        reservas, cursor = self.crucero.paginar_reservas(len(self.codigos))
+        self.assertEqual(len(reservas), len(self.codigos))
+        self.assertIsNone(cursor)
+
+    def test_cursor_estable_ante_cambios(self):
+        ordenados = sorted(self.codigos)
+        pagina, cursor = self.crucero.paginar_reservas(100)
+        self.assertEqual(cursor, ordenados[99])
+
+        # Cancelar reservas ya devueltas y pendientes, y crear otras nuevas
+        self.crucero.cancelar_reserva(ordenados[10])
+        self.crucero.cancelar_reserva(ordenados[99])
+        self.crucero.cancelar_reserva(ordenados[150])
+        nueva = self.crucero.crear_reserva(["U1"], "E01", 1, self.fecha - timedelta(days=1))
+
+        resto = [reserva.codigo_reserva for reserva in self.crucero.iterar_reservas(despues_de=cursor)]
+        self.assertEqual(resto, [codigo for codigo in ordenados[100:] if codigo != ordenados[150]] + [nueva])
+
+    def test_filtros(self):
+        hasta = self.fecha + timedelta(days=2)
+        casos = [
+            ({"codigo_habitacion": "P03"}, lambda reserva: reserva.codigo_habitacion == "P03"),
+            ({"codigo_usuario": "U5"}, lambda reserva: "U005" in reserva.codigos_usuarios),
+            ({"fecha_inicio": self.fecha, "fecha_fin": hasta},
+             lambda reserva: reserva.fecha_inicio < hasta and reserva.fecha_fin > self.fecha),
+            ({"cubierta": "economica", "fecha_inicio": self.fecha + timedelta(weeks=1)},
+             lambda reserva: reserva.codigo_habitacion.startswith("E")
+             and reserva.fecha_inicio == self.fecha + timedelta(weeks=1)),
+        ]
+        for filtros, condicion in casos:
+            with self.subTest(filtros=filtros):
+                esperados = sorted(reserva.codigo_reserva for reserva in self.crucero.reservas if condicion(reserva))
+                self.assertTrue(esperados)
+                self.assertEqual(self._todas_las_paginas(4, **filtros), esperados)
+
+    def test_limite_invalido(self):
+        with self.assertRaises(ValueError):
+            self.crucero.paginar_reservas(0)
+
+class PruebasOrdenCodigos(unittest.TestCase):
+    """
+    Orden de los códigos antiguos, más cortos que los generados.
+    """
+
+    def test_codigos_cortos_primero(self):
+        crucero = Crucero()
+        fecha = date.today() + timedelta(days=30)
+        for numero, codigo in enumerate(("R1000", "R999", "R12")):
+            crucero.aplicar_operacion({"op": "reserva", "reserva": {
+                "codigo_reserva": codigo, "codigo_habitacion": f"E0{numero + 1}", "codigos_usuarios": ["U001"],
+                "dias_reserva": 2, "fecha_inicio": fecha.isoformat(), "fecha_reserva": "2024-01-01T00:00:00"}})
+        generado = crucero.crear_reserva(["U2"], "N01", 2, fecha)
+        self.assertEqual([reserva.codigo_reserva for reserva in crucero.iterar_reservas()],
+                         ["R12", "R999", "R1000", generado])
+        reservas, cursor = crucero.paginar_reservas(2)
+        self.assertEqual(cursor, "R999")
+        self.assertEqual([reserva.codigo_reserva for reserva in crucero.paginar_reservas(2, cursor)[0]],
+                         ["R1000", generado])
+        crucero.cerrar()
+
+class PruebasIterarHabitaciones(unittest.TestCase):
+    """
+    Recorrido perezoso de las habitaciones disponibles.
+    """
+
+    def test_mismo_resultado_que_listar(self):
+        crucero = Crucero(perezosa=True)
+        fecha = date.today() + timedelta(days=30)
+        crucero.crear_reserva(["U1"], "N02", 2, fecha)
+        orden = crucero.distribucion.posiciones()
+        for filtros in ((), ("normal",), (None, 2), (None, None, fecha, fecha + timedelta(days=2))):
+            with self.subTest(filtros=filtros):
+                iteradas = [habitacion.codigo_habitacion
+                            for habitacion in crucero.iterar_habitaciones_disponibles(*filtros)]
+                listadas = [habitacion.codigo_habitacion
+                            for habitacion in crucero.listar_habitaciones_disponibles(*filtros)]
+                self.assertEqual(sorted(iteradas), sorted(listadas))
+                self.assertEqual(iteradas, sorted(iteradas, key=orden.get))
+        primeras = list(islice(crucero.iterar_habitaciones_disponibles("premium"), 2))
+        self.assertEqual([habitacion.codigo_habitacion for habitacion in primeras], ["P01", "P02"])
+        crucero.cerrar()
+
+if __name__ == "__main__":
+    unittest.main()
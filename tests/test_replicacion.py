@@ -0,0 +1,165 @@
+"""
+Pruebas del flujo de cambios y de las réplicas de lectura.
+
+Uso:
+    python -m pytest tests
+"""
+
+import json
+import os
+import sys
+import time
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import Crucero
+from Replicacion import FlujoCambios, PublicadorCambios, Replica
+from Usuario import Usuario
+
+def sincronizar(replica, flujo):
+    """
+    Pone al día una réplica como lo hace el publicador: con los cambios que
+    le faltan o, si el flujo ya no los tiene, con una instantánea.
+    """
+    lineas = flujo.cambios_desde(replica.secuencia) if replica.flujo == flujo.identificador else None
+    if lineas is None:
+        secuencia, estado = flujo.instantanea()
+        # Pasar por JSON como en el protocolo
+        replica.aplicar(json.loads(json.dumps({"tipo": "instantanea", "flujo": flujo.identificador,
+                                               "secuencia": secuencia, "estado": estado})))
+        lineas = flujo.cambios_desde(replica.secuencia)
+    for linea in lineas:
+        replica.aplicar(json.loads(linea))
+
+def resumen(crucero):
+    """
+    Estado observable de un crucero para comparar primario y réplica.
+    """
+    return {
+        "usuarios": sorted((usuario.codigo, usuario.nombre, usuario.obtener_reserva())
+                           for usuario in crucero.usuarios.usuarios()),
+        "reservas": sorted(json.dumps(reserva.a_dict(), sort_keys=True) for reserva in crucero.reservas),
+        "historial": sorted(vista.codigo_reserva for vista in crucero.historial),
+        "disponibles": [habitacion.codigo_habitacion for habitacion in crucero.listar_habitaciones_disponibles()],
+    }
+
+class PruebasReplica(unittest.TestCase):
+    """
+    Réplicas que se ponen al día desde una instantánea o desde los cambios.
+    """
+
+    def setUp(self):
+        self.fecha = date.today() + timedelta(days=30)
+        self.primario = Crucero()
+        self.replicas = []
+
+    def tearDown(self):
+        for replica in self.replicas:
+            replica.cerrar()
+        self.primario.cerrar()
+
+    def _replica(self):
+        replica = Replica()
+        self.replicas.append(replica)
+        return replica
+
+    def _operar(self, desde=0):
+        """
+        Aplica sobre el primario operaciones de cada tipo que se publica.
+        """
+        primario = self.primario
+        primario.registrar_usuarios([Usuario(f"Pasajero {numero}", f"U{numero}") for numero in range(desde, desde + 3)])
+        primera = primario.crear_reserva([f"U{desde}"], f"E0{desde % 9 + 1}", 2, self.fecha)
+        segunda = primario.crear_reserva([f"U{desde + 1}"], f"N0{desde % 9 + 1}", 2, self.fecha)
+        primario.cancelar_reserva(segunda)
+        primario.crear_reservas_lote([{"codigos_usuarios": [f"U{desde + 2}"], "dias_reserva": 1,
+                                       "fecha_inicio": date.today(), "cubierta": "premium"}])
+        # Cambios de disponibilidad sin operación del almacenamiento
+        retencion = primario.retener_habitacion(f"P0{desde % 9 + 1}", 1, self.fecha + timedelta(days=10))
+        primario.liberar_retencion(retencion)
+        primario.archivar_finalizadas(date.today() + timedelta(days=1))
+        return primera
+
+    def test_ponerse_al_dia_con_los_cambios(self):
+        flujo = FlujoCambios(self.primario)
+        replica = self._replica()
+        sincronizar(replica, flujo)
+        self.assertEqual(replica.instantaneas, 1)
+
+        self._operar()
+        sincronizar(replica, flujo)
+        self.assertEqual(replica.instantaneas, 1)
+        self.assertEqual(replica.cambios_aplicados, flujo.secuencia)
+        self.assertEqual(replica.estado_replicacion()["retraso_cambios"], 0)
+        self.assertEqual(resumen(replica.crucero), resumen(self.primario))
+
+    def test_ponerse_al_dia_con_una_instantanea(self):
+        flujo = FlujoCambios(self.primario, capacidad=2)
+        replica = self._replica()
+        sincronizar(replica, flujo)
+
+        # El flujo guarda solo dos cambios: la réplica necesita otra instantánea
+        self._operar()
+        self.assertIsNone(flujo.cambios_desde(replica.secuencia))
+        sincronizar(replica, flujo)
+        self.assertEqual(replica.instantaneas, 2)
+        self.assertEqual(replica.secuencia, flujo.secuencia)
+        self.assertEqual(resumen(replica.crucero), resumen(self.primario))
+
+    def test_instantanea_y_cambios_dan_el_mismo_estado(self):
+        flujo = FlujoCambios(self.primario)
+        desde_el_inicio = self._replica()
+        sincronizar(desde_el_inicio, flujo)
+        self._operar()
+        sincronizar(desde_el_inicio, flujo)
+
+        # Una réplica nueva parte de una instantánea a mitad del flujo
+        nueva = self._replica()
+        sincronizar(nueva, flujo)
+        self.assertEqual(nueva.cambios_aplicados, 0)
+        self._operar(desde=3)
+        sincronizar(desde_el_inicio, flujo)
+        sincronizar(nueva, flujo)
+        self.assertEqual(resumen(nueva.crucero), resumen(desde_el_inicio.crucero))
+        self.assertEqual(resumen(nueva.crucero), resumen(self.primario))
+        # Los códigos nuevos continúan la numeración del primario
+        self.assertEqual(nueva.crucero.identificadores.ultimo, self.primario.identificadores.ultimo)
+
+    def test_aplicar_dos_veces_no_tiene_efecto(self):
+        flujo = FlujoCambios(self.primario)
+        replica = self._replica()
+        sincronizar(replica, flujo)
+        self._operar()
+        lineas = flujo.cambios_desde(0)
+        for linea in lineas:
+            operacion = json.loads(linea)
+            replica.aplicar(operacion)
+            replica.aplicar(operacion)
+            # La misma operación también se descarta sin número de secuencia
+            if operacion["op"] != "disponibilidad":
+                replica.crucero.aplicar_operacion(operacion)
+        self.assertEqual(replica.cambios_aplicados, len(lineas))
+        self.assertEqual(resumen(replica.crucero), resumen(self.primario))
+
+    def test_seguir_al_primario_por_socket(self):
+        flujo = FlujoCambios(self.primario)
+        publicador = PublicadorCambios(flujo, puerto=0)
+        publicador.iniciar()
+        replica = self._replica()
+        try:
+            self._operar()
+            replica.conectar(publicador.host, publicador.puerto, reintento=0.05)
+            self._operar(desde=3)
+            limite = time.monotonic() + 10
+            while replica.secuencia < flujo.secuencia and time.monotonic() < limite:
+                time.sleep(0.01)
+            self.assertEqual(replica.secuencia, flujo.secuencia)
+            self.assertEqual(replica.instantaneas, 1)
+            self.assertEqual(resumen(replica.crucero), resumen(self.primario))
+        finally:
+            publicador.detener()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Pruebas de las retenciones temporales de habitaciones.
+
+El reloj de vencimientos del crucero se reemplaza por uno manual, así que
+las pruebas no esperan a que pase el tiempo.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import Crucero
+from Retenciones import PlanificadorVencimientos
+
+class RelojManual:
+    """
+    Reloj que solo avanza cuando la prueba lo indica.
+    """
+
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+class PruebasRetenciones(unittest.TestCase):
+    """
+    Retener, confirmar, liberar y vencer retenciones.
+    """
+
+    def setUp(self):
+        self.fecha = date.today() + timedelta(days=30)
+        self.reloj = RelojManual()
+        self.crucero = Crucero()
+        self.crucero._vencimientos = PlanificadorVencimientos(self.reloj)
+
+    def tearDown(self):
+        self.crucero.cerrar()
+
+    def _retener(self, codigo_habitacion="E01", segundos=60):
+        return self.crucero.retener_habitacion(codigo_habitacion, 2, self.fecha, segundos)
+
+    def _libre(self, codigo_habitacion="E01"):
+        habitacion = self.crucero.buscar_habitacion(codigo_habitacion)
+        return habitacion.esta_libre(self.fecha, self.fecha + timedelta(days=2))
+
+    def test_retencion_bloquea_la_habitacion(self):
+        codigo = self._retener()
+        self.assertIsNotNone(codigo)
+        self.assertFalse(self._libre())
+        self.assertIsNone(self.crucero.crear_reserva(["U1"], "E01", 1, self.fecha))
+        self.assertIsNone(self._retener())
+        self.assertEqual([retencion["codigo_retencion"] for retencion in self.crucero.retenciones()], [codigo])
+        self.assertEqual(self.crucero.proximo_vencimiento(), 60)
+
+    def test_confirmar_antes_de_vencer(self):
+        codigo = self._retener()
+        self.reloj.ahora += 59
+        self.assertEqual(self.crucero.confirmar_retencion(codigo, ["U1"]), codigo)
+        reserva = self.crucero.buscar_reserva(codigo)
+        self.assertEqual((reserva.codigo_habitacion, reserva.fecha_inicio), ("E01", self.fecha))
+        self.assertEqual(self.crucero.retenciones(), [])
+
+        # Ya confirmada, no vence ni se confirma de nuevo
+        self.reloj.ahora += 60
+        self.assertEqual(self.crucero.expirar_retenciones(), 0)
+        self.assertIsNone(self.crucero.confirmar_retencion(codigo, ["U2"]))
+        self.assertIsNotNone(self.crucero.buscar_reserva(codigo))
+
+    def test_vencer_libera_la_habitacion(self):
+        codigo = self._retener()
+        self.reloj.ahora += 30
+        self.assertEqual(self.crucero.expirar_retenciones(), 0)
+        self.reloj.ahora += 30
+        self.assertEqual(self.crucero.expirar_retenciones(), 1)
+        self.assertTrue(self._libre())
+        self.assertEqual(self.crucero.retenciones(), [])
+        self.assertIsNone(self.crucero.proximo_vencimiento())
+        self.assertIsNone(self.crucero.confirmar_retencion(codigo, ["U1"]))
+
+    def test_confirmar_despues_de_vencer_sin_expirar_antes(self):
+        codigo = self._retener()
+        self.reloj.ahora += 61
+        # Nadie llamó a expirar_retenciones: la confirmación comprueba el vencimiento
+        self.assertIsNone(self.crucero.confirmar_retencion(codigo, ["U1"]))
+        self.assertIsNone(self.crucero.buscar_reserva(codigo))
+        self.assertTrue(self._libre())
+        self.assertIsNotNone(self.crucero.crear_reserva(["U2"], "E01", 2, self.fecha))
+
+    def test_liberar(self):
+        codigo = self._retener()
+        self.assertTrue(self.crucero.liberar_retencion(codigo))
+        self.assertTrue(self._libre())
+        self.assertFalse(self.crucero.liberar_retencion(codigo))
+        self.reloj.ahora += 120
+        self.assertEqual(self.crucero.expirar_retenciones(), 0)
+
+    def test_vencen_en_orden_y_solo_las_vencidas(self):
+        corta = self._retener("E01", segundos=10)
+        larga = self._retener("E02", segundos=100)
+        media = self._retener("E03", segundos=50)
+        self.reloj.ahora += 50
+        self.assertEqual(self.crucero.expirar_retenciones(), 2)
+        self.assertEqual([retencion["codigo_retencion"] for retencion in self.crucero.retenciones()], [larga])
+        self.assertTrue(self._libre("E01") and self._libre("E03"))
+        self.assertIsNone(self.crucero.confirmar_retencion(corta, ["U1"]))
+        self.assertIsNone(self.crucero.confirmar_retencion(media, ["U1"]))
+        self.assertEqual(self.crucero.confirmar_retencion(larga, ["U1"]), larga)
+
+    def test_retener_vence_las_pendientes(self):
+        self._retener("E01", segundos=10)
+        self.reloj.ahora += 10
+        self.assertIsNotNone(self._retener("E01"))
+
+    def test_dias_invalidos(self):
+        with self.assertRaises(ValueError):
+            self.crucero.retener_habitacion("E01", 0, self.fecha)
+        self.assertIsNone(self.crucero.retener_habitacion("X99", 2, self.fecha))
+
+class PruebasPlanificador(unittest.TestCase):
+    """
+    Montículo de vencimientos con cancelación perezosa.
+    """
+
+    def test_reprogramar_y_cancelar(self):
+        planificador = PlanificadorVencimientos(lambda: 0.0)
+        planificador.programar("a", 5)
+        planificador.programar("b", 3)
+        planificador.programar("a", 10)
+        planificador.programar("c", 1)
+        self.assertTrue(planificador.cancelar("c"))
+        self.assertFalse(planificador.cancelar("c"))
+        self.assertEqual(len(planificador), 2)
+        self.assertEqual(planificador.proximo(), 3)
+        self.assertEqual(planificador.vencidos(5), ["b"])
+        self.assertEqual(planificador.vencidos(10), ["a"])
+        self.assertIsNone(planificador.proximo())
+
+if __name__ == "__main__":
+    unittest.main()
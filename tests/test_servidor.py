@@ -0,0 +1,301 @@
+"""
+Pruebas del servidor HTTP/JSON del sistema de reservas.
+
+El servidor se inicia en el mismo proceso, en un puerto libre, y se le
+envían peticiones HTTP/1.1 reales por una conexión TCP.
+
+Uso:
+    python -m pytest tests
+"""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import Crucero
+from Metricas import Metricas
+from Servidor import ServidorCrucero
+from Usuario import Usuario
+
+class ClienteHTTP:
+    """
+    Cliente HTTP/1.1 mínimo que reutiliza una sola conexión.
+    """
+
+    def __init__(self, puerto):
+        self.puerto = puerto
+        self.lector = None
+        self.escritor = None
+
+    async def conectar(self):
+        self.lector, self.escritor = await asyncio.open_connection("127.0.0.1", self.puerto)
+
+    async def cerrar(self):
+        self.escritor.close()
+        await self.escritor.wait_closed()
+
+    async def enviar(self, crudo):
+        """
+        Envía una petición ya formada y devuelve (estado, cabeceras, cuerpo).
+        """
+        self.escritor.write(crudo)
+        await self.escritor.drain()
+        cabecera = (await self.lector.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        estado = int(cabecera[0].split(" ")[1])
+        cabeceras = {}
+        for linea in cabecera[1:]:
+            if ":" in linea:
+                nombre, valor = linea.split(":", 1)
+                cabeceras[nombre.strip().lower()] = valor.strip()
+        cuerpo = await self.lector.readexactly(int(cabeceras["content-length"]))
+        if cabeceras["content-type"].startswith("application/json"):
+            cuerpo = json.loads(cuerpo)
+        else:
+            cuerpo = cuerpo.decode("utf-8")
+        return estado, cabeceras, cuerpo
+
+    async def pedir(self, metodo, ruta, datos=None):
+        """
+        Envía una petición con un cuerpo JSON opcional y devuelve (estado, cuerpo).
+        """
+        cuerpo = json.dumps(datos).encode("utf-8") if datos is not None else b""
+        estado, _, respuesta = await self.enviar(
+            f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo)
+        return estado, respuesta
+
+class PruebasServidorBase(unittest.IsolatedAsyncioTestCase):
+    """
+    Inicia un servidor sobre un crucero en memoria y abre una conexión.
+    """
+
+    solo_lectura = False
+
+    async def asyncSetUp(self):
+        self.fecha = date.today() + timedelta(days=30)
+        self.crucero = Crucero()
+        self.crucero.registrar_usuarios([Usuario("Ana Pérez", "U1"), Usuario("Luis Gómez", "U2"),
+                                         Usuario("Eva Ruiz", "U3"), Usuario("Juan Díaz", "U4")])
+        self.metricas = Metricas()
+        self.metricas.instrumentar(self.crucero)
+        self.servidor = ServidorCrucero(self.crucero, puerto=0, hilos=2, metricas=self.metricas,
+                                        solo_lectura=self.solo_lectura)
+        await self.servidor.iniciar()
+        self.cliente = ClienteHTTP(self.servidor.puerto)
+        await self.cliente.conectar()
+
+    async def asyncTearDown(self):
+        await self.cliente.cerrar()
+        await self.servidor.detener()
+        self.crucero.cerrar()
+
+    async def reservar(self, codigo_habitacion, usuarios, dias=2):
+        return await self.cliente.pedir("POST", "/reservas", {
+            "codigo_habitacion": codigo_habitacion, "dias_reserva": dias,
+            "fecha_inicio": self.fecha.isoformat(), "codigos_usuarios": usuarios,
+        })
+
+class PruebasRutas(PruebasServidorBase):
+    """
+    Cada ruta del servidor y sus errores.
+    """
+
+    async def test_habitaciones(self):
+        estado, habitaciones = await self.cliente.pedir("GET", "/habitaciones?cubierta=premium&acomodacion=2")
+        self.assertEqual(estado, 200)
+        self.assertEqual([habitacion["codigo_habitacion"] for habitacion in habitaciones], ["P01", "P02", "P03"])
+        self.assertTrue(all(habitacion["costo_diario"] > 0 for habitacion in habitaciones))
+
+        estado, habitacion = await self.cliente.pedir("GET", "/habitaciones/E01")
+        self.assertEqual((estado, habitacion["codigo_habitacion"]), (200, "E01"))
+        self.assertEqual((await self.cliente.pedir("GET", "/habitaciones/X99"))[0], 404)
+        self.assertEqual((await self.cliente.pedir("GET", "/habitaciones?acomodacion=dos"))[0], 400)
+        self.assertEqual((await self.cliente.pedir("GET", "/habitaciones?fecha_inicio=ayer"))[0], 400)
+
+    async def test_usuarios(self):
+        estado, usuarios = await self.cliente.pedir("GET", "/usuarios?nombre=ana%20perez&limite=1")
+        self.assertEqual(estado, 200)
+        self.assertEqual([usuario["codigo"] for usuario in usuarios], ["U001"])
+        self.assertEqual((await self.cliente.pedir("GET", "/usuarios"))[0], 400)
+        self.assertEqual((await self.cliente.pedir("GET", "/usuarios?nombre=ana&limite=x"))[0], 400)
+
+    async def test_crear_consultar_y_cancelar_reserva(self):
+        estado, creada = await self.reservar("E01", ["U1"])
+        self.assertEqual(estado, 201)
+        self.assertGreater(creada["costo"], 0)
+        codigo = creada["codigo_reserva"]
+
+        estado, reserva = await self.cliente.pedir("GET", f"/reservas/{codigo}")
+        self.assertEqual((estado, reserva["codigo_habitacion"]), (200, "E01"))
+        self.assertIn("descripcion", reserva)
+
+        self.assertEqual((await self.reservar("E01", ["U2"]))[0], 409)
+        self.assertEqual((await self.reservar("X99", ["U2"]))[0], 409)
+
+        estado, cancelada = await self.cliente.pedir("DELETE", f"/reservas/{codigo}")
+        self.assertEqual((estado, cancelada["cancelada"]), (200, True))
+        self.assertEqual((await self.cliente.pedir("DELETE", f"/reservas/{codigo}"))[0], 404)
+        self.assertEqual((await self.cliente.pedir("GET", f"/reservas/{codigo}"))[0], 404)
+
+    async def test_reserva_con_cuerpo_invalido(self):
+        for datos in (
+            [1, 2],
+            {"codigo_habitacion": "E01", "codigos_usuarios": ["U1"]},
+            {"codigo_habitacion": "E01", "dias_reserva": 0, "codigos_usuarios": ["U1"]},
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "codigos_usuarios": "U1"},
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "codigos_usuarios": ["U1", ""]},
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "codigos_usuarios": [1]},
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "codigos_usuarios": []},
+            {"codigo_habitacion": "E01", "dias_reserva": 2, "codigos_usuarios": ["U1"], "fecha_inicio": "x"},
+        ):
+            with self.subTest(datos=datos):
+                estado, respuesta = await self.cliente.pedir("POST", "/reservas", datos)
+                self.assertEqual(estado, 400)
+                self.assertIn("error", respuesta)
+        self.assertEqual(len(self.crucero.reservas), 0)
+
+    async def test_listar_reservas_por_paginas(self):
+        for numero, codigo_habitacion in enumerate(("E01", "E02", "E03"), start=1):
+            await self.reservar(codigo_habitacion, [f"U{numero}"])
+
+        codigos = []
+        cursor = None
+        while True:
+            ruta = "/reservas?limite=2" + (f"&cursor={cursor}" if cursor else "")
+            estado, pagina = await self.cliente.pedir("GET", ruta)
+            self.assertEqual(estado, 200)
+            self.assertLessEqual(len(pagina["reservas"]), 2)
+            codigos.extend(reserva["codigo_reserva"] for reserva in pagina["reservas"])
+            cursor = pagina["cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(codigos, sorted(reserva.codigo_reserva for reserva in self.crucero.reservas))
+
+        estado, pagina = await self.cliente.pedir("GET", "/reservas?habitacion=E02")
+        self.assertEqual([reserva["codigo_habitacion"] for reserva in pagina["reservas"]], ["E02"])
+        self.assertEqual((await self.cliente.pedir("GET", "/reservas?limite=0"))[0], 400)
+
+    async def test_historial(self):
+        _, creada = await self.reservar("E01", ["U1"])
+        self.crucero.archivar_finalizadas(self.fecha + timedelta(days=2))
+        estado, archivadas = await self.cliente.pedir("GET", "/historial?habitacion=E01")
+        self.assertEqual(estado, 200)
+        self.assertEqual([reserva["codigo_reserva"] for reserva in archivadas], [creada["codigo_reserva"]])
+        self.assertEqual((await self.cliente.pedir("GET", f"/reservas/{creada['codigo_reserva']}"))[0], 200)
+        self.assertEqual((await self.cliente.pedir("GET", "/historial?limite=-1"))[0], 400)
+
+    async def test_retenciones(self):
+        estado, retenida = await self.cliente.pedir("POST", "/retenciones", {
+            "codigo_habitacion": "E01", "dias_reserva": 2, "fecha_inicio": self.fecha.isoformat(), "segundos": 60})
+        self.assertEqual(estado, 201)
+        codigo = retenida["codigo_retencion"]
+        estado, retenciones = await self.cliente.pedir("GET", "/retenciones")
+        self.assertEqual(len(retenciones), 1)
+        self.assertEqual((await self.reservar("E01", ["U2"]))[0], 409)
+
+        ruta = f"/retenciones/{codigo}/confirmar"
+        self.assertEqual((await self.cliente.pedir("POST", ruta, {"codigos_usuarios": "U1"}))[0], 400)
+        estado, confirmada = await self.cliente.pedir("POST", ruta, {"codigos_usuarios": ["U1"]})
+        self.assertEqual(estado, 201)
+        self.assertIsNotNone(self.crucero.buscar_reserva(confirmada["codigo_reserva"]))
+        self.assertEqual((await self.cliente.pedir("POST", ruta, {"codigos_usuarios": ["U1"]}))[0], 404)
+
+        _, retenida = await self.cliente.pedir("POST", "/retenciones", {
+            "codigo_habitacion": "E02", "dias_reserva": 2, "fecha_inicio": self.fecha.isoformat()})
+        codigo = retenida["codigo_retencion"]
+        self.assertEqual((await self.cliente.pedir("DELETE", f"/retenciones/{codigo}"))[0], 200)
+        self.assertEqual((await self.cliente.pedir("DELETE", f"/retenciones/{codigo}"))[0], 404)
+        self.assertEqual((await self.cliente.pedir("POST", "/retenciones", {"codigo_habitacion": "E02"}))[0], 400)
+
+    async def test_lista_de_espera(self):
+        codigos = []
+        for numero, codigo_habitacion in enumerate(("P01", "P02", "P03"), start=1):
+            codigos.append((await self.reservar(codigo_habitacion, [f"U{numero}"]))[1]["codigo_reserva"])
+        solicitud = {"codigos_usuarios": ["U4"], "cubierta": "premium", "acomodacion": 2,
+                     "dias_reserva": 2, "fecha_inicio": self.fecha.isoformat()}
+
+        estado, espera = await self.cliente.pedir("POST", "/espera", solicitud)
+        self.assertEqual((estado, espera["en_espera"]), (202, True))
+        estado, pendientes = await self.cliente.pedir("GET", "/espera")
+        self.assertEqual([pendiente["codigo_reserva"] for pendiente in pendientes], [espera["codigo_reserva"]])
+
+        # Al cancelar una reserva del grupo, la solicitud en espera la ocupa
+        await self.cliente.pedir("DELETE", f"/reservas/{codigos[0]}")
+        self.assertEqual((await self.cliente.pedir("GET", "/espera"))[1], [])
+        estado, reserva = await self.cliente.pedir("GET", f"/reservas/{espera['codigo_reserva']}")
+        self.assertEqual((estado, reserva["codigo_habitacion"]), (200, "P01"))
+        self.assertEqual((await self.cliente.pedir("DELETE", f"/espera/{espera['codigo_reserva']}"))[0], 404)
+
+        estado, espera = await self.cliente.pedir("POST", "/espera", dict(solicitud, codigos_usuarios=["U1"]))
+        self.assertEqual(estado, 202)
+        self.assertEqual((await self.cliente.pedir("DELETE", f"/espera/{espera['codigo_reserva']}"))[0], 200)
+        self.assertEqual((await self.cliente.pedir("POST", "/espera", dict(solicitud, codigos_usuarios="U1")))[0], 400)
+        self.assertEqual((await self.cliente.pedir("POST", "/espera", dict(solicitud, cubierta="suite")))[0], 400)
+
+    async def test_metricas(self):
+        await self.reservar("E01", ["U1"])
+        estado, texto = await self.cliente.pedir("GET", "/metricas")
+        self.assertEqual(estado, 200)
+        self.assertIn("crear_reserva", texto)
+        estado, datos = await self.cliente.pedir("GET", "/metricas?formato=json")
+        self.assertEqual(estado, 200)
+        self.assertIsInstance(datos, dict)
+
+    async def test_rutas_y_metodos_desconocidos(self):
+        self.assertEqual((await self.cliente.pedir("GET", "/nada"))[0], 404)
+        self.assertEqual((await self.cliente.pedir("PUT", "/reservas"))[0], 405)
+        self.assertEqual((await self.cliente.pedir("POST", "/habitaciones/E01"))[0], 405)
+
+class PruebasConexion(PruebasServidorBase):
+    """
+    Manejo de la conexión: keep-alive, cierre y cabeceras inválidas.
+    """
+
+    async def test_varias_peticiones_por_la_misma_conexion(self):
+        for _ in range(3):
+            estado, cabeceras, _ = await self.cliente.enviar(b"GET /habitaciones/E01 HTTP/1.1\r\n\r\n")
+            self.assertEqual(estado, 200)
+            self.assertEqual(cabeceras["connection"], "keep-alive")
+
+    async def test_connection_close_y_http_1_0_cierran(self):
+        for peticion in (b"GET /habitaciones/E01 HTTP/1.1\r\nConnection: close\r\n\r\n",
+                         b"GET /habitaciones/E01 HTTP/1.0\r\n\r\n"):
+            with self.subTest(peticion=peticion):
+                estado, cabeceras, _ = await self.cliente.enviar(peticion)
+                self.assertEqual((estado, cabeceras["connection"]), (200, "close"))
+                self.assertEqual(await self.cliente.lector.read(), b"")
+                await self.cliente.cerrar()
+                await self.cliente.conectar()
+
+    async def test_content_length_invalido(self):
+        for longitud in (b"-5", b"abc", b"+3", b"1_0"):
+            with self.subTest(longitud=longitud):
+                estado, cabeceras, _ = await self.cliente.enviar(
+                    b"POST /reservas HTTP/1.1\r\nContent-Length: " + longitud + b"\r\n\r\n")
+                self.assertEqual((estado, cabeceras["connection"]), (400, "close"))
+                await self.cliente.cerrar()
+                await self.cliente.conectar()
+
+    async def test_cuerpo_demasiado_grande(self):
+        estado, _, _ = await self.cliente.enviar(b"POST /reservas HTTP/1.1\r\nContent-Length: 99999999\r\n\r\n")
+        self.assertEqual(estado, 413)
+
+class PruebasSoloLectura(PruebasServidorBase):
+    """
+    Servidor que solo atiende consultas, como el de una réplica.
+    """
+
+    solo_lectura = True
+
+    async def test_rechaza_escrituras(self):
+        self.assertEqual((await self.reservar("E01", ["U1"]))[0], 405)
+        self.assertEqual((await self.cliente.pedir("GET", "/habitaciones/E01"))[0], 200)
+        self.assertEqual(len(self.crucero.reservas), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Pruebas de los códigos canónicos de usuario y del registro de usuarios.
+
+Uso:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crucero import Crucero
+from RegistroUsuarios import RegistroUsuarios
+from Usuario import Usuario, normalizar_codigo_usuario
+
+class PruebasCodigoCanonico(unittest.TestCase):
+    """
+    Formas equivalentes de un mismo código de usuario.
+    """
+
+    def test_formas_equivalentes(self):
+        for codigo in (7, "7", " 7 ", "u7", "U7", "U07", "U007", "007"):
+            with self.subTest(codigo=codigo):
+                self.assertEqual(normalizar_codigo_usuario(codigo), "U007")
+        self.assertEqual(normalizar_codigo_usuario("U1234"), "U1234")
+
+    def test_codigos_generados_y_otros_formatos_no_cambian(self):
+        generado = Usuario("Ana").codigo
+        self.assertEqual(len(generado), 20)
+        self.assertEqual(normalizar_codigo_usuario(generado), generado)
+        self.assertEqual(normalizar_codigo_usuario(" AG-15 "), "AG-15")
+        self.assertEqual(normalizar_codigo_usuario("U7a"), "U7a")
+
+    def test_vacantes(self):
+        self.assertIsNone(RegistroUsuarios.codigo_canonico(None))
+        self.assertIsNone(RegistroUsuarios.codigo_canonico(""))
+
+class PruebasRegistroUsuarios(unittest.TestCase):
+    """
+    Búsquedas del registro y vínculos entre usuarios y reservas.
+    """
+
+    def setUp(self):
+        self.fecha = date.today() + timedelta(days=30)
+        self.crucero = Crucero()
+        self.crucero.registrar_usuarios([Usuario("José Muñoz", "U7"), Usuario("Ana", "12")])
+
+    def tearDown(self):
+        self.crucero.cerrar()
+
+    def test_buscar_por_cualquier_forma(self):
+        for codigo in ("U7", "u07", "7", "U007"):
+            self.assertEqual(self.crucero.buscar_usuario(codigo).nombre, "José Muñoz")
+        self.assertEqual(self.crucero.buscar_usuario("U12").codigo, "U012")
+        self.assertIn("007", self.crucero.usuarios)
+        self.assertIsNone(self.crucero.buscar_usuario("U8"))
+
+    def test_no_registra_dos_veces_el_mismo_codigo(self):
+        self.assertFalse(self.crucero.registrar_usuario(Usuario("Otro", "U007")))
+        self.assertEqual(len(self.crucero.usuarios), 2)
+
+    def test_buscar_por_nombre_sin_acentos_ni_mayusculas(self):
+        self.assertEqual([usuario.codigo for usuario in self.crucero.buscar_usuarios_por_nombre("jose munoz")],
+                         ["U007"])
+
+    def test_reserva_vincula_y_libera_a_sus_usuarios(self):
+        codigo = self.crucero.crear_reserva(["7", "U12"], "E01", 2, self.fecha)
+        reserva = self.crucero.buscar_reserva(codigo)
+        self.assertEqual(reserva.codigos_usuarios, ["U007", "U012"])
+        self.assertEqual(self.crucero.buscar_usuario("U7").obtener_reserva(), codigo)
+        self.assertEqual([usuario.codigo for usuario in self.crucero.usuarios.usuarios_de_reserva(codigo)],
+                         ["U007", "U012"])
+
+        self.crucero.cancelar_reserva(codigo)
+        self.assertIsNone(self.crucero.buscar_usuario("U7").obtener_reserva())
+        self.assertEqual(self.crucero.usuarios.usuarios_de_reserva(codigo), [])
+
+    def test_archivar_registra_la_fecha_de_salida(self):
+        self.crucero.crear_reserva(["U7"], "E01", 2, self.fecha)
+        self.crucero.archivar_finalizadas(self.fecha + timedelta(days=2))
+        usuario = self.crucero.buscar_usuario("U7")
+        self.assertIsNone(usuario.obtener_reserva())
+        self.assertEqual(usuario.fecha_salida, self.fecha + timedelta(days=2))
+
+    def test_a_dict_y_desde_dict(self):
+        usuario = self.crucero.buscar_usuario("U7")
+        usuario.fecha_salida = self.fecha
+        copia = Usuario.desde_dict(usuario.a_dict())
+        self.assertEqual((copia.codigo, copia.nombre, copia.fecha_registro, copia.fecha_salida),
+                         (usuario.codigo, usuario.nombre, usuario.fecha_registro, usuario.fecha_salida))
+
+if __name__ == "__main__":
+    unittest.main()